@@ -12,11 +12,21 @@ import os
 import sqlite3
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set
 from urllib.parse import urlparse
 
 import jwt
 import uvicorn
+from fastapi.responses import StreamingResponse
+
+from config.database_manager import AsyncDatabasePool
+from crawled_pages import (
+    crawled_items,
+    ensure_crawled_pages_table,
+    find_crawled_page_async,
+    index_job_result_async,
+)
+from job_progress import RUNNING_STATUSES, JobProgressRegistry
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +38,7 @@ from fastapi import (
     Depends,
     FastAPI,
     HTTPException,
+    Query,
     Request,
     WebSocket,
     WebSocketDisconnect,
@@ -445,6 +456,13 @@ def get_ai_service():
 # Database setup
 DATABASE_PATH = database_config.DATABASE_PATH
 
+# Shared async connection pool used by every request handler
+db_pool = AsyncDatabasePool(
+    DATABASE_PATH,
+    pool_size=database_config.DB_MAX_CONNECTIONS,
+    timeout=database_config.DB_CONNECTION_TIMEOUT,
+)
+
 
 def init_database():
     """Initialize SQLite database with required tables"""
@@ -502,6 +520,12 @@ def init_database():
         )
     """
     )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_job_results_job_id
+        ON job_results (job_id, id)
+    """
+    )
 
     # Analytics table
     cursor.execute(
@@ -516,6 +540,9 @@ def init_database():
     """
     )
 
+    # URL -> job_results position index used by /api/cfpl/page-content
+    ensure_crawled_pages_table(cursor)
+
     # Create default admin user with secure password hashing
     current_config = get_config()
     default_password = getattr(current_config, 'DEFAULT_PASSWORD', 'admin123')
@@ -615,6 +642,7 @@ async def startup_event():
 
     # Initialize database
     init_database()
+    await db_pool.open()
 
     # Initialize enhanced monitoring if available
     if ENHANCED_MONITORING_AVAILABLE:
@@ -648,6 +676,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup resources on shutdown"""
+    await db_pool.close()
+
     if ADVANCED_CONFIG_AVAILABLE and config_manager:
         try:
             await config_manager.stop_watching()
@@ -746,15 +776,76 @@ async def get_bearer_token(request: Request):
 
 # WebSocket connection manager
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self, progress_registry: JobProgressRegistry, progress_interval: float = 0.5
+    ):
         self.active_connections: List[WebSocket] = []
+        self.progress_registry = progress_registry
+        self.progress_interval = progress_interval
+        self.progress_subscriptions: Dict[int, Set[WebSocket]] = {}
+        self._progress_task: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        for job_id in list(self.progress_subscriptions):
+            self.unsubscribe_progress(websocket, job_id)
+
+    def subscribe_progress(self, websocket: WebSocket, job_id: int):
+        """Push progress of job_id to websocket until the job finishes"""
+        self.progress_subscriptions.setdefault(job_id, set()).add(websocket)
+        if self._progress_task is None or self._progress_task.done():
+            self._progress_task = asyncio.create_task(self._pump_progress())
+
+    def unsubscribe_progress(self, websocket: WebSocket, job_id: int):
+        subscribers = self.progress_subscriptions.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.progress_subscriptions[job_id]
+
+    async def flush_progress(self):
+        """Send one coalesced snapshot per changed job to its subscribers"""
+        for snapshot in self.progress_registry.drain_changes():
+            job_id = snapshot["job_id"]
+            subscribers = self.progress_subscriptions.get(job_id)
+            if not subscribers:
+                continue
+
+            message = json.dumps({"type": "job_progress", "data": snapshot})
+            sockets = list(subscribers)
+            sent = await asyncio.gather(
+                *(self._send_progress(websocket, message) for websocket in sockets)
+            )
+            for websocket, ok in zip(sockets, sent):
+                if not ok:
+                    self.unsubscribe_progress(websocket, job_id)
+
+            # The final snapshot has gone out; nothing more will change
+            if snapshot["status"] not in RUNNING_STATUSES:
+                self.progress_subscriptions.pop(job_id, None)
+
+    async def _send_progress(self, websocket: WebSocket, message: str) -> bool:
+        try:
+            await asyncio.wait_for(
+                websocket.send_text(message), timeout=self.progress_interval * 4
+            )
+            return True
+        except Exception:
+            return False
+
+    async def _pump_progress(self):
+        # Events arriving between ticks collapse into one message per job
+        while self.progress_subscriptions:
+            await asyncio.sleep(self.progress_interval)
+            try:
+                await self.flush_progress()
+            except Exception as e:
+                logger.warning(f"Progress push failed: {e}")
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
@@ -767,7 +858,8 @@ class ConnectionManager:
                 pass
 
 
-manager = ConnectionManager()
+progress_registry = JobProgressRegistry()
+manager = ConnectionManager(progress_registry)
 
 
 # Pydantic models
@@ -838,8 +930,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(get_bearer_token)):
+async def get_current_user(token: str = Depends(get_bearer_token)):
     """Get current authenticated user"""
+    return await _user_from_token(token)
+
+
+async def _user_from_token(token: str) -> Dict[str, Any]:
+    """Resolve a JWT to its active user, raising 401 otherwise"""
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         username: str = payload.get("sub")
@@ -848,13 +945,9 @@ def get_current_user(token: str = Depends(get_bearer_token)):
                 status_code=401, detail="Invalid authentication credentials"
             )
 
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
+        user = await db_pool.fetchone(
             "SELECT * FROM users WHERE username = ? AND is_active = 1", (username,)
         )
-        user = cursor.fetchone()
-        conn.close()
 
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
@@ -907,24 +1000,18 @@ async def health_check():
 @limiter.limit(f"{security_config.API_RATE_LIMIT_PER_MINUTE}/minute")
 async def login(request: Request, user_data: UserLogin):
     """User authentication endpoint with rate limiting"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+    user = await db_pool.fetchone(
         "SELECT * FROM users WHERE username = ? AND is_active = 1",
         (user_data.username,),
     )
-    user = cursor.fetchone()
 
     if not user or not verify_user_password(user_data.password, user[3]):
-        conn.close()
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
     # Update last login
-    cursor.execute(
+    await db_pool.execute(
         "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user[0],)
     )
-    conn.commit()
-    conn.close()
 
     # Create access token
     access_token = create_access_token(data={"sub": user[1]})
@@ -967,9 +1054,7 @@ async def create_job(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+    job_id, _ = await db_pool.execute(
         """
         INSERT INTO jobs (name, type, config, created_by, status)
         VALUES (?, ?, ?, ?, 'pending')
@@ -981,9 +1066,6 @@ async def create_job(
             current_user["id"],
         ),
     )
-    job_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
 
     # Broadcast job creation to WebSocket clients
     await manager.broadcast(
@@ -1021,55 +1103,53 @@ async def create_batch_jobs(
         raise HTTPException(status_code=400, detail="Too many URLs (max 100)")
 
     created_jobs = []
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
 
     try:
-        for i, url in enumerate(batch_data.urls):
-            # Create job name with index
-            job_name = f"{batch_data.base_name} - Job {i + 1}"
-
-            # Build job configuration
-            job_config = {
-                "url": url,
-                "scraper_type": batch_data.scraper_type or "basic",
-                "config": batch_data.config or {},
-            }
-
-            # Validate job configuration for security
-            try:
-                validated_config = validate_job_config(job_config)
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=400, detail=f"Invalid config for URL {url}: {str(e)}"
-                )
-
-            # Insert job into database
-            cursor.execute(
-                """
-                INSERT INTO jobs (name, type, config, created_by, status)
-                VALUES (?, ?, ?, ?, 'pending')
-                """,
-                (
-                    job_name,
-                    "batch_scraping",
-                    json.dumps(validated_config),
-                    current_user["id"],
-                ),
-            )
-            job_id = cursor.lastrowid
+        async with db_pool.transaction() as conn:
+            for i, url in enumerate(batch_data.urls):
+                # Create job name with index
+                job_name = f"{batch_data.base_name} - Job {i + 1}"
 
-            created_jobs.append(
-                {
-                    "id": job_id,
-                    "name": job_name,
+                # Build job configuration
+                job_config = {
                     "url": url,
-                    "scraper_type": batch_data.scraper_type,
-                    "status": "pending",
+                    "scraper_type": batch_data.scraper_type or "basic",
+                    "config": batch_data.config or {},
                 }
-            )
 
-        conn.commit()
+                # Validate job configuration for security
+                try:
+                    validated_config = validate_job_config(job_config)
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid config for URL {url}: {str(e)}",
+                    )
+
+                # Insert job into database
+                cursor = await conn.execute(
+                    """
+                    INSERT INTO jobs (name, type, config, created_by, status)
+                    VALUES (?, ?, ?, ?, 'pending')
+                    """,
+                    (
+                        job_name,
+                        "batch_scraping",
+                        json.dumps(validated_config),
+                        current_user["id"],
+                    ),
+                )
+                job_id = cursor.lastrowid
+
+                created_jobs.append(
+                    {
+                        "id": job_id,
+                        "name": job_name,
+                        "url": url,
+                        "scraper_type": batch_data.scraper_type,
+                        "status": "pending",
+                    }
+                )
 
         # Broadcast batch job creation to WebSocket clients
         await manager.broadcast(
@@ -1093,28 +1173,21 @@ async def create_batch_jobs(
         }
 
     except Exception as e:
-        conn.rollback()
         raise HTTPException(
             status_code=500, detail=f"Failed to create batch jobs: {str(e)}"
         )
-    finally:
-        conn.close()
 
 
 @app.get("/api/jobs/{job_id}")
 async def get_job(job_id: int, current_user: dict = Depends(get_current_user)):
     """Get specific job details"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+    job = await db_pool.fetchone(
         """
         SELECT * FROM jobs 
         WHERE id = ? AND created_by = ?
     """,
         (job_id, current_user["id"]),
     )
-    job = cursor.fetchone()
-    conn.close()
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -1133,11 +1206,8 @@ async def get_job(job_id: int, current_user: dict = Depends(get_current_user)):
 @app.post("/api/jobs/{job_id}/start")
 async def start_job(job_id: int, current_user: dict = Depends(get_current_user)):
     """Start a scraping job"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
     # First, get the job configuration and type
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         """
         SELECT config, type FROM jobs 
         WHERE id = ? AND created_by = ?
@@ -1145,9 +1215,7 @@ async def start_job(job_id: int, current_user: dict = Depends(get_current_user))
         (job_id, current_user["id"]),
     )
 
-    job_row = cursor.fetchone()
     if not job_row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
 
     job_config = json.loads(job_row[0]) if job_row[0] else {}
@@ -1157,7 +1225,7 @@ async def start_job(job_id: int, current_user: dict = Depends(get_current_user))
     job_config["type"] = job_type
 
     # Update job status to running
-    cursor.execute(
+    await db_pool.execute(
         """
         UPDATE jobs 
         SET status = 'running', started_at = CURRENT_TIMESTAMP 
@@ -1165,22 +1233,37 @@ async def start_job(job_id: int, current_user: dict = Depends(get_current_user))
     """,
         (job_id,),
     )
-    conn.commit()
-    conn.close()
 
     # Execute real scraping job in background
-    asyncio.create_task(execute_real_scraping_job(job_id, job_config))
+    asyncio.create_task(
+        execute_real_scraping_job(job_id, job_config, owner_id=current_user["id"])
+    )
 
     return {"message": "Job started successfully"}
 
 
-async def execute_real_scraping_job(job_id: int, job_config: Dict[str, Any]):
+def _estimated_target(job_config: Dict[str, Any]) -> int:
+    """Expected page count of a job, from max_pages or crawl_depth in its config"""
+    for config_data in (job_config, job_config.get("config") or {}):
+        try:
+            if "max_pages" in config_data:
+                return int(config_data["max_pages"])
+            if "crawl_depth" in config_data:
+                # Estimate based on depth (exponential growth assumption)
+                return min(1000, 10 ** int(config_data["crawl_depth"]))  # Cap at 1000
+        except (TypeError, ValueError):
+            pass
+    return 100  # Default estimate
+
+
+async def execute_real_scraping_job(
+    job_id: int, job_config: Dict[str, Any], owner_id: Optional[int] = None
+):
     """Execute real scraping job using the scraping engine"""
+    progress_registry.start(job_id, owner_id, _estimated_target(job_config))
     try:
         # Update job status to running
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
+        await db_pool.execute(
             """
             UPDATE jobs 
             SET status = 'running'
@@ -1188,8 +1271,6 @@ async def execute_real_scraping_job(job_id: int, job_config: Dict[str, Any]):
         """,
             (job_id,),
         )
-        conn.commit()
-        conn.close()
 
         # Broadcast job start
         await manager.broadcast(
@@ -1198,8 +1279,18 @@ async def execute_real_scraping_job(job_id: int, job_config: Dict[str, Any]):
             )
         )
 
-        # Execute the scraping job
-        result = await execute_scraping_job(job_id, job_config)
+        # Execute the scraping job, publishing per-page progress as it goes
+        result = await execute_scraping_job(
+            job_id,
+            job_config,
+            progress_callback=lambda event: progress_registry.publish(job_id, event),
+        )
+        summary = (result.get("data") or {}).get("summary") or {}
+        progress_registry.finish(
+            job_id,
+            result["status"],
+            summary.get("pages_processed", 1 if result["status"] == "completed" else 0),
+        )
 
         # Broadcast job completion
         await manager.broadcast(
@@ -1219,12 +1310,11 @@ async def execute_real_scraping_job(job_id: int, job_config: Dict[str, Any]):
     except Exception as e:
         # Handle any errors during job execution
         print(f"Error executing job {job_id}: {str(e)}")
+        progress_registry.finish(job_id, "failed")
 
         # Update job status to failed
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
-            cursor.execute(
+            await db_pool.execute(
                 """
                 UPDATE jobs 
                 SET status = 'failed', 
@@ -1234,8 +1324,6 @@ async def execute_real_scraping_job(job_id: int, job_config: Dict[str, Any]):
             """,
                 (str(e), job_id),
             )
-            conn.commit()
-            conn.close()
 
             # Broadcast job failure
             await manager.broadcast(
@@ -1250,14 +1338,155 @@ async def execute_real_scraping_job(job_id: int, job_config: Dict[str, Any]):
             print(f"Failed to update job status: {str(db_error)}")
 
 
-@app.get("/api/jobs/{job_id}/results")
-async def get_job_results(job_id: int, current_user: dict = Depends(get_current_user)):
-    """Get results for a specific job"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+def _project_fields(
+    record: Dict[str, Any], fields: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Keep only the requested keys of a page record"""
+    if not fields:
+        return record
+    return {key: record[key] for key in fields if key in record}
+
+
+def _decode_result_row(
+    row: tuple, fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Decode one (id, data, created_at) job_results row, applying field projection"""
+    result_id, blob, created_at = row
+    try:
+        data = json.loads(blob)
+    except json.JSONDecodeError:
+        # Handle any JSON parsing errors
+        return {
+            "error": "Failed to parse result data",
+            "raw_data": blob,
+            "retrieved_at": created_at,
+            "result_id": result_id,
+        }
+
+    if fields:
+        if isinstance(data.get("crawled_data"), list):
+            data["crawled_data"] = [
+                _project_fields(item, fields) for item in data["crawled_data"]
+            ]
+        else:
+            data = _project_fields(data, fields)
+
+    data["retrieved_at"] = created_at
+    data["result_id"] = result_id
+    return data
+
+
+# A crawl job stores every page in one row's crawled_data array. With a page
+# window, SQLite slices that array so only the requested pages reach Python.
+_CRAWL_PAGE_WINDOW_SQL = """
+    CASE WHEN json_valid(data) AND json_type(data, '$.crawled_data') = 'array'
+    THEN json_set(
+        data,
+        '$.crawled_data', json((
+            SELECT json_group_array(json(value)) FROM (
+                SELECT value FROM json_each(job_results.data, '$.crawled_data')
+                WHERE key >= ? ORDER BY key LIMIT ?
+            )
+        )),
+        '$.crawled_data_total', json_array_length(data, '$.crawled_data')
+    )
+    ELSE data END
+"""
+
+
+def _job_results_query(
+    job_id: int,
+    cursor_id: Optional[int],
+    limit: Optional[int],
+    page_offset: int = 0,
+    page_limit: Optional[int] = None,
+):
+    """SQL and parameters for a newest-first page of a job's result rows"""
+    params: List[Any] = []
+    data_column = "data"
+    if page_limit is not None:
+        data_column = _CRAWL_PAGE_WINDOW_SQL
+        params.extend([page_offset, page_limit])
+
+    sql = f"SELECT id, {data_column}, created_at FROM job_results WHERE job_id = ?"
+    params.append(job_id)
+    if cursor_id is not None:
+        sql += " AND id < ?"
+        params.append(cursor_id)
+    sql += " ORDER BY id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+def _add_next_page_offset(result: Dict[str, Any], page_offset: int) -> Dict[str, Any]:
+    """Point a windowed crawl result at its next page window, or None at the end"""
+    total = result.get("crawled_data_total")
+    if total is not None:
+        end = page_offset + len(result["crawled_data"])
+        result["next_page_offset"] = end if end < total else None
+    return result
+
+
+# Rows read per query while streaming. The pooled connection (and its WAL
+# read snapshot) is released between batches, so a slow client never pins it.
+STREAM_BATCH_ROWS = 20
+
+
+async def _stream_job_results(
+    job_id: int,
+    cursor_id: Optional[int],
+    limit: Optional[int],
+    fields: Optional[List[str]],
+    page_offset: int = 0,
+    page_limit: Optional[int] = None,
+):
+    """Yield job results as NDJSON, reading a bounded batch of rows at a time"""
+    remaining = limit
+    while remaining is None or remaining > 0:
+        batch_size = STREAM_BATCH_ROWS
+        if remaining is not None:
+            batch_size = min(batch_size, remaining)
+            remaining -= batch_size
+        rows = await db_pool.fetchall(
+            *_job_results_query(job_id, cursor_id, batch_size, page_offset, page_limit)
+        )
+        for row in rows:
+            result = _decode_result_row(row, fields)
+            yield json.dumps(_add_next_page_offset(result, page_offset)) + "\n"
+        if len(rows) < batch_size:
+            return
+        cursor_id = rows[-1][0]
 
+
+@app.get("/api/jobs/{job_id}/results")
+async def get_job_results(
+    job_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[int] = None,
+    fields: Optional[str] = None,
+    page_offset: int = Query(0, ge=0),
+    page_limit: Optional[int] = Query(None, ge=1, le=1000),
+    response_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get results for a specific job, newest first.
+
+    - limit / cursor: page through result rows; pass the returned next_cursor
+      to get the following page
+    - page_offset / page_limit: page through the pages of a crawl result. A
+      crawl stores all its pages in one row, so without a page window the
+      whole row is loaded. Windowed crawl results carry crawled_data_total
+      and next_page_offset.
+    - fields: comma-separated page fields to return (e.g. url,title,links)
+    - format=ndjson: stream one JSON result per line instead of a single body
+
+    Without limit, cursor or format the response is the full list, as before.
+    """
     # First check if job exists and belongs to user
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         """
         SELECT id FROM jobs 
         WHERE id = ? AND created_by = ?
@@ -1265,82 +1494,77 @@ async def get_job_results(job_id: int, current_user: dict = Depends(get_current_
         (job_id, current_user["id"]),
     )
 
-    if not cursor.fetchone():
-        conn.close()
+    if not job_row:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # Get job results
-    cursor.execute(
-        """
-        SELECT data, created_at FROM job_results 
-        WHERE job_id = ?
-        ORDER BY created_at DESC
-    """,
-        (job_id,),
+    field_list = None
+    if fields:
+        field_list = [field.strip() for field in fields.split(",") if field.strip()]
+
+    if response_format == "ndjson":
+        return StreamingResponse(
+            _stream_job_results(
+                job_id, cursor, limit, field_list, page_offset, page_limit
+            ),
+            media_type="application/x-ndjson",
+        )
+
+    rows = await db_pool.fetchall(
+        *_job_results_query(job_id, cursor, limit, page_offset, page_limit)
     )
+    results = [
+        _add_next_page_offset(_decode_result_row(row, field_list), page_offset)
+        for row in rows
+    ]
 
-    results = []
-    for row in cursor.fetchall():
-        try:
-            data = json.loads(row[0])
-            data["retrieved_at"] = row[1]
-            results.append(data)
-        except json.JSONDecodeError:
-            # Handle any JSON parsing errors
-            results.append(
-                {
-                    "error": "Failed to parse result data",
-                    "raw_data": row[0],
-                    "retrieved_at": row[1],
-                }
-            )
+    if limit is None and cursor is None:
+        return results
 
-    conn.close()
-    return results
+    next_cursor = None
+    if limit is not None and len(results) == limit:
+        next_cursor = results[-1]["result_id"]
+    return {"job_id": job_id, "results": results, "next_cursor": next_cursor}
 
 
 async def simulate_job_execution(job_id: int):
     """Legacy simulation method - kept for backward compatibility"""
     await asyncio.sleep(2)  # Simulate processing time
 
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
-    # Update job status to completed
-    cursor.execute(
-        """
-        UPDATE jobs 
-        SET status = 'completed', completed_at = CURRENT_TIMESTAMP, results_count = ?
-        WHERE id = ?
-    """,
-        (42, job_id),
-    )  # Simulate 42 results
-
-    # Add some sample results
-    sample_data = [
-        {
-            "url": "https://example.com/page1",
-            "title": "Sample Page 1",
-            "content": "Sample content 1",
-        },
-        {
-            "url": "https://example.com/page2",
-            "title": "Sample Page 2",
-            "content": "Sample content 2",
-        },
-    ]
-
-    for data in sample_data:
-        cursor.execute(
+    async with db_pool.transaction() as conn:
+        # Update job status to completed
+        await conn.execute(
             """
-            INSERT INTO job_results (job_id, data)
-            VALUES (?, ?)
+            UPDATE jobs
+            SET status = 'completed', completed_at = CURRENT_TIMESTAMP,
+                results_count = ?
+            WHERE id = ?
         """,
-            (job_id, json.dumps(data)),
-        )
+            (42, job_id),
+        )  # Simulate 42 results
 
-    conn.commit()
-    conn.close()
+        # Add some sample results
+        sample_data = [
+            {
+                "url": "https://example.com/page1",
+                "title": "Sample Page 1",
+                "content": "Sample content 1",
+            },
+            {
+                "url": "https://example.com/page2",
+                "title": "Sample Page 2",
+                "content": "Sample content 2",
+            },
+        ]
+
+        for data in sample_data:
+            cursor = await conn.execute(
+                """
+                INSERT INTO job_results (job_id, data)
+                VALUES (?, ?)
+            """,
+                (job_id, json.dumps(data)),
+            )
+            await index_job_result_async(conn, cursor.lastrowid, job_id, data)
 
     # Broadcast job completion
     await manager.broadcast(
@@ -1362,383 +1586,406 @@ class ExportBundleRequest(BaseModel):
     url: str
     output_format: str = "zip"
 
+
+def _build_page_content(
+    item: Dict[str, Any], job_id: int, render_html: bool
+) -> Dict[str, Any]:
+    """Build the CFPL viewer payload (manifest, rendered HTML, assets) for one page"""
+    # Build page data structure
+    page_data = {
+        'url': item['url'],
+        'status': 200,  # Default status since not stored
+        'content_type': 'text/html',
+        'manifest': {
+            'job_id': job_id,
+            'scraped_at': item.get('timestamp', ''),
+            'size': (
+                len(item.get('article_content', ''))
+                if item.get('article_content')
+                else 0
+            ),
+            'word_count': item.get('word_count', 0),
+            'reading_time': item.get('reading_time', ''),
+            'headline': item.get('headline', ''),
+            'author': item.get('author', ''),
+            'publish_date': item.get('publish_date', ''),
+        },
+        'main_content': '',
+        'assets': [],
+    }
+
+    # Create HTML content from extracted data
+    article_content = item.get('article_content', '')
+    headline = item.get('headline', '')
+    author = item.get('author', '')
+    publish_date = item.get('publish_date', '')
+    word_count = item.get('word_count', 0)
+    crawl_metadata = item.get('crawl_metadata', {})
+
+    url_label = item['url'][:40] + ('...' if len(item['url']) > 40 else '')
+    author_html = (
+        f'<div class="meta"><span class="icon">👤</span> By: '
+        f'<strong>{author}</strong></div>'
+        if author
+        else ''
+    )
+    publish_html = (
+        f'<div class="meta"><span class="icon">📅</span> Published: '
+        f'<strong>{publish_date}</strong></div>'
+        if publish_date
+        else ''
+    )
+    quality_html = ''
+    quality_score = item.get('quality_score')
+    if quality_score:
+        if quality_score > 0.8:
+            quality_level, quality_label = 'high', 'Excellent'
+        elif quality_score > 0.5:
+            quality_level, quality_label = 'medium', 'Good'
+        else:
+            quality_level, quality_label = 'low', 'Basic'
+        quality_html = (
+            f'<div class="meta"><span class="icon">⭐</span> Quality Score: '
+            f'<strong>{quality_score}</strong><span class="quality-indicator '
+            f'quality-{quality_level}">{quality_label}</span></div>'
+        )
+    content_html = article_content or (
+        '<p><em>📄 Processing raw HTML content for comprehensive offline '
+        'viewing...</em></p>'
+    )
+
+    # Build a proper HTML page with enhanced styling
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>{headline}</title>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <style>
+            /* Enhanced styling for better offline viewing */
+            body {{
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI',
+                    Arial, sans-serif;
+                margin: 20px;
+                line-height: 1.6;
+                color: #333;
+                background: #fff;
+                max-width: 1200px;
+                margin: 0 auto;
+                padding: 20px;
+            }}
+            .header {{
+                border-bottom: 3px solid #007bff;
+                padding-bottom: 25px;
+                margin-bottom: 30px;
+                background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
+                padding: 25px;
+                border-radius: 8px;
+            }}
+            .headline {{
+                font-size: 2.5em;
+                font-weight: 700;
+                margin-bottom: 20px;
+                color: #1a1a1a;
+                line-height: 1.2;
+            }}
+            .meta {{
+                color: #666;
+                font-size: 0.95em;
+                margin-bottom: 10px;
+                display: flex;
+                align-items: center;
+                gap: 5px;
+            }}
+            .meta .icon {{
+                font-size: 1.1em;
+            }}
+            .content {{
+                margin-top: 30px;
+                font-size: 1.1em;
+                line-height: 1.8;
+            }}
+            .content p {{
+                margin-bottom: 1.2em;
+            }}
+            .content h1, .content h2, .content h3 {{
+                margin-top: 2em;
+                margin-bottom: 1em;
+                color: #2c3e50;
+            }}
+            .stats {{
+                background: linear-gradient(135deg, #e3f2fd 0%, #f8f9fa 100%);
+                padding: 25px;
+                border-radius: 12px;
+                margin: 30px 0;
+                border-left: 5px solid #2196f3;
+                box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            }}
+            .links {{
+                margin-top: 40px;
+                background: #f8f9fa;
+                padding: 25px;
+                border-radius: 12px;
+                border-left: 5px solid #28a745;
+            }}
+            .link-item {{
+                margin: 12px 0;
+                padding: 8px 0;
+                border-bottom: 1px solid #dee2e6;
+            }}
+            .link-item:last-child {{
+                border-bottom: none;
+            }}
+            .link-item a {{
+                color: #0066cc;
+                text-decoration: none;
+                font-weight: 500;
+            }}
+            .link-item a:hover {{
+                text-decoration: underline;
+                color: #004499;
+            }}
+            .cfpl-viewer-badge {{
+                position: fixed;
+                top: 15px;
+                right: 15px;
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                color: white;
+                padding: 15px 20px;
+                border-radius: 10px;
+                font-size: 12px;
+                z-index: 9999;
+                box-shadow: 0 4px 15px rgba(0,0,0,0.2);
+                min-width: 200px;
+            }}
+            .media-gallery {{
+                margin-top: 30px;
+                background: #f8f9fa;
+                padding: 25px;
+                border-radius: 12px;
+            }}
+            .media-item {{
+                display: inline-block;
+                margin: 10px;
+                max-width: 200px;
+                text-align: center;
+            }}
+            .media-item img {{
+                max-width: 100%;
+                height: auto;
+                border-radius: 8px;
+                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+            }}
+            img {{ max-width: 100%; height: auto; }}
+            /* Responsive design */
+            @media (max-width: 768px) {{
+                body {{ margin: 10px; padding: 10px; }}
+                .headline {{ font-size: 2em; }}
+                .cfpl-viewer-badge {{ position: relative; margin-bottom: 20px; }}
+            }}
+            .quality-indicator {{
+                display: inline-block;
+                padding: 4px 8px;
+                border-radius: 4px;
+                font-size: 0.8em;
+                font-weight: bold;
+                margin-left: 10px;
+            }}
+            .quality-high {{ background: #d4edda; color: #155724; }}
+            .quality-medium {{ background: #fff3cd; color: #856404; }}
+            .quality-low {{ background: #f8d7da; color: #721c24; }}
+        </style>
+        <base href="{item['url']}">
+    </head>
+    <body>
+        <div class="cfpl-viewer-badge">
+            <div>📄 <strong>CFPL Offline Archive</strong></div>
+            <div>🌐 {url_label}</div>
+            <div>📸 {len(page_data['assets'])} assets captured</div>
+            <div>⚡ Processed: {crawl_metadata.get('processing_time', 0):.1f}s</div>
+        </div>
+
+        <div class="header">
+            <div class="headline">{headline}</div>
+            {author_html}
+            {publish_html}
+            <div class="meta"><span class="icon">📊</span> Words:
+                <strong>{word_count:,}</strong> | 🕒 Read time:
+                <strong>{word_count//200 + 1} min</strong></div>
+            <div class="meta"><span class="icon">🔗</span> Source:
+                <a href="{item['url']}" target="_blank">{item['url']}</a></div>
+            {quality_html}
+        </div>
+
+        <div class="stats">
+            <strong>📊 Crawl Intelligence Report:</strong><br>
+            🔍 Discovery Order:
+                <strong>#{crawl_metadata.get('discovery_order', 'N/A')}</strong><br>
+            🌊 Crawl Depth: <strong>{crawl_metadata.get('depth', 'N/A')}</strong><br>
+            ⚡ Processing Time:
+                <strong>{crawl_metadata.get('processing_time', 0):.2f}s</strong><br>
+            🌐 Domain: <strong>{crawl_metadata.get('domain', 'N/A')}</strong><br>
+            📏 Content Size: <strong>{len(article_content):,} characters</strong><br>
+            🔗 Links Found: <strong>{len(item.get('links', []))}</strong><br>
+            📸 Images Found: <strong>{len(item.get('images', []))}</strong><br>
+            🎥 Videos Found: <strong>{len(item.get('videos', []))}</strong>
+        </div>
+
+        <div class="content">
+            {content_html}
+        </div>
+    """
+
+    # Add links section if available
+    if 'links' in item and item['links']:
+        html_content += f"""
+        <div class="links">
+            <h3>🔗 Discovered Links ({len(item['links'])})</h3>
+        """
+        for link in item['links'][:20]:  # Show first 20 links
+            if link.get('text') and link.get('url'):
+                html_content += (
+                    f'<div class="link-item"><a href="{link["url"]}" '
+                    f'target="_blank">{link["text"]}</a></div>'
+                )
+
+        if len(item['links']) > 20:
+            html_content += (
+                f"<div class='meta'>... and {len(item['links']) - 20} more links</div>"
+            )
+
+        html_content += "</div>"
+
+    html_content += """
+    </body>
+    </html>
+    """
+
+    page_data['main_content'] = html_content
+
+    # Add images from the dedicated images array (primary source)
+    if 'images' in item and item['images']:
+        for img in item['images']:
+            # Determine content type from URL extension
+            img_url = img.get('src', '')
+            content_type = 'image/jpeg'  # Default
+            if img_url:
+                if '.png' in img_url.lower():
+                    content_type = 'image/png'
+                elif '.gif' in img_url.lower():
+                    content_type = 'image/gif'
+                elif '.svg' in img_url.lower():
+                    content_type = 'image/svg+xml'
+                elif '.webp' in img_url.lower():
+                    content_type = 'image/webp'
+
+            asset = {
+                'url': img_url,
+                'content_type': content_type,
+                'size': img.get('file_size', 0),  # Size if available
+                'data_url': img_url,  # Use original URL for display
+                'discovered_via': 'image_extraction',
+                'alt_text': img.get('alt', ''),
+                'title': img.get('title', ''),
+                'width': img.get('width', ''),
+                'height': img.get('height', ''),
+                'css_class': img.get('class', '')
+            }
+            page_data['assets'].append(asset)
+
+    # Add videos from video extraction (NEW FEATURE)
+    if 'videos' in item and item['videos']:
+        for video in item['videos']:
+            video_url = video.get('url', '')
+            if video_url:
+                asset = {
+                    'url': video_url,
+                    'content_type': (
+                        'video/mp4' if video.get('type') == 'video' else 'text/html'
+                    ),
+                    'size': 0,
+                    'data_url': video_url,
+                    'discovered_via': 'video_extraction',
+                    'title': video.get('title', ''),
+                    'video_type': video.get('type', 'video'),
+                    'platform': video.get('platform', 'unknown'),
+                }
+                page_data['assets'].append(asset)
+
+    # Also extract images from links as fallback (for backwards compatibility)
+    if 'links' in item:
+        for link in item['links']:
+            if link.get('url') and any(
+                ext in link['url'].lower()
+                for ext in ['.jpg', '.jpeg', '.png', '.gif', '.svg']
+            ):
+                # Check if this image URL is already in assets (avoid duplicates)
+                existing_urls = [asset['url'] for asset in page_data['assets']]
+                if link['url'] not in existing_urls:
+                    asset = {
+                        'url': link['url'],
+                        'content_type': 'image/jpeg',  # Default
+                        'size': 0,
+                        'data_url': link['url'],  # Use original URL
+                        'discovered_via': 'link'
+                    }
+                    page_data['assets'].append(asset)
+
+    # If render_html is requested, inject viewer controls
+    if render_html and page_data['main_content']:
+        # Add basic viewer controls CSS
+        viewer_css = """
+        <style>
+            .cfpl-viewer-controls {{
+                position: fixed;
+                top: 10px;
+                right: 10px;
+                background: rgba(0,0,0,0.8);
+                color: white;
+                padding: 10px;
+                border-radius: 5px;
+                font-family: Arial, sans-serif;
+                z-index: 9999;
+            }}
+            .cfpl-viewer-info {{
+                margin: 5px 0;
+                font-size: 12px;
+            }}
+        </style>
+        <div class="cfpl-viewer-controls">
+            <div class="cfpl-viewer-info">📄 CFPL Page Viewer</div>
+            <div class="cfpl-viewer-info">🌐 {}</div>
+            <div class="cfpl-viewer-info">📊 Status: {}</div>
+            <div class="cfpl-viewer-info">📸 Images: {}</div>
+        </div>
+        """.format(
+            item['url'][:50] + '...' if len(item['url']) > 50 else item['url'],
+            page_data['status'],
+            len(page_data['assets'])
+        )
+
+        page_data['main_content'] = viewer_css + page_data['main_content']
+
+    return page_data
+
+
 @app.post("/api/cfpl/page-content")
 async def get_page_content(request: PageContentRequest, current_user: dict = Depends(get_current_user)):
     """Get full page content with rendered HTML and assets from scraped data"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Find the scraped data for this URL
-        cursor.execute(
-            """
-            SELECT jr.data, j.id as job_id 
-            FROM job_results jr 
-            JOIN jobs j ON jr.job_id = j.id 
-            WHERE j.created_by = ?
-            ORDER BY jr.created_at DESC
-        """,
-            (current_user["id"],),
-        )
-        
-        page_data = None
-        found_url = None
-        
-        for row in cursor.fetchall():
-            try:
-                data = json.loads(row[0])
-                job_id = row[1]
-                
-                # Handle both old and new data formats
-                crawled_items = []
-                if 'crawled_data' in data:
-                    crawled_items = data['crawled_data']
-                elif 'url' in data:
-                    crawled_items = [data]
-                
-                # Look for the requested URL
-                for item in crawled_items:
-                    if item.get('url') == request.url:
-                        found_url = item['url']
-                        
-                        # Build page data structure
-                        page_data = {
-                            'url': item['url'],
-                            'status': 200,  # Default status since not stored
-                            'content_type': 'text/html',
-                            'manifest': {
-                                'job_id': job_id,
-                                'scraped_at': item.get('timestamp', ''),
-                                'size': len(item.get('article_content', '')) if item.get('article_content') else 0,
-                                'word_count': item.get('word_count', 0),
-                                'reading_time': item.get('reading_time', ''),
-                                'headline': item.get('headline', ''),
-                                'author': item.get('author', ''),
-                                'publish_date': item.get('publish_date', '')
-                            },
-                            'main_content': '',
-                            'assets': []
-                        }
-                        
-                        # Create HTML content from extracted data
-                        article_content = item.get('article_content', '')
-                        headline = item.get('headline', '')
-                        author = item.get('author', '')
-                        publish_date = item.get('publish_date', '')
-                        word_count = item.get('word_count', 0)
-                        
-                        # Build a proper HTML page with enhanced styling
-                        html_content = f"""
-                        <!DOCTYPE html>
-                        <html>
-                        <head>
-                            <title>{headline}</title>
-                            <meta charset="utf-8">
-                            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                            <style>
-                                /* Enhanced styling for better offline viewing */
-                                body {{ 
-                                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif; 
-                                    margin: 20px; 
-                                    line-height: 1.6; 
-                                    color: #333;
-                                    background: #fff;
-                                    max-width: 1200px;
-                                    margin: 0 auto;
-                                    padding: 20px;
-                                }}
-                                .header {{ 
-                                    border-bottom: 3px solid #007bff; 
-                                    padding-bottom: 25px; 
-                                    margin-bottom: 30px; 
-                                    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                                    padding: 25px;
-                                    border-radius: 8px;
-                                }}
-                                .headline {{ 
-                                    font-size: 2.5em; 
-                                    font-weight: 700; 
-                                    margin-bottom: 20px; 
-                                    color: #1a1a1a;
-                                    line-height: 1.2;
-                                }}
-                                .meta {{ 
-                                    color: #666; 
-                                    font-size: 0.95em; 
-                                    margin-bottom: 10px; 
-                                    display: flex;
-                                    align-items: center;
-                                    gap: 5px;
-                                }}
-                                .meta .icon {{ 
-                                    font-size: 1.1em; 
-                                }}
-                                .content {{ 
-                                    margin-top: 30px; 
-                                    font-size: 1.1em;
-                                    line-height: 1.8;
-                                }}
-                                .content p {{
-                                    margin-bottom: 1.2em;
-                                }}
-                                .content h1, .content h2, .content h3 {{
-                                    margin-top: 2em;
-                                    margin-bottom: 1em;
-                                    color: #2c3e50;
-                                }}
-                                .stats {{ 
-                                    background: linear-gradient(135deg, #e3f2fd 0%, #f8f9fa 100%); 
-                                    padding: 25px; 
-                                    border-radius: 12px; 
-                                    margin: 30px 0; 
-                                    border-left: 5px solid #2196f3;
-                                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                                }}
-                                .links {{ 
-                                    margin-top: 40px; 
-                                    background: #f8f9fa;
-                                    padding: 25px;
-                                    border-radius: 12px;
-                                    border-left: 5px solid #28a745;
-                                }}
-                                .link-item {{ 
-                                    margin: 12px 0; 
-                                    padding: 8px 0;
-                                    border-bottom: 1px solid #dee2e6;
-                                }}
-                                .link-item:last-child {{
-                                    border-bottom: none;
-                                }}
-                                .link-item a {{ 
-                                    color: #0066cc; 
-                                    text-decoration: none; 
-                                    font-weight: 500;
-                                }}
-                                .link-item a:hover {{ 
-                                    text-decoration: underline; 
-                                    color: #004499;
-                                }}
-                                .cfpl-viewer-badge {{
-                                    position: fixed;
-                                    top: 15px;
-                                    right: 15px;
-                                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                                    color: white;
-                                    padding: 15px 20px;
-                                    border-radius: 10px;
-                                    font-size: 12px;
-                                    z-index: 9999;
-                                    box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-                                    min-width: 200px;
-                                }}
-                                .media-gallery {{
-                                    margin-top: 30px;
-                                    background: #f8f9fa;
-                                    padding: 25px;
-                                    border-radius: 12px;
-                                }}
-                                .media-item {{
-                                    display: inline-block;
-                                    margin: 10px;
-                                    max-width: 200px;
-                                    text-align: center;
-                                }}
-                                .media-item img {{
-                                    max-width: 100%;
-                                    height: auto;
-                                    border-radius: 8px;
-                                    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                                }}
-                                img {{ max-width: 100%; height: auto; }}
-                                /* Responsive design */
-                                @media (max-width: 768px) {{
-                                    body {{ margin: 10px; padding: 10px; }}
-                                    .headline {{ font-size: 2em; }}
-                                    .cfpl-viewer-badge {{ position: relative; margin-bottom: 20px; }}
-                                }}
-                                .quality-indicator {{
-                                    display: inline-block;
-                                    padding: 4px 8px;
-                                    border-radius: 4px;
-                                    font-size: 0.8em;
-                                    font-weight: bold;
-                                    margin-left: 10px;
-                                }}
-                                .quality-high {{ background: #d4edda; color: #155724; }}
-                                .quality-medium {{ background: #fff3cd; color: #856404; }}
-                                .quality-low {{ background: #f8d7da; color: #721c24; }}
-                            </style>
-                            <base href="{item['url']}">
-                        </head>
-                        <body>
-                            <div class="cfpl-viewer-badge">
-                                <div>📄 <strong>CFPL Offline Archive</strong></div>
-                                <div>🌐 {item['url'][:40]}{'...' if len(item['url']) > 40 else ''}</div>
-                                <div>📸 {len(page_data['assets'])} assets captured</div>
-                                <div>⚡ Processed: {item.get('crawl_metadata', {}).get('processing_time', 0):.1f}s</div>
-                            </div>
-                            
-                            <div class="header">
-                                <div class="headline">{headline}</div>
-                                {f'<div class="meta"><span class="icon">👤</span> By: <strong>{author}</strong></div>' if author else ''}
-                                {f'<div class="meta"><span class="icon">📅</span> Published: <strong>{publish_date}</strong></div>' if publish_date else ''}
-                                <div class="meta"><span class="icon">📊</span> Words: <strong>{word_count:,}</strong> | 🕒 Read time: <strong>{word_count//200 + 1} min</strong></div>
-                                <div class="meta"><span class="icon">🔗</span> Source: <a href="{item['url']}" target="_blank">{item['url']}</a></div>
-                                {f'<div class="meta"><span class="icon">⭐</span> Quality Score: <strong>{item.get("quality_score", "N/A")}</strong><span class="quality-indicator quality-{"high" if item.get("quality_score", 0) > 0.8 else "medium" if item.get("quality_score", 0) > 0.5 else "low"}">{"Excellent" if item.get("quality_score", 0) > 0.8 else "Good" if item.get("quality_score", 0) > 0.5 else "Basic"}</span></div>' if item.get('quality_score') else ''}
-                            </div>
-                            
-                            <div class="stats">
-                                <strong>📊 Crawl Intelligence Report:</strong><br>
-                                🔍 Discovery Order: <strong>#{item.get('crawl_metadata', {}).get('discovery_order', 'N/A')}</strong><br>
-                                🌊 Crawl Depth: <strong>{item.get('crawl_metadata', {}).get('depth', 'N/A')}</strong><br>
-                                ⚡ Processing Time: <strong>{item.get('crawl_metadata', {}).get('processing_time', 0):.2f}s</strong><br>
-                                🌐 Domain: <strong>{item.get('crawl_metadata', {}).get('domain', 'N/A')}</strong><br>
-                                📏 Content Size: <strong>{len(article_content):,} characters</strong><br>
-                                🔗 Links Found: <strong>{len(item.get('links', []))}</strong><br>
-                                📸 Images Found: <strong>{len(item.get('images', []))}</strong><br>
-                                🎥 Videos Found: <strong>{len(item.get('videos', []))}</strong>
-                            </div>
-                            
-                            <div class="content">
-                                {article_content if article_content else '<p><em>📄 Processing raw HTML content for comprehensive offline viewing...</em></p>'}
-                            </div>
-                        """
-                        
-                        # Add links section if available
-                        if 'links' in item and item['links']:
-                            html_content += f"""
-                            <div class="links">
-                                <h3>🔗 Discovered Links ({len(item['links'])})</h3>
-                            """
-                            for link in item['links'][:20]:  # Show first 20 links
-                                if link.get('text') and link.get('url'):
-                                    html_content += f'<div class="link-item"><a href="{link["url"]}" target="_blank">{link["text"]}</a></div>'
-                            
-                            if len(item['links']) > 20:
-                                html_content += f"<div class='meta'>... and {len(item['links']) - 20} more links</div>"
-                            
-                            html_content += "</div>"
-                        
-                        html_content += """
-                        </body>
-                        </html>
-                        """
-                        
-                        page_data['main_content'] = html_content
-                        
-                        # Add images from the dedicated images array (primary source)
-                        if 'images' in item and item['images']:
-                            for img in item['images']:
-                                # Determine content type from URL extension
-                                img_url = img.get('src', '')
-                                content_type = 'image/jpeg'  # Default
-                                if img_url:
-                                    if '.png' in img_url.lower():
-                                        content_type = 'image/png'
-                                    elif '.gif' in img_url.lower():
-                                        content_type = 'image/gif'
-                                    elif '.svg' in img_url.lower():
-                                        content_type = 'image/svg+xml'
-                                    elif '.webp' in img_url.lower():
-                                        content_type = 'image/webp'
-                                
-                                asset = {
-                                    'url': img_url,
-                                    'content_type': content_type,
-                                    'size': img.get('file_size', 0),  # Size if available
-                                    'data_url': img_url,  # Use original URL for display
-                                    'discovered_via': 'image_extraction',
-                                    'alt_text': img.get('alt', ''),
-                                    'title': img.get('title', ''),
-                                    'width': img.get('width', ''),
-                                    'height': img.get('height', ''),
-                                    'css_class': img.get('class', '')
-                                }
-                                page_data['assets'].append(asset)
-                        
-                        # Add videos from video extraction (NEW FEATURE)
-                        if 'videos' in item and item['videos']:
-                            for video in item['videos']:
-                                video_url = video.get('url', '')
-                                if video_url:
-                                    asset = {
-                                        'url': video_url,
-                                        'content_type': 'video/mp4' if video.get('type') == 'video' else 'text/html',
-                                        'size': 0,
-                                        'data_url': video_url,
-                                        'discovered_via': 'video_extraction',
-                                        'title': video.get('title', ''),
-                                        'video_type': video.get('type', 'video'),
-                                        'platform': video.get('platform', 'unknown')
-                                    }
-                                    page_data['assets'].append(asset)
-                        
-                        # Also extract images from links as fallback (for backwards compatibility)
-                        if 'links' in item:
-                            for link in item['links']:
-                                if link.get('url') and any(ext in link['url'].lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.svg']):
-                                    # Check if this image URL is already in assets (avoid duplicates)
-                                    existing_urls = [asset['url'] for asset in page_data['assets']]
-                                    if link['url'] not in existing_urls:
-                                        asset = {
-                                            'url': link['url'],
-                                            'content_type': 'image/jpeg',  # Default
-                                            'size': 0,
-                                            'data_url': link['url'],  # Use original URL
-                                            'discovered_via': 'link'
-                                        }
-                                        page_data['assets'].append(asset)
-                        
-                        # If render_html is requested, inject viewer controls
-                        if request.render_html and page_data['main_content']:
-                            # Add basic viewer controls CSS
-                            viewer_css = """
-                            <style>
-                                .cfpl-viewer-controls {
-                                    position: fixed;
-                                    top: 10px;
-                                    right: 10px;
-                                    background: rgba(0,0,0,0.8);
-                                    color: white;
-                                    padding: 10px;
-                                    border-radius: 5px;
-                                    font-family: Arial, sans-serif;
-                                    z-index: 9999;
-                                }
-                                .cfpl-viewer-info {
-                                    margin: 5px 0;
-                                    font-size: 12px;
-                                }
-                            </style>
-                            <div class="cfpl-viewer-controls">
-                                <div class="cfpl-viewer-info">📄 CFPL Page Viewer</div>
-                                <div class="cfpl-viewer-info">🌐 {}</div>
-                                <div class="cfpl-viewer-info">📊 Status: {}</div>
-                                <div class="cfpl-viewer-info">📸 Images: {}</div>
-                            </div>
-                            """.format(
-                                item['url'][:50] + '...' if len(item['url']) > 50 else item['url'],
-                                page_data['status'],
-                                len(page_data['assets'])
-                            )
-                            
-                            page_data['main_content'] = viewer_css + page_data['main_content']
-                        
-                        break
-                
-                if page_data:
-                    break
-                    
-            except (json.JSONDecodeError, KeyError):
-                continue
-        
-        conn.close()
-        
-        if not page_data:
+        # Indexed (user_id, url) lookup of the latest result holding this page
+        async with db_pool.connection() as conn:
+            found = await find_crawled_page_async(conn, current_user["id"], request.url)
+
+        if not found:
             raise HTTPException(status_code=404, detail=f"Page not found in scraped data: {request.url}")
-        
-        return page_data
-        
+
+        item, job_id = found
+        return _build_page_content(item, job_id, request.render_html)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting page content for {request.url}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get page content: {str(e)}")
@@ -1746,11 +1993,8 @@ async def get_page_content(request: PageContentRequest, current_user: dict = Dep
 @app.get("/api/jobs/{job_id}/urls")
 async def get_job_urls(job_id: int, current_user: dict = Depends(get_current_user)):
     """Get all URLs scraped in a specific job"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
     # Check job exists and belongs to user
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         """
         SELECT id FROM jobs 
         WHERE id = ? AND created_by = ?
@@ -1758,22 +2002,19 @@ async def get_job_urls(job_id: int, current_user: dict = Depends(get_current_use
         (job_id, current_user["id"]),
     )
 
-    if not cursor.fetchone():
-        conn.close()
+    if not job_row:
         raise HTTPException(status_code=404, detail="Job not found")
 
     # Get all URLs from job results
-    cursor.execute(
+    urls = set()
+    async for row in db_pool.iterate(
         """
-        SELECT data FROM job_results 
+        SELECT data FROM job_results
         WHERE job_id = ?
         ORDER BY created_at DESC
     """,
         (job_id,),
-    )
-
-    urls = set()
-    for row in cursor.fetchall():
+    ):
         try:
             data = json.loads(row[0])
             # Handle both old and new data formats
@@ -1786,17 +2027,13 @@ async def get_job_urls(job_id: int, current_user: dict = Depends(get_current_use
         except (json.JSONDecodeError, KeyError):
             continue
 
-    conn.close()
     return sorted(list(urls))
 
 @app.get("/api/jobs/{job_id}/debug")
 async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_current_user)):
     """Get debug information for a job including error logs and failure analysis"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
     # Check job exists and belongs to user
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         """
         SELECT id, status, error_message, created_at, config 
         FROM jobs 
@@ -1805,9 +2042,7 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
         (job_id, current_user["id"]),
     )
 
-    job_row = cursor.fetchone()
     if not job_row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
 
     job_status = job_row[1] or "unknown"
@@ -1816,14 +2051,6 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
     job_config = job_row[4]
 
     # Get crawl statistics
-    cursor.execute(
-        """
-        SELECT data FROM job_results 
-        WHERE job_id = ?
-    """,
-        (job_id,),
-    )
-
     total_attempted = 0
     total_successful = 0
     total_failed = 0
@@ -1832,10 +2059,16 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
     failed_urls = []
     error_logs = []
 
-    for row in cursor.fetchall():
+    async for row in db_pool.iterate(
+        """
+        SELECT data FROM job_results
+        WHERE job_id = ?
+    """,
+        (job_id,),
+    ):
         try:
             data = json.loads(row[0])
-            
+
             # Handle different data formats
             if 'crawled_data' in data:
                 for item in data['crawled_data']:
@@ -1844,7 +2077,7 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
                         url = item['url']
                         domain = url.split('/')[2] if '//' in url else url.split('/')[0]
                         domains_attempted.add(domain)
-                        
+
                         status_code = item.get('status_code', 0)
                         if status_code >= 200 and status_code < 300:
                             total_successful += 1
@@ -1858,7 +2091,7 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
                                 'status_code': status_code if status_code > 0 else None,
                                 'timestamp': item.get('timestamp', job_created)
                             })
-                            
+
                             # Add to error logs
                             error_logs.append({
                                 'timestamp': item.get('timestamp', job_created),
@@ -1867,14 +2100,14 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
                                 'url': url,
                                 'error_code': str(status_code) if status_code > 0 else None
                             })
-            
+
             elif 'url' in data:
                 # Single URL result
                 total_attempted += 1
                 url = data['url']
                 domain = url.split('/')[2] if '//' in url else url.split('/')[0]
                 domains_attempted.add(domain)
-                
+
                 status_code = data.get('status_code', 0)
                 if status_code >= 200 and status_code < 300:
                     total_successful += 1
@@ -1888,7 +2121,7 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
                         'status_code': status_code if status_code > 0 else None,
                         'timestamp': data.get('timestamp', job_created)
                     })
-                    
+
                     error_logs.append({
                         'timestamp': data.get('timestamp', job_created),
                         'level': 'ERROR',
@@ -1896,7 +2129,7 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
                         'url': url,
                         'error_code': str(status_code) if status_code > 0 else None
                     })
-        
+
         except (json.JSONDecodeError, KeyError, IndexError) as e:
             error_logs.append({
                 'timestamp': job_created,
@@ -1937,8 +2170,6 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
         except:
             pass
 
-    conn.close()
-
     return {
         'job_id': job_id,
         'status': job_status,
@@ -1956,26 +2187,20 @@ async def get_job_debug_info(job_id: int, current_user: dict = Depends(get_curre
 @app.post("/api/jobs/{job_id}/terminate")
 async def terminate_job(job_id: int, current_user: dict = Depends(get_current_user)):
     """Terminate a running job"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
     # Check if job exists and belongs to user
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         "SELECT id, status FROM jobs WHERE id = ? AND created_by = ?",
         (job_id, current_user["id"])
     )
     
-    job_row = cursor.fetchone()
     if not job_row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
     
     if job_row[1] != 'running':
-        conn.close()
         raise HTTPException(status_code=400, detail="Job is not running")
     
     # Update job status to failed
-    cursor.execute(
+    await db_pool.execute(
         """
         UPDATE jobs 
         SET status = 'failed', 
@@ -1986,38 +2211,31 @@ async def terminate_job(job_id: int, current_user: dict = Depends(get_current_us
         (datetime.now().isoformat(), job_id)
     )
     
-    conn.commit()
-    conn.close()
-    
     return {"message": f"Job {job_id} terminated successfully"}
 
 
 @app.delete("/api/jobs/{job_id}")
 async def delete_job(job_id: int, current_user: dict = Depends(get_current_user)):
     """Delete a job and all its results"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
     # Check if job exists and belongs to user
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         "SELECT id FROM jobs WHERE id = ? AND created_by = ?",
         (job_id, current_user["id"])
     )
-    
-    if not cursor.fetchone():
-        conn.close()
+
+    if not job_row:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Delete job results first
-    cursor.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
-    results_deleted = cursor.rowcount
-    
-    # Delete job
-    cursor.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
-    
-    conn.commit()
-    conn.close()
-    
+
+    async with db_pool.transaction() as conn:
+        # Delete job results first
+        cursor = await conn.execute(
+            "DELETE FROM job_results WHERE job_id = ?", (job_id,)
+        )
+        results_deleted = cursor.rowcount
+
+        # Delete job
+        await conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
     return {"message": f"Job {job_id} and {results_deleted} results deleted successfully"}
 
 
@@ -2027,206 +2245,148 @@ async def get_database_stats(current_user: dict = Depends(get_current_user)):
     # For now, allow all authenticated users. In production, add role check:
     # if current_user.get("role") != "admin":
     #     raise HTTPException(status_code=403, detail="Admin access required")
-    
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
+
     stats = {}
-    
+
     # Job statistics
-    cursor.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
-    stats['jobs_by_status'] = dict(cursor.fetchall())
-    
+    stats['jobs_by_status'] = dict(
+        await db_pool.fetchall("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+    )
+
     # Total counts
-    cursor.execute("SELECT COUNT(*) FROM jobs")
-    stats['total_jobs'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM job_results")
-    stats['total_results'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users")
-    stats['total_users'] = cursor.fetchone()[0]
-    
+    stats['total_jobs'] = (await db_pool.fetchone("SELECT COUNT(*) FROM jobs"))[0]
+
+    stats['total_results'] = (
+        await db_pool.fetchone("SELECT COUNT(*) FROM job_results")
+    )[0]
+
+    stats['total_users'] = (await db_pool.fetchone("SELECT COUNT(*) FROM users"))[0]
+
     # Database size
-    cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
-    stats['database_size_bytes'] = cursor.fetchone()[0]
-    
+    stats['database_size_bytes'] = (
+        await db_pool.fetchone(
+            "SELECT page_count * page_size as size "
+            "FROM pragma_page_count(), pragma_page_size()"
+        )
+    )[0]
+
     # Recent activity
-    cursor.execute("SELECT COUNT(*) FROM jobs WHERE created_at > datetime('now', '-24 hours')")
-    stats['jobs_last_24h'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'")
-    stats['currently_running'] = cursor.fetchone()[0]
-    
+    stats['jobs_last_24h'] = (await db_pool.fetchone(
+        "SELECT COUNT(*) FROM jobs WHERE created_at > datetime('now', '-24 hours')"
+    ))[0]
+
+    stats['currently_running'] = (await db_pool.fetchone(
+        "SELECT COUNT(*) FROM jobs WHERE status = 'running'"
+    ))[0]
+
     # Find stuck jobs (running for more than 2 hours)
-    cursor.execute("""
+    stats['stuck_jobs'] = (await db_pool.fetchone("""
         SELECT COUNT(*) FROM jobs 
         WHERE status = 'running' 
         AND started_at < datetime('now', '-2 hours')
-    """)
-    stats['stuck_jobs'] = cursor.fetchone()[0]
-    
-    conn.close()
+    """))[0]
+
     return stats
 
 
 @app.get("/api/jobs/{job_id}/progress")
 async def get_job_progress(job_id: int, current_user: dict = Depends(get_current_user)):
     """Get real-time progress information for a running job"""
-    print(f"PROGRESS DEBUG: Called for job {job_id}")  # This should definitely show up
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    # Jobs run by this process report straight from the progress registry
+    progress = progress_registry.get(job_id)
+    if progress is not None and progress.owner_id == current_user["id"]:
+        return progress.to_dict()
 
-    # Check job exists and belongs to user
-    cursor.execute(
+    # Otherwise (queued, or finished before a restart) the jobs row is enough
+    job_row = await db_pool.fetchone(
         """
-        SELECT id, status, created_at, config, results_count 
+        SELECT status, COALESCE(started_at, created_at), config, results_count
         FROM jobs 
         WHERE id = ? AND created_by = ?
     """,
         (job_id, current_user["id"]),
     )
 
-    job_row = cursor.fetchone()
     if not job_row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job_status = job_row[1] or "unknown"
-    job_created = job_row[2]
-    job_config = job_row[3]
-    results_count = job_row[4] or 0
-
-    # Calculate progress based on job results and estimated targets
-    cursor.execute(
-        """
-        SELECT COUNT(*) FROM job_results 
-        WHERE job_id = ?
-    """,
-        (job_id,),
-    )
-    
-    current_results = cursor.fetchone()[0] or 0
-    
-    # Estimate target based on job configuration
-    estimated_target = 100  # Default estimate
+    job_status = job_row[0] or "unknown"
+    results_count = job_row[3] or 0
     try:
-        if job_config:
-            config_data = json.loads(job_config)
-            if 'max_pages' in config_data:
-                estimated_target = int(config_data['max_pages'])
-            elif 'crawl_depth' in config_data:
-                # Estimate based on depth (exponential growth assumption)
-                depth = int(config_data.get('crawl_depth', 2))
-                estimated_target = min(1000, 10 ** depth)  # Cap at 1000
-    except:
-        pass
+        job_config = json.loads(job_row[2]) if job_row[2] else {}
+    except json.JSONDecodeError:
+        job_config = {}
 
-    # Calculate runtime
     runtime_seconds = 0
-    if job_created:
+    if job_row[1]:
         try:
-            start_time = datetime.fromisoformat(job_created.replace('Z', '+00:00'))
+            start_time = datetime.fromisoformat(job_row[1].replace('Z', '+00:00'))
             runtime_seconds = (datetime.now() - start_time.replace(tzinfo=None)).total_seconds()
-        except:
-            pass
-
-    # Calculate progress percentage
-    print(f"PROGRESS CALC: job_status={job_status}, current_results={current_results}, runtime_seconds={runtime_seconds}")
-    
-    if job_status == "completed":
-        progress_percentage = 100
-        eta_seconds = 0
-        print(f"PROGRESS CALC: Job completed, setting 100%")
-    elif job_status == "running":
-        # Debug logging
-        print(f"PROGRESS CALC: Job running, checking conditions...")
-        logger.info(f"DEBUG: Job {job_id} - current_results={current_results}, estimated_target={estimated_target}, runtime_seconds={runtime_seconds}")
-        
-        if current_results > 0 and estimated_target > 0:
-            # Results-based progress
-            progress_percentage = min(95, (current_results / estimated_target) * 100)
-            print(f"PROGRESS CALC: Using results-based progress: {progress_percentage}%")
-            logger.info(f"DEBUG: Using results-based progress: {progress_percentage}%")
-        elif runtime_seconds > 0:
-            # Time-based progress estimation for jobs with no results yet
-            # Show increasing progress based on time, but cap at 85% until we get results
-            print(f"PROGRESS CALC: Using time-based progress, runtime={runtime_seconds}")
-            if runtime_seconds < 60:  # First minute: 0-20%
-                progress_percentage = (runtime_seconds / 60) * 20
-                print(f"PROGRESS CALC: First minute calculation: {progress_percentage}%")
-            elif runtime_seconds < 300:  # Next 4 minutes: 20-50%
-                progress_percentage = 20 + ((runtime_seconds - 60) / 240) * 30
-                print(f"PROGRESS CALC: Next 4 minutes calculation: {progress_percentage}%")
-            elif runtime_seconds < 600:  # Next 5 minutes: 50-70%
-                progress_percentage = 50 + ((runtime_seconds - 300) / 300) * 20
-                print(f"PROGRESS CALC: Next 5 minutes calculation: {progress_percentage}%")
-            else:  # After 10 minutes: slowly approach 85%
-                progress_percentage = min(85, 70 + ((runtime_seconds - 600) / 600) * 15)
-                print(f"PROGRESS CALC: After 10 minutes calculation: {progress_percentage}%")
-            logger.info(f"DEBUG: Using time-based progress: {progress_percentage}% (runtime: {runtime_seconds}s)")
-        else:
-            progress_percentage = 0
-            print(f"PROGRESS CALC: No progress calculation method available")
-            logger.info(f"DEBUG: No progress calculation method available")
-        
-        # Calculate ETA
-        if current_results > 5 and runtime_seconds > 30:
-            eta_seconds = max(0, (runtime_seconds / (current_results / estimated_target)) - runtime_seconds)
-        elif runtime_seconds > 300:  # After 5 minutes, estimate completion time
-            eta_seconds = max(0, 1200 - runtime_seconds)  # Estimate 20 minutes total
-        else:
-            eta_seconds = None
-    else:
-        progress_percentage = 0
-        eta_seconds = None
-
-    # Get recent activity
-    cursor.execute(
-        """
-        SELECT data, created_at FROM job_results 
-        WHERE job_id = ?
-        ORDER BY created_at DESC 
-        LIMIT 3
-    """,
-        (job_id,),
-    )
-    
-    recent_activity = []
-    for row in cursor.fetchall():
-        try:
-            data = json.loads(row[0])
-            url = data.get('url', 'Unknown URL')
-            recent_activity.append({
-                'url': url,
-                'timestamp': row[1]
-            })
-        except:
+        except ValueError:
             pass
 
-    conn.close()
-
+    completed = job_status == "completed"
     return {
         'job_id': job_id,
         'status': job_status,
-        'progress_percentage': round(progress_percentage, 1),
-        'current_results': current_results,
-        'estimated_target': estimated_target,
-        'runtime_seconds': int(runtime_seconds),
-        'eta_seconds': int(eta_seconds) if eta_seconds is not None else None,
-        'recent_activity': recent_activity,
+        'progress_percentage': 100.0 if completed else 0.0,
+        'current_results': results_count,
+        'estimated_target': _estimated_target(job_config),
+        'runtime_seconds': max(0, int(runtime_seconds)),
+        'eta_seconds': 0 if completed else None,
+        'recent_activity': [],
         'last_updated': datetime.now().isoformat()
     }
 
 
+def _page_media_assets(result_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Image and video asset records for one scraped page"""
+    page_url = result_data.get('url', 'Unknown URL')
+    assets = []
+
+    # Extract images
+    if 'images' in result_data:
+        for img in result_data['images']:
+            asset = {
+                'url': img.get('url', ''),
+                'content_type': img.get('content_type', 'image/unknown'),
+                'size': img.get('size', 0),
+                'data_url': img.get('data_url', ''),
+                'alt_text': img.get('alt_text', ''),
+                'title': img.get('title', ''),
+                'width': img.get('width', ''),
+                'height': img.get('height', ''),
+                'page_url': page_url,
+                'discovered_via': img.get('discovered_via', 'image_extraction')
+            }
+            assets.append(asset)
+
+    # Extract videos
+    if 'videos' in result_data:
+        for vid in result_data['videos']:
+            asset = {
+                'url': vid.get('url', ''),
+                'content_type': vid.get('content_type', 'video/unknown'),
+                'size': vid.get('size', 0),
+                'data_url': vid.get('data_url', ''),
+                'video_type': vid.get('video_type', 'unknown'),
+                'platform': vid.get('platform', ''),
+                'title': vid.get('title', ''),
+                'width': vid.get('width', ''),
+                'height': vid.get('height', ''),
+                'page_url': page_url,
+                'discovered_via': vid.get('discovered_via', 'video_extraction')
+            }
+            assets.append(asset)
+
+    return assets
+
+
 @app.get("/api/jobs/{job_id}/media")
 async def get_job_media(job_id: int, current_user: dict = Depends(get_current_user)):
     """Get all media assets from all pages in a job"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
     # Check job exists and belongs to user
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         """
         SELECT id, status FROM jobs 
         WHERE id = ? AND created_by = ?
@@ -2234,78 +2394,34 @@ async def get_job_media(job_id: int, current_user: dict = Depends(get_current_us
         (job_id, current_user["id"]),
     )
 
-    job_row = cursor.fetchone()
     if not job_row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # Get all results for this job
-    cursor.execute(
+    unique_assets = {}
+    page_count = 0
+
+    # Iterate the cursor so only one result blob is decoded and held at a time
+    async for row in db_pool.iterate(
         """
-        SELECT data FROM job_results 
+        SELECT data FROM job_results
         WHERE job_id = ?
         ORDER BY created_at ASC
     """,
         (job_id,),
-    )
-
-    all_assets = []
-    page_count = 0
-
-    for row in cursor.fetchall():
+    ):
         try:
             result_data = json.loads(row[0])
-            page_url = result_data.get('url', 'Unknown URL')
-            page_count += 1
-
-            # Extract images
-            if 'images' in result_data:
-                for img in result_data['images']:
-                    asset = {
-                        'url': img.get('url', ''),
-                        'content_type': img.get('content_type', 'image/unknown'),
-                        'size': img.get('size', 0),
-                        'data_url': img.get('data_url', ''),
-                        'alt_text': img.get('alt_text', ''),
-                        'title': img.get('title', ''),
-                        'width': img.get('width', ''),
-                        'height': img.get('height', ''),
-                        'page_url': page_url,
-                        'discovered_via': img.get('discovered_via', 'image_extraction')
-                    }
-                    all_assets.append(asset)
-
-            # Extract videos
-            if 'videos' in result_data:
-                for vid in result_data['videos']:
-                    asset = {
-                        'url': vid.get('url', ''),
-                        'content_type': vid.get('content_type', 'video/unknown'),
-                        'size': vid.get('size', 0),
-                        'data_url': vid.get('data_url', ''),
-                        'video_type': vid.get('video_type', 'unknown'),
-                        'platform': vid.get('platform', ''),
-                        'title': vid.get('title', ''),
-                        'width': vid.get('width', ''),
-                        'height': vid.get('height', ''),
-                        'page_url': page_url,
-                        'discovered_via': vid.get('discovered_via', 'video_extraction')
-                    }
-                    all_assets.append(asset)
+            for page in crawled_items(result_data) or [result_data]:
+                page_count += 1
+                # Deduplicate assets by URL
+                for asset in _page_media_assets(page):
+                    if asset['url'] and asset['url'] not in unique_assets:
+                        unique_assets[asset['url']] = asset
 
         except (json.JSONDecodeError, KeyError) as e:
             logger.warning(f"Could not parse result data for job {job_id}: {e}")
             continue
 
-    conn.close()
-
-    # Deduplicate assets by URL
-    unique_assets = {}
-    for asset in all_assets:
-        url = asset['url']
-        if url and url not in unique_assets:
-            unique_assets[url] = asset
-
     return {
         'job_id': job_id,
         'pages_processed': page_count,
@@ -2316,11 +2432,8 @@ async def get_job_media(job_id: int, current_user: dict = Depends(get_current_us
 @app.delete("/api/jobs/{job_id}")
 async def delete_job(job_id: int, current_user: dict = Depends(get_current_user)):
     """Delete a job and all its associated data"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
     # Check job exists and belongs to user
-    cursor.execute(
+    job_row = await db_pool.fetchone(
         """
         SELECT id, status, name FROM jobs 
         WHERE id = ? AND created_by = ?
@@ -2328,9 +2441,7 @@ async def delete_job(job_id: int, current_user: dict = Depends(get_current_user)
         (job_id, current_user["id"]),
     )
 
-    job_row = cursor.fetchone()
     if not job_row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
 
     job_name = job_row[2]
@@ -2338,22 +2449,21 @@ async def delete_job(job_id: int, current_user: dict = Depends(get_current_user)
 
     # Don't allow deletion of running jobs
     if job_status == "running":
-        conn.close()
         raise HTTPException(
             status_code=400, 
             detail="Cannot delete a running job. Please stop it first."
         )
 
     try:
-        # Delete job results first (foreign key constraint)
-        cursor.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
-        results_deleted = cursor.rowcount
+        async with db_pool.transaction() as conn:
+            # Delete job results first (foreign key constraint)
+            cursor = await conn.execute(
+                "DELETE FROM job_results WHERE job_id = ?", (job_id,)
+            )
+            results_deleted = cursor.rowcount
 
-        # Delete the job
-        cursor.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
-        
-        conn.commit()
-        conn.close()
+            # Delete the job
+            await conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
 
         return {
             'message': f'Job "{job_name}" deleted successfully',
@@ -2362,8 +2472,6 @@ async def delete_job(job_id: int, current_user: dict = Depends(get_current_user)
         }
 
     except Exception as e:
-        conn.rollback()
-        conn.close()
         raise HTTPException(status_code=500, detail=f"Failed to delete job: {str(e)}")
 
 @app.get("/api/cfpl/network-diagram/{job_id}")
@@ -2371,9 +2479,7 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
     """Generate enhanced network diagram for a crawl job using scraped data"""
     try:
         # Verify job belongs to user
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
+        job_row = await db_pool.fetchone(
             """
             SELECT j.id, j.name, j.created_at, j.config
             FROM jobs j
@@ -2382,14 +2488,12 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
             (job_id, current_user["id"]),
         )
 
-        job_row = cursor.fetchone()
         if not job_row:
-            conn.close()
             raise HTTPException(status_code=404, detail="Job not found")
-        
+
         job_name = job_row[1] or f"Job #{job_id}"
         job_created = job_row[2]
-        
+
         # Extract URL from config JSON
         import json
         try:
@@ -2397,17 +2501,7 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
             root_url = config.get('url', f'Job-{job_id}')
         except (json.JSONDecodeError, TypeError):
             root_url = f'Job-{job_id}'
-        
-        # Get all scraped data for this job
-        cursor.execute(
-            """
-            SELECT data FROM job_results 
-            WHERE job_id = ?
-            ORDER BY created_at ASC
-        """,
-            (job_id,),
-        )
-        
+
         nodes = []
         edges = []
         url_to_node_id = {}  # Map URLs to node IDs for deduplication
@@ -2415,29 +2509,30 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
         domains = set()
         total_size = 0
         max_depth = 0
-        
-        for row in cursor.fetchall():
+
+        # Get all scraped data for this job, decoding one result blob at a time
+        async for row in db_pool.iterate(
+            """
+            SELECT data FROM job_results
+            WHERE job_id = ?
+            ORDER BY created_at ASC
+        """,
+            (job_id,),
+        ):
             try:
                 data = json.loads(row[0])
-                
-                # Handle both old and new data formats
-                crawled_items = []
-                if 'crawled_data' in data:
-                    crawled_items = data['crawled_data']
-                elif 'url' in data:
-                    crawled_items = [data]
-                
-                for item in crawled_items:
+
+                for item in crawled_items(data):
                     url = item.get('url', '').strip()
                     if not url or url in url_to_node_id:
                         continue
-                    
+
                     # Parse domain and URL info
                     from urllib.parse import urlparse
                     parsed = urlparse(url)
                     domain = parsed.netloc or 'unknown'
                     domains.add(domain)
-                    
+
                     # Calculate depth more accurately
                     if url == root_url:
                         depth = 0
@@ -2446,7 +2541,7 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                         path_segments = [seg for seg in parsed.path.split('/') if seg]
                         depth = len(path_segments)
                     max_depth = max(max_depth, depth)
-                    
+
                     # Extract better title
                     title = item.get('title', '').strip()
                     if not title:
@@ -2455,15 +2550,15 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                             title = parsed.path.split('/')[-1] or parsed.netloc
                         else:
                             title = parsed.netloc
-                    
+
                     # Truncate title appropriately
                     if len(title) > 50:
                         title = title[:47] + '...'
-                    
+
                     # Calculate node size
                     html_size = len(item.get('html_content', ''))
                     total_size += html_size
-                    
+
                     # Determine node type and color
                     node_type = 'root' if url == root_url else 'page'
                     if depth == 0:
@@ -2474,7 +2569,7 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                         node_color = '#45b7d1'  # Blue for second level
                     else:
                         node_color = '#96ceb4'  # Green for deeper levels
-                    
+
                     # Create enhanced node
                     node_id = f"page_{node_counter}"
                     node = {
@@ -2504,24 +2599,24 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                     }
                     nodes.append(node)
                     url_to_node_id[url] = node_id
-                    
+
                     # Create edges for links found in this page
                     if 'links' in item:
                         processed_links = set()  # Avoid duplicate edges
                         link_count = 0
-                        
+
                         for link in item['links']:
                             if link_count >= 10:  # Increased limit for better connectivity
                                 break
-                            
+
                             target_url = (link.get('url', '') or link.get('href', '')).strip()
                             link_text = (link.get('text', '') or link.get('title', '')).strip()
-                            
+
                             if not target_url or target_url in processed_links:
                                 continue
-                            
+
                             processed_links.add(target_url)
-                            
+
                             # Check if target is already crawled
                             if target_url in url_to_node_id:
                                 # Internal link to crawled page
@@ -2548,7 +2643,7 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                                 target_node_id = f"external_{node_counter}_{link_count}"
                                 target_parsed = urlparse(target_url)
                                 target_domain = target_parsed.netloc or 'unknown'
-                                
+
                                 # Create external node
                                 external_node = {
                                     'id': target_node_id,
@@ -2576,7 +2671,7 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                                     }
                                 }
                                 nodes.append(external_node)
-                                
+
                                 # Create edge to external node
                                 edge = {
                                     'id': f"edge_{node_id}_{target_node_id}",
@@ -2597,18 +2692,16 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                                         'color': '#ff9800'
                                     }
                                 }
-                            
+
                             edges.append(edge)
                             link_count += 1
-                    
+
                     node_counter += 1
-                    
+
             except (json.JSONDecodeError, KeyError) as e:
                 logger.warning(f"Could not parse job result for network diagram: {e}")
                 continue
-        
-        conn.close()
-        
+
         # Calculate layout suggestions
         layout_algorithms = [
             {
@@ -2632,7 +2725,7 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                 'description': 'Regular grid arrangement'
             }
         ]
-        
+
         # Build enhanced network diagram response
         diagram = {
             'nodes': nodes,
@@ -2650,9 +2743,9 @@ async def get_network_diagram(job_id: int, current_user: dict = Depends(get_curr
                 'layout_algorithms': layout_algorithms
             }
         }
-        
+
         return diagram
-        
+
     except Exception as e:
         logger.error(f"Error generating network diagram for job {job_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate network diagram: {str(e)}")
@@ -2703,23 +2796,21 @@ async def export_page_bundle(request: ExportBundleRequest, current_user: dict =
 @app.get("/api/analytics/dashboard")
 async def get_dashboard_analytics(current_user: dict = Depends(get_current_user)):
     """Get analytics data for dashboard"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-
     # Get job statistics
-    cursor.execute(
-        """
+    job_stats = dict(
+        await db_pool.fetchall(
+            """
         SELECT status, COUNT(*) 
         FROM jobs 
         WHERE created_by = ? 
         GROUP BY status
     """,
-        (current_user["id"],),
+            (current_user["id"],),
+        )
     )
-    job_stats = dict(cursor.fetchall())
 
     # Get total results
-    cursor.execute(
+    total_row = await db_pool.fetchone(
         """
         SELECT SUM(results_count) 
         FROM jobs 
@@ -2727,9 +2818,7 @@ async def get_dashboard_analytics(current_user: dict = Depends(get_current_user)
     """,
         (current_user["id"],),
     )
-    total_results = cursor.fetchone()[0] or 0
-
-    conn.close()
+    total_results = total_row[0] or 0
 
     return {
         "jobs": {
@@ -2859,9 +2948,7 @@ async def clear_cache(current_user: dict = Depends(get_current_user)):
 @cached(cache_type="ttl", ttl=60, key_prefix="jobs_")
 async def get_jobs(current_user: dict = Depends(get_current_user)):
     """Get all jobs for the current user with caching"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
+    jobs = await db_pool.fetchall(
         """
         SELECT id, name, type, status, created_at, results_count 
         FROM jobs 
@@ -2870,8 +2957,6 @@ async def get_jobs(current_user: dict = Depends(get_current_user)):
     """,
         (current_user["id"],),
     )
-    jobs = cursor.fetchall()
-    conn.close()
 
     return [
         JobResponse(
@@ -2886,28 +2971,104 @@ async def get_jobs(current_user: dict = Depends(get_current_user)):
     ]
 
 
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates"""
-    await manager.connect(websocket)
-    try:
-        while True:
-            # Send periodic updates
-            await asyncio.sleep(5)
+async def _send_metrics(websocket: WebSocket):
+    """Periodic metrics for a dashboard socket, taken from the progress registry"""
+    while True:
+        # Send periodic updates
+        await asyncio.sleep(5)
+        running = progress_registry.running()
+        pages_per_minute = sum(
+            p.pages_done / max(1.0, (time.time() - p.started_at) / 60) for p in running
+        )
+        try:
             await websocket.send_text(
                 json.dumps(
                     {
                         "type": "metrics_update",
                         "data": {
                             "timestamp": datetime.utcnow().isoformat(),
-                            "active_jobs": 3,
-                            "queue_size": 7,
-                            "processing_rate": "12.5/min",
+                            "active_jobs": len(running),
+                            "queue_size": sum(p.queue_size for p in running),
+                            "processing_rate": f"{pages_per_minute:.1f}/min",
                         },
                     }
                 )
             )
+        except Exception:
+            return  # Socket closed; the receive loop cleans up
+
+
+async def _handle_socket_message(websocket: WebSocket, message: Dict[str, Any]):
+    """Handle a client request: subscribe/unsubscribe to one job's progress"""
+    action = message.get("action")
+    try:
+        job_id = int(message.get("job_id"))
+    except (TypeError, ValueError):
+        await websocket.send_text(
+            json.dumps({"type": "error", "detail": "job_id required"})
+        )
+        return
+
+    if action == "unsubscribe_progress":
+        manager.unsubscribe_progress(websocket, job_id)
+        return
+    if action != "subscribe_progress":
+        await websocket.send_text(
+            json.dumps({"type": "error", "detail": "Unknown action"})
+        )
+        return
+
+    try:
+        user = await _user_from_token(message.get("token") or "")
+    except HTTPException as e:
+        await websocket.send_text(json.dumps({"type": "error", "detail": e.detail}))
+        return
+
+    progress = progress_registry.get(job_id)
+    if progress is not None:
+        owned = progress.owner_id == user["id"]
+    else:
+        owned = await db_pool.fetchone(
+            "SELECT 1 FROM jobs WHERE id = ? AND created_by = ?", (job_id, user["id"])
+        ) is not None
+    if not owned:
+        await websocket.send_text(
+            json.dumps({"type": "error", "detail": "Job not found"})
+        )
+        return
+
+    # Current state right away; later changes arrive as coalesced pushes
+    if progress is not None:
+        await websocket.send_text(
+            json.dumps({"type": "job_progress", "data": progress.to_dict()})
+        )
+        if progress.status not in RUNNING_STATUSES:
+            return
+    manager.subscribe_progress(websocket, job_id)
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """
+    WebSocket endpoint for real-time updates.
+
+    Clients send {"action": "subscribe_progress", "job_id": N, "token": JWT}
+    to receive job_progress pushes for one of their jobs.
+    """
+    await manager.connect(websocket)
+    metrics_task = asyncio.create_task(_send_metrics(websocket))
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                continue
+            if isinstance(message, dict):
+                await _handle_socket_message(websocket, message)
     except WebSocketDisconnect:
+        pass
+    finally:
+        metrics_task.cancel()
         manager.disconnect(websocket)
 
 
@@ -2928,154 +3089,149 @@ async def centralize_data(
     Enhanced with comprehensive data processing and quality metrics
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        # Create centralized data table if it doesn't exist
-        cursor.execute(
+        async with db_pool.transaction() as conn:
+            # Create centralized data table if it doesn't exist
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS centralized_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source_job_id INTEGER,
+                    source_job_name TEXT,
+                    source_job_type TEXT,
+                    source_url TEXT,
+                    raw_data TEXT,
+                    processed_data TEXT,
+                    data_type TEXT,
+                    content_hash TEXT,
+                    scraped_at TIMESTAMP,
+                    centralized_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    data_quality_score INTEGER,
+                    completeness_score INTEGER,
+                    validation_status TEXT,
+                    word_count INTEGER,
+                    link_count INTEGER,
+                    image_count INTEGER,
+                    crawl_metadata TEXT
+                )
             """
-            CREATE TABLE IF NOT EXISTS centralized_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source_job_id INTEGER,
-                source_job_name TEXT,
-                source_job_type TEXT,
-                source_url TEXT,
-                raw_data TEXT,
-                processed_data TEXT,
-                data_type TEXT,
-                content_hash TEXT,
-                scraped_at TIMESTAMP,
-                centralized_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                data_quality_score INTEGER,
-                completeness_score INTEGER,
-                validation_status TEXT,
-                word_count INTEGER,
-                link_count INTEGER,
-                image_count INTEGER,
-                crawl_metadata TEXT
             )
-        """
-        )
 
-        # Create index for efficient lookups
-        cursor.execute(
+            # Create index for efficient lookups
+            await conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_content_hash
+                ON centralized_data(content_hash)
             """
-            CREATE INDEX IF NOT EXISTS idx_content_hash 
-            ON centralized_data(content_hash)
-        """
-        )
-
-        centralized_count = 0
-        duplicate_count = 0
-
-        for item in request.data:
-            # Calculate content hash for deduplication
-            content_str = json.dumps(item, sort_keys=True)
-            content_hash = hashlib.md5(content_str.encode()).hexdigest()
-
-            # Check for duplicates
-            cursor.execute(
-                "SELECT id FROM centralized_data WHERE content_hash = ?",
-                (content_hash,),
             )
-            existing = cursor.fetchone()
 
-            if existing:
-                duplicate_count += 1
-                continue
-
-            # Calculate quality metrics
-            quality_score = 0
-            completeness_score = 0
-            word_count = 0
-            link_count = 0
-            image_count = 0
-
-            # Quality assessment
-            if item.get("title"):
-                quality_score += 20
-                completeness_score += 25
-            if item.get("content") or item.get("text_content"):
-                content = item.get("content", "") or item.get("text_content", "")
-                if len(content) > 100:
-                    quality_score += 30
+            centralized_count = 0
+            duplicate_count = 0
+
+            for item in request.data:
+                # Calculate content hash for deduplication
+                content_str = json.dumps(item, sort_keys=True)
+                content_hash = hashlib.md5(content_str.encode()).hexdigest()
+
+                # Check for duplicates
+                async with conn.execute(
+                    "SELECT id FROM centralized_data WHERE content_hash = ?",
+                    (content_hash,),
+                ) as cursor:
+                    existing = await cursor.fetchone()
+
+                if existing:
+                    duplicate_count += 1
+                    continue
+
+                # Calculate quality metrics
+                quality_score = 0
+                completeness_score = 0
+                word_count = 0
+                link_count = 0
+                image_count = 0
+
+                # Quality assessment
+                if item.get("title"):
+                    quality_score += 20
                     completeness_score += 25
-                word_count = len(content.split())
-            if item.get("url"):
-                quality_score += 20
-                completeness_score += 20
-            if item.get("links"):
-                links = item.get("links", [])
-                link_count = len(links) if isinstance(links, list) else 0
-                if link_count > 0:
-                    quality_score += 15
-                    completeness_score += 15
-            if item.get("images"):
-                images = item.get("images", [])
-                image_count = len(images) if isinstance(images, list) else 0
-                if image_count > 0:
-                    quality_score += 15
-                    completeness_score += 15
-
-            # Determine data type
-            data_type = "general"
-            content_lower = str(item).lower()
-            if any(
-                keyword in content_lower
-                for keyword in ["product", "price", "buy", "cart"]
-            ):
-                data_type = "ecommerce"
-            elif any(
-                keyword in content_lower
-                for keyword in ["article", "news", "headline", "author"]
-            ):
-                data_type = "news"
-            elif any(
-                keyword in content_lower
-                for keyword in ["post", "tweet", "comment", "like"]
-            ):
-                data_type = "social_media"
-
-            # Process crawl metadata if available
-            crawl_metadata = ""
-            if item.get("crawl_metadata"):
-                crawl_metadata = json.dumps(item["crawl_metadata"])
-
-            # Insert centralized record
-            cursor.execute(
-                """
-                INSERT INTO centralized_data (
-                    source_job_id, source_job_name, source_job_type, source_url,
-                    raw_data, processed_data, data_type, content_hash,
-                    scraped_at, data_quality_score, completeness_score,
-                    validation_status, word_count, link_count, image_count,
-                    crawl_metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    request.job_id,
-                    request.job_name,
-                    request.metadata.get("job_type", "unknown"),
-                    item.get("url", ""),
-                    json.dumps(item),
-                    json.dumps(item),  # Could be enhanced processing
-                    data_type,
-                    content_hash,
-                    item.get("timestamp", datetime.utcnow().isoformat()),
-                    quality_score,
-                    completeness_score,
-                    "valid" if quality_score >= 70 else "pending",
-                    word_count,
-                    link_count,
-                    image_count,
-                    crawl_metadata,
-                ),
-            )
-
-            centralized_count += 1
+                if item.get("content") or item.get("text_content"):
+                    content = item.get("content", "") or item.get("text_content", "")
+                    if len(content) > 100:
+                        quality_score += 30
+                        completeness_score += 25
+                    word_count = len(content.split())
+                if item.get("url"):
+                    quality_score += 20
+                    completeness_score += 20
+                if item.get("links"):
+                    links = item.get("links", [])
+                    link_count = len(links) if isinstance(links, list) else 0
+                    if link_count > 0:
+                        quality_score += 15
+                        completeness_score += 15
+                if item.get("images"):
+                    images = item.get("images", [])
+                    image_count = len(images) if isinstance(images, list) else 0
+                    if image_count > 0:
+                        quality_score += 15
+                        completeness_score += 15
+
+                # Determine data type
+                data_type = "general"
+                content_lower = str(item).lower()
+                if any(
+                    keyword in content_lower
+                    for keyword in ["product", "price", "buy", "cart"]
+                ):
+                    data_type = "ecommerce"
+                elif any(
+                    keyword in content_lower
+                    for keyword in ["article", "news", "headline", "author"]
+                ):
+                    data_type = "news"
+                elif any(
+                    keyword in content_lower
+                    for keyword in ["post", "tweet", "comment", "like"]
+                ):
+                    data_type = "social_media"
+
+                # Process crawl metadata if available
+                crawl_metadata = ""
+                if item.get("crawl_metadata"):
+                    crawl_metadata = json.dumps(item["crawl_metadata"])
+
+                # Insert centralized record
+                await conn.execute(
+                    """
+                    INSERT INTO centralized_data (
+                        source_job_id, source_job_name, source_job_type, source_url,
+                        raw_data, processed_data, data_type, content_hash,
+                        scraped_at, data_quality_score, completeness_score,
+                        validation_status, word_count, link_count, image_count,
+                        crawl_metadata
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    (
+                        request.job_id,
+                        request.job_name,
+                        request.metadata.get("job_type", "unknown"),
+                        item.get("url", ""),
+                        json.dumps(item),
+                        json.dumps(item),  # Could be enhanced processing
+                        data_type,
+                        content_hash,
+                        item.get("timestamp", datetime.utcnow().isoformat()),
+                        quality_score,
+                        completeness_score,
+                        "valid" if quality_score >= 70 else "pending",
+                        word_count,
+                        link_count,
+                        image_count,
+                        crawl_metadata,
+                    ),
+                )
 
-        conn.commit()
-        conn.close()
+                centralized_count += 1
 
         return {
             "status": "success",
@@ -3130,6 +3286,15 @@ if __name__ == "__main__":
 # ==========================================
 
 
+async def _fetch_dicts(query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+    """Run a SELECT on the pool and return rows as column-name dicts"""
+    async with db_pool.connection() as conn:
+        async with conn.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+            columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
 @app.get("/api/database/tables")
 @limiter.limit(f"{security_config.API_RATE_LIMIT_PER_MINUTE}/minute")
 async def get_database_tables(
@@ -3137,23 +3302,19 @@ async def get_database_tables(
 ):
     """Get list of all database tables and their info"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         # Get table names
-        cursor.execute(
+        table_rows = await db_pool.fetchall(
             "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
         )
         tables = []
 
-        for (table_name,) in cursor.fetchall():
+        for (table_name,) in table_rows:
             # Get table info
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = cursor.fetchall()
+            columns = await db_pool.fetchall(f"PRAGMA table_info({table_name})")
 
             # Get row count
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            row_count = cursor.fetchone()[0]
+            count_row = await db_pool.fetchone(f"SELECT COUNT(*) FROM {table_name}")
+            row_count = count_row[0]
 
             tables.append(
                 {
@@ -3171,7 +3332,6 @@ async def get_database_tables(
                 }
             )
 
-        conn.close()
         return {"tables": tables}
 
     except Exception as e:
@@ -3195,22 +3355,14 @@ async def get_table_data(
         if table_name not in valid_tables:
             raise HTTPException(status_code=400, detail="Invalid table name")
 
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
         # Get total count
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-        total_count = cursor.fetchone()[0]
+        total_count = (await db_pool.fetchone(f"SELECT COUNT(*) FROM {table_name}"))[0]
 
         # Get paginated data
-        cursor.execute(
+        rows = await _fetch_dicts(
             f"SELECT * FROM {table_name} ORDER BY id DESC LIMIT ? OFFSET ?",
             (limit, offset),
         )
-        rows = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
 
         return {
             "table_name": table_name,
@@ -3242,14 +3394,7 @@ async def execute_database_query(
                 status_code=400, detail="Only SELECT queries are allowed"
             )
 
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(query)
-        rows = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
+        rows = await _fetch_dicts(query)
 
         return {"query": query, "result_count": len(rows), "data": rows}
 
@@ -3280,18 +3425,15 @@ async def delete_record(
         if table_name not in valid_tables:
             raise HTTPException(status_code=400, detail="Cannot delete from this table")
 
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         # Check if record exists
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE id = ?", (record_id,))
-        if cursor.fetchone()[0] == 0:
+        count_row = await db_pool.fetchone(
+            f"SELECT COUNT(*) FROM {table_name} WHERE id = ?", (record_id,)
+        )
+        if count_row[0] == 0:
             raise HTTPException(status_code=404, detail="Record not found")
 
         # Delete the record
-        cursor.execute(f"DELETE FROM {table_name} WHERE id = ?", (record_id,))
-        conn.commit()
-        conn.close()
+        await db_pool.execute(f"DELETE FROM {table_name} WHERE id = ?", (record_id,))
 
         return {"message": f"Record {record_id} deleted from {table_name}"}
 
@@ -3309,37 +3451,33 @@ async def cleanup_database(
     try:
         cleanup_type = cleanup_data.get("type", "")
 
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
         deleted_count = 0
 
         if cleanup_type == "failed_jobs":
             # Delete failed jobs and their results
-            cursor.execute(
-                "DELETE FROM job_results WHERE job_id IN (SELECT id FROM jobs WHERE status = 'failed')"
-            )
-            cursor.execute("DELETE FROM jobs WHERE status = 'failed'")
-            deleted_count = cursor.rowcount
+            async with db_pool.transaction() as conn:
+                await conn.execute(
+                    "DELETE FROM job_results WHERE job_id IN "
+                    "(SELECT id FROM jobs WHERE status = 'failed')"
+                )
+                cursor = await conn.execute("DELETE FROM jobs WHERE status = 'failed'")
+                deleted_count = cursor.rowcount
 
         elif cleanup_type == "old_analytics":
             # Delete analytics older than 30 days
-            cursor.execute(
+            _, deleted_count = await db_pool.execute(
                 "DELETE FROM analytics WHERE timestamp < datetime('now', '-30 days')"
             )
-            deleted_count = cursor.rowcount
 
         elif cleanup_type == "empty_results":
             # Delete job results with no data
-            cursor.execute("DELETE FROM job_results WHERE data IS NULL OR data = ''")
-            deleted_count = cursor.rowcount
+            _, deleted_count = await db_pool.execute(
+                "DELETE FROM job_results WHERE data IS NULL OR data = ''"
+            )
 
         else:
             raise HTTPException(status_code=400, detail="Invalid cleanup type")
 
-        conn.commit()
-        conn.close()
-
         return {"message": f"Cleanup completed", "deleted_count": deleted_count}
 
     except Exception as e:
@@ -55,7 +55,11 @@ from .distributed_crawler import (
     URLStatus
 )
 
-from .api import router as queue_router
+# The HTTP API needs the auth middleware; the queue system works without it
+try:
+    from .api import router as queue_router
+except ImportError:
+    queue_router = None
 
 # Queue backend implementations
 try:
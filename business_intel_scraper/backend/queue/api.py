@@ -43,6 +43,9 @@ class SeedURLRequest(BaseModel):
     urls: List[str] = Field(..., description="List of seed URLs to crawl")
     job_id: str = Field(..., description="Job ID for tracking")
     priority: int = Field(default=5, description="Priority level (1-10, higher = more priority)")
+    reseed: bool = Field(
+        default=False, description="Forget the URLs the job has already queued"
+    )
 
 
 class CrawlURLResponse(BaseModel):
@@ -247,7 +250,8 @@ async def add_seed_urls(request: SeedURLRequest) -> Dict[str, Any]:
         added_count = await queue_system.add_seed_urls(
             urls=request.urls,
             job_id=request.job_id,
-            priority=request.priority
+            priority=request.priority,
+            reseed=request.reseed
         )
         
         return {
@@ -265,6 +269,21 @@ async def add_seed_urls(request: SeedURLRequest) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Failed to add seed URLs: {str(e)}")
 
 
+@router.post("/jobs/{job_id}/finish", dependencies=[Depends(require_token)])
+async def finish_job(job_id: str) -> Dict[str, Any]:
+    """Release a finished job's de-duplication state"""
+    global queue_system
+
+    if not queue_system:
+        raise HTTPException(status_code=400, detail="Queue system not initialized")
+
+    try:
+        await queue_system.finish_job(job_id)
+        return {"status": "success", "job_id": job_id}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to finish job: {str(e)}")
+
+
 @router.get("/urls/frontier")
 async def get_frontier_queue_status(
     limit: int = Query(default=100, description="Maximum number of URLs to return"),
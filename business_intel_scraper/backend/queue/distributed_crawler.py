@@ -11,17 +11,23 @@ This module implements a robust distributed crawling system with:
 """
 
 import asyncio
+import concurrent.futures
+import functools
 import hashlib
 import json
 import logging
+import math
+import os
+import sqlite3
 import time
 import random
 import socket
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, List, Set, Optional, Any, Union, AsyncGenerator
-from urllib.parse import urlparse, urljoin
+from urllib.parse import unquote_plus, urljoin, urlparse, urlsplit, urlunsplit
 import uuid
 import aiohttp
 import backoff
@@ -70,6 +76,15 @@ except ImportError:
     PUPPETEER_AVAILABLE = False
     launch = None
 
+# Fast HTML parsing for link extraction
+try:
+    import lxml.etree
+    import lxml.html
+    LXML_AVAILABLE = True
+    _LXML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+except ImportError:
+    LXML_AVAILABLE = False
+
 # Database integration
 try:
     from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text, Boolean, JSON
@@ -174,18 +189,63 @@ class RateLimiter:
                 await asyncio.sleep(jitter_delay)
 
 
+@dataclass
+class BrowserPageSlot:
+    """One reusable page, in its own incognito context"""
+    browser: Any
+    context: Any = None
+    page: Any = None
+    renders: int = 0
+
+
 class HeadlessBrowser:
-    """Headless browser manager for JavaScript-heavy sites"""
-    
-    def __init__(self, max_browsers: int = 3, page_timeout: int = 30):
+    """
+    Headless browser manager for JavaScript-heavy sites
+
+    Keeps pages_per_browser pages open in each browser and leases them out
+    for renders instead of opening a page per URL. A page is recycled (its
+    context closed and reopened) after max_renders_per_page renders or a
+    failed render. Images, fonts and media are blocked by default, and a
+    page counts as ready at DOMContentLoaded once its DOM stops growing,
+    rather than after networkidle0's 500ms of network silence.
+    """
+    
+    DEFAULT_BLOCKED_RESOURCES = ('image', 'font', 'media')
+
+    def __init__(
+        self,
+        max_browsers: int = 3,
+        page_timeout: int = 30,
+        pages_per_browser: int = 4,
+        blocked_resource_types: Optional[List[str]] = None,
+        max_renders_per_page: int = 100,
+        settle_interval: float = 0.1,
+        max_settle_time: float = 2.0
+    ):
         self.max_browsers = max_browsers
         self.page_timeout = page_timeout
+        self.pages_per_browser = pages_per_browser
+        self.blocked_resource_types = set(
+            self.DEFAULT_BLOCKED_RESOURCES if blocked_resource_types is None
+            else blocked_resource_types
+        )
+        self.max_renders_per_page = max_renders_per_page
+        self.settle_interval = settle_interval
+        self.max_settle_time = max_settle_time
         self.browsers = []
-        self.browser_pool = asyncio.Queue()
+        self.page_pool: asyncio.Queue = asyncio.Queue()
         self._initialized = False
+
+        self.metrics = {
+            "pages_rendered": 0,
+            "render_seconds": 0.0,
+            "js_heap_bytes": 0,
+            "requests_blocked": 0,
+            "pages_recycled": 0
+        }
     
     async def initialize(self):
-        """Initialize browser pool"""
+        """Initialize browser and page pool"""
         if not PUPPETEER_AVAILABLE:
             raise ImportError("Puppeteer not available")
         
@@ -198,81 +258,459 @@ class HeadlessBrowser:
                 args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
             )
             self.browsers.append(browser)
-            await self.browser_pool.put(browser)
+            for _ in range(self.pages_per_browser):
+                slot = BrowserPageSlot(browser)
+                await self._open_page(slot)
+                self.page_pool.put_nowait(slot)
         
         self._initialized = True
-        logger.info(f"Initialized {self.max_browsers} headless browsers")
+        logger.info(
+            f"Initialized {self.max_browsers} headless browsers "
+            f"with {self.max_browsers * self.pages_per_browser} pooled pages"
+        )
     
-    async def render_page(self, url: str, wait_for: str = None) -> Dict[str, Any]:
-        """Render page with JavaScript execution"""
+    async def _open_page(self, slot: BrowserPageSlot):
+        """Give a slot a fresh context and page"""
+        slot.context = await slot.browser.createIncognitoBrowserContext()
+        page = await slot.context.newPage()
+        await page.setUserAgent('BusinessIntelCrawler/1.0 (Headless)')
+        await page.setViewport({'width': 1920, 'height': 1080})
+        if self.blocked_resource_types:
+            await page.setRequestInterception(True)
+            page.on('request',
+                    lambda request: asyncio.ensure_future(self._route_request(request)))
+        slot.page = page
+        slot.renders = 0
+
+    async def _close_page(self, slot: BrowserPageSlot):
+        """Close a slot's context, and with it its page"""
+        context, slot.context, slot.page = slot.context, None, None
+        if context is not None:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Failed to close browser context: {e}")
+
+    async def _route_request(self, request):
+        """Abort requests for blocked resource types"""
+        try:
+            if request.resourceType in self.blocked_resource_types:
+                self.metrics["requests_blocked"] += 1
+                await request.abort()
+            else:
+                await request.continue_()
+        except Exception as e:
+            # The page may have navigated away or closed meanwhile
+            logger.debug(f"Request interception failed for {request.url}: {e}")
+
+    @asynccontextmanager
+    async def lease_page(self, timeout: float = 10):
+        """Borrow a pooled page; waits up to timeout seconds for one to free up"""
         if not self._initialized:
             await self.initialize()
         
-        browser = await asyncio.wait_for(self.browser_pool.get(), timeout=10)
+        slot = await asyncio.wait_for(self.page_pool.get(), timeout=timeout)
+        healthy = False
+        try:
+            if slot.page is None:
+                await self._open_page(slot)
+            yield slot.page
+            healthy = True
+        finally:
+            slot.renders += 1
+            worn_out = slot.renders >= self.max_renders_per_page
+            if slot.context is not None and (not healthy or worn_out):
+                await self._close_page(slot)
+                self.metrics["pages_recycled"] += 1
+            # A closed slot reopens on its next lease
+            self.page_pool.put_nowait(slot)
+
+    async def _wait_for_dom_settled(self, page):
+        """Wait until the element count stops changing, up to max_settle_time"""
+        deadline = time.monotonic() + self.max_settle_time
+        last_count = -1
+        while time.monotonic() < deadline:
+            count = await page.evaluate(
+                '() => document.getElementsByTagName("*").length'
+            )
+            if count == last_count:
+                return
+            last_count = count
+            await asyncio.sleep(self.settle_interval)
+
+    async def render_page(self, url: str, wait_for: str = None) -> Dict[str, Any]:
+        """Render page with JavaScript execution"""
+        start_time = time.monotonic()
         
         try:
-            page = await browser.newPage()
-            await page.setUserAgent('BusinessIntelCrawler/1.0 (Headless)')
-            await page.setViewport({'width': 1920, 'height': 1080})
-            
-            # Navigate to page
-            response = await page.goto(url, waitUntil='networkidle0', timeout=self.page_timeout * 1000)
+            async with self.lease_page() as page:
+                # Navigate to page
+                response = await page.goto(url, waitUntil='domcontentloaded',
+                                           timeout=self.page_timeout * 1000)
+
+                # Wait for specific element if requested, otherwise for the DOM
+                # to settle
+                if wait_for:
+                    try:
+                        await page.waitForSelector(wait_for, timeout=10000)
+                    except Exception:
+                        logger.warning(f"Wait selector '{wait_for}' not found on {url}")
+                else:
+                    await self._wait_for_dom_settled(page)
+
+                # Get page content and metadata
+                content = await page.content()
+                title = await page.title()
+
+                # Extract links (including dynamically generated ones)
+                links = await page.evaluate('''() => {
+                    const links = Array.from(document.querySelectorAll('a[href]'));
+                    return links.map(link => ({
+                        url: link.href,
+                        text: link.textContent.trim(),
+                        type: 'link'
+                    }));
+                }''')
+
+                # Extract forms
+                forms = await page.evaluate('''() => {
+                    const forms = Array.from(document.querySelectorAll('form[action]'));
+                    return forms.map(form => ({
+                        url: form.action,
+                        text: '',
+                        type: 'form'
+                    }));
+                }''')
+
+                final_url = page.url
+                page_metrics = await page.metrics()
             
-            # Wait for specific element if requested
-            if wait_for:
-                try:
-                    await page.waitForSelector(wait_for, timeout=10000)
-                except Exception:
-                    logger.warning(f"Wait selector '{wait_for}' not found on {url}")
-            
-            # Get page content and metadata
-            content = await page.content()
-            title = await page.title()
-            
-            # Extract links (including dynamically generated ones)
-            links = await page.evaluate('''() => {
-                const links = Array.from(document.querySelectorAll('a[href]'));
-                return links.map(link => ({
-                    url: link.href,
-                    text: link.textContent.trim(),
-                    type: 'link'
-                }));
-            }''')
-            
-            # Extract forms
-            forms = await page.evaluate('''() => {
-                const forms = Array.from(document.querySelectorAll('form[action]'));
-                return forms.map(form => ({
-                    url: form.action,
-                    text: '',
-                    type: 'form'
-                }));
-            }''')
-            
-            await page.close()
+            self.metrics["pages_rendered"] += 1
+            self.metrics["render_seconds"] += time.monotonic() - start_time
+            self.metrics["js_heap_bytes"] += page_metrics.get('JSHeapUsedSize', 0)
             
             return {
                 'content': content,
                 'title': title,
                 'links': links + forms,
                 'status_code': response.status if response else 200,
-                'final_url': page.url
+                'final_url': final_url
             }
             
         except Exception as e:
             logger.error(f"Browser rendering failed for {url}: {e}")
             raise
-        finally:
-            await self.browser_pool.put(browser)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Render throughput and per-page JS heap usage"""
+        rendered = self.metrics["pages_rendered"]
+        return {
+            **self.metrics,
+            "pool_size": self.max_browsers * self.pages_per_browser,
+            "avg_render_ms": (self.metrics["render_seconds"] / rendered * 1000
+                              if rendered else 0.0),
+            "avg_js_heap_bytes": (self.metrics["js_heap_bytes"] // rendered
+                                  if rendered else 0)
+        }
     
     async def close(self):
-        """Close all browsers"""
+        """Close all pooled pages and browsers"""
+        while not self.page_pool.empty():
+            await self._close_page(self.page_pool.get_nowait())
         for browser in self.browsers:
             await browser.close()
         self.browsers.clear()
         self._initialized = False
 
 
+# Query parameters that only identify the referring campaign or click
+TRACKING_QUERY_PARAMS = {
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'ref_src'
+}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for de-duplication
+    Lowercases scheme and host, drops default ports, the fragment and
+    tracking parameters, sorts the query and gives an empty path as "/".
+    Query parameters are kept as written (no re-encoding, bare keys stay
+    bare). Only used as a key: the URL as linked is what gets fetched.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"  # IPv6 literal
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+
+    netloc = host
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else '')
+        netloc = f"{userinfo}@{netloc}"
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    query = sorted(param for param in parts.query.split('&')
+                   if param and not _is_tracking_param(param))
+    return urlunsplit((scheme, netloc, parts.path or '/', '&'.join(query), ''))
+
+
+def _is_tracking_param(param: str) -> bool:
+    key = unquote_plus(param.split('=', 1)[0]).lower()
+    return key.startswith('utm_') or key in TRACKING_QUERY_PARAMS
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 16-byte keys"""
+
+    def __init__(self, expected_items: int, error_rate: float = 0.001):
+        bits = -expected_items * math.log(error_rate) / (math.log(2) ** 2)
+        self.num_bits = max(8, int(bits))
+        self.num_hashes = max(1, round(self.num_bits / expected_items * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: bytes):
+        # Double hashing on the two halves of the (already uniform) key
+        h1 = int.from_bytes(key[:8], 'little')
+        h2 = int.from_bytes(key[8:16], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: bytes):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class URLSeenSet:
+    """
+    Frontier-wide record of URLs already queued, scoped per job
+
+    URLs are keyed by their canonical form (see canonicalize_url). Callers
+    enqueue only what add_new() returns, so a URL reaches the frontier once
+    per job however many pages link to it, and forget() whatever then
+    failed to reach the frontier. forget_job() drops a job's whole record
+    once it is finished or about to be seeded afresh.
+    """
+
+    @staticmethod
+    def url_key(url: str) -> bytes:
+        return hashlib.blake2b(canonicalize_url(url).encode(), digest_size=16).digest()
+
+    async def add_new(self, urls: List[str], job_id: Optional[str] = None) -> List[str]:
+        """Record urls as seen; returns those not seen before, in order"""
+        keyed: Dict[bytes, str] = {}
+        for url in urls:
+            keyed.setdefault(self.url_key(url), url)
+        if not keyed:
+            return []
+        new_keys = await self._add_keys(job_id or '', list(keyed))
+        return [url for key, url in keyed.items() if key in new_keys]
+
+    async def forget(self, urls: List[str], job_id: Optional[str] = None):
+        """Drop urls from the set so they can be queued again"""
+        keys = list({self.url_key(url) for url in urls})
+        if keys:
+            await self._remove_keys(job_id or '', keys)
+
+    async def forget_job(self, job_id: Optional[str] = None):
+        """Drop every URL recorded for job_id"""
+        await self._clear_job(job_id or '')
+
+    async def _add_keys(self, job_id: str, keys: List[bytes]) -> Set[bytes]:
+        """Insert keys; returns the ones that were not already present"""
+        raise NotImplementedError
+
+    async def _remove_keys(self, job_id: str, keys: List[bytes]):
+        raise NotImplementedError
+
+    async def _clear_job(self, job_id: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryURLSeenSet(URLSeenSet):
+    """
+    Seen-set living as long as the process, for the in-memory frontier
+
+    A frontier that is lost on restart must not leave its URLs marked as
+    seen, or reseeding the same job would queue nothing.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Set[bytes]] = {}
+
+    async def _add_keys(self, job_id: str, keys: List[bytes]) -> Set[bytes]:
+        seen = self._jobs.setdefault(job_id, set())
+        new_keys = set(keys) - seen
+        seen.update(new_keys)
+        return new_keys
+
+    async def _remove_keys(self, job_id: str, keys: List[bytes]):
+        self._jobs.get(job_id, set()).difference_update(keys)
+
+    async def _clear_job(self, job_id: str):
+        self._jobs.pop(job_id, None)
+
+
+class SQLiteURLSeenSet(URLSeenSet):
+    """
+    Seen-set for a single crawler process: Bloom filter over a SQLite table
+
+    Only pair it with a durable frontier such as SQLiteQueueManager; the
+    record outlives the process. The Bloom filter is rebuilt from the table
+    on open. Keys it has never seen are inserted without a lookup; only its
+    positives (mostly real duplicates) are checked against the table, so
+    pages full of known navigation links cost reads, not writes.
+    """
+
+    def __init__(self, db_path: str = "seen_urls.db", expected_urls: int = 5_000_000,
+                 error_rate: float = 0.001):
+        self.db_path = db_path
+        self.bloom = BloomFilter(expected_urls, error_rate)
+        # The connection and the Bloom filter are only touched on this thread
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="url-seen-set"
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def _bloom_key(job_id: str, key: bytes) -> bytes:
+        return job_id.encode() + b'\n' + key
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS seen_urls "
+                         "(job_id TEXT NOT NULL, key BLOB NOT NULL, "
+                         "PRIMARY KEY (job_id, key)) WITHOUT ROWID")
+            conn.commit()
+            for job_id, key in conn.execute("SELECT job_id, key FROM seen_urls"):
+                self.bloom.add(self._bloom_key(job_id, key))
+            self._conn = conn
+        return self._conn
+
+    def _insert_new(self, job_id: str, keys: List[bytes]) -> Set[bytes]:
+        conn = self._get_connection()
+        new_keys = [
+            key for key in keys
+            if self._bloom_key(job_id, key) not in self.bloom
+            or conn.execute(
+                "SELECT 1 FROM seen_urls WHERE job_id = ? AND key = ?",
+                (job_id, key)
+            ).fetchone() is None
+        ]
+        if new_keys:
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO seen_urls (job_id, key) VALUES (?, ?)",
+                    [(job_id, k) for k in new_keys]
+                )
+            for key in new_keys:
+                self.bloom.add(self._bloom_key(job_id, key))
+        return set(new_keys)
+
+    async def _add_keys(self, job_id: str, keys: List[bytes]) -> Set[bytes]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._insert_new, job_id, keys
+        )
+
+    # The Bloom filter keeps the bits of deleted keys; its positives are
+    # checked against the table, so removed keys read as new again
+
+    def _delete(self, job_id: str, keys: List[bytes]):
+        conn = self._get_connection()
+        with conn:
+            conn.executemany("DELETE FROM seen_urls WHERE job_id = ? AND key = ?",
+                             [(job_id, k) for k in keys])
+
+    def _delete_job(self, job_id: str):
+        conn = self._get_connection()
+        with conn:
+            conn.execute("DELETE FROM seen_urls WHERE job_id = ?", (job_id,))
+
+    async def _remove_keys(self, job_id: str, keys: List[bytes]):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._delete, job_id, keys)
+
+    async def _clear_job(self, job_id: str):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._delete_job, job_id)
+
+    async def close(self):
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, _close)
+        self._executor.shutdown(wait=False)
+
+
+class RedisURLSeenSet(URLSeenSet):
+    """
+    Seen-set shared by every worker through one Redis set per job
+
+    SADD is atomic, so of several workers discovering the same URL at once
+    exactly one gets to queue it. A page's links go in one pipelined round
+    trip, which also pushes back the job's expiry: a job that stops
+    discovering URLs for ttl seconds is forgotten even if nobody calls
+    forget_job(). Persistence follows the Redis server's RDB/AOF settings.
+    """
+
+    def __init__(self, redis_url: str = "redis://localhost:6379/0",
+                 key_prefix: str = "crawler:seen", ttl: int = 7 * 24 * 3600):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.redis_client: Optional[redis.Redis] = None
+
+    def _get_client(self) -> "redis.Redis":
+        if self.redis_client is None:
+            if not REDIS_AVAILABLE:
+                raise ImportError("Redis not available")
+            self.redis_client = redis.from_url(self.redis_url)
+        return self.redis_client
+
+    def job_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:{job_id}"
+
+    async def _add_keys(self, job_id: str, keys: List[bytes]) -> Set[bytes]:
+        job_key = self.job_key(job_id)
+        pipe = self._get_client().pipeline(transaction=False)
+        for key in keys:
+            pipe.sadd(job_key, key)
+        pipe.expire(job_key, self.ttl)
+        added = (await pipe.execute())[:-1]
+        return {key for key, was_added in zip(keys, added) if was_added}
+
+    async def _remove_keys(self, job_id: str, keys: List[bytes]):
+        await self._get_client().srem(self.job_key(job_id), *keys)
+
+    async def _clear_job(self, job_id: str):
+        await self._get_client().delete(self.job_key(job_id))
+
+    async def close(self):
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
+
 class QueueBackend(Enum):
     """Supported queue backends"""
     REDIS = "redis"
@@ -310,6 +748,8 @@ class CrawlURL:
     requires_js: bool = False  # Whether this URL requires JavaScript rendering
     content_size_estimate: Optional[int] = None  # Estimated content size
     is_dynamic: bool = False  # Whether content changes frequently
+    # Claim handle from a leasing queue backend; not serialized
+    queue_receipt: Optional[str] = None
     
     def __post_init__(self):
         self.domain = urlparse(self.url).netloc
@@ -437,6 +877,33 @@ class QueueManager:
         logger.warning("QueueManager.get_frontier_url not implemented in subclass")
         return None
     
+    async def put_frontier_urls(self, crawl_urls: List[CrawlURL]) -> int:
+        """Add URLs to frontier queue; returns how many were added"""
+        added = 0
+        for crawl_url in crawl_urls:
+            if await self.put_frontier_url(crawl_url):
+                added += 1
+        return added
+
+    async def get_frontier_urls(self, max_count: int) -> List[CrawlURL]:
+        """Get up to max_count URLs from frontier queue"""
+        crawl_urls = []
+        while len(crawl_urls) < max_count:
+            crawl_url = await self.get_frontier_url()
+            if crawl_url is None:
+                break
+            crawl_urls.append(crawl_url)
+        return crawl_urls
+
+    async def ack_frontier_url(self, crawl_url: CrawlURL) -> bool:
+        """Confirm a URL from get_frontier_url() has been handled"""
+        # Backends that remove URLs on receipt have nothing to confirm
+        return True
+
+    async def renew_frontier_lease(self, crawl_url: CrawlURL) -> bool:
+        """Extend the claim on a URL from get_frontier_url(); False if it was lost"""
+        return True
+
     async def put_parse_task(self, parse_task: ParseTask) -> bool:
         """Add task to parsing queue"""
         # Default implementation for graceful fallback
@@ -463,202 +930,301 @@ class QueueManager:
 
 
 class SQLiteQueueManager(QueueManager):
-    """SQLite-based queue implementation for fallback"""
-    
-    def __init__(self, db_path: str = "distributed_queue.db"):
+    """
+    SQLite-based queue implementation for fallback
+
+    One executor thread owns the (WAL-mode) connection, so every call reuses
+    it. Frontier dequeues claim rows with a lease instead of deleting them:
+    a claimed URL stays in the table until ack_frontier_url(), and if the
+    worker dies the lease runs out after visibility_timeout seconds and the
+    URL is handed out again.
+    """
+    
+    def __init__(self, db_path: str = "distributed_queue.db",
+                 visibility_timeout: int = 300):
         self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
         self.logger = logging.getLogger(__name__)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-queue"
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, fn, *args):
+        """Run fn(conn, *args) on the connection's thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: fn(self._get_connection(), *args)
+        )
         
     async def init_tables(self):
         """Initialize database tables"""
-        import sqlite3
-        import threading
-        
-        # Use thread-local storage for SQLite connections
-        if not hasattr(self, '_local'):
-            self._local = threading.local()
-        
-        def _init_db():
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS frontier_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT NOT NULL,
-                    source_url TEXT,
-                    depth INTEGER DEFAULT 0,
-                    priority INTEGER DEFAULT 5,
-                    created_at TEXT,
-                    scheduled_at TEXT,
-                    retry_count INTEGER DEFAULT 0,
-                    max_retries INTEGER DEFAULT 3,
-                    metadata TEXT,
-                    job_id TEXT,
-                    domain TEXT,
-                    link_depth INTEGER DEFAULT 0,
-                    requires_js BOOLEAN DEFAULT FALSE,
-                    content_size_estimate INTEGER,
-                    is_dynamic BOOLEAN DEFAULT FALSE
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS parse_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id TEXT NOT NULL UNIQUE,
-                    url TEXT NOT NULL,
-                    raw_id TEXT NOT NULL,
-                    storage_location TEXT NOT NULL,
-                    content_type TEXT DEFAULT 'text/html',
-                    priority INTEGER DEFAULT 5,
-                    created_at TEXT,
-                    retry_count INTEGER DEFAULT 0,
-                    max_retries INTEGER DEFAULT 3,
-                    metadata TEXT,
-                    requires_ocr BOOLEAN DEFAULT FALSE
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS retry_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT NOT NULL,
-                    scheduled_for TEXT NOT NULL,
-                    retry_count INTEGER DEFAULT 0,
-                    reason TEXT,
-                    metadata TEXT,
-                    created_at TEXT
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS dead_queue (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT NOT NULL,
-                    reason TEXT NOT NULL,
-                    failed_at TEXT,
-                    retry_count INTEGER DEFAULT 0,
-                    metadata TEXT,
-                    last_error TEXT
-                )
-            """)
-            
-            # Create indexes for performance
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_priority ON frontier_queue (priority DESC, id ASC)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_priority ON parse_queue (priority DESC, id ASC)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_retry_scheduled ON retry_queue (scheduled_for ASC)")
-            
-            conn.commit()
+        await self._run(lambda conn: None)
+
+    async def disconnect(self):
+        """Close the connection and stop the executor thread"""
+        def _close(conn):
             conn.close()
+            self._conn = None
         
-        # Run in thread to avoid SQLite threading issues
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            await asyncio.get_event_loop().run_in_executor(executor, _init_db)
-    
-    def _get_connection(self):
-        """Get thread-local SQLite connection"""
-        import sqlite3
-        import threading
+        if self._conn is not None:
+            await self._run(_close)
+        self._executor.shutdown(wait=False)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """The executor thread's connection, opened (schema included) on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._init_db(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _init_db(conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                source_url TEXT,
+                depth INTEGER DEFAULT 0,
+                priority INTEGER DEFAULT 5,
+                created_at TEXT,
+                scheduled_at TEXT,
+                retry_count INTEGER DEFAULT 0,
+                max_retries INTEGER DEFAULT 3,
+                metadata TEXT,
+                job_id TEXT,
+                domain TEXT,
+                link_depth INTEGER DEFAULT 0,
+                requires_js BOOLEAN DEFAULT FALSE,
+                content_size_estimate INTEGER,
+                is_dynamic BOOLEAN DEFAULT FALSE,
+                lease_token TEXT,
+                lease_expires_at REAL
+            )
+        """)
         
-        if not hasattr(self, '_local'):
-            self._local = threading.local()
-            
-        if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(self.db_path)
-            self._local.connection.row_factory = sqlite3.Row
-            
-        return self._local.connection
+        # Queues created before leases
+        frontier_columns = {
+            row[1] for row in conn.execute("PRAGMA table_info(frontier_queue)")
+        }
+        if 'lease_token' not in frontier_columns:
+            conn.execute("ALTER TABLE frontier_queue ADD COLUMN lease_token TEXT")
+            conn.execute("ALTER TABLE frontier_queue ADD COLUMN lease_expires_at REAL")
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                raw_id TEXT NOT NULL,
+                storage_location TEXT NOT NULL,
+                content_type TEXT DEFAULT 'text/html',
+                priority INTEGER DEFAULT 5,
+                created_at TEXT,
+                retry_count INTEGER DEFAULT 0,
+                max_retries INTEGER DEFAULT 3,
+                metadata TEXT,
+                requires_ocr BOOLEAN DEFAULT FALSE
+            )
+        """)
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS retry_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                scheduled_for TEXT NOT NULL,
+                retry_count INTEGER DEFAULT 0,
+                reason TEXT,
+                metadata TEXT,
+                created_at TEXT
+            )
+        """)
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS dead_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                failed_at TEXT,
+                retry_count INTEGER DEFAULT 0,
+                metadata TEXT,
+                last_error TEXT
+            )
+        """)
+
+        # Create indexes for performance
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_priority "
+                     "ON frontier_queue (priority DESC, id ASC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_priority "
+                     "ON parse_queue (priority DESC, id ASC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_retry_scheduled "
+                     "ON retry_queue (scheduled_for ASC)")
+
+        conn.commit()
+
+    @staticmethod
+    def _frontier_row(crawl_url: CrawlURL) -> tuple:
+        return (
+            crawl_url.url,
+            crawl_url.source_url,
+            crawl_url.depth,
+            crawl_url.priority,
+            crawl_url.created_at.isoformat(),
+            crawl_url.scheduled_at.isoformat(),
+            crawl_url.retry_count,
+            crawl_url.max_retries,
+            json.dumps(crawl_url.metadata),
+            crawl_url.job_id,
+            crawl_url.domain,
+            crawl_url.link_depth,
+            crawl_url.requires_js,
+            crawl_url.content_size_estimate,
+            crawl_url.is_dynamic
+        )
+
+    @staticmethod
+    def _row_to_crawl_url(row: sqlite3.Row) -> CrawlURL:
+        crawl_url = CrawlURL(
+            url=row['url'],
+            source_url=row['source_url'],
+            depth=row['depth'],
+            priority=row['priority'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            scheduled_at=datetime.fromisoformat(row['scheduled_at']),
+            retry_count=row['retry_count'],
+            max_retries=row['max_retries'],
+            metadata=json.loads(row['metadata']) if row['metadata'] else {},
+            job_id=row['job_id'],
+            link_depth=row['link_depth'],
+            requires_js=bool(row['requires_js']),
+            content_size_estimate=row['content_size_estimate'],
+            is_dynamic=bool(row['is_dynamic'])
+        )
+        crawl_url.queue_receipt = f"{row['id']}:{row['lease_token']}"
+        return crawl_url
     
     async def put_frontier_url(self, crawl_url: CrawlURL) -> bool:
         """Add URL to frontier queue"""
-        try:
-            def _insert():
-                conn = self._get_connection()
-                conn.execute("""
+        return await self.put_frontier_urls([crawl_url]) == 1
+
+    async def put_frontier_urls(self, crawl_urls: List[CrawlURL]) -> int:
+        """Add URLs to frontier queue in one transaction; returns how many were added"""
+        if not crawl_urls:
+            return 0
+
+        def _insert(conn, rows):
+            with conn:
+                conn.executemany("""
                     INSERT INTO frontier_queue (
                         url, source_url, depth, priority, created_at, scheduled_at,
                         retry_count, max_retries, metadata, job_id, domain,
                         link_depth, requires_js, content_size_estimate, is_dynamic
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    crawl_url.url,
-                    crawl_url.source_url,
-                    crawl_url.depth,
-                    crawl_url.priority,
-                    crawl_url.created_at.isoformat(),
-                    crawl_url.scheduled_at.isoformat(),
-                    crawl_url.retry_count,
-                    crawl_url.max_retries,
-                    json.dumps(crawl_url.metadata),
-                    crawl_url.job_id,
-                    crawl_url.domain,
-                    crawl_url.link_depth,
-                    crawl_url.requires_js,
-                    crawl_url.content_size_estimate,
-                    crawl_url.is_dynamic
-                ))
-                conn.commit()
-                return True
-            
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                result = await asyncio.get_event_loop().run_in_executor(executor, _insert)
-                return result
-                
+                """, rows)
+            return len(rows)
+
+        try:
+            return await self._run(_insert, [self._frontier_row(u) for u in crawl_urls])
         except Exception as e:
-            self.logger.error(f"Failed to add URL to frontier queue: {e}")
-            return False
+            self.logger.error(f"Failed to add URLs to frontier queue: {e}")
+            return 0
     
     async def get_frontier_url(self) -> Optional[CrawlURL]:
-        """Get next URL from frontier queue"""
-        try:
-            def _get():
-                conn = self._get_connection()
-                cursor = conn.execute("""
-                    SELECT * FROM frontier_queue 
-                    ORDER BY priority DESC, id ASC 
-                    LIMIT 1
-                """)
-                row = cursor.fetchone()
-                
-                if row:
-                    # Delete the record
-                    conn.execute("DELETE FROM frontier_queue WHERE id = ?", (row['id'],))
-                    conn.commit()
-                    
-                    # Convert back to CrawlURL
-                    return CrawlURL(
-                        url=row['url'],
-                        source_url=row['source_url'],
-                        depth=row['depth'],
-                        priority=row['priority'],
-                        created_at=datetime.fromisoformat(row['created_at']),
-                        scheduled_at=datetime.fromisoformat(row['scheduled_at']),
-                        retry_count=row['retry_count'],
-                        max_retries=row['max_retries'],
-                        metadata=json.loads(row['metadata']) if row['metadata'] else {},
-                        job_id=row['job_id'],
-                        link_depth=row['link_depth'],
-                        requires_js=bool(row['requires_js']),
-                        content_size_estimate=row['content_size_estimate'],
-                        is_dynamic=bool(row['is_dynamic'])
+        """Claim next URL from frontier queue"""
+        claimed = await self.get_frontier_urls(1)
+        return claimed[0] if claimed else None
+
+    async def get_frontier_urls(self, max_count: int) -> List[CrawlURL]:
+        """
+        Claim up to max_count URLs, highest priority first
+        The claim is a single UPDATE, so concurrent workers (in this or other
+        processes) never receive the same row while its lease is live.
+        """
+        def _claim(conn, token, now):
+            with conn:
+                rows = conn.execute("""
+                    UPDATE frontier_queue SET lease_token = ?, lease_expires_at = ?
+                    WHERE id IN (
+                        SELECT id FROM frontier_queue
+                        WHERE lease_expires_at IS NULL OR lease_expires_at <= ?
+                        ORDER BY priority DESC, id ASC
+                        LIMIT ?
                     )
-                return None
-            
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                result = await asyncio.get_event_loop().run_in_executor(executor, _get)
-                return result
-                
+                    RETURNING *
+                """, (token, now + self.visibility_timeout, now, max_count)).fetchall()
+            # RETURNING order is unspecified
+            rows.sort(key=lambda row: (-row['priority'], row['id']))
+            return [self._row_to_crawl_url(row) for row in rows]
+
+        try:
+            return await self._run(_claim, uuid.uuid4().hex, time.time())
         except Exception as e:
-            self.logger.error(f"Failed to get URL from frontier queue: {e}")
-            return None
+            self.logger.error(f"Failed to get URLs from frontier queue: {e}")
+            return []
+
+    async def ack_frontier_url(self, crawl_url: CrawlURL) -> bool:
+        """Remove a claimed URL once it has been handled"""
+        return await self.ack_frontier_urls([crawl_url]) == 1
+
+    async def renew_frontier_lease(self, crawl_url: CrawlURL) -> bool:
+        """
+        Restart a claimed URL's lease at visibility_timeout from now
+        Returns False once another worker holds the URL (the lease ran out
+        and it was claimed again), in which case the caller must drop it.
+        """
+        if not crawl_url.queue_receipt:
+            return True
+        row_id, token = crawl_url.queue_receipt.split(':', 1)
+
+        def _renew(conn):
+            with conn:
+                return conn.execute(
+                    "UPDATE frontier_queue SET lease_expires_at = ? "
+                    "WHERE id = ? AND lease_token = ?",
+                    (time.time() + self.visibility_timeout, row_id, token)
+                ).rowcount == 1
+
+        try:
+            return await self._run(_renew)
+        except Exception as e:
+            # Unconfirmed: leave the URL to expire and be claimed again
+            self.logger.error(f"Failed to renew frontier lease: {e}")
+            return False
+
+    async def ack_frontier_urls(self, crawl_urls: List[CrawlURL]) -> int:
+        """Remove claimed URLs in one transaction; returns how many were removed"""
+        # A URL whose lease ran out and was claimed again belongs to its new
+        # holder, so only the current lease removes it
+        claims = [
+            tuple(crawl_url.queue_receipt.split(':', 1))
+            for crawl_url in crawl_urls if crawl_url.queue_receipt
+        ]
+        if not claims:
+            return 0
+
+        def _delete(conn, claims):
+            with conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "DELETE FROM frontier_queue WHERE id = ? AND lease_token = ?",
+                    claims
+                )
+                return conn.total_changes - before
+
+        try:
+            return await self._run(_delete, claims)
+        except Exception as e:
+            self.logger.error(f"Failed to acknowledge frontier URLs: {e}")
+            return 0
     
     async def put_parse_task(self, parse_task: ParseTask) -> bool:
         """Add task to parsing queue"""
         try:
-            def _insert():
-                conn = self._get_connection()
+            def _insert(conn):
                 conn.execute("""
                     INSERT OR REPLACE INTO parse_queue (
                         task_id, url, raw_id, storage_location, content_type,
@@ -681,10 +1247,7 @@ class SQLiteQueueManager(QueueManager):
                 conn.commit()
                 return True
             
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                result = await asyncio.get_event_loop().run_in_executor(executor, _insert)
-                return result
+            return await self._run(_insert)
                 
         except Exception as e:
             self.logger.error(f"Failed to add parse task: {e}")
@@ -693,20 +1256,18 @@ class SQLiteQueueManager(QueueManager):
     async def get_parse_task(self) -> Optional[ParseTask]:
         """Get next parsing task"""
         try:
-            def _get():
-                conn = self._get_connection()
-                cursor = conn.execute("""
-                    SELECT * FROM parse_queue 
-                    ORDER BY priority DESC, id ASC 
-                    LIMIT 1
-                """)
-                row = cursor.fetchone()
+            def _get(conn):
+                with conn:
+                    row = conn.execute("""
+                        DELETE FROM parse_queue WHERE id = (
+                            SELECT id FROM parse_queue
+                            ORDER BY priority DESC, id ASC
+                            LIMIT 1
+                        )
+                        RETURNING *
+                    """).fetchone()
                 
                 if row:
-                    # Delete the record
-                    conn.execute("DELETE FROM parse_queue WHERE id = ?", (row['id'],))
-                    conn.commit()
-                    
                     # Convert back to ParseTask
                     return ParseTask(
                         task_id=row['task_id'],
@@ -723,10 +1284,7 @@ class SQLiteQueueManager(QueueManager):
                     )
                 return None
             
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                result = await asyncio.get_event_loop().run_in_executor(executor, _get)
-                return result
+            return await self._run(_get)
                 
         except Exception as e:
             self.logger.error(f"Failed to get parse task: {e}")
@@ -737,8 +1295,7 @@ class SQLiteQueueManager(QueueManager):
         try:
             scheduled_for = datetime.utcnow() + timedelta(seconds=delay_seconds)
             
-            def _insert():
-                conn = self._get_connection()
+            def _insert(conn):
                 conn.execute("""
                     INSERT INTO retry_queue (
                         url, scheduled_for, retry_count, reason, metadata, created_at
@@ -754,10 +1311,7 @@ class SQLiteQueueManager(QueueManager):
                 conn.commit()
                 return True
             
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                result = await asyncio.get_event_loop().run_in_executor(executor, _insert)
-                return result
+            return await self._run(_insert)
                 
         except Exception as e:
             self.logger.error(f"Failed to add URL to retry queue: {e}")
@@ -766,8 +1320,7 @@ class SQLiteQueueManager(QueueManager):
     async def put_dead_url(self, crawl_url: CrawlURL, reason: str) -> bool:
         """Add URL to dead letter queue"""
         try:
-            def _insert():
-                conn = self._get_connection()
+            def _insert(conn):
                 conn.execute("""
                     INSERT INTO dead_queue (
                         url, reason, failed_at, retry_count, metadata, last_error
@@ -783,10 +1336,7 @@ class SQLiteQueueManager(QueueManager):
                 conn.commit()
                 return True
             
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                result = await asyncio.get_event_loop().run_in_executor(executor, _insert)
-                return result
+            return await self._run(_insert)
                 
         except Exception as e:
             self.logger.error(f"Failed to add URL to dead queue: {e}")
@@ -794,33 +1344,45 @@ class SQLiteQueueManager(QueueManager):
     
     async def get_queue_stats(self) -> Dict[str, int]:
         """Get queue statistics"""
+        def _count(conn):
+            # Taken on the connection's thread so leases that ran out while
+            # this call was queued are not counted
+            now = time.time()
+            stats = {}
+
+            # Count frontier URLs, and those currently claimed by a worker
+            stats['frontier_queue_size'] = conn.execute(
+                "SELECT COUNT(*) FROM frontier_queue"
+            ).fetchone()[0]
+            stats['frontier_leased'] = conn.execute(
+                "SELECT COUNT(*) FROM frontier_queue WHERE lease_expires_at > ?", (now,)
+            ).fetchone()[0]
+
+            # Count parse tasks
+            stats['parse_queue_size'] = conn.execute(
+                "SELECT COUNT(*) FROM parse_queue"
+            ).fetchone()[0]
+
+            # Count retry URLs
+            stats['retry_queue_size'] = conn.execute(
+                "SELECT COUNT(*) FROM retry_queue"
+            ).fetchone()[0]
+
+            # Count dead URLs
+            stats['dead_queue_size'] = conn.execute(
+                "SELECT COUNT(*) FROM dead_queue"
+            ).fetchone()[0]
+
+            return stats
+
         try:
-            import aiosqlite
-            async with aiosqlite.connect(self.db_path) as db:
-                stats = {}
-                
-                # Count frontier URLs
-                cursor = await db.execute("SELECT COUNT(*) FROM frontier_queue")
-                stats['frontier_queue_size'] = (await cursor.fetchone())[0]
-                
-                # Count parse tasks
-                cursor = await db.execute("SELECT COUNT(*) FROM parse_queue")
-                stats['parse_queue_size'] = (await cursor.fetchone())[0]
-                
-                # Count retry URLs
-                cursor = await db.execute("SELECT COUNT(*) FROM retry_queue")
-                stats['retry_queue_size'] = (await cursor.fetchone())[0]
-                
-                # Count dead URLs
-                cursor = await db.execute("SELECT COUNT(*) FROM dead_queue")
-                stats['dead_queue_size'] = (await cursor.fetchone())[0]
-                
-                return stats
+            return await self._run(_count)
                 
         except Exception as e:
             self.logger.error(f"Failed to get queue stats: {e}")
             return {
                 'frontier_queue_size': 0,
+                'frontier_leased': 0,
                 'parse_queue_size': 0,
                 'retry_queue_size': 0,
                 'dead_queue_size': 0
@@ -1180,6 +1742,205 @@ class MemoryQueueManager(QueueManager):
         return processed
 
 
+@dataclass(slots=True)
+class RecrawlEntry:
+    """What a crawl worker needs to know about a URL between crawls"""
+    last_crawled_at: Optional[datetime] = None
+    next_crawl_at: Optional[datetime] = None
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+
+
+class RecrawlIndex:
+    """
+    Memory-resident view of crawl_records with write-behind updates
+
+    Warmed once from the database; recrawl checks and conditional-request
+    validators are then answered from memory. Crawl results update the index
+    at once and are queued per URL (several crawls of one URL coalesce into
+    one row update), then written every flush_interval seconds, or sooner
+    once max_pending URLs are waiting, in a single transaction on the
+    index's own thread. A failed flush keeps its updates for the next one.
+    """
+
+    def __init__(self, db_session_factory, flush_interval: float = 2.0,
+                 max_pending: int = 1000):
+        self.db_session_factory = db_session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.entries: Dict[str, RecrawlEntry] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="recrawl-index"
+        )
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._closing = False
+
+        self.metrics = {
+            "warmed_records": 0,
+            "flushed_records": 0,
+            "flush_batches": 0,
+            "flush_failures": 0
+        }
+
+    async def start(self):
+        """Load the index and start the periodic flush"""
+        if self._flush_task:
+            return
+
+        loop = asyncio.get_running_loop()
+        self.entries = await loop.run_in_executor(self._executor, self._load_entries)
+        self.metrics["warmed_records"] = len(self.entries)
+        self._flush_requested = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Recrawl index warmed with {len(self.entries)} crawl records")
+
+    async def close(self):
+        """Stop the periodic flush and write what is still pending"""
+        if self._flush_task:
+            # Not cancelled: a write already on the executor must finish first
+            self._closing = True
+            self._flush_requested.set()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+        self._executor.shutdown(wait=False)
+
+    def _load_entries(self) -> Dict[str, RecrawlEntry]:
+        session = self.db_session_factory()
+        try:
+            rows = session.query(
+                CrawlRecord.url_hash,
+                CrawlRecord.last_crawled_at,
+                CrawlRecord.next_crawl_at,
+                CrawlRecord.etag,
+                CrawlRecord.last_modified
+            ).yield_per(10000)
+            return {url_hash: RecrawlEntry(*fields) for url_hash, *fields in rows}
+        finally:
+            session.close()
+
+    def get(self, url_hash: str) -> Optional[RecrawlEntry]:
+        return self.entries.get(url_hash)
+
+    def should_crawl(self, url_hash: str) -> bool:
+        """False while a URL's recrawl interval has not elapsed"""
+        entry = self.entries.get(url_hash)
+        return not (entry and entry.next_crawl_at
+                    and datetime.utcnow() < entry.next_crawl_at)
+
+    def record_crawl(self, url_hash: str, update: Dict[str, Any]):
+        """Apply a crawl result to the index and queue it for the database"""
+        entry = self.entries.get(url_hash)
+        if entry is None:
+            entry = self.entries[url_hash] = RecrawlEntry()
+        entry.last_crawled_at = update['crawled_at']
+        entry.next_crawl_at = update['next_crawl_at']
+        if update.get('etag'):
+            entry.etag = update['etag']
+        if update.get('last_modified'):
+            entry.last_modified = update['last_modified']
+
+        update = {**update, 'crawls': 1}
+        older = self._pending.get(url_hash)
+        self._pending[url_hash] = (
+            self._merge_updates(older, update) if older else update
+        )
+        if len(self._pending) >= self.max_pending and self._flush_requested:
+            self._flush_requested.set()
+
+    @staticmethod
+    def _merge_updates(older: Dict[str, Any],
+                       newer: Dict[str, Any]) -> Dict[str, Any]:
+        merged = {**older}
+        merged.update((key, value) for key, value in newer.items() if value is not None)
+        merged['first_crawled_at'] = older['first_crawled_at']
+        merged['crawls'] = older['crawls'] + newer['crawls']
+        merged['metadata'] = {**older['metadata'], **newer['metadata']}
+        return merged
+
+    async def _flush_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(),
+                                       timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write every queued crawl update in one transaction"""
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._write_batch, batch)
+            self.metrics["flushed_records"] += len(batch)
+            self.metrics["flush_batches"] += 1
+        except Exception as e:
+            self.metrics["flush_failures"] += 1
+            logger.error(f"Failed to flush {len(batch)} crawl records: {e}")
+            # Retry with the next flush; updates queued meanwhile are newer
+            for url_hash, update in batch.items():
+                newer = self._pending.get(url_hash)
+                self._pending[url_hash] = (
+                    self._merge_updates(update, newer) if newer else update
+                )
+
+    def _write_batch(self, batch: Dict[str, Dict[str, Any]]):
+        session = self.db_session_factory()
+        try:
+            url_hashes = list(batch)
+            existing = {}
+            for i in range(0, len(url_hashes), 500):
+                chunk = url_hashes[i:i + 500]
+                query = session.query(CrawlRecord)
+                for record in query.filter(CrawlRecord.url_hash.in_(chunk)):
+                    existing[record.url_hash] = record
+
+            for url_hash, update in batch.items():
+                record = existing.get(url_hash)
+                if record is None:
+                    record = CrawlRecord(
+                        url=update['url'],
+                        url_hash=url_hash,
+                        domain=update['domain'],
+                        first_crawled_at=update['first_crawled_at'],
+                        crawl_count=0,
+                        metadata={},
+                        link_depth=update['link_depth']
+                    )
+                    session.add(record)
+
+                record.last_crawled_at = update['crawled_at']
+                record.crawl_count = (record.crawl_count or 0) + update['crawls']
+                record.status = URLStatus.COMPLETED.value
+                record.last_status_code = update['status_code']
+                record.requires_js = update['requires_js']
+                record.is_dynamic = update['is_dynamic']
+                record.recrawl_interval_hours = update['recrawl_interval_hours']
+                record.next_crawl_at = update['next_crawl_at']
+                if update.get('content_size'):
+                    record.content_size = update['content_size']
+                if update.get('etag'):
+                    record.etag = update['etag']
+                if update.get('last_modified'):
+                    record.last_modified = update['last_modified']
+                # Reassigned, not mutated, so the JSON column is marked dirty
+                record.metadata = {**(record.metadata or {}), **update['metadata']}
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
 class CrawlWorker:
     """Distributed crawl worker with enhanced capabilities"""
     
@@ -1193,12 +1954,23 @@ class CrawlWorker:
         rate_limit_config: Dict[str, Any] = None,
         enable_js_rendering: bool = False,
         dns_cache_ttl: int = 300,
-        max_content_size: int = 50 * 1024 * 1024  # 50MB
+        max_content_size: int = 50 * 1024 * 1024,  # 50MB
+        recrawl_index: Optional[RecrawlIndex] = None
     ):
         self.worker_id = worker_id
         self.queue_manager = queue_manager
         self.storage_manager = storage_manager
         self.db_session_factory = db_session_factory
+
+        # Crawl records are read from and written through a shared index;
+        # a worker given only a session factory keeps its own
+        self._owns_recrawl_index = (
+            recrawl_index is None and db_session_factory is not None
+        )
+        self.recrawl_index = (
+            RecrawlIndex(db_session_factory) if self._owns_recrawl_index
+            else recrawl_index
+        )
         self.max_concurrent = max_concurrent
         self.enable_js_rendering = enable_js_rendering
         self.max_content_size = max_content_size
@@ -1220,7 +1992,9 @@ class CrawlWorker:
         if enable_js_rendering:
             self.headless_browser = HeadlessBrowser(
                 max_browsers=rate_config.get('max_browsers', 2),
-                page_timeout=rate_config.get('page_timeout', 30)
+                page_timeout=rate_config.get('page_timeout', 30),
+                pages_per_browser=rate_config.get('pages_per_browser', 4),
+                blocked_resource_types=rate_config.get('blocked_resource_types')
             )
         
         # HTTP session
@@ -1229,11 +2003,13 @@ class CrawlWorker:
         # State
         self.is_running = False
         self.active_tasks: Set[asyncio.Task] = set()
+        self._task_slots = asyncio.Semaphore(max_concurrent)
         
         # Metrics
         self.metrics = {
             "urls_crawled": 0,
             "urls_failed": 0,
+            "leases_lost": 0,
             "bytes_downloaded": 0,
             "avg_response_time": 0.0,
             "js_rendered_pages": 0,
@@ -1249,6 +2025,9 @@ class CrawlWorker:
         
         self.is_running = True
         
+        if self._owns_recrawl_index:
+            await self.recrawl_index.start()
+
         # Initialize headless browser if enabled
         if self.headless_browser:
             try:
@@ -1315,28 +2094,41 @@ class CrawlWorker:
         if self.session:
             await self.session.close()
         
+        if self._owns_recrawl_index:
+            await self.recrawl_index.close()
+
         logger.info(f"Crawl worker {self.worker_id} stopped")
     
     async def _crawl_loop(self):
         """Main crawl loop"""
         while self.is_running:
             try:
+                # Claim no more URLs than max_concurrent tasks can work on, so
+                # a worker never sits on leases it cannot get to in time
+                await self._task_slots.acquire()
+
                 # Get next URL from queue
-                crawl_url = await self.queue_manager.get_frontier_url()
+                try:
+                    crawl_url = await self.queue_manager.get_frontier_url()
+                except BaseException:
+                    self._task_slots.release()
+                    raise
                 
-                if crawl_url:
-                    # Check if we should crawl this URL
-                    if await self._should_crawl_url(crawl_url):
-                        # Create crawl task
-                        task = asyncio.create_task(self._crawl_url(crawl_url))
-                        self.active_tasks.add(task)
-                        
-                        # Clean up finished tasks
-                        self.active_tasks = {t for t in self.active_tasks if not t.done()}
-                    else:
-                        logger.debug(f"Skipping URL {crawl_url.url} (shouldn't crawl)")
+                if crawl_url and await self._should_crawl_url(crawl_url):
+                    # Create crawl task; it releases its slot when done
+                    task = asyncio.create_task(self._crawl_url(crawl_url))
+                    task.add_done_callback(lambda _: self._task_slots.release())
+                    self.active_tasks.add(task)
+
+                    # Clean up finished tasks
+                    self.active_tasks = {t for t in self.active_tasks if not t.done()}
+                elif crawl_url:
+                    self._task_slots.release()
+                    logger.debug(f"Skipping URL {crawl_url.url} (shouldn't crawl)")
+                    await self.queue_manager.ack_frontier_url(crawl_url)
                 else:
                     # No URLs available, wait a bit
+                    self._task_slots.release()
                     await asyncio.sleep(1)
                 
             except asyncio.CancelledError:
@@ -1348,27 +2140,12 @@ class CrawlWorker:
     async def _should_crawl_url(self, crawl_url: CrawlURL) -> bool:
         """Check if URL should be crawled"""
         try:
-            if not self.db_session_factory:
+            if not self.recrawl_index:
                 return True  # No database, always crawl
             
-            session = self.db_session_factory()
-            try:
-                url_hash = hashlib.sha256(crawl_url.url.encode()).hexdigest()
-                
-                # Check if URL exists in database
-                record = session.query(CrawlRecord).filter_by(url_hash=url_hash).first()
-                
-                if not record:
-                    return True  # New URL, should crawl
-                
-                # Check recrawl interval
-                if record.next_crawl_at and datetime.utcnow() < record.next_crawl_at:
-                    return False  # Too soon to recrawl
-                
-                return True
-                
-            finally:
-                session.close()
+            # New URLs, and those past their recrawl interval
+            url_hash = hashlib.sha256(crawl_url.url.encode()).hexdigest()
+            return self.recrawl_index.should_crawl(url_hash)
                 
         except Exception as e:
             logger.error(f"Error checking crawl status for {crawl_url.url}: {e}")
@@ -1388,6 +2165,15 @@ class CrawlWorker:
             # Apply rate limiting
             await self.rate_limiter.acquire(crawl_url.url)
             
+            # The per-domain wait can outlast the lease; renew it, and leave
+            # the URL to its new holder if it was claimed again meanwhile
+            if not await self.queue_manager.renew_frontier_lease(crawl_url):
+                logger.info(
+                    f"Lease on {crawl_url.url} lost while rate limited, skipping"
+                )
+                self.metrics["leases_lost"] += 1
+                return
+
             logger.info(f"Crawling URL: {crawl_url.url}")
             
             # Check if we should use conditional requests
@@ -1537,6 +2323,8 @@ class CrawlWorker:
             await self._handle_crawl_failure(crawl_url, str(e))
         
         finally:
+            # Crawled, or handed to the retry/dead queues
+            await self.queue_manager.ack_frontier_url(crawl_url)
             # Remove from active tasks
             self.active_tasks.discard(asyncio.current_task())
     
@@ -1599,22 +2387,15 @@ class CrawlWorker:
         
         return dynamic_count >= 2
     
-    async def _get_last_crawl_record(self, crawl_url: CrawlURL) -> Optional[Any]:
+    async def _get_last_crawl_record(
+        self, crawl_url: CrawlURL
+    ) -> Optional[RecrawlEntry]:
         """Get last crawl record for conditional requests"""
-        if not self.db_session_factory:
+        if not self.recrawl_index:
             return None
         
-        try:
-            session = self.db_session_factory()
-            try:
-                url_hash = hashlib.sha256(crawl_url.url.encode()).hexdigest()
-                record = session.query(CrawlRecord).filter_by(url_hash=url_hash).first()
-                return record
-            finally:
-                session.close()
-        except Exception as e:
-            logger.error(f"Failed to get crawl record: {e}")
-            return None
+        url_hash = hashlib.sha256(crawl_url.url.encode()).hexdigest()
+        return self.recrawl_index.get(url_hash)
     
     def _requires_ocr(self, content_type: str) -> bool:
         """Check if content requires OCR processing"""
@@ -1648,83 +2429,245 @@ class CrawlWorker:
         is_dynamic: bool = False,
         requires_js: bool = False
     ):
-        """Update crawl record in database with enhanced information"""
-        if not self.db_session_factory:
+        """Record a crawl in the recrawl index; the database write is batched"""
+        if not self.recrawl_index:
             return
         
         try:
-            session = self.db_session_factory()
-            try:
-                url_hash = hashlib.sha256(crawl_url.url.encode()).hexdigest()
-                
-                record = session.query(CrawlRecord).filter_by(url_hash=url_hash).first()
-                
-                if not record:
-                    record = CrawlRecord(
-                        url=crawl_url.url,
-                        url_hash=url_hash,
-                        domain=crawl_url.domain,
-                        first_crawled_at=datetime.utcnow(),
-                        crawl_count=0,
-                        metadata={},
-                        link_depth=crawl_url.link_depth
-                    )
-                    session.add(record)
-                
-                # Update record
-                record.last_crawled_at = datetime.utcnow()
-                record.crawl_count += 1
-                record.status = URLStatus.COMPLETED.value
-                record.last_status_code = status_code
-                record.requires_js = requires_js
-                record.is_dynamic = is_dynamic
-                
-                if content_size:
-                    record.content_size = content_size
-                
-                # Extract caching headers
-                if response_headers:
-                    if 'etag' in response_headers:
-                        record.etag = response_headers['etag']
-                    if 'last-modified' in response_headers:
-                        try:
-                            from email.utils import parsedate_to_datetime
-                            record.last_modified = parsedate_to_datetime(response_headers['last-modified'])
-                        except Exception:
-                            pass
-                
-                # Calculate next crawl time based on content type
-                if is_dynamic:
-                    # Dynamic content: crawl more frequently
-                    record.recrawl_interval_hours = 6
-                elif requires_js:
-                    # JS-heavy sites: moderate frequency
-                    record.recrawl_interval_hours = 12
-                else:
-                    # Static content: normal frequency
-                    record.recrawl_interval_hours = 24
-                
-                record.next_crawl_at = datetime.utcnow() + timedelta(hours=record.recrawl_interval_hours)
-                
-                # Update metadata
-                if not record.metadata:
-                    record.metadata = {}
-                record.metadata.update({
+            now = datetime.utcnow()
+            url_hash = hashlib.sha256(crawl_url.url.encode()).hexdigest()
+
+            # Extract caching headers
+            etag = last_modified = None
+            if response_headers:
+                etag = response_headers.get('etag')
+                if 'last-modified' in response_headers:
+                    try:
+                        from email.utils import parsedate_to_datetime
+                        last_modified = parsedate_to_datetime(
+                            response_headers['last-modified']
+                        )
+                    except Exception:
+                        pass
+
+            # Calculate next crawl time based on content type
+            if is_dynamic:
+                # Dynamic content: crawl more frequently
+                recrawl_interval_hours = 6
+            elif requires_js:
+                # JS-heavy sites: moderate frequency
+                recrawl_interval_hours = 12
+            else:
+                # Static content: normal frequency
+                recrawl_interval_hours = 24
+
+            self.recrawl_index.record_crawl(url_hash, {
+                "url": crawl_url.url,
+                "domain": crawl_url.domain,
+                "link_depth": crawl_url.link_depth,
+                "first_crawled_at": now,
+                "crawled_at": now,
+                "status_code": status_code,
+                "requires_js": requires_js,
+                "is_dynamic": is_dynamic,
+                "content_size": content_size,
+                "etag": etag,
+                "last_modified": last_modified,
+                "recrawl_interval_hours": recrawl_interval_hours,
+                "next_crawl_at": now + timedelta(hours=recrawl_interval_hours),
+                "metadata": {
                     "last_response_time_ms": int(response_time * 1000),
                     "worker_id": self.worker_id,
                     "crawl_method": "browser" if requires_js else "http",
                     "tags": crawl_url.metadata.get('tags', [])
-                })
-                
-                session.commit()
-                
-            finally:
-                session.close()
+                }
+            })
                 
         except Exception as e:
             logger.error(f"Failed to update crawl record for {crawl_url.url}: {e}")
 
 
+# File types that are never worth crawling as pages
+EXCLUDED_URL_EXTENSIONS = (
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.zip', '.rar', '.tar', '.gz', '.exe', '.dmg',
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg',
+    '.mp3', '.mp4', '.avi', '.mov', '.wmv', '.flv',
+    '.css', '.js', '.xml', '.rss'
+)
+
+
+def is_crawlable_url(url: str) -> bool:
+    """Absolute http(s) URL that does not point at a known non-page file type"""
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return False
+
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        return False
+    return not parsed.path.lower().endswith(EXCLUDED_URL_EXTENSIONS)
+
+
+def _raw_links_lxml(content: Union[str, bytes]) -> List[tuple]:
+    if isinstance(content, str):
+        content = content.encode('utf-8', errors='replace')
+    try:
+        doc = lxml.html.document_fromstring(content, parser=_LXML_PARSER)
+    except lxml.etree.ParserError:
+        return []  # empty document
+
+    links, forms, image_links = [], [], []
+    for element in doc.iter('a', 'form', 'img'):
+        if element.tag == 'a':
+            href = element.get('href')
+            if href is not None:
+                text = ''.join(part.strip() for part in element.itertext())
+                links.append((href, text, 'link'))
+        elif element.tag == 'form':
+            action = element.get('action')
+            if action is not None:
+                forms.append((action, '', 'form'))
+        elif element.get('src') is not None:
+            parent_link = next(element.iterancestors('a'), None)
+            if parent_link is not None and parent_link.get('href'):
+                image_links.append(
+                    (parent_link.get('href'), element.get('alt', ''), 'image_link')
+                )
+    return links + forms + image_links
+
+
+def _raw_links_soup(content: Union[str, bytes]) -> List[tuple]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    links = [(link['href'], link.get_text(strip=True), 'link')
+             for link in soup.find_all('a', href=True)]
+    forms = [(form['action'], '', 'form')
+             for form in soup.find_all('form', action=True)]
+    image_links = []
+    for img in soup.find_all('img', src=True):
+        parent_link = img.find_parent('a')
+        if parent_link and parent_link.get('href'):
+            image_links.append((parent_link['href'], img.get('alt', ''), 'image_link'))
+    return links + forms + image_links
+
+
+def extract_links(content: Union[str, bytes], base_url: str) -> List[Dict[str, str]]:
+    """
+    Crawlable links, form actions and image links of an HTML page
+    Resolved against base_url and de-duplicated in document order. A plain
+    function of its arguments so it can run in a LinkExtractionPool worker.
+    """
+    raw_links = _raw_links_lxml(content) if LXML_AVAILABLE else _raw_links_soup(content)
+
+    urls = []
+    seen_urls = set()
+    seen_hrefs = set()
+    for href, text, link_type in raw_links:
+        # Repeated hrefs (navigation, footers) resolve the same way; only the
+        # first occurrence is kept, so skip urljoin for the rest
+        if href in seen_hrefs:
+            continue
+        seen_hrefs.add(href)
+        try:
+            url = urljoin(base_url, href)
+        except ValueError:
+            continue
+        if url and url not in seen_urls and is_crawlable_url(url):
+            seen_urls.add(url)
+            urls.append({"url": url, "text": text, "type": link_type})
+    return urls
+
+
+class LinkExtractionPool:
+    """
+    Bounded process pool that runs extract_links off the event loop
+
+    At most max_pending pages are queued on the pool; extract() waits for a
+    slot while it is saturated, which holds callers back instead of piling
+    page bodies up in memory. One pool is shared by every parse worker.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._in_flight = 0
+
+        self.metrics = {
+            "pages_extracted": 0,
+            "extraction_time": 0.0,
+            "saturated_waits": 0,
+            "saturated_wait_time": 0.0
+        }
+
+    @property
+    def saturated(self) -> bool:
+        return self._slots.locked()
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers
+            )
+        return self._executor
+
+    async def extract(self, content: Union[str, bytes],
+                      base_url: str) -> List[Dict[str, str]]:
+        """extract_links() in a pool worker"""
+        if self._slots.locked():
+            self.metrics["saturated_waits"] += 1
+        wait_start = time.perf_counter()
+        async with self._slots:
+            start = time.perf_counter()
+            self.metrics["saturated_wait_time"] += start - wait_start
+            loop = asyncio.get_running_loop()
+            self._in_flight += 1
+            try:
+                urls = await loop.run_in_executor(
+                    self._get_executor(), extract_links, content, base_url
+                )
+            except concurrent.futures.process.BrokenProcessPool:
+                # A worker died (e.g. OOM on a huge page); start fresh next time
+                self._executor = None
+                raise
+            finally:
+                self._in_flight -= 1
+            self.metrics["pages_extracted"] += 1
+            self.metrics["extraction_time"] += time.perf_counter() - start
+            return urls
+
+    def get_stats(self) -> Dict[str, Any]:
+        pages = self.metrics["pages_extracted"]
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "parser": "lxml" if LXML_AVAILABLE else "html.parser",
+            "avg_extraction_ms": (self.metrics["extraction_time"] / pages * 1000
+                                  if pages else 0.0),
+            **self.metrics
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def aclose(self):
+        """close() for async callers: the pool is shut down on a thread"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            shutdown = functools.partial(
+                executor.shutdown, wait=True, cancel_futures=True
+            )
+            await loop.run_in_executor(None, shutdown)
+
+
 class ParseWorker:
     """Distributed parsing worker with OCR support"""
     
@@ -1733,23 +2676,33 @@ class ParseWorker:
         worker_id: str,
         queue_manager: QueueManager,
         storage_manager: AdvancedStorageManager,
-        max_concurrent: int = 5
+        max_concurrent: int = 5,
+        seen_urls: Optional[URLSeenSet] = None,
+        link_extractor: Optional[LinkExtractionPool] = None
     ):
         self.worker_id = worker_id
         self.queue_manager = queue_manager
         self.storage_manager = storage_manager
         self.max_concurrent = max_concurrent
+        self.seen_urls = seen_urls
         
+        # Link extraction runs in a process pool, shared when one is passed in
+        self._owns_link_extractor = link_extractor is None
+        self.link_extractor = link_extractor or LinkExtractionPool()
+
         # State
         self.is_running = False
         self.active_tasks: Set[asyncio.Task] = set()
+        self._task_slots = asyncio.Semaphore(max_concurrent)
         
         # Metrics
         self.metrics = {
             "tasks_processed": 0,
             "tasks_failed": 0,
             "urls_extracted": 0,
-            "ocr_tasks_processed": 0
+            "duplicate_urls_skipped": 0,
+            "ocr_tasks_processed": 0,
+            "backpressure_waits": 0
         }
     
     async def start(self):
@@ -1783,24 +2736,40 @@ class ParseWorker:
         if self.active_tasks:
             await asyncio.gather(*self.active_tasks, return_exceptions=True)
         
+        if self._owns_link_extractor:
+            await self.link_extractor.aclose()
+
         logger.info(f"Parse worker {self.worker_id} stopped")
     
     async def _parse_loop(self):
         """Main parsing loop"""
         while self.is_running:
             try:
+                # Backpressure: while max_concurrent tasks are in progress
+                # (typically waiting on a saturated extraction pool) leave
+                # further tasks on the queue for other workers
+                if self._task_slots.locked():
+                    self.metrics["backpressure_waits"] += 1
+                await self._task_slots.acquire()
+
                 # Get next parsing task
-                parse_task = await self.queue_manager.get_parse_task()
+                try:
+                    parse_task = await self.queue_manager.get_parse_task()
+                except BaseException:
+                    self._task_slots.release()
+                    raise
                 
                 if parse_task:
-                    # Create parsing task
+                    # Create parsing task; it releases its slot when done
                     task = asyncio.create_task(self._process_parse_task(parse_task))
+                    task.add_done_callback(lambda _: self._task_slots.release())
                     self.active_tasks.add(task)
                     
                     # Clean up finished tasks
                     self.active_tasks = {t for t in self.active_tasks if not t.done()}
                 else:
                     # No tasks available, wait a bit
+                    self._task_slots.release()
                     await asyncio.sleep(1)
                 
             except asyncio.CancelledError:
@@ -1825,20 +2794,34 @@ class ParseWorker:
             else:
                 extracted_urls = await self._extract_urls_from_html(raw_record.content, parse_task.url)
             
-            # Queue extracted URLs for crawling
+            # Drop URLs already queued for this job (compared in canonical
+            # form); the URL as linked is the one queued and fetched
+            discovered: Dict[str, Dict[str, str]] = {}
             for url_info in extracted_urls:
+                discovered.setdefault(url_info["url"], url_info)
+            new_urls = list(discovered)
+            job_id = parse_task.metadata.get("job_id")
+            if self.seen_urls is not None:
+                new_urls = await self.seen_urls.add_new(new_urls, job_id)
+            duplicates = len(extracted_urls) - len(new_urls)
+            self.metrics["duplicate_urls_skipped"] += duplicates
+
+            # Queue extracted URLs for crawling
+            crawl_urls = []
+            for url in new_urls:
+                url_info = discovered[url]
                 # Calculate link depth from original seed
                 parent_depth = parse_task.metadata.get("link_depth", 0)
                 new_link_depth = parent_depth + 1
                 
                 crawl_url = CrawlURL(
-                    url=url_info["url"],
+                    url=url,
                     source_url=parse_task.url,
                     depth=parse_task.metadata.get("depth", 0) + 1,
                     priority=max(1, parse_task.priority - 1),  # Lower priority for discovered URLs
                     job_id=parse_task.metadata.get("job_id"),
                     link_depth=new_link_depth,
-                    requires_js=self._url_requires_js(url_info["url"]),
+                    requires_js=self._url_requires_js(url),
                     metadata={
                         "discovered_from": parse_task.url,
                         "link_text": url_info.get("text", ""),
@@ -1852,8 +2835,18 @@ class ParseWorker:
                         ]
                     }
                 )
-                
-                await self.queue_manager.put_frontier_url(crawl_url)
+                crawl_urls.append(crawl_url)
+
+            added = await self.queue_manager.put_frontier_urls(crawl_urls)
+            if added < len(crawl_urls):
+                # Unmark them so a retry or another linking page can queue
+                # them (after a partial enqueue some may be queued twice,
+                # which beats losing them)
+                if self.seen_urls is not None:
+                    await self.seen_urls.forget(new_urls, job_id)
+                raise RuntimeError(
+                    f"Queued {added} of {len(crawl_urls)} discovered URLs"
+                )
             
             self.metrics["tasks_processed"] += 1
             self.metrics["urls_extracted"] += len(extracted_urls)
@@ -1874,52 +2867,7 @@ class ParseWorker:
     async def _extract_urls_from_html(self, content: str, base_url: str) -> List[Dict[str, str]]:
         """Extract URLs from HTML content"""
         try:
-            from bs4 import BeautifulSoup
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            urls = []
-            
-            # Extract links
-            for link in soup.find_all('a', href=True):
-                url = urljoin(base_url, link['href'])
-                urls.append({
-                    "url": url,
-                    "text": link.get_text(strip=True),
-                    "type": "link"
-                })
-            
-            # Extract forms
-            for form in soup.find_all('form', action=True):
-                url = urljoin(base_url, form['action'])
-                urls.append({
-                    "url": url,
-                    "text": "",
-                    "type": "form"
-                })
-            
-            # Extract images with links
-            for img in soup.find_all('img', src=True):
-                parent_link = img.find_parent('a')
-                if parent_link and parent_link.get('href'):
-                    url = urljoin(base_url, parent_link['href'])
-                    urls.append({
-                        "url": url,
-                        "text": img.get('alt', ''),
-                        "type": "image_link"
-                    })
-            
-            # Filter and deduplicate
-            valid_urls = []
-            seen_urls = set()
-            
-            for url_info in urls:
-                url = url_info["url"]
-                if url and url not in seen_urls and self._is_valid_url(url):
-                    seen_urls.add(url)
-                    valid_urls.append(url_info)
-            
-            return valid_urls
-            
+            return await self.link_extractor.extract(content, base_url)
         except Exception as e:
             logger.error(f"Failed to extract URLs from HTML: {e}")
             return []
@@ -1961,37 +2909,6 @@ class ParseWorker:
             logger.error(f"OCR processing failed: {e}")
             return []
     
-    def _is_valid_url(self, url: str) -> bool:
-        """Check if URL is valid for crawling"""
-        try:
-            parsed = urlparse(url)
-            
-            # Must have scheme and netloc
-            if not parsed.scheme or not parsed.netloc:
-                return False
-            
-            # Only HTTP/HTTPS
-            if parsed.scheme not in ('http', 'https'):
-                return False
-            
-            # Exclude common file types that aren't web pages
-            excluded_extensions = {
-                '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-                '.zip', '.rar', '.tar', '.gz', '.exe', '.dmg',
-                '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg',
-                '.mp3', '.mp4', '.avi', '.mov', '.wmv', '.flv',
-                '.css', '.js', '.xml', '.rss'
-            }
-            
-            path_lower = parsed.path.lower()
-            if any(path_lower.endswith(ext) for ext in excluded_extensions):
-                return False
-            
-            return True
-            
-        except Exception:
-            return False
-    
     def _url_requires_js(self, url: str) -> bool:
         """Determine if a URL likely requires JavaScript rendering"""
         js_indicators = [
@@ -2042,7 +2959,9 @@ class DistributedCrawlSystem:
         rate_limit_config: Optional[Dict[str, Any]] = None,
         enable_js_rendering: bool = False,
         max_content_size: int = 50 * 1024 * 1024,
-        dns_cache_ttl: int = 300
+        dns_cache_ttl: int = 300,
+        seen_urls_ttl: int = 7 * 24 * 3600,
+        link_extraction_workers: Optional[int] = None
     ):
         self.queue_backend = queue_backend
         self.num_crawl_workers = num_crawl_workers
@@ -2058,6 +2977,15 @@ class DistributedCrawlSystem:
         else:
             self.queue_manager = MemoryQueueManager()
         
+        # Frontier-wide de-duplication, kept exactly as long as the frontier
+        if queue_backend == QueueBackend.REDIS:
+            self.seen_urls: URLSeenSet = RedisURLSeenSet(redis_url, ttl=seen_urls_ttl)
+        else:
+            self.seen_urls = MemoryURLSeenSet()
+
+        # One extraction process pool shared by every parse worker
+        self.link_extractor = LinkExtractionPool(max_workers=link_extraction_workers)
+
         # Initialize storage manager
         if storage_config:
             from ..storage.core import StorageConfig
@@ -2084,6 +3012,11 @@ class DistributedCrawlSystem:
         else:
             self.db_session_factory = None
         
+        # One recrawl index shared by every crawl worker
+        self.recrawl_index = (
+            RecrawlIndex(self.db_session_factory) if self.db_session_factory else None
+        )
+
         # Workers
         self.crawl_workers: List[CrawlWorker] = []
         self.parse_workers: List[ParseWorker] = []
@@ -2103,6 +3036,9 @@ class DistributedCrawlSystem:
         if hasattr(self.queue_manager, 'connect'):
             await self.queue_manager.connect()
         
+        if self.recrawl_index:
+            await self.recrawl_index.start()
+
         # Create and start crawl workers with enhanced capabilities
         for i in range(self.num_crawl_workers):
             worker = CrawlWorker(
@@ -2113,7 +3049,8 @@ class DistributedCrawlSystem:
                 rate_limit_config=self.rate_limit_config,
                 enable_js_rendering=self.enable_js_rendering,
                 dns_cache_ttl=self.dns_cache_ttl,
-                max_content_size=self.max_content_size
+                max_content_size=self.max_content_size,
+                recrawl_index=self.recrawl_index
             )
             await worker.start()
             self.crawl_workers.append(worker)
@@ -2123,7 +3060,9 @@ class DistributedCrawlSystem:
             worker = ParseWorker(
                 worker_id=f"parse-worker-{i}",
                 queue_manager=self.queue_manager,
-                storage_manager=self.storage_manager
+                storage_manager=self.storage_manager,
+                seen_urls=self.seen_urls,
+                link_extractor=self.link_extractor
             )
             await worker.start()
             self.parse_workers.append(worker)
@@ -2157,9 +3096,14 @@ class DistributedCrawlSystem:
         if stop_tasks:
             await asyncio.gather(*stop_tasks, return_exceptions=True)
         
+        if self.recrawl_index:
+            await self.recrawl_index.close()
+        await self.link_extractor.aclose()
+
         # Disconnect from queue backend
         if hasattr(self.queue_manager, 'disconnect'):
             await self.queue_manager.disconnect()
+        await self.seen_urls.close()
         
         logger.info("Enhanced distributed crawl system stopped")
     
@@ -2169,12 +3113,21 @@ class DistributedCrawlSystem:
         job_id: str, 
         priority: int = 5,
         requires_js: bool = False,
-        is_dynamic: bool = False
+        is_dynamic: bool = False,
+        reseed: bool = False
     ) -> int:
-        """Add seed URLs to the frontier queue with enhanced metadata"""
-        added = 0
-        
-        for url in urls:
+        """
+        Add seed URLs to the frontier queue with enhanced metadata
+
+        Seeds already queued for this job are not queued again, unless
+        reseed is set: the job's record of seen URLs is then dropped first.
+        """
+        if reseed:
+            await self.seen_urls.forget_job(job_id)
+        new_urls = await self.seen_urls.add_new(urls, job_id)
+        
+        crawl_urls = []
+        for url in new_urls:
             crawl_url = CrawlURL(
                 url=url,
                 depth=0,
@@ -2194,12 +3147,23 @@ class DistributedCrawlSystem:
                     ]
                 }
             )
-            
-            if await self.queue_manager.put_frontier_url(crawl_url):
-                added += 1
+            crawl_urls.append(crawl_url)
+
+        added = await self.queue_manager.put_frontier_urls(crawl_urls)
+        if added < len(crawl_urls):
+            # Leave them addable again rather than marked seen but never queued
+            await self.seen_urls.forget(new_urls, job_id)
+            logger.error(
+                f"Queued {added} of {len(crawl_urls)} seed URLs for job {job_id}"
+            )
         
         logger.info(f"Added {added} enhanced seed URLs for job {job_id}")
         return added
+
+    async def finish_job(self, job_id: str):
+        """Release a finished job's record of seen URLs"""
+        await self.seen_urls.forget_job(job_id)
+        logger.info(f"Forgot seen URLs for finished job {job_id}")
     
     async def get_system_stats(self) -> Dict[str, Any]:
         """Get comprehensive system statistics"""
@@ -2228,7 +3192,9 @@ class DistributedCrawlSystem:
             },
             "queue_stats": queue_stats,
             "crawl_metrics": crawl_metrics,
+            "recrawl_index": self.recrawl_index.metrics if self.recrawl_index else {},
             "parse_metrics": parse_metrics,
+            "link_extraction": self.link_extractor.get_stats(),
             "rate_limiting": {
                 "enabled": bool(self.rate_limit_config),
                 "per_domain": self.rate_limit_config.get('per_domain', True),
@@ -2266,6 +3232,8 @@ async def main():
         'jitter_factor': 0.2,  # 20% jitter
         'per_domain': True,
         'max_browsers': 3,  # For JavaScript rendering
+        'pages_per_browser': 4,  # Pooled pages leased out per browser
+        'blocked_resource_types': ['image', 'font', 'media'],
         'page_timeout': 45
     }
     
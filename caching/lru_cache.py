@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+O(1) LRU/TTL map shared by the in-memory cache tiers
+OrderedDict ordering replaces sort-on-evict and list.remove bookkeeping
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate in-memory size of a cached value.
+
+    Containers are measured one level deep (the container plus its direct
+    items) so the cost is proportional to the item count, never to a full
+    serialisation of nested data.
+    """
+    try:
+        if isinstance(value, (str, bytes, bytearray)):
+            return len(value)
+        if isinstance(value, (int, float, bool)) or value is None:
+            return 8
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            for key, item in value.items():
+                size += sys.getsizeof(key) + sys.getsizeof(item)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            for item in value:
+                size += sys.getsizeof(item)
+        return size
+    except Exception:
+        return 100  # Default estimate
+
+
+class LRUCache:
+    """
+    Least-recently-used map with optional per-entry TTL and a byte budget.
+
+    get/set/delete are O(1). Expired entries are dropped lazily when they are
+    read or reach the cold end during eviction; purge_expired() sweeps the
+    rest on demand. Not thread-safe: callers that share an instance across
+    threads hold their own lock.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        size_of: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+        on_remove: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.clock = clock
+        # Called with (key, value) whenever an entry leaves other than via clear()
+        self.on_remove = on_remove
+        # key -> (value, expires_at or None, size_bytes); most recent at the end
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = (
+            OrderedDict()
+        )
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value and mark it most recently used"""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at = item[1]
+        if expires_at is not None and expires_at <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live value without touching recency or counters"""
+        item = self._data.get(key)
+        if item is None or (item[1] is not None and item[1] <= self.clock()):
+            return default
+        return item[0]
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        """Insert or replace a value, evicting cold entries past either limit"""
+        size_bytes = self.size_of(value) if size is None else size
+        expires_at = self.clock() + ttl if ttl else None
+
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (value, expires_at, size_bytes)
+        self.current_bytes += size_bytes
+
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None
+            and self.current_bytes > self.max_bytes
+            and len(self._data) > 1
+        ):
+            cold_key, (_, cold_expires, _) = next(iter(self._data.items()))
+            self._remove(cold_key)
+            if cold_expires is not None and cold_expires <= self.clock():
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key; True if it was present"""
+        if key not in self._data:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self) -> int:
+        """Drop everything; returns the number of entries removed"""
+        count = len(self._data)
+        self._data.clear()
+        self.current_bytes = 0
+        return count
+
+    def purge_expired(self) -> int:
+        """Sweep every expired entry (O(n)); returns the number removed"""
+        now = self.clock()
+        expired = [
+            key
+            for key, (_, expires_at, _) in self._data.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Snapshot of live (key, value) pairs, coldest first"""
+        now = self.clock()
+        return iter(
+            [
+                (key, value)
+                for key, (value, expires_at, _) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+        )
+
+    def keys(self) -> Iterator[Hashable]:
+        return (key for key, _ in self.items())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        value, _, size_bytes = self._data.pop(key)
+        self.current_bytes -= size_bytes
+        if self.on_remove is not None:
+            self.on_remove(key, value)
@@ -9,7 +9,8 @@ import json
 import time
 import hashlib
 import logging
-from typing import Dict, Any, Optional, Union, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -17,6 +18,9 @@ import sqlite3
 import pickle
 import redis.asyncio as redis
 
+from caching.lru_cache import LRUCache
+from caching.stampede import StampedeGuard, stored_value
+
 logger = logging.getLogger(__name__)
 
 class CacheType(Enum):
@@ -54,116 +58,50 @@ class MemoryCache:
     def __init__(self, max_size: int = 1000, max_memory_mb: int = 100):
         self.max_size = max_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
-        self.cache: Dict[str, CacheEntry] = {}
-        self.current_memory_bytes = 0
-        
-    def _calculate_size(self, value: Any) -> int:
-        """Calculate approximate size of cached value"""
-        try:
-            if isinstance(value, (str, bytes)):
-                return len(value)
-            elif isinstance(value, (int, float)):
-                return 8
-            elif isinstance(value, (list, dict)):
-                return len(json.dumps(value))
-            else:
-                return len(str(value))
-        except:
-            return 100  # Default estimate
+        self.cache = LRUCache(max_entries=max_size, max_bytes=self.max_memory_bytes)
     
-    def _evict_lru(self):
-        """Evict least recently used items"""
-        if not self.cache:
-            return
-            
-        # Sort by last accessed time
-        sorted_entries = sorted(
-            self.cache.items(),
-            key=lambda x: x[1].last_accessed or x[1].created_at
-        )
-        
-        # Remove oldest 20% of entries
-        remove_count = max(1, len(sorted_entries) // 5)
-        for i in range(remove_count):
-            key, entry = sorted_entries[i]
-            self.current_memory_bytes -= entry.size_bytes
-            del self.cache[key]
-    
-    def _ensure_capacity(self, new_size: int):
-        """Ensure cache has capacity for new entry"""
-        # Check size limits
-        while (len(self.cache) >= self.max_size or 
-               self.current_memory_bytes + new_size > self.max_memory_bytes):
-            self._evict_lru()
+    @property
+    def current_memory_bytes(self) -> int:
+        return self.cache.current_bytes
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from memory cache"""
-        entry = self.cache.get(key)
-        if entry is None:
-            return None
-            
-        if entry.is_expired():
-            await self.delete(key)
-            return None
-            
-        entry.touch()
-        return entry.value
+        return self.cache.get(key)
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in memory cache"""
         try:
-            size_bytes = self._calculate_size(value)
-            self._ensure_capacity(size_bytes)
-            
-            expires_at = None
-            if ttl:
-                expires_at = datetime.now() + timedelta(seconds=ttl)
-            
-            entry = CacheEntry(
-                key=key,
-                value=value,
-                created_at=datetime.now(),
-                expires_at=expires_at,
-                cache_tier="memory",
-                size_bytes=size_bytes
-            )
-            
-            # Remove old entry if exists
-            if key in self.cache:
-                self.current_memory_bytes -= self.cache[key].size_bytes
-            
-            self.cache[key] = entry
-            self.current_memory_bytes += size_bytes
-            
+            self.cache.set(key, value, ttl)
             return True
-            
         except Exception as e:
             logger.error(f"Memory cache set error: {e}")
             return False
     
     async def delete(self, key: str) -> bool:
         """Delete value from memory cache"""
-        if key in self.cache:
-            entry = self.cache[key]
-            self.current_memory_bytes -= entry.size_bytes
-            del self.cache[key]
-            return True
-        return False
+        return self.cache.delete(key)
     
     async def clear(self):
         """Clear all memory cache"""
         self.cache.clear()
-        self.current_memory_bytes = 0
     
-    def get_stats(self) -> Dict[str, Any]:
+    async def cleanup_expired(self) -> int:
+        """Drop expired entries that have not been read since they expired"""
+        return self.cache.purge_expired()
+
+    async def get_stats(self) -> Dict[str, Any]:
         """Get memory cache statistics"""
-        total_entries = len(self.cache)
-        expired_entries = sum(1 for entry in self.cache.values() if entry.is_expired())
+        lru_stats = self.cache.get_stats()
+        total_entries = lru_stats["entries"]
         
         return {
             "tier": "memory",
             "total_entries": total_entries,
-            "expired_entries": expired_entries,
+            "expired_entries": total_entries - sum(1 for _ in self.cache.items()),
+            "hits": lru_stats["hits"],
+            "misses": lru_stats["misses"],
+            "evictions": lru_stats["evictions"],
+            "expirations": lru_stats["expirations"],
             "memory_usage_mb": round(self.current_memory_bytes / (1024 * 1024), 2),
             "memory_limit_mb": round(self.max_memory_bytes / (1024 * 1024), 2),
             "memory_utilization": round(self.current_memory_bytes / self.max_memory_bytes * 100, 2),
@@ -301,19 +239,45 @@ class RedisCache:
             return {"tier": "redis", "connected": True, "error": str(e)}
 
 class DatabaseCache:
-    """Database-backed persistent cache tier"""
-    
-    def __init__(self, db_path: str = "data.db"):
+    """
+    Database-backed persistent cache tier
+    
+    One long-lived WAL connection lives on a dedicated worker thread, so the
+    event loop never blocks on SQLite. Reads never write: access counts are
+    buffered in memory and flushed in one transaction every
+    stats_flush_interval seconds, and expired rows are treated as misses
+    until cleanup_expired() deletes them.
+    """
+
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, db_path: str = "data.db", stats_flush_interval: float = 5.0):
         self.db_path = db_path
+        self.stats_flush_interval = stats_flush_interval
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="db-cache"
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        # key -> (hits since last flush, last access time)
+        self._pending_access: Dict[str, Tuple[int, str]] = {}
+        self._last_stats_flush = time.monotonic()
+        self._stats_flush_task: Optional[asyncio.Task] = None
         self._init_cache_table()
     
     def _init_cache_table(self):
         """Initialize cache table in database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self._executor.submit(self._connection).result()
+        except Exception as e:
+            logger.error(f"Database cache init error: {e}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """The worker thread's connection, opened on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS advanced_cache (
                     key TEXT PRIMARY KEY,
                     value TEXT NOT NULL,
@@ -327,16 +291,25 @@ class DatabaseCache:
             """)
             
             # Create index for expiration cleanup
-            cursor.execute("""
+            conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_cache_expires 
                 ON advanced_cache(expires_at)
             """)
-            
             conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            logger.error(f"Database cache init error: {e}")
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        """Run fn(connection, *args) on the worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: fn(self._connection(), *args)
+        )
+
+    @staticmethod
+    def _timestamp(value: datetime) -> str:
+        # Same text form sqlite3's default datetime adapter produced
+        return value.isoformat(sep=" ")
     
     def _serialize_value(self, value: Any) -> tuple:
         """Serialize value for database storage"""
@@ -371,17 +344,9 @@ class DatabaseCache:
     async def cleanup_expired(self):
         """Remove expired entries from database cache"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                DELETE FROM advanced_cache 
-                WHERE expires_at IS NOT NULL AND expires_at < ?
-            """, (datetime.now(),))
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            await self.flush_access_stats()
+            now = self._timestamp(datetime.now())
+            deleted_count = await self._run(self._delete_expired, now)
             
             if deleted_count > 0:
                 logger.debug(f"Cleaned up {deleted_count} expired cache entries")
@@ -389,153 +354,201 @@ class DatabaseCache:
         except Exception as e:
             logger.error(f"Database cache cleanup error: {e}")
     
+    @staticmethod
+    def _delete_expired(conn: sqlite3.Connection, now: str) -> int:
+        with conn:
+            cursor = conn.execute("""
+                DELETE FROM advanced_cache
+                WHERE expires_at IS NOT NULL AND expires_at < ?
+            """, (now,))
+        return cursor.rowcount
+
     async def get(self, key: str) -> Optional[Any]:
         """Get value from database cache"""
+        found = await self.get_many([key])
+        return found.get(key)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get every live value among keys in as few queries as possible"""
+        if not keys:
+            return {}
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT value, value_type, expires_at, access_count 
-                FROM advanced_cache 
-                WHERE key = ?
-            """, (key,))
-            
-            row = cursor.fetchone()
-            
-            if row is None:
-                conn.close()
-                return None
-            
-            value, value_type, expires_at, access_count = row
-            
-            # Check expiration
-            if expires_at:
-                expires_datetime = datetime.fromisoformat(expires_at)
-                if datetime.now() > expires_datetime:
-                    cursor.execute("DELETE FROM advanced_cache WHERE key = ?", (key,))
-                    conn.commit()
-                    conn.close()
-                    return None
-            
-            # Update access information
-            cursor.execute("""
-                UPDATE advanced_cache 
-                SET access_count = ?, last_accessed = ?
-                WHERE key = ?
-            """, (access_count + 1, datetime.now(), key))
-            
-            conn.commit()
-            conn.close()
-            
-            return self._deserialize_value(value, value_type)
-            
+            now = datetime.now()
+            rows = await self._run(self._select_many, list(dict.fromkeys(keys)))
         except Exception as e:
             logger.error(f"Database cache get error: {e}")
-            return None
+            return {}
+
+        found = {}
+        accessed_at = self._timestamp(now)
+        for key, value, value_type, expires_at in rows:
+            # Check expiration; cleanup_expired() deletes the row later
+            if expires_at and datetime.fromisoformat(expires_at) < now:
+                continue
+            found[key] = self._deserialize_value(value, value_type)
+            hits, _ = self._pending_access.get(key, (0, accessed_at))
+            self._pending_access[key] = (hits + 1, accessed_at)
+
+        if found:
+            self._schedule_stats_flush()
+        return found
+
+    def _select_many(self, conn: sqlite3.Connection, keys: List[str]) -> List[tuple]:
+        rows = []
+        for offset in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+            chunk = keys[offset:offset + self.LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(conn.execute(
+                "SELECT key, value, value_type, expires_at FROM advanced_cache "
+                f"WHERE key IN ({placeholders})",
+                chunk
+            ))
+        return rows
+
+    def _schedule_stats_flush(self):
+        """Start a background stats flush once the flush interval has passed"""
+        if time.monotonic() - self._last_stats_flush < self.stats_flush_interval:
+            return
+        if self._stats_flush_task is not None and not self._stats_flush_task.done():
+            return
+        self._stats_flush_task = asyncio.create_task(self.flush_access_stats())
+
+    async def flush_access_stats(self):
+        """Write buffered access counts in a single transaction"""
+        self._last_stats_flush = time.monotonic()
+        if not self._pending_access:
+            return
+        pending, self._pending_access = self._pending_access, {}
+        rows = [(hits, accessed_at, key)
+                for key, (hits, accessed_at) in pending.items()]
+        try:
+            await self._run(self._write_access_stats, rows)
+        except Exception as e:
+            logger.error(f"Database cache stats flush error: {e}")
+
+    @staticmethod
+    def _write_access_stats(conn: sqlite3.Connection, rows: List[tuple]):
+        with conn:
+            conn.executemany("""
+                UPDATE advanced_cache
+                SET access_count = access_count + ?, last_accessed = ?
+                WHERE key = ?
+            """, rows)
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in database cache"""
+        return await self.set_many({key: value}, ttl)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Set several values in one transaction"""
+        if not items:
+            return True
         try:
-            serialized_value, value_type = self._serialize_value(value)
-            size_bytes = len(serialized_value)
-            
+            now = datetime.now()
             expires_at = None
             if ttl:
-                expires_at = datetime.now() + timedelta(seconds=ttl)
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO advanced_cache 
-                (key, value, value_type, created_at, expires_at, access_count, size_bytes)
-                VALUES (?, ?, ?, ?, ?, 0, ?)
-            """, (key, serialized_value, value_type, datetime.now(), expires_at, size_bytes))
+                expires_at = self._timestamp(now + timedelta(seconds=ttl))
             
-            conn.commit()
-            conn.close()
+            rows = []
+            for key, value in items.items():
+                serialized_value, value_type = self._serialize_value(value)
+                rows.append((key, serialized_value, value_type, self._timestamp(now),
+                             expires_at, len(serialized_value)))
             
+            await self._run(self._write_rows, rows)
             return True
             
         except Exception as e:
             logger.error(f"Database cache set error: {e}")
             return False
     
+    @staticmethod
+    def _write_rows(conn: sqlite3.Connection, rows: List[tuple]):
+        with conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO advanced_cache
+                (key, value, value_type, created_at, expires_at, access_count,
+                 size_bytes)
+                VALUES (?, ?, ?, ?, ?, 0, ?)
+            """, rows)
+
     async def delete(self, key: str) -> bool:
         """Delete value from database cache"""
+        self._pending_access.pop(key, None)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM advanced_cache WHERE key = ?", (key,))
-            deleted = cursor.rowcount > 0
-            
-            conn.commit()
-            conn.close()
-            
-            return deleted
-            
+            return await self._run(self._delete_key, key)
         except Exception as e:
             logger.error(f"Database cache delete error: {e}")
             return False
     
+    @staticmethod
+    def _delete_key(conn: sqlite3.Connection, key: str) -> bool:
+        with conn:
+            cursor = conn.execute("DELETE FROM advanced_cache WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
     async def clear(self):
         """Clear all database cache"""
+        self._pending_access.clear()
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM advanced_cache")
-            
-            conn.commit()
-            conn.close()
-            
+            await self._run(self._delete_all)
         except Exception as e:
             logger.error(f"Database cache clear error: {e}")
     
+    @staticmethod
+    def _delete_all(conn: sqlite3.Connection):
+        with conn:
+            conn.execute("DELETE FROM advanced_cache")
+
     async def get_stats(self) -> Dict[str, Any]:
         """Get database cache statistics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Total entries
-            cursor.execute("SELECT COUNT(*) FROM advanced_cache")
-            total_entries = cursor.fetchone()[0]
-            
-            # Expired entries
-            cursor.execute("""
-                SELECT COUNT(*) FROM advanced_cache 
-                WHERE expires_at IS NOT NULL AND expires_at < ?
-            """, (datetime.now(),))
-            expired_entries = cursor.fetchone()[0]
-            
-            # Total size
-            cursor.execute("SELECT SUM(size_bytes) FROM advanced_cache")
-            total_bytes = cursor.fetchone()[0] or 0
-            
-            # Most accessed
-            cursor.execute("""
-                SELECT key, access_count FROM advanced_cache 
-                ORDER BY access_count DESC LIMIT 5
-            """)
-            top_accessed = cursor.fetchall()
-            
-            conn.close()
-            
-            return {
-                "tier": "database",
-                "total_entries": total_entries,
-                "expired_entries": expired_entries,
-                "total_size_mb": round(total_bytes / (1024 * 1024), 2),
-                "top_accessed": dict(top_accessed)
-            }
-            
+            await self.flush_access_stats()
+            return await self._run(self._collect_stats, self._timestamp(datetime.now()))
         except Exception as e:
             logger.error(f"Database cache stats error: {e}")
             return {"tier": "database", "error": str(e)}
 
+    @staticmethod
+    def _collect_stats(conn: sqlite3.Connection, now: str) -> Dict[str, Any]:
+        # Total entries
+        total_entries = conn.execute(
+            "SELECT COUNT(*) FROM advanced_cache"
+        ).fetchone()[0]
+
+        # Expired entries
+        expired_entries = conn.execute("""
+            SELECT COUNT(*) FROM advanced_cache
+            WHERE expires_at IS NOT NULL AND expires_at < ?
+        """, (now,)).fetchone()[0]
+
+        # Total size
+        total_bytes = conn.execute(
+            "SELECT SUM(size_bytes) FROM advanced_cache"
+        ).fetchone()[0] or 0
+
+        # Most accessed
+        top_accessed = conn.execute("""
+            SELECT key, access_count FROM advanced_cache
+            ORDER BY access_count DESC LIMIT 5
+        """).fetchall()
+
+        return {
+            "tier": "database",
+            "total_entries": total_entries,
+            "expired_entries": expired_entries,
+            "total_size_mb": round(total_bytes / (1024 * 1024), 2),
+            "top_accessed": dict(top_accessed)
+        }
+
+    async def close(self):
+        """Flush buffered access counts and release the connection"""
+        await self.flush_access_stats()
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.get_running_loop().run_in_executor(self._executor, conn.close)
+        self._executor.shutdown(wait=False)
+
 class MultiTierCacheManager:
     """Multi-tier cache manager coordinating all cache layers"""
     
@@ -558,6 +571,8 @@ class MultiTierCacheManager:
         
         self.write_through = True  # Write to all tiers
         self.read_through = True   # Read from next tier on miss
+
+        self._stampede_guard = StampedeGuard(self._lookup, self.set)
     
     async def initialize(self):
         """Initialize all cache tiers"""
@@ -567,10 +582,11 @@ class MultiTierCacheManager:
     async def shutdown(self):
         """Shutdown all cache tiers"""
         await self.redis_cache.disconnect()
+        await self.database_cache.close()
         logger.info("Multi-tier cache manager shutdown")
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value with tier fallback"""
+    async def _lookup(self, key: str) -> Optional[Any]:
+        """Raw stored value from the fastest tier holding key, promoting it upwards"""
         
         # Try memory cache first (fastest)
         value = await self.memory_cache.get(key)
@@ -586,7 +602,7 @@ class MultiTierCacheManager:
             await self.memory_cache.set(key, value, ttl=300)  # 5 min in memory
             return value
         
-        # Try database cache (slower, persistent)
+        # Try database cache (slower, persistent) only after a Redis miss
         value = await self.database_cache.get(key)
         if value is not None:
             self.hit_stats["database"] += 1
@@ -599,6 +615,22 @@ class MultiTierCacheManager:
         self.hit_stats["miss"] += 1
         return None
     
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value with tier fallback"""
+        return stored_value(await self._lookup(key))
+
+    async def get_or_set(self,
+                         key: str,
+                         loader: Callable[[], Awaitable[Any]],
+                         ttl: int = 300,
+                         stale_ttl: int = 0,
+                         negative_ttl: Optional[int] = None,
+                         beta: float = 1.0) -> Optional[Any]:
+        """Cached value for key, loading it once per miss (see StampedeGuard)"""
+        return await self._stampede_guard.get_or_set(
+            key, loader, ttl, stale_ttl=stale_ttl, negative_ttl=negative_ttl, beta=beta
+        )
+
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in all cache tiers"""
         
@@ -674,6 +706,7 @@ class MultiTierCacheManager:
     
     async def cleanup_expired(self):
         """Clean up expired entries from all tiers"""
+        await self.memory_cache.cleanup_expired()
         await self.database_cache.cleanup_expired()
         logger.debug("Cache cleanup completed")
 
@@ -721,7 +754,8 @@ async def background_cache_cleanup():
             await asyncio.sleep(60)  # Retry after 1 minute on error
 
 # Cache decorators for easy use
-def cached(ttl: int = 300, key_prefix: str = ""):
+def cached(ttl: int = 300, key_prefix: str = "", stale_ttl: int = 0,
+           negative_ttl: Optional[int] = None):
     """Decorator for caching function results"""
     def decorator(func):
         async def async_wrapper(*args, **kwargs):
@@ -734,16 +768,14 @@ def cached(ttl: int = 300, key_prefix: str = ""):
             key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
             cache_key = ":".join(filter(None, key_parts))
             
-            # Try to get from cache
-            cached_result = await cache_manager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache_manager.set(cache_key, result, ttl)
-            
-            return result
+            # Concurrent misses for the same key share one call of func
+            return await cache_manager.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl,
+                stale_ttl=stale_ttl,
+                negative_ttl=negative_ttl
+            )
         
         def sync_wrapper(*args, **kwargs):
             # For sync functions, create a simple key and return uncached
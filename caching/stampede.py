@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Cache stampede protection shared by the multi-tier cache managers
+Single-flight loading, stale-while-revalidate records and probabilistic early expiry
+"""
+
+import asyncio
+import functools
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+RECORD_MARKER = "__cache_record__"
+
+
+class SingleFlight:
+    """At most one running loader per key; concurrent callers share its result"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for key, or wait for the call already running for it"""
+        task = self._calls.get(key)
+        if task is None:
+            # fn runs in its own task, so cancelling the caller that started it
+            # leaves the load running for everyone else waiting on it
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        # shield: a cancelled caller must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here; callers re-raise it themselves
+
+
+@dataclass
+class CacheRecord:
+    """A cached value plus the timing metadata stampede protection needs"""
+
+    value: Any
+    fresh_until: float
+    stale_until: float
+    delta: float = 0.0
+    negative: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON/pickle-friendly form stored in every tier"""
+        return {
+            RECORD_MARKER: 1,
+            "value": self.value,
+            "fresh_until": self.fresh_until,
+            "stale_until": self.stale_until,
+            "delta": self.delta,
+            "negative": self.negative,
+        }
+
+    @classmethod
+    def from_stored(cls, stored: Any) -> Optional["CacheRecord"]:
+        """Decode a stored record; None for plain values written by set()"""
+        if not isinstance(stored, dict) or RECORD_MARKER not in stored:
+            return None
+        return cls(
+            value=stored.get("value"),
+            fresh_until=float(stored.get("fresh_until", 0)),
+            stale_until=float(stored.get("stale_until", 0)),
+            delta=float(stored.get("delta", 0)),
+            negative=bool(stored.get("negative", False)),
+        )
+
+    @classmethod
+    def create(
+        cls, value: Any, ttl: float, stale_ttl: float = 0, delta: float = 0.0,
+        negative: bool = False,
+    ) -> "CacheRecord":
+        now = time.time()
+        return cls(
+            value=value,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+            delta=delta,
+            negative=negative,
+        )
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.fresh_until
+
+    def is_servable(self, now: Optional[float] = None) -> bool:
+        """Fresh, or stale but still inside the stale-while-revalidate window"""
+        return (now or time.time()) < self.stale_until
+
+    def refresh_due(self, beta: float = 1.0, now: Optional[float] = None) -> bool:
+        """
+        Probabilistic early expiry (XFetch).
+
+        Returns True with rising probability as fresh_until approaches, scaled
+        by how long the value took to compute, so one caller refreshes ahead
+        of the deadline instead of every caller at once after it.
+        """
+        if beta <= 0 or self.delta <= 0:
+            return False
+        now = now or time.time()
+        early = -self.delta * beta * math.log(1.0 - random.random())
+        return now + early >= self.fresh_until
+
+
+def stored_value(stored: Any) -> Any:
+    """The caller-visible value of whatever a tier returned"""
+    record = CacheRecord.from_stored(stored)
+    if record is None:
+        return stored
+    return None if record.negative else record.value
+
+
+class StampedeGuard:
+    """
+    get_or_set on top of a cache's raw read and write callables.
+
+    read(key) returns whatever the cache stores; write(key, stored, ttl, **kw)
+    stores a value for ttl seconds. Records written here carry their own
+    freshness deadline, so tiers only need to keep them for ttl + stale_ttl.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[Hashable], Awaitable[Any]],
+        write: Callable[..., Awaitable[Any]],
+    ):
+        self.read = read
+        self.write = write
+        self.flight = SingleFlight()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0,
+        negative_ttl: Optional[float] = None,
+        beta: float = 1.0,
+        **write_kwargs: Any,
+    ) -> Any:
+        """
+        Return the cached value for key, calling loader at most once per miss.
+
+        Concurrent misses share one loader call. Within stale_ttl seconds after
+        expiry the old value is served while one background task refreshes it,
+        and values may be refreshed early (XFetch, scaled by beta). A loader
+        result of None is cached for negative_ttl seconds when that is set.
+        """
+        def load() -> Awaitable[Any]:
+            return self._load(key, loader, ttl, stale_ttl, negative_ttl, write_kwargs)
+
+
+        record = CacheRecord.from_stored(await self.read(key))
+        if record is not None:
+            now = time.time()
+            if record.is_fresh(now):
+                if not record.negative and record.refresh_due(beta, now):
+                    self._refresh_in_background(key, load)
+                return None if record.negative else record.value
+            if record.is_servable(now) and not record.negative:
+                self._refresh_in_background(key, load)
+                return record.value
+
+        return await self.flight.do(key, load)
+
+    async def _load(
+        self, key, loader, ttl, stale_ttl, negative_ttl, write_kwargs
+    ) -> Any:
+        """Run loader and store its result as a timed record"""
+        started = time.monotonic()
+        value = await loader()
+        delta = time.monotonic() - started
+
+        if value is None:
+            if negative_ttl:
+                record = CacheRecord.create(
+                    None, negative_ttl, delta=delta, negative=True
+                )
+                await self.write(key, record.to_dict(), negative_ttl, **write_kwargs)
+            return None
+
+        record = CacheRecord.create(value, ttl, stale_ttl, delta)
+        await self.write(key, record.to_dict(), ttl + stale_ttl, **write_kwargs)
+        return value
+
+    def _refresh_in_background(self, key: Hashable, load: Callable[[], Awaitable[Any]]):
+        """Start one refresh for key unless a load is already running"""
+        if self.flight.in_flight(key):
+            return
+        task = asyncio.create_task(self.flight.do(key, load))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
@@ -220,6 +220,22 @@ def cmd_cleanup(args):
     return 0
 
 
+def cmd_repack(args):
+    """Compact CAS pack files"""
+    config = get_config()
+    cas_store = CASStore(config.storage.root,
+                         max_pack_bytes=config.storage.max_pack_bytes)
+
+    result = cas_store.repack(min_dead_ratio=args.min_dead_ratio)
+    cas_store.close()
+    print("Repack complete:")
+    print(f"  Packs rewritten: {result['packs_rewritten']}")
+    print(f"  Objects moved: {result['objects_moved']}")
+    print(f"  Bytes reclaimed: {result['bytes_reclaimed']:,}")
+
+    return 0
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -244,6 +260,9 @@ Examples:
   
   # Clean up old data
   cfpl cleanup --days 30 --confirm
+
+  # Compact pack files after cleanup
+  cfpl repack
         """
     )
     
@@ -285,6 +304,12 @@ Examples:
     cleanup_parser.add_argument('--dry-run', action='store_true', help='Show what would be deleted')
     cleanup_parser.add_argument('--confirm', action='store_true', help='Skip confirmation prompt')
     
+    # Repack command
+    repack_parser = subparsers.add_parser('repack', help='Compact CAS pack files')
+    repack_parser.add_argument('--min-dead-ratio', type=float, default=0.5,
+                               help='Rewrite packs with at least this fraction '
+                                    'of dead space')
+
     args = parser.parse_args()
     
     if not args.command:
@@ -303,6 +328,8 @@ Examples:
             return cmd_config(args)
         elif args.command == 'cleanup':
             return cmd_cleanup(args)
+        elif args.command == 'repack':
+            return cmd_repack(args)
         else:
             print(f"Unknown command: {args.command}", file=sys.stderr)
             return 1
@@ -11,10 +11,17 @@ import time
 from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from config.logging_config import get_logger
 
+try:
+    import aiosqlite
+
+    AIOSQLITE_AVAILABLE = True
+except ImportError:
+    AIOSQLITE_AVAILABLE = False
+
 logger = get_logger("database")
 
 
@@ -262,6 +269,182 @@ class DatabaseConnectionPool:
         logger.info("Database connection pool closed")
 
 
+class AsyncDatabasePool:
+    """
+    Bounded pool of pre-opened aiosqlite connections for async request handlers.
+
+    Every connection runs its queries on its own aiosqlite worker thread, so
+    handlers never block the event loop. Connections stay open for the life of
+    the pool, which lets sqlite3's per-connection statement cache
+    (``cached_statements``) reuse prepared statements across requests.
+
+    A pool belongs to the event loop that opened it; used from another loop it
+    reopens its connections there. aiosqlite worker threads are not daemonic,
+    so close() must be awaited before the process exits.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=10000",
+        "PRAGMA temp_store=memory",
+    )
+
+    def __init__(
+        self,
+        database_path: str,
+        pool_size: int = 8,
+        timeout: float = 30.0,
+        cached_statements: int = 256,
+    ):
+        if not AIOSQLITE_AVAILABLE:
+            raise RuntimeError("aiosqlite is required for AsyncDatabasePool")
+
+        self.database_path = database_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._connections: List["aiosqlite.Connection"] = []
+        self._available: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._open_lock = threading.Lock()
+        self._stats = ConnectionStats(max_connections=pool_size)
+
+    async def _create_connection(self) -> "aiosqlite.Connection":
+        """Open one connection with the pool's pragmas applied"""
+        conn = await aiosqlite.connect(
+            self.database_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+        )
+        for pragma in self.PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    async def open(self):
+        """Open every pooled connection on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        # Publish the new queue before connecting so concurrent borrowers
+        # wait on it instead of starting a second open()
+        with self._open_lock:
+            stale = self._connections
+            self._connections = []
+            self._loop = loop
+            available = self._available = asyncio.Queue(maxsize=self.pool_size)
+        for conn in stale:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.error("Error closing database connection", error=e)
+
+        Path(self.database_path).parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(self.pool_size):
+            conn = await self._create_connection()
+            self._connections.append(conn)
+            available.put_nowait(conn)
+        self._stats.total_connections = len(self._connections)
+
+        logger.info(
+            "Async database pool opened",
+            database=self.database_path,
+            pool_size=self.pool_size,
+        )
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator["aiosqlite.Connection"]:
+        """Borrow a connection; waits while every connection is in use"""
+        if self._loop is not asyncio.get_running_loop():
+            await self.open()
+
+        available = self._available
+        conn = await available.get()
+        self._stats.active_connections += 1
+        start_time = time.time()
+        try:
+            yield conn
+        except Exception:
+            self._stats.failed_queries += 1
+            raise
+        finally:
+            self._stats.active_connections -= 1
+            self._update_query_stats(time.time() - start_time)
+            available.put_nowait(conn)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["aiosqlite.Connection"]:
+        """Borrow a connection for several statements, committed together"""
+        async with self.connection() as conn:
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            await conn.commit()
+
+    async def fetchone(self, query: str, params: tuple = ()) -> Optional[tuple]:
+        """Execute a SELECT query and return its first row"""
+        async with self.connection() as conn:
+            async with conn.execute(query, params) as cursor:
+                return await cursor.fetchone()
+
+    async def fetchall(self, query: str, params: tuple = ()) -> List[tuple]:
+        """Execute a SELECT query and return every row"""
+        async with self.connection() as conn:
+            return list(await conn.execute_fetchall(query, params))
+
+    async def iterate(self, query: str, params: tuple = ()) -> AsyncIterator[tuple]:
+        """Yield the rows of a SELECT query without materialising them all"""
+        async with self.connection() as conn:
+            async with conn.execute(query, params) as cursor:
+                async for row in cursor:
+                    yield row
+
+    async def execute(self, query: str, params: tuple = ()) -> Tuple[int, int]:
+        """Execute and commit one INSERT/UPDATE/DELETE; returns (lastrowid, rowcount)"""
+        async with self.transaction() as conn:
+            async with conn.execute(query, params) as cursor:
+                return cursor.lastrowid, cursor.rowcount
+
+    def _update_query_stats(self, query_time: float):
+        """Update query timing statistics"""
+        self._stats.total_queries += 1
+        alpha = 1.0 if self._stats.total_queries == 1 else 0.1
+        self._stats.avg_query_time = (
+            alpha * query_time + (1 - alpha) * self._stats.avg_query_time
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        available = self._available.qsize() if self._available else 0
+        return {
+            "total_connections": self._stats.total_connections,
+            "active_connections": self._stats.active_connections,
+            "available_connections": available,
+            "max_connections": self._stats.max_connections,
+            "total_queries": self._stats.total_queries,
+            "failed_queries": self._stats.failed_queries,
+            "avg_query_time_ms": round(self._stats.avg_query_time * 1000, 2),
+        }
+
+    async def close(self):
+        """Close all connections in the pool"""
+        with self._open_lock:
+            connections = self._connections
+            self._connections = []
+            self._available = None
+            self._loop = None
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.error("Error closing database connection", error=e)
+
+        logger.info("Async database pool closed")
+
+
 # Global connection pool instance
 _connection_pool: Optional[DatabaseConnectionPool] = None
 
@@ -0,0 +1,45 @@
+"""
+Per-host request pacing
+Token buckets shared by the crawler and the CFPL capture engine
+"""
+
+import asyncio
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Per-host token bucket pacing for crawl fetches"""
+
+    def __init__(self, requests_per_second: float, burst: int = 1):
+        self.rate = float(requests_per_second)
+        self.capacity = max(1.0, float(burst))
+        self._buckets: Dict[str, Dict[str, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, url: str) -> None:
+        """Wait until a request slot is available for the URL's host"""
+        if self.rate <= 0:
+            return
+
+        host = urlparse(url).netloc.lower()
+        lock = self._locks.setdefault(host, asyncio.Lock())
+
+        # Waiters on the same host queue on the lock, so slots are handed
+        # out in arrival order while other hosts proceed independently
+        async with lock:
+            bucket = self._buckets.setdefault(
+                host, {"tokens": self.capacity, "updated": time.monotonic()}
+            )
+            while True:
+                now = time.monotonic()
+                bucket["tokens"] = min(
+                    self.capacity,
+                    bucket["tokens"] + (now - bucket["updated"]) * self.rate,
+                )
+                bucket["updated"] = now
+                if bucket["tokens"] >= 1.0:
+                    bucket["tokens"] -= 1.0
+                    return
+                await asyncio.sleep((1.0 - bucket["tokens"]) / self.rate)
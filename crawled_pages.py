@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Crawled Page Index
+Maps (user_id, url) to the job_results row and position that holds a scraped page,
+so single-page lookups do not have to decode every result blob a user owns.
+
+Existing databases: python crawled_pages.py [--database PATH]
+"""
+
+import json
+import logging
+import sqlite3
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_crawled_pages_table(cursor: sqlite3.Cursor) -> None:
+    """Create the crawled_pages index table, its lookup index and cleanup trigger"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS crawled_pages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            url TEXT NOT NULL,
+            job_id INTEGER,
+            job_result_id INTEGER NOT NULL,
+            item_offset INTEGER NOT NULL,
+            scraped_at TEXT,
+            UNIQUE (job_result_id, item_offset)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_crawled_pages_user_url
+        ON crawled_pages (user_id, url, job_result_id DESC)
+    """
+    )
+    # job_results rows are deleted from several places; drop their index rows too
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_crawled_pages_cleanup
+        AFTER DELETE ON job_results
+        BEGIN
+            DELETE FROM crawled_pages WHERE job_result_id = OLD.id;
+        END
+    """
+    )
+
+
+def crawled_items(data: Any) -> List[Dict[str, Any]]:
+    """Page records held in a job_results blob (crawl or single-page format)"""
+    if not isinstance(data, dict):
+        return []
+    if "crawled_data" in data:
+        return data["crawled_data"] or []
+    if "url" in data:
+        return [data]
+    return []
+
+
+INSERT_CRAWLED_PAGE_SQL = """
+    INSERT OR IGNORE INTO crawled_pages
+        (user_id, url, job_id, job_result_id, item_offset, scraped_at)
+    VALUES ((SELECT created_by FROM jobs WHERE id = ?), ?, ?, ?, ?, ?)
+"""
+
+FIND_CRAWLED_PAGE_SQL = """
+    SELECT cp.job_id, cp.item_offset, jr.data
+    FROM crawled_pages cp
+    JOIN job_results jr ON jr.id = cp.job_result_id
+    WHERE cp.user_id = ? AND cp.url = ?
+    ORDER BY cp.job_result_id DESC
+    LIMIT 1
+"""
+
+
+def crawled_page_rows(job_result_id: int, job_id: int, data: Any) -> List[tuple]:
+    """Parameter rows for INSERT_CRAWLED_PAGE_SQL, one per page in the blob"""
+    return [
+        (job_id, item["url"], job_id, job_result_id, offset, item.get("timestamp", ""))
+        for offset, item in enumerate(crawled_items(data))
+        if isinstance(item, dict) and item.get("url")
+    ]
+
+
+def _resolve_crawled_page(
+    row: Optional[tuple], url: str
+) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Decode the page record an index row points at"""
+    if not row:
+        return None
+
+    job_id, item_offset, blob = row
+    try:
+        items = crawled_items(json.loads(blob))
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if item_offset >= len(items) or items[item_offset].get("url") != url:
+        return None
+    return items[item_offset], job_id
+
+
+def index_job_result(
+    cursor: sqlite3.Cursor, job_result_id: int, job_id: int, data: Any
+) -> int:
+    """Record every page of a freshly written job_results row; returns rows indexed"""
+    rows = crawled_page_rows(job_result_id, job_id, data)
+    cursor.executemany(INSERT_CRAWLED_PAGE_SQL, rows)
+    return len(rows)
+
+
+async def index_job_result_async(
+    conn, job_result_id: int, job_id: int, data: Any
+) -> int:
+    """index_job_result for an aiosqlite connection"""
+    rows = crawled_page_rows(job_result_id, job_id, data)
+    await conn.executemany(INSERT_CRAWLED_PAGE_SQL, rows)
+    return len(rows)
+
+
+def find_crawled_page(
+    cursor: sqlite3.Cursor, user_id: int, url: str
+) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Return the most recent (page record, job_id) for a user's URL, or None"""
+    cursor.execute(FIND_CRAWLED_PAGE_SQL, (user_id, url))
+    return _resolve_crawled_page(cursor.fetchone(), url)
+
+
+async def find_crawled_page_async(
+    conn, user_id: int, url: str
+) -> Optional[Tuple[Dict[str, Any], int]]:
+    """find_crawled_page for an aiosqlite connection"""
+    async with conn.execute(FIND_CRAWLED_PAGE_SQL, (user_id, url)) as cursor:
+        row = await cursor.fetchone()
+    return _resolve_crawled_page(row, url)
+
+
+def backfill_crawled_pages(database_path: str, batch_size: int = 200) -> Dict[str, int]:
+    """
+    One-time index build for databases written before crawled_pages existed.
+
+    Rows already indexed are skipped, so the backfill is safe to re-run.
+    """
+    conn = sqlite3.connect(database_path)
+    stats = {"results_scanned": 0, "pages_indexed": 0, "results_unreadable": 0}
+    try:
+        cursor = conn.cursor()
+        ensure_crawled_pages_table(cursor)
+        conn.commit()
+
+        last_id = 0
+        while True:
+            cursor.execute(
+                """
+                SELECT jr.id, jr.job_id, jr.data
+                FROM job_results jr
+                WHERE jr.id > ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM crawled_pages cp WHERE cp.job_result_id = jr.id
+                  )
+                ORDER BY jr.id
+                LIMIT ?
+            """,
+                (last_id, batch_size),
+            )
+            batch = cursor.fetchall()
+            if not batch:
+                break
+
+            for job_result_id, job_id, blob in batch:
+                stats["results_scanned"] += 1
+                try:
+                    data = json.loads(blob)
+                except (json.JSONDecodeError, TypeError):
+                    stats["results_unreadable"] += 1
+                    continue
+                stats["pages_indexed"] += index_job_result(
+                    cursor, job_result_id, job_id, data
+                )
+            conn.commit()
+            last_id = batch[-1][0]
+    finally:
+        conn.close()
+
+    logger.info(
+        f"Crawled page backfill: {stats['pages_indexed']} pages from "
+        f"{stats['results_scanned']} results"
+    )
+    return stats
+
+
+def main():
+    """Backfill the crawled page index of an existing database"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill the crawled_pages URL index")
+    parser.add_argument(
+        "--database",
+        default=None,
+        help="SQLite database to index (defaults to the configured DATABASE_PATH)",
+    )
+    args = parser.parse_args()
+
+    database_path = args.database
+    if database_path is None:
+        from secure_config import database_config
+
+        database_path = database_config.DATABASE_PATH
+
+    stats = backfill_crawled_pages(database_path)
+    print(
+        f"Indexed {stats['pages_indexed']} pages from {stats['results_scanned']} "
+        f"job results ({stats['results_unreadable']} unreadable) in {database_path}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
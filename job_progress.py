@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Job Progress Registry
+In-process progress snapshots for running jobs, fed by per-page crawl events.
+
+Progress reads and WebSocket pushes come from here, so neither has to query
+job_results while a crawl is in flight.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+RUNNING_STATUSES = ("pending", "running")
+
+
+@dataclass
+class JobProgress:
+    """Latest known progress of one job"""
+
+    job_id: int
+    owner_id: Optional[int] = None
+    status: str = "running"
+    pages_done: int = 0
+    queue_size: int = 0
+    errors: int = 0
+    bytes_downloaded: int = 0
+    urls_discovered: int = 0
+    estimated_target: int = 100
+    started_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    recent_activity: Deque[Dict[str, str]] = field(
+        default_factory=lambda: deque(maxlen=3)
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Progress payload served by the progress endpoint and WebSocket pushes"""
+        end = self.finished_at or time.time()
+        runtime_seconds = max(0.0, end - self.started_at)
+        target = max(1, self.estimated_target)
+
+        if self.status == "completed":
+            progress_percentage = 100.0
+            eta_seconds = 0
+        elif self.status in RUNNING_STATUSES:
+            # A crawl can stop short of max_pages, so never report done early
+            progress_percentage = min(95.0, self.pages_done / target * 100)
+            remaining = max(0, target - self.pages_done)
+            if self.pages_done and runtime_seconds > 0:
+                eta_seconds = int(remaining * runtime_seconds / self.pages_done)
+            else:
+                eta_seconds = None
+        else:
+            progress_percentage = 0.0
+            eta_seconds = None
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "progress_percentage": round(progress_percentage, 1),
+            "current_results": self.pages_done,
+            "estimated_target": self.estimated_target,
+            "pages_done": self.pages_done,
+            "queue_size": self.queue_size,
+            "errors": self.errors,
+            "bytes_downloaded": self.bytes_downloaded,
+            "urls_discovered": self.urls_discovered,
+            "runtime_seconds": int(runtime_seconds),
+            "eta_seconds": eta_seconds,
+            "recent_activity": list(self.recent_activity),
+            "last_updated": datetime.fromtimestamp(self.updated_at).isoformat(),
+        }
+
+
+class JobProgressRegistry:
+    """
+    job_id -> JobProgress map with change tracking.
+
+    publish() only updates counters and marks the job dirty; consumers call
+    drain_changes() on their own schedule, so any number of events between
+    two drains collapse into one snapshot per job. Finished jobs are kept for
+    retention_seconds so late readers still see the final state.
+    """
+
+    def __init__(self, retention_seconds: float = 600.0):
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[int, JobProgress] = {}
+        self._dirty: Set[int] = set()
+
+    def start(
+        self, job_id: int, owner_id: Optional[int] = None, estimated_target: int = 100
+    ) -> JobProgress:
+        """Register (or reset) a job that is about to run"""
+        self._prune()
+        progress = JobProgress(
+            job_id=job_id, owner_id=owner_id, estimated_target=estimated_target
+        )
+        self._jobs[job_id] = progress
+        self._dirty.add(job_id)
+        return progress
+
+    def publish(self, job_id: int, event: Dict[str, Any]) -> None:
+        """Apply one progress event; counters in events are running totals"""
+        progress = self._jobs.get(job_id)
+        if progress is None:
+            progress = self.start(job_id)
+
+        for key in ("pages_done", "queue_size", "errors", "urls_discovered"):
+            if key in event:
+                setattr(progress, key, int(event[key]))
+        if "bytes" in event:
+            progress.bytes_downloaded = int(event["bytes"])
+        if event.get("max_pages"):
+            progress.estimated_target = int(event["max_pages"])
+        if event.get("url"):
+            progress.recent_activity.appendleft(
+                {"url": event["url"], "timestamp": datetime.now().isoformat()}
+            )
+
+        progress.updated_at = time.time()
+        self._dirty.add(job_id)
+
+    def finish(
+        self, job_id: int, status: str, results_count: Optional[int] = None
+    ) -> None:
+        """Record a job's final status"""
+        progress = self._jobs.get(job_id)
+        if progress is None:
+            progress = self.start(job_id)
+
+        progress.status = status
+        progress.queue_size = 0
+        if results_count is not None and not progress.pages_done:
+            progress.pages_done = results_count
+        progress.finished_at = progress.updated_at = time.time()
+        self._dirty.add(job_id)
+
+    def get(self, job_id: int) -> Optional[JobProgress]:
+        """Current progress of a job, or None if the registry has not seen it"""
+        return self._jobs.get(job_id)
+
+    def running(self) -> List[JobProgress]:
+        """Jobs that have not finished yet"""
+        return [p for p in self._jobs.values() if p.status in RUNNING_STATUSES]
+
+    def drain_changes(self) -> List[Dict[str, Any]]:
+        """Snapshots of every job changed since the previous drain"""
+        changed = [self._jobs[job_id] for job_id in self._dirty if job_id in self._jobs]
+        self._dirty.clear()
+        return [progress.to_dict() for progress in changed]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, progress in self._jobs.items()
+            if progress.finished_at is not None and progress.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._dirty.discard(job_id)
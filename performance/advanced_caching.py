@@ -11,7 +11,7 @@ import pickle
 import gzip
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, List, Optional, Set, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
@@ -19,6 +19,9 @@ import threading
 from functools import wraps
 import weakref
 
+from caching.lru_cache import LRUCache, estimate_size
+from caching.stampede import StampedeGuard, stored_value
+
 @dataclass
 class CacheEntry:
     """Cache entry with metadata"""
@@ -98,39 +101,60 @@ class MemoryCache(CacheBackend):
     """In-memory cache backend with LRU eviction"""
     
     def __init__(self, max_size: int = 1000, max_memory_mb: int = 100):
-        self.cache: Dict[str, CacheEntry] = {}
-        self.access_order: List[str] = []
         self.max_size = max_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.cache = LRUCache(
+            max_entries=max_size,
+            max_bytes=self.max_memory_bytes,
+            on_remove=self._unindex
+        )
         self.lock = threading.RLock()
-        self.stats = {
-            'hits': 0,
-            'misses': 0,
-            'evictions': 0,
-            'memory_usage': 0
+        # tag -> keys of live entries carrying it, kept in step with self.cache
+        self.tag_index: Dict[str, Set[str]] = {}
+
+    def _unindex(self, key: str, entry: CacheEntry):
+        """Drop a departing entry from the tag index"""
+        for tag in entry.tags or ():
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+
+    def keys_for_tags(self, tags: List[str]) -> Set[str]:
+        """Keys of entries carrying any of tags"""
+        with self.lock:
+            keys: Set[str] = set()
+            for tag in tags:
+                keys |= self.tag_index.get(tag, set())
+            return keys
+
+    async def invalidate_tags(self, tags: List[str]) -> Set[str]:
+        """Delete every entry carrying any of tags; returns the deleted keys"""
+        with self.lock:
+            keys = self.keys_for_tags(tags)
+            for key in keys:
+                self.cache.delete(key)
+            return keys
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current memory usage"""
+        return {
+            'hits': self.cache.hits,
+            'misses': self.cache.misses,
+            'evictions': self.cache.evictions,
+            'expirations': self.cache.expirations,
+            'memory_usage': self.cache.current_bytes
         }
     
     async def get(self, key: str) -> Optional[CacheEntry]:
         """Get cache entry"""
         with self.lock:
             entry = self.cache.get(key)
-            if entry and not entry.is_expired():
-                # Update access order for LRU
-                if key in self.access_order:
-                    self.access_order.remove(key)
-                self.access_order.append(key)
-                
+            if entry is not None:
                 entry.hit_count += 1
-                self.stats['hits'] += 1
-                return entry
-            elif entry:
-                # Remove expired entry
-                del self.cache[key]
-                if key in self.access_order:
-                    self.access_order.remove(key)
-            
-            self.stats['misses'] += 1
-            return None
+            return entry
     
     async def set(self, entry: CacheEntry, ttl: Optional[int] = None) -> bool:
         """Set cache entry"""
@@ -138,90 +162,52 @@ class MemoryCache(CacheBackend):
             # Set expiration if TTL provided
             if ttl:
                 entry.expires_at = datetime.now() + timedelta(seconds=ttl)
+            elif entry.expires_at is not None:
+                ttl = (entry.expires_at - datetime.now()).total_seconds()
+                if ttl <= 0:
+                    return False
             
             # Calculate entry size
-            entry.size_bytes = len(pickle.dumps(entry.value))
-            
-            # Check if we need to evict entries
-            await self._evict_if_needed(entry.size_bytes)
+            entry.size_bytes = estimate_size(entry.value)
             
-            # Store entry
-            self.cache[entry.key] = entry
-            if entry.key in self.access_order:
-                self.access_order.remove(entry.key)
-            self.access_order.append(entry.key)
-            
-            self._update_memory_usage()
+            self.cache.set(entry.key, entry, ttl, size=entry.size_bytes)
+            for tag in entry.tags or ():
+                self.tag_index.setdefault(tag, set()).add(entry.key)
             return True
     
     async def delete(self, key: str) -> bool:
         """Delete cache entry"""
         with self.lock:
-            if key in self.cache:
-                del self.cache[key]
-                if key in self.access_order:
-                    self.access_order.remove(key)
-                self._update_memory_usage()
-                return True
-            return False
+            return self.cache.delete(key)
     
     async def clear(self, pattern: Optional[str] = None) -> int:
         """Clear cache entries"""
         with self.lock:
             if pattern is None:
-                count = len(self.cache)
-                self.cache.clear()
-                self.access_order.clear()
-                self.stats['memory_usage'] = 0
-                return count
+                self.tag_index.clear()
+                return self.cache.clear()
             else:
                 # Pattern-based clearing (simple wildcard support)
                 import fnmatch
-                keys_to_delete = []
-                for key in self.cache.keys():
-                    if fnmatch.fnmatch(key, pattern):
-                        keys_to_delete.append(key)
+                keys_to_delete = [
+                    key for key in self.cache.keys() if fnmatch.fnmatch(key, pattern)
+                ]
                 
                 for key in keys_to_delete:
-                    del self.cache[key]
-                    if key in self.access_order:
-                        self.access_order.remove(key)
+                    self.cache.delete(key)
                 
-                self._update_memory_usage()
                 return len(keys_to_delete)
     
     async def exists(self, key: str) -> bool:
         """Check if key exists"""
         with self.lock:
-            entry = self.cache.get(key)
-            return entry is not None and not entry.is_expired()
-    
-    async def _evict_if_needed(self, new_entry_size: int):
-        """Evict entries if needed for size/memory limits"""
-        # Check size limit
-        while len(self.cache) >= self.max_size and self.access_order:
-            oldest_key = self.access_order.pop(0)
-            if oldest_key in self.cache:
-                del self.cache[oldest_key]
-                self.stats['evictions'] += 1
-        
-        # Check memory limit
-        while (self.stats['memory_usage'] + new_entry_size > self.max_memory_bytes 
-               and self.access_order):
-            oldest_key = self.access_order.pop(0)
-            if oldest_key in self.cache:
-                del self.cache[oldest_key]
-                self.stats['evictions'] += 1
-    
-    def _update_memory_usage(self):
-        """Update memory usage statistics"""
-        self.stats['memory_usage'] = sum(
-            entry.size_bytes for entry in self.cache.values()
-        )
+            return key in self.cache
 
 class RedisCache(CacheBackend):
     """Redis cache backend"""
     
+    DELETE_BATCH_SIZE = 500
+
     def __init__(self, redis_url: str, key_prefix: str = "cache:"):
         self.redis_url = redis_url
         self.key_prefix = key_prefix
@@ -246,6 +232,10 @@ class RedisCache(CacheBackend):
         """Create Redis key with prefix"""
         return f"{self.key_prefix}{key}"
     
+    def _tag_key(self, tag: str) -> str:
+        """Redis set holding the keys that carry tag"""
+        return f"{self.key_prefix}tag:{tag}"
+
     async def get(self, key: str) -> Optional[CacheEntry]:
         """Get cache entry from Redis"""
         redis = await self._get_redis()
@@ -286,10 +276,15 @@ class RedisCache(CacheBackend):
             else:
                 expire_time = None
             
+            # Value and tag memberships go out in one round trip
+            pipe = redis.pipeline(transaction=False)
             if expire_time:
-                await redis.setex(self._make_key(entry.key), expire_time, data)
+                pipe.setex(self._make_key(entry.key), expire_time, data)
             else:
-                await redis.set(self._make_key(entry.key), data)
+                pipe.set(self._make_key(entry.key), data)
+            for tag in entry.tags or ():
+                pipe.sadd(self._tag_key(tag), entry.key)
+            await pipe.execute()
             
             return True
         except Exception as e:
@@ -320,16 +315,58 @@ class RedisCache(CacheBackend):
                 pattern = "*"
             
             search_pattern = f"{self.key_prefix}{pattern}"
-            keys = await redis.keys(search_pattern)
             
-            if keys:
-                deleted = await redis.delete(*keys)
-                return deleted
-            return 0
+            # SCAN in batches rather than KEYS, which blocks the server
+            deleted = 0
+            batch = []
+            async for key in redis.scan_iter(match=search_pattern,
+                                             count=self.DELETE_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= self.DELETE_BATCH_SIZE:
+                    deleted += await redis.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await redis.delete(*batch)
+            return deleted
         except Exception as e:
             logging.error(f"Redis clear error: {e}")
             return 0
     
+    async def invalidate_tags(self, tags: List[str]) -> Set[str]:
+        """
+        Delete every key tagged with any of tags; returns the keys removed.
+
+        Tag sets are not trimmed when their keys expire on their own, so stale
+        members are dropped here along with the set itself.
+        """
+        redis = await self._get_redis()
+        if not redis or not tags:
+            return set()
+
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(self._tag_key(tag))
+            memberships = await pipe.execute()
+
+            keys = {
+                member.decode() if isinstance(member, bytes) else member
+                for members in memberships
+                for member in members
+            }
+
+            pipe = redis.pipeline(transaction=False)
+            ordered = sorted(keys)
+            for offset in range(0, len(ordered), self.DELETE_BATCH_SIZE):
+                chunk = ordered[offset:offset + self.DELETE_BATCH_SIZE]
+                pipe.delete(*(self._make_key(key) for key in chunk))
+            pipe.delete(*(self._tag_key(tag) for tag in tags))
+            await pipe.execute()
+            return keys
+        except Exception as e:
+            logging.error(f"Redis tag invalidation error: {e}")
+            return set()
+
     async def exists(self, key: str) -> bool:
         """Check if key exists in Redis"""
         redis = await self._get_redis()
@@ -360,6 +397,7 @@ class MultiTierCache:
             'writes': 0,     # Total writes
             'evictions': 0   # Total evictions
         }
+        self._stampede_guard = StampedeGuard(self._get_stored, self.set)
     
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate cache key from arguments"""
@@ -368,6 +406,20 @@ class MultiTierCache:
     
     async def get(self, key: str, tags: List[str] = None) -> Optional[Any]:
         """Get value from cache (L1 -> L2 -> miss)"""
+        return stored_value(await self._get_stored(key))
+
+    async def get_or_set(self, key: str, loader: Callable[[], Any],
+                         ttl: Optional[int] = None, tags: List[str] = None,
+                         stale_ttl: int = 0, negative_ttl: Optional[int] = None,
+                         beta: float = 1.0) -> Optional[Any]:
+        """Cached value for key, loading it once per miss (see StampedeGuard)"""
+        return await self._stampede_guard.get_or_set(
+            key, loader, ttl or self.default_ttl, stale_ttl=stale_ttl,
+            negative_ttl=negative_ttl, beta=beta, tags=tags
+        )
+
+    async def _get_stored(self, key: str) -> Optional[Any]:
+        """Raw stored value, promoting L2 hits into L1"""
         # Try L1 cache (memory) first
         entry = await self.memory_cache.get(key)
         if entry:
@@ -436,22 +488,13 @@ class MultiTierCache:
     
     async def invalidate_by_tags(self, tags: List[str]) -> int:
         """Invalidate cache entries by tags"""
-        # This is a simplified implementation
-        # In production, you'd want a more efficient tag-based invalidation system
-        count = 0
+        # Both tiers keep tag -> keys indexes, so cost is O(keys with the tags)
+        keys = await self.memory_cache.invalidate_tags(tags)
         
-        # For memory cache, we need to check each entry
-        with self.memory_cache.lock:
-            keys_to_delete = []
-            for key, entry in self.memory_cache.cache.items():
-                if entry.tags and any(tag in entry.tags for tag in tags):
-                    keys_to_delete.append(key)
-            
-            for key in keys_to_delete:
-                await self.delete(key)
-                count += 1
+        if self.redis_cache:
+            keys |= await self.redis_cache.invalidate_tags(tags)
         
-        return count
+        return len(keys)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -466,7 +509,8 @@ class MultiTierCache:
             'memory_cache_stats': self.memory_cache.stats
         }
 
-def cached(ttl: int = 3600, tags: List[str] = None, key_prefix: str = "func"):
+def cached(ttl: int = 3600, tags: List[str] = None, key_prefix: str = "func",
+           stale_ttl: int = 0, negative_ttl: Optional[int] = None):
     """Decorator for caching function results"""
     def decorator(func: Callable):
         # Store cache instance as a weak reference to avoid circular references
@@ -491,16 +535,11 @@ def cached(ttl: int = 3600, tags: List[str] = None, key_prefix: str = "func"):
             # Generate cache key
             cache_key = cache._generate_key(f"{key_prefix}:{func.__name__}", *args, **kwargs)
             
-            # Try to get from cache
-            result = await cache.get(cache_key, tags)
-            if result is not None:
-                return result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache.set(cache_key, result, ttl, tags)
-            
-            return result
+            # Concurrent misses for the same key share one call of func
+            return await cache.get_or_set(
+                cache_key, lambda: func(*args, **kwargs), ttl, tags,
+                stale_ttl=stale_ttl, negative_ttl=negative_ttl
+            )
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
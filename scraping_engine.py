@@ -4,19 +4,33 @@ Provides actual web scraping functionality using multiple backends
 """
 
 import asyncio
+import itertools
 import json
 import logging
+import random
 import re
 import sqlite3
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Union, cast
-from urllib.parse import urljoin
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
 
-import requests
+import httpx
 from bs4 import BeautifulSoup, Tag
 from bs4.element import NavigableString
 
+from config.rate_limiter import HostRateLimiter
+from crawled_pages import ensure_crawled_pages_table, index_job_result
+
+try:
+    import h2  # noqa: F401  # enables HTTP/2 negotiation in httpx
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -50,16 +64,308 @@ def safe_get_class_list(element: Any) -> List[str]:
     return []
 
 
+def _page_size(page_data: Dict[str, Any]) -> int:
+    """Best-effort byte count of a fetched page, for progress reporting"""
+    if page_data.get("html_size_bytes"):
+        return int(page_data["html_size_bytes"])
+    content_length = (page_data.get("page_metadata") or {}).get("content_length")
+    if content_length and str(content_length).isdigit():
+        return int(content_length)
+    return len(page_data.get("raw_html", "") or "")
+
+
+class CrawlCache:
+    """
+    crawl_cache table behind a single WAL-mode connection.
+
+    All SQLite work runs on one dedicated thread so the event loop never
+    blocks on a commit. Writes are queued and flushed by a background task
+    in one transaction per batch (every `batch_size` rows or
+    `flush_interval` seconds). Raw HTML is stored zlib-compressed in
+    `content`; `metadata` holds the page data without it.
+    """
+
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        db_path: str = "data.db",
+        batch_size: int = 100,
+        flush_interval: float = 0.25,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="crawl-cache"
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def open(self) -> None:
+        try:
+            await self._run(self._open)
+        except Exception:
+            self._executor.shutdown(wait=False)
+            raise
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_cache (
+                url TEXT PRIMARY KEY,
+                content TEXT,
+                metadata TEXT,
+                crawled_at TIMESTAMP,
+                domain TEXT
+            )
+        """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(crawl_cache)")}
+        if "content_encoding" not in columns:
+            # Rows written before compression keep a NULL encoding
+            conn.execute("ALTER TABLE crawl_cache ADD COLUMN content_encoding TEXT")
+        conn.commit()
+        self._conn = conn
+
+    async def get_many(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up cached pages for a batch of URLs in as few queries as possible"""
+        if not urls or self._conn is None:
+            return {}
+        return await self._run(self._get_many, list(dict.fromkeys(urls)))
+
+    def _get_many(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        assert self._conn is not None
+        found = {}
+        for offset in range(0, len(urls), self.LOOKUP_CHUNK_SIZE):
+            chunk = urls[offset : offset + self.LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                "SELECT url, content, metadata, crawled_at, content_encoding "
+                f"FROM crawl_cache WHERE url IN ({placeholders})",
+                chunk,
+            )
+            for url, content, metadata, crawled_at, encoding in rows:
+                data = json.loads(metadata) if metadata else {}
+                if encoding == "zlib" and content:
+                    data["raw_html"] = zlib.decompress(content).decode("utf-8")
+                found[url] = {"cached_at": crawled_at, "data": data}
+        return found
+
+    async def cached_urls(self, urls: List[str]) -> Set[str]:
+        """Which of these URLs have a cached page, without loading the pages"""
+        if not urls or self._conn is None:
+            return set()
+        return await self._run(self._cached_urls, list(dict.fromkeys(urls)))
+
+    def _cached_urls(self, urls: List[str]) -> Set[str]:
+        assert self._conn is not None
+        found = set()
+        for offset in range(0, len(urls), self.LOOKUP_CHUNK_SIZE):
+            chunk = urls[offset : offset + self.LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT url FROM crawl_cache WHERE url IN ({placeholders})", chunk
+            )
+            found.update(url for (url,) in rows)
+        return found
+
+    def put(self, url: str, page_data: Dict[str, Any]) -> None:
+        """Queue a crawled page for the next batched write"""
+        if self._queue is not None:
+            self._queue.put_nowait(
+                (url, page_data, datetime.now().isoformat(), urlparse(url).netloc)
+            )
+
+    async def _writer(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            try:
+                await self._run(self._write_batch, batch)
+            except Exception as e:
+                logger.warning(f"Failed to cache {len(batch)} crawled pages: {e}")
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any], str, str]]) -> None:
+        assert self._conn is not None
+        rows = []
+        for url, page_data, crawled_at, domain in batch:
+            raw_html = page_data.get("raw_html")
+            metadata = {
+                key: value for key, value in page_data.items() if key != "raw_html"
+            }
+            content = (
+                zlib.compress(raw_html.encode("utf-8"), 6) if raw_html else None
+            )
+            rows.append(
+                (
+                    url,
+                    content,
+                    json.dumps(metadata),
+                    crawled_at,
+                    domain,
+                    "zlib" if content else None,
+                )
+            )
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO crawl_cache "
+                "(url, content, metadata, crawled_at, domain, content_encoding) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def close(self) -> None:
+        """Flush queued writes and release the connection"""
+        if self._writer_task is not None and self._queue is not None:
+            self._queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+
+class ResponseTooLargeError(Exception):
+    """Raised when a response body exceeds the configured size cap"""
+
+
+class FetchResponse:
+    """Buffered HTTP response with the subset of the requests API the scrapers use"""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        reason: str,
+        headers: httpx.Headers,
+        content: bytes,
+        encoding: Optional[str],
+        elapsed: timedelta,
+        history: List[str],
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.elapsed = elapsed
+        self.history = history
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
 class ScrapingEngine:
     """Main scraping engine with multiple backend support"""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-        )
+    DEFAULT_HEADERS = {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        ),
+        "Accept": (
+            "text/html,application/xhtml+xml,application/xml;q=0.9,"
+            "image/webp,*/*;q=0.8"
+        ),
+        "Accept-Language": "en-US,en;q=0.5",
+        "Upgrade-Insecure-Requests": "1",
+    }
+
+    # Status codes that will not change on retry, and ones worth retrying
+    NON_RETRYABLE_STATUS = {403, 404, 410, 451}
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_connections: int = 200,
+        max_connections_per_host: int = 8,
+        max_response_bytes: int = 10 * 1024 * 1024,
+        max_retries: int = 3,
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.max_response_bytes = max_response_bytes
+        self.max_retries = max_retries
+
+        # The pooled client and host semaphores are bound to the event loop
+        # that created them, so they are built lazily on first fetch
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client_loop is not loop
+            or self._client.is_closed
+        ):
+            self._client = httpx.AsyncClient(
+                headers=self.DEFAULT_HEADERS,
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True,
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=30.0,
+                ),
+            )
+            self._client_loop = loop
+            self._host_semaphores = {}
+        return self._client
+
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
 
     async def scrape_url(
         self, url: str, scraper_type: str = "basic", config: Optional[Dict[str, Any]] = None
@@ -95,11 +401,17 @@ class ScrapingEngine:
             }
 
     async def intelligent_crawl(
-        self, seed_url: str, scraper_type: str = "basic", config: Optional[Dict] = None
+        self,
+        seed_url: str,
+        scraper_type: str = "basic",
+        config: Optional[Dict] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
         """
         Intelligent crawling that discovers and follows links from seed URL
         Enhanced with full HTML extraction, domain crawling, and comprehensive status tracking
+
+        progress_callback, if given, receives running totals after every page.
         """
         config = config or {}
 
@@ -142,6 +454,7 @@ class ScrapingEngine:
                 "include_images": include_images,
                 "follow_internal_links": follow_internal_links,
                 "follow_external_links": follow_external_links,
+                "max_concurrent_workers": max_concurrent_workers,
             },
             "summary": {
                 "pages_processed": 0,
@@ -152,6 +465,7 @@ class ScrapingEngine:
                 "average_page_time": 0,
                 "duplicate_pages_skipped": 0,
                 "errors_encountered": 0,
+                "bytes_downloaded": 0,
                 "images_extracted": 0,
                 "forms_extracted": 0,
                 "domains_crawled": set(),
@@ -164,8 +478,15 @@ class ScrapingEngine:
         }
 
         try:
-            # Initialize crawling state with enhanced tracking
-            url_queue = [{"url": seed_url, "depth": 0}]
+            # Initialize crawling state with enhanced tracking. The frontier is
+            # ordered by (depth, discovery order) so concurrent workers still
+            # expand the crawl breadth-first.
+            frontier: asyncio.PriorityQueue = asyncio.PriorityQueue()
+            frontier_sequence = itertools.count()
+            frontier.put_nowait((0, next(frontier_sequence), seed_url))
+            rate_limiter = HostRateLimiter(
+                requests_per_second, burst=rate_limit.get("burst", 1)
+            )
             visited_urls = set()
             discovered_urls = set()
             page_times = []
@@ -185,81 +506,47 @@ class ScrapingEngine:
                     max_depth, 5
                 )  # Ensure sufficient depth for domain exploration
 
-            # Database connection for persistence
-            db_conn = None
+            # Crawl cache for persistence
+            crawl_cache: Optional[CrawlCache] = None
+            # Only which URLs are cached is prefetched; a cached page's
+            # content is loaded when a worker dequeues it
+            cached_urls: Set[str] = set()
             if save_to_database:
                 try:
-                    db_conn = sqlite3.connect("data.db")
-                    cursor = db_conn.cursor()
-                    # Create tables if they don't exist
-                    cursor.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS crawl_cache (
-                            url TEXT PRIMARY KEY,
-                            content TEXT,
-                            metadata TEXT,
-                            crawled_at TIMESTAMP,
-                            domain TEXT
-                        )
-                    """
-                    )
-                    db_conn.commit()
+                    crawl_cache = CrawlCache("data.db")
+                    await crawl_cache.open()
+                    cached_urls.update(await crawl_cache.cached_urls([seed_url]))
                 except Exception as e:
                     logger.warning(
                         f"Database connection failed, proceeding without persistence: {e}"
                     )
-                    db_conn = None
+                    crawl_cache = None
 
-            while url_queue and len(visited_urls) < max_pages:
-                current_item = url_queue.pop(0)
-                current_url = current_item["url"]
-                current_depth = current_item["depth"]
-
-                # Skip if already visited or max depth reached
-                if current_url in visited_urls or current_depth > max_depth:
-                    if current_url in visited_urls:
-                        crawl_results["duplicate_urls"].append(current_url)
-                        crawl_results["summary"]["duplicate_pages_skipped"] += 1
-                    continue
-
-                visited_urls.add(current_url)
+            async def crawl_page(current_url: str, current_depth: int) -> None:
                 page_start_time = time.time()
 
-                # Check if page was previously crawled (if database is available)
+                # Check if page was previously crawled
                 cached_data = None
-                if db_conn:
+                if crawl_cache and current_url in cached_urls:
+                    cached_urls.discard(current_url)
                     try:
-                        cursor = db_conn.cursor()
-                        cursor.execute(
-                            "SELECT content, metadata, crawled_at FROM crawl_cache WHERE url = ?",
-                            (current_url,),
-                        )
-                        cached_result = cursor.fetchone()
-                        if cached_result:
-                            cached_data = {
-                                "url": current_url,
-                                "cached": True,
-                                "cached_at": cached_result[2],
-                                "data": (
-                                    json.loads(cached_result[1])
-                                    if cached_result[1]
-                                    else {}
-                                ),
-                            }
-                            logger.info(f"Using cached data for {current_url}")
+                        cached = await crawl_cache.get_many([current_url])
+                        cached_data = cached.get(current_url)
                     except Exception as e:
                         logger.warning(f"Cache lookup failed for {current_url}: {e}")
+                if cached_data:
+                    logger.info(f"Using cached data for {current_url}")
 
                 try:
-                    # Rate limiting
-                    await asyncio.sleep(1.0 / requests_per_second)
-
                     # Scrape current page (or use cached data)
                     if cached_data:
                         page_data = cached_data["data"]
                         page_data["cached"] = True
                         page_data["cached_at"] = cached_data["cached_at"]
                     else:
+                        # Per-host pacing; cached pages never touch the network
+                        await rate_limiter.acquire(current_url)
+
                         # Enhanced scraping with full HTML option
                         enhanced_config = {**config}
                         if extract_full_html:
@@ -273,6 +560,9 @@ class ScrapingEngine:
                         page_data = await self.scrape_url(
                             current_url, scraper_type, enhanced_config
                         )
+                        crawl_results["summary"]["bytes_downloaded"] += _page_size(
+                            page_data
+                        )
 
                     if page_data.get("status") == "success":
                         # Track page processing time
@@ -289,24 +579,8 @@ class ScrapingEngine:
                         }
 
                         # Save to database if enabled
-                        if db_conn and not cached_data:
-                            try:
-                                cursor = db_conn.cursor()
-                                cursor.execute(
-                                    "INSERT OR REPLACE INTO crawl_cache (url, content, metadata, crawled_at, domain) VALUES (?, ?, ?, ?, ?)",
-                                    (
-                                        current_url,
-                                        page_data.get("raw_html", ""),
-                                        json.dumps(page_data),
-                                        datetime.now().isoformat(),
-                                        urlparse(current_url).netloc,
-                                    ),
-                                )
-                                db_conn.commit()
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed to cache data for {current_url}: {e}"
-                                )
+                        if crawl_cache and not cached_data:
+                            crawl_cache.put(current_url, page_data)
 
                         crawl_results["crawled_data"].append(page_data)
                         crawl_results["summary"]["pages_processed"] += 1
@@ -354,6 +628,7 @@ class ScrapingEngine:
                         # Extract links for further crawling
                         if current_depth < max_depth:
                             links = page_data.get("links", [])
+                            new_urls: List[str] = []
 
                             for link in links:
                                 if isinstance(link, dict):
@@ -398,18 +673,35 @@ class ScrapingEngine:
                                 # Add to queue if not already discovered
                                 if absolute_url not in discovered_urls:
                                     discovered_urls.add(absolute_url)
-                                    url_queue.append(
-                                        {
-                                            "url": absolute_url,
-                                            "depth": current_depth + 1,
-                                        }
-                                    )
+                                    new_urls.append(absolute_url)
                                     crawl_results["discovered_urls"].append(
                                         absolute_url
                                     )
                                     crawl_results["summary"]["urls_discovered"] += 1
                                     crawl_results["summary"]["urls_queued"] += 1
 
+                            # One cache query for the whole batch, before any
+                            # worker can pick these URLs up
+                            if crawl_cache and new_urls:
+                                try:
+                                    cached_urls.update(
+                                        await crawl_cache.cached_urls(new_urls)
+                                    )
+                                except Exception as e:
+                                    logger.warning(
+                                        "Cache lookup failed for links of "
+                                        f"{current_url}: {e}"
+                                    )
+
+                            for new_url in new_urls:
+                                frontier.put_nowait(
+                                    (
+                                        current_depth + 1,
+                                        next(frontier_sequence),
+                                        new_url,
+                                    )
+                                )
+
                 except Exception as e:
                     logger.error(f"Error crawling {current_url}: {str(e)}")
                     crawl_results["errors"].append(
@@ -422,6 +714,61 @@ class ScrapingEngine:
                     )
                     crawl_results["summary"]["errors_encountered"] += 1
 
+            def report_progress(current_url: str) -> None:
+                if progress_callback is None:
+                    return
+                summary = crawl_results["summary"]
+                try:
+                    progress_callback(
+                        {
+                            "url": current_url,
+                            "pages_done": summary["pages_processed"],
+                            "queue_size": frontier.qsize(),
+                            "errors": summary["errors_encountered"],
+                            "bytes": summary["bytes_downloaded"],
+                            "urls_discovered": summary["urls_discovered"],
+                            "max_pages": max_pages,
+                        }
+                    )
+                except Exception as e:
+                    logger.warning(f"Progress callback failed for {current_url}: {e}")
+
+            async def crawl_worker() -> None:
+                while True:
+                    current_depth, _, current_url = await frontier.get()
+                    try:
+                        # Drain the frontier once the page budget is spent
+                        if len(visited_urls) >= max_pages:
+                            continue
+
+                        # Skip if already visited or max depth reached
+                        if current_url in visited_urls or current_depth > max_depth:
+                            if current_url in visited_urls:
+                                crawl_results["duplicate_urls"].append(current_url)
+                                crawl_results["summary"]["duplicate_pages_skipped"] += 1
+                            continue
+
+                        visited_urls.add(current_url)
+                        await crawl_page(current_url, current_depth)
+                        report_progress(current_url)
+                    finally:
+                        frontier.task_done()
+
+            worker_count = max(1, int(max_concurrent_workers))
+            workers = [
+                asyncio.create_task(crawl_worker()) for _ in range(worker_count)
+            ]
+            try:
+                await frontier.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+                # Flush pending cache writes
+                if crawl_cache:
+                    await crawl_cache.close()
+
             # Calculate final statistics
             end_time = time.time()
             total_time = end_time - start_time
@@ -435,10 +782,6 @@ class ScrapingEngine:
             crawl_results["crawl_status"] = "completed"
             crawl_results["end_time"] = end_time
 
-            # Close database connection
-            if db_conn:
-                db_conn.close()
-
             logger.info(
                 f"Crawling completed: {crawl_results['summary']['pages_processed']} pages processed, "
                 f"{crawl_results['summary']['urls_discovered']} URLs discovered, "
@@ -647,48 +990,32 @@ class ScrapingEngine:
     async def _basic_scraper(self, url: str, config: Dict) -> Dict[str, Any]:
         """Enhanced basic web page scraper with full HTML and comprehensive image extraction"""
         try:
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self._fetch_url, url)
+            response = await self._fetch_url(url)
 
             if response.status_code != 200:
                 raise Exception(f"HTTP {response.status_code}: {response.reason}")
 
+            # html.parser, not lxml: raw_html and custom selectors are served
+            # from this tree, and lxml repairs malformed markup differently
             soup = BeautifulSoup(response.content, "html.parser")
+            page = self._extract_page_data(soup, url, config)
 
             # Extract basic data
             data = {
                 "url": url,
-                "title": self._extract_title(soup),
-                "meta_description": self._extract_meta_description(soup),
-                "headings": self._extract_headings(soup),
-                "links": self._extract_links(soup, url),
-                "text_content": self._extract_text_content(soup),
-                "word_count": len(soup.get_text().split()),
+                "title": page["title"],
+                "meta_description": page["meta_description"],
+                "headings": page["headings"],
+                "links": page["links"],
+                "text_content": page["text_content"],
+                "word_count": page["word_count"],
                 "status": "success",
                 "timestamp": datetime.now().isoformat(),
                 "response_time": response.elapsed.total_seconds(),
+                "images": page["images"],
+                "videos": page["videos"],
+                "forms": page["forms"],
             }
-            
-            # Only extract images if requested
-            if config.get("include_images", False):
-                data["images"] = self._extract_images(
-                    soup, url, config.get("include_all_images", False)
-                )
-            else:
-                data["images"] = []
-            
-            # NEW: Extract videos if requested
-            if config.get("extract_videos", True):
-                data["videos"] = self._extract_videos(soup, url)
-            else:
-                data["videos"] = []
-            
-            # Only extract forms if requested
-            if config.get("include_forms", False):
-                data["forms"] = self._extract_forms(soup, url)
-            else:
-                data["forms"] = []
 
             # NEW: Add full HTML if requested
             if config.get("extract_full_html", False):
@@ -721,8 +1048,7 @@ class ScrapingEngine:
     async def _ecommerce_scraper(self, url: str, config: Dict) -> Dict[str, Any]:
         """E-commerce specific scraper for product information"""
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self._fetch_url, url)
+            response = await self._fetch_url(url)
             soup = BeautifulSoup(response.content, "html.parser")
 
             data = {
@@ -754,8 +1080,7 @@ class ScrapingEngine:
     async def _news_scraper(self, url: str, config: Dict) -> Dict[str, Any]:
         """News article scraper"""
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self._fetch_url, url)
+            response = await self._fetch_url(url)
             soup = BeautifulSoup(response.content, "html.parser")
 
             data = {
@@ -784,8 +1109,7 @@ class ScrapingEngine:
     async def _social_media_scraper(self, url: str, config: Dict) -> Dict[str, Any]:
         """Social media content scraper (limited by platform APIs)"""
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self._fetch_url, url)
+            response = await self._fetch_url(url)
             soup = BeautifulSoup(response.content, "html.parser")
 
             # Extract open graph data common to social platforms
@@ -809,8 +1133,7 @@ class ScrapingEngine:
     async def _api_scraper(self, url: str, config: Dict) -> Dict[str, Any]:
         """API endpoint scraper for JSON/XML data"""
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, self._fetch_url, url)
+            response = await self._fetch_url(url)
 
             content_type = response.headers.get("content-type", "").lower()
 
@@ -844,74 +1167,114 @@ class ScrapingEngine:
         except Exception as e:
             raise Exception(f"API scraping failed: {str(e)}")
 
-    def _fetch_url(self, url: str) -> requests.Response:
-        """Fetch URL with enhanced retry logic and better error handling"""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        for attempt in range(3):
+    async def _fetch_url(self, url: str) -> FetchResponse:
+        """Fetch URL over the pooled async client with jittered retry backoff"""
+        client = self._get_client()
+        semaphore = self._get_host_semaphore(url)
+
+        for attempt in range(self.max_retries):
+            last_attempt = attempt == self.max_retries - 1
             try:
-                logger.debug(f"Attempting to fetch {url} (attempt {attempt + 1}/3)")
-                response = self.session.get(
-                    url, 
-                    timeout=(10, 30),  # (connection timeout, read timeout)
-                    headers=headers,
-                    allow_redirects=True,
-                    stream=False
+                logger.debug(
+                    f"Attempting to fetch {url} "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
                 )
-                
-                # Check if we got a response
-                if response.status_code == 0:
-                    raise requests.exceptions.ConnectionError("Received HTTP status code 0 - connection failed")
-                
+                async with semaphore:
+                    response = await self._read_response(client, url)
+
                 # Log non-200 responses but don't necessarily fail
                 if response.status_code != 200:
-                    logger.warning(f"Non-200 response from {url}: HTTP {response.status_code}")
-                    
+                    logger.warning(
+                        f"Non-200 response from {url}: HTTP {response.status_code}"
+                    )
+
                     # For some error codes, don't retry
-                    if response.status_code in [403, 404, 410, 451]:
-                        raise Exception(f"HTTP {response.status_code}: {response.reason}")
-                
+                    if response.status_code in self.NON_RETRYABLE_STATUS:
+                        raise Exception(
+                            f"HTTP {response.status_code}: {response.reason}"
+                        )
+                    if (
+                        response.status_code in self.RETRYABLE_STATUS
+                        and not last_attempt
+                    ):
+                        await self._backoff(url, attempt)
+                        continue
+
                 # Check content length
                 if len(response.content) == 0:
                     logger.warning(f"Empty response from {url}")
-                
+
                 return response
-                
-            except requests.exceptions.Timeout as e:
+
+            except httpx.TimeoutException as e:
                 logger.warning(f"Timeout on attempt {attempt + 1} for {url}: {e}")
-                if attempt == 2:  # Last attempt
-                    raise Exception(f"Timeout after 3 attempts: {e}")
-                    
-            except requests.exceptions.ConnectionError as e:
-                logger.warning(f"Connection error on attempt {attempt + 1} for {url}: {e}")
-                if attempt == 2:  # Last attempt
-                    raise Exception(f"Connection failed after 3 attempts: {e}")
-                    
-            except requests.exceptions.RequestException as e:
+                if last_attempt:
+                    raise Exception(f"Timeout after {self.max_retries} attempts: {e}")
+
+            except httpx.TransportError as e:
+                logger.warning(
+                    f"Connection error on attempt {attempt + 1} for {url}: {e}"
+                )
+                if last_attempt:
+                    raise Exception(
+                        f"Connection failed after {self.max_retries} attempts: {e}"
+                    )
+
+            except httpx.HTTPError as e:
                 logger.warning(f"Request error on attempt {attempt + 1} for {url}: {e}")
-                if attempt == 2:  # Last attempt
-                    raise Exception(f"Request failed after 3 attempts: {e}")
-                    
-            except Exception as e:
-                logger.warning(f"Unexpected error on attempt {attempt + 1} for {url}: {e}")
-                if attempt == 2:  # Last attempt
-                    raise e
-            
-            # Wait before retry with exponential backoff
-            wait_time = (2 ** attempt) + 1  # 2, 5, 9 seconds
-            logger.debug(f"Waiting {wait_time} seconds before retry...")
-            time.sleep(wait_time)
-        
+                if last_attempt:
+                    raise Exception(
+                        f"Request failed after {self.max_retries} attempts: {e}"
+                    )
+
+            await self._backoff(url, attempt)
+
         # This should never be reached due to the exception handling above
         raise Exception("Failed to fetch URL after all retries")
 
+    async def _read_response(
+        self, client: httpx.AsyncClient, url: str
+    ) -> FetchResponse:
+        """Stream a response body into memory, enforcing the size cap"""
+        started = time.perf_counter()
+        async with client.stream("GET", url) as response:
+            declared_length = response.headers.get("content-length", "")
+            if (
+                declared_length.isdigit()
+                and int(declared_length) > self.max_response_bytes
+            ):
+                raise ResponseTooLargeError(
+                    f"Response from {url} declares {declared_length} bytes, "
+                    f"limit is {self.max_response_bytes}"
+                )
+
+            chunks: List[bytes] = []
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > self.max_response_bytes:
+                    raise ResponseTooLargeError(
+                        f"Response from {url} exceeded {self.max_response_bytes} bytes"
+                    )
+                chunks.append(chunk)
+
+            return FetchResponse(
+                url=str(response.url),
+                status_code=response.status_code,
+                reason=response.reason_phrase,
+                headers=response.headers,
+                content=b"".join(chunks),
+                encoding=response.charset_encoding,
+                elapsed=timedelta(seconds=time.perf_counter() - started),
+                history=[str(previous.url) for previous in response.history],
+            )
+
+    async def _backoff(self, url: str, attempt: int) -> None:
+        """Sleep with full-jitter exponential backoff before a retry"""
+        wait_time = random.uniform(0, min(10.0, 2 ** (attempt + 1)))
+        logger.debug(f"Waiting {wait_time:.2f} seconds before retrying {url}...")
+        await asyncio.sleep(wait_time)
+
     # Extraction helper methods
     def _extract_title(self, soup: BeautifulSoup) -> str:
         title_tag = soup.find("title")
@@ -945,7 +1308,9 @@ class ScrapingEngine:
         for script in soup(["script", "style"]):
             script.decompose()
 
-        text = soup.get_text()
+        return self._clean_text(soup.get_text())
+
+    def _clean_text(self, text: str) -> str:
         # Clean up whitespace
         lines = (line.strip() for line in text.splitlines())
         chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
@@ -953,11 +1318,140 @@ class ScrapingEngine:
 
         return text[:2000]  # Truncate to 2000 characters
 
+    def _extract_page_data(
+        self, soup: BeautifulSoup, base_url: str, config: Dict
+    ) -> Dict[str, Any]:
+        """
+        Single-pass equivalent of the _extract_* helpers used by _basic_scraper.
+
+        Walks the tree once, bucketing every element the extractors need in
+        document order, then builds the same records the per-field helpers
+        produce. Script and style elements are removed at the end, as
+        _extract_text_content did, so raw_html and custom selectors see the
+        same tree as before.
+        """
+        include_images = config.get("include_images", False)
+        include_all_images = config.get("include_all_images", False)
+        extract_videos = config.get("extract_videos", True)
+        include_forms = config.get("include_forms", False)
+
+        title_tag = None
+        meta_description_tag = None
+        headings: Dict[str, List[str]] = {f"h{i}": [] for i in range(1, 7)}
+        links: List[Dict[str, str]] = []
+        anchors: List[Tag] = []
+        # Buckets mirror the selector lists in _extract_images/_extract_videos
+        image_candidates: List[List[Tag]] = [[] for _ in range(6)]
+        background_elements: List[Tag] = []
+        video_tags: List[Tag] = []
+        iframes_by_host: List[List[Tag]] = [[] for _ in self.VIDEO_IFRAME_HOSTS]
+        form_tags: List[Tag] = []
+        removed_tags: List[Tag] = []
+        strings: List[str] = []
+
+        # Same string selection as soup.get_text()
+        text_types = soup.interesting_string_types
+
+        for node in soup.descendants:
+            if isinstance(node, NavigableString):
+                if text_types is None:
+                    wanted = True
+                elif isinstance(text_types, type):
+                    wanted = type(node) is text_types
+                else:
+                    wanted = type(node) in text_types
+                if wanted and node.parent.name not in ("script", "style"):
+                    strings.append(node)
+                continue
+
+            if not isinstance(node, Tag):
+                continue
+
+            name = node.name
+            attrs = node.attrs
+
+            if name in ("script", "style"):
+                removed_tags.append(node)
+            elif name == "title":
+                if title_tag is None:
+                    title_tag = node
+            elif name == "meta":
+                if meta_description_tag is None and attrs.get("name") == "description":
+                    meta_description_tag = node
+            elif name in headings:
+                headings[name].append(node.get_text().strip())
+            elif name == "a" and "href" in attrs:
+                anchors.append(node)
+                href = safe_get_attr(node, "href")
+                if href and len(links) < 50:
+                    links.append(
+                        {"text": safe_get_text(node), "url": urljoin(base_url, href)}
+                    )
+            elif name == "img":
+                for index, attr in enumerate(
+                    ("src", "data-src", "data-lazy", "data-original")
+                ):
+                    if attr in attrs:
+                        image_candidates[index].append(node)
+            elif name == "source":
+                if "srcset" in attrs and node.find_parent("picture") is not None:
+                    image_candidates[5].append(node)
+            elif name == "video":
+                video_tags.append(node)
+            elif name == "iframe":
+                src = attrs.get("src")
+                if isinstance(src, str):
+                    for index, host in enumerate(self.VIDEO_IFRAME_HOSTS):
+                        if host in src:
+                            iframes_by_host[index].append(node)
+            elif name == "form":
+                form_tags.append(node)
+
+            style = attrs.get("style")
+            if isinstance(style, str) and "background-image" in style:
+                image_candidates[4].append(node)
+                background_elements.append(node)
+
+        text = "".join(strings)
+        page: Dict[str, Any] = {
+            "title": title_tag.get_text().strip() if title_tag else "",
+            "meta_description": (
+                safe_get_attr(meta_description_tag, "content")
+                if meta_description_tag
+                else ""
+            ),
+            "headings": headings,
+            "links": links,
+            "text_content": self._clean_text(text),
+            "word_count": len(text.split()),
+            "images": [],
+            "videos": [],
+            "forms": [],
+        }
+
+        if include_images:
+            page["images"] = self._build_images(
+                image_candidates if include_all_images else image_candidates[:1],
+                background_elements,
+                base_url,
+                include_all_images,
+            )
+        if extract_videos:
+            page["videos"] = self._build_videos(
+                video_tags, iframes_by_host, anchors, base_url
+            )
+        if include_forms:
+            page["forms"] = [self._build_form(form, base_url) for form in form_tags]
+
+        for tag in removed_tags:
+            tag.decompose()
+
+        return page
+
     def _extract_images(
         self, soup: BeautifulSoup, base_url: str, include_all_images: bool = False
     ) -> List[Dict[str, str]]:
         """Enhanced image extraction with optional comprehensive image gathering"""
-        images = []
         image_selectors = ["img[src]"]
 
         # If including all images, add more comprehensive selectors
@@ -974,10 +1468,31 @@ class ScrapingEngine:
             )
 
         # Extract regular img tags
-        for selector in (
-            image_selectors[:3] if not include_all_images else image_selectors[:6]
-        ):
-            for img_tag in soup.select(selector):
+        candidates_by_selector = [
+            soup.select(selector)
+            for selector in (
+                image_selectors[:3] if not include_all_images else image_selectors[:6]
+            )
+        ]
+        background_elements = (
+            soup.select("[style*='background-image']") if include_all_images else []
+        )
+        return self._build_images(
+            candidates_by_selector, background_elements, base_url, include_all_images
+        )
+
+    def _build_images(
+        self,
+        candidates_by_selector: List[List[Any]],
+        background_elements: List[Any],
+        base_url: str,
+        include_all_images: bool,
+    ) -> List[Dict[str, str]]:
+        """Image records for the elements matched per selector, in selector order"""
+        images = []
+
+        for candidates in candidates_by_selector:
+            for img_tag in candidates:
                 src_attrs = ["src", "data-src", "data-lazy", "data-original"]
                 src = None
 
@@ -1011,9 +1526,7 @@ class ScrapingEngine:
 
         # Extract background images if including all images
         if include_all_images:
-            import re
-
-            for element in soup.select("[style*='background-image']"):
+            for element in background_elements:
                 if isinstance(element, Tag):
                     style = safe_get_attr(element, "style")
                     bg_images = re.findall(
@@ -1038,59 +1551,88 @@ class ScrapingEngine:
 
     def _extract_forms(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
         """Extract form information from the page"""
-        forms = []
-        
-        for form_tag in soup.find_all("form"):
-            if isinstance(form_tag, Tag):
-                form_data = {
-                    "action": urljoin(base_url, safe_get_attr(form_tag, "action") or ""),
-                    "method": safe_get_attr(form_tag, "method") or "GET",
-                    "name": safe_get_attr(form_tag, "name"),
-                    "id": safe_get_attr(form_tag, "id"),
-                    "class": " ".join(safe_get_class_list(form_tag)),
-                    "enctype": safe_get_attr(form_tag, "enctype"),
-                    "target": safe_get_attr(form_tag, "target"),
-                    "fields": []
+        return [
+            self._build_form(form_tag, base_url)
+            for form_tag in soup.find_all("form")
+            if isinstance(form_tag, Tag)
+        ]
+
+    def _build_form(self, form_tag: Tag, base_url: str) -> Dict[str, Any]:
+        """Build the record for a single form element and its fields"""
+        form_data = {
+            "action": urljoin(base_url, safe_get_attr(form_tag, "action") or ""),
+            "method": safe_get_attr(form_tag, "method") or "GET",
+            "name": safe_get_attr(form_tag, "name"),
+            "id": safe_get_attr(form_tag, "id"),
+            "class": " ".join(safe_get_class_list(form_tag)),
+            "enctype": safe_get_attr(form_tag, "enctype"),
+            "target": safe_get_attr(form_tag, "target"),
+            "fields": []
+        }
+
+        # Extract form fields
+        for field in form_tag.find_all(["input", "select", "textarea", "button"]):
+            if isinstance(field, Tag):
+                field_data = {
+                    "tag": field.name,
+                    "type": safe_get_attr(field, "type"),
+                    "name": safe_get_attr(field, "name"),
+                    "id": safe_get_attr(field, "id"),
+                    "value": safe_get_attr(field, "value"),
+                    "placeholder": safe_get_attr(field, "placeholder"),
+                    "required": field.has_attr("required"),
+                    "class": " ".join(safe_get_class_list(field))
                 }
-                
-                # Extract form fields
-                for field in form_tag.find_all(["input", "select", "textarea", "button"]):
-                    if isinstance(field, Tag):
-                        field_data = {
-                            "tag": field.name,
-                            "type": safe_get_attr(field, "type"),
-                            "name": safe_get_attr(field, "name"),
-                            "id": safe_get_attr(field, "id"),
-                            "value": safe_get_attr(field, "value"),
-                            "placeholder": safe_get_attr(field, "placeholder"),
-                            "required": field.has_attr("required"),
-                            "class": " ".join(safe_get_class_list(field))
-                        }
-                        
-                        # For select fields, extract options
-                        if field.name == "select":
-                            options = []
-                            for option in field.find_all("option"):
-                                if isinstance(option, Tag):
-                                    options.append({
-                                        "value": safe_get_attr(option, "value"),
-                                        "text": safe_get_text(option),
-                                        "selected": option.has_attr("selected")
-                                    })
-                            field_data["options"] = options
-                        
-                        form_data["fields"].append(field_data)
-                
-                forms.append(form_data)
-        
-        return forms
+
+                # For select fields, extract options
+                if field.name == "select":
+                    options = []
+                    for option in field.find_all("option"):
+                        if isinstance(option, Tag):
+                            options.append({
+                                "value": safe_get_attr(option, "value"),
+                                "text": safe_get_text(option),
+                                "selected": option.has_attr("selected")
+                            })
+                    field_data["options"] = options
+
+                form_data["fields"].append(field_data)
+
+        return form_data
+
+    # Embedded video hosts, in the order their iframes are reported
+    VIDEO_IFRAME_HOSTS = [
+        "youtube.com",
+        "youtu.be",
+        "vimeo.com",
+        "dailymotion.com",
+        "twitch.tv",
+        "facebook.com/video",
+        "tiktok.com",
+    ]
+    VIDEO_FILE_EXTENSIONS = [".mp4", ".webm", ".ogg", ".avi", ".mov", ".mkv"]
 
     def _extract_videos(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
         """Extract video information from the page"""
+        return self._build_videos(
+            soup.find_all("video"),
+            [soup.select(f'iframe[src*="{host}"]') for host in self.VIDEO_IFRAME_HOSTS],
+            soup.find_all("a", href=True),
+            base_url,
+        )
+
+    def _build_videos(
+        self,
+        video_tags: List[Any],
+        iframes_by_host: List[List[Any]],
+        anchors: List[Any],
+        base_url: str,
+    ) -> List[Dict[str, Any]]:
+        """Build video records from video tags, embed iframes and direct file links"""
         videos = []
-        
+
         # Extract HTML5 video tags
-        for video_tag in soup.find_all('video'):
+        for video_tag in video_tags:
             if isinstance(video_tag, Tag):
                 src = safe_get_attr(video_tag, 'src')
                 if not src:
@@ -1098,7 +1640,7 @@ class ScrapingEngine:
                     source = video_tag.find('source')
                     if source:
                         src = safe_get_attr(source, 'src')
-                
+
                 if src:
                     absolute_url = urljoin(base_url, src)
                     video_data = {
@@ -1116,20 +1658,10 @@ class ScrapingEngine:
                         'platform': 'html5'
                     }
                     videos.append(video_data)
-        
+
         # Extract embedded videos from iframes (YouTube, Vimeo, etc.)
-        iframe_selectors = [
-            'iframe[src*="youtube.com"]',
-            'iframe[src*="youtu.be"]',
-            'iframe[src*="vimeo.com"]',
-            'iframe[src*="dailymotion.com"]',
-            'iframe[src*="twitch.tv"]',
-            'iframe[src*="facebook.com/video"]',
-            'iframe[src*="tiktok.com"]'
-        ]
-        
-        for selector in iframe_selectors:
-            for iframe in soup.select(selector):
+        for iframes in iframes_by_host:
+            for iframe in iframes:
                 if isinstance(iframe, Tag):
                     src = safe_get_attr(iframe, 'src')
                     if src:
@@ -1147,7 +1679,7 @@ class ScrapingEngine:
                             platform = 'facebook'
                         elif 'tiktok' in src:
                             platform = 'tiktok'
-                        
+
                         video_data = {
                             'url': urljoin(base_url, src),
                             'type': 'embedded',
@@ -1159,12 +1691,14 @@ class ScrapingEngine:
                             'allowfullscreen': iframe.has_attr('allowfullscreen')
                         }
                         videos.append(video_data)
-        
+
         # Also look for video links in anchor tags
-        for link in soup.find_all('a', href=True):
+        for link in anchors:
             if isinstance(link, Tag):
                 href = safe_get_attr(link, 'href')
-                if href and any(ext in href.lower() for ext in ['.mp4', '.webm', '.ogg', '.avi', '.mov', '.mkv']):
+                if href and any(
+                    ext in href.lower() for ext in self.VIDEO_FILE_EXTENSIONS
+                ):
                     absolute_url = urljoin(base_url, href)
                     video_data = {
                         'url': absolute_url,
@@ -1173,7 +1707,7 @@ class ScrapingEngine:
                         'platform': 'direct_link'
                     }
                     videos.append(video_data)
-        
+
         # Limit to 20 videos to avoid overwhelming the response
         return videos[:20]
 
@@ -1455,10 +1989,14 @@ scraping_engine = ScrapingEngine()
 
 
 async def execute_scraping_job(
-    job_id: int, job_config: Dict[str, Any]
+    job_id: int,
+    job_config: Dict[str, Any],
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Dict[str, Any]:
     """
     Execute a scraping job and store results in database
+
+    progress_callback is forwarded to intelligent_crawl for per-page progress.
     """
     DATABASE_PATH = "/home/homebrew/scraper/data/scraper.db"
 
@@ -1495,7 +2033,9 @@ async def execute_scraping_job(
 
         # Handle different job types
         if job_type == "intelligent":
-            result = await scraping_engine.intelligent_crawl(url, scraper_type, config)
+            result = await scraping_engine.intelligent_crawl(
+                url, scraper_type, config, progress_callback=progress_callback
+            )
         else:  # single_page or legacy types
             result = await scraping_engine.scrape_url(url, scraper_type, config)
 
@@ -1511,6 +2051,8 @@ async def execute_scraping_job(
         """,
             (job_id, json.dumps(result)),
         )
+        ensure_crawled_pages_table(cursor)
+        index_job_result(cursor, cursor.lastrowid, job_id, result)
 
         # Calculate results count and summary data
         if job_type == "intelligent_crawling":
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the in-memory cache tiers.
+
+Usage:
+    python scripts/benchmark_cache.py [--sizes 1000,10000,100000,300000] [--ops N]
+
+For each cache size the cache is filled to capacity, then timed for:
+
+  set-evict   inserts of new keys into a full cache (every insert evicts)
+  get-hit     reads of random resident keys
+  get-miss    reads of absent keys
+
+across LRUCache and both MemoryCache wrappers (caching.multi_tier_cache and
+performance.advanced_caching). Cost per operation should stay flat as the
+cache grows.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from caching.lru_cache import LRUCache  # noqa: E402
+from caching.multi_tier_cache import MemoryCache as TierMemoryCache  # noqa: E402
+from performance.advanced_caching import CacheEntry  # noqa: E402
+from performance.advanced_caching import MemoryCache as BackendMemoryCache  # noqa: E402
+
+VALUE = {
+    "url": "https://example.com/page",
+    "title": "Example",
+    "links": list(range(20)),
+}
+
+
+def run_lru(size: int, ops: int, keys: list) -> dict:
+    cache = LRUCache(max_entries=size)
+    for i in range(size):
+        cache.set(f"k{i}", VALUE, ttl=3600)
+
+    start = time.perf_counter()
+    for i in range(ops):
+        cache.set(f"n{i}", VALUE, ttl=3600)
+    set_time = time.perf_counter() - start
+
+    resident = [f"n{i}" for i in range(max(0, ops - size), ops)] or keys
+    start = time.perf_counter()
+    for i in range(ops):
+        cache.get(resident[i % len(resident)])
+    hit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(ops):
+        cache.get(f"absent{i}")
+    miss_time = time.perf_counter() - start
+    return {"set-evict": set_time, "get-hit": hit_time, "get-miss": miss_time}
+
+
+async def run_tier(size: int, ops: int, keys: list) -> dict:
+    cache = TierMemoryCache(max_size=size, max_memory_mb=4096)
+    for i in range(size):
+        await cache.set(f"k{i}", VALUE, ttl=3600)
+
+    start = time.perf_counter()
+    for i in range(ops):
+        await cache.set(f"n{i}", VALUE, ttl=3600)
+    set_time = time.perf_counter() - start
+
+    resident = [f"n{i}" for i in range(max(0, ops - size), ops)] or keys
+    start = time.perf_counter()
+    for i in range(ops):
+        await cache.get(resident[i % len(resident)])
+    hit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(ops):
+        await cache.get(f"absent{i}")
+    miss_time = time.perf_counter() - start
+    return {"set-evict": set_time, "get-hit": hit_time, "get-miss": miss_time}
+
+
+async def run_backend(size: int, ops: int, keys: list) -> dict:
+    cache = BackendMemoryCache(max_size=size, max_memory_mb=4096)
+
+    def entry(key):
+        return CacheEntry(
+            key=key, value=VALUE, created_at=datetime.now(), expires_at=None
+        )
+
+    for i in range(size):
+        await cache.set(entry(f"k{i}"), ttl=3600)
+
+    start = time.perf_counter()
+    for i in range(ops):
+        await cache.set(entry(f"n{i}"), ttl=3600)
+    set_time = time.perf_counter() - start
+
+    resident = [f"n{i}" for i in range(max(0, ops - size), ops)] or keys
+    start = time.perf_counter()
+    for i in range(ops):
+        await cache.get(resident[i % len(resident)])
+    hit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(ops):
+        await cache.get(f"absent{i}")
+    miss_time = time.perf_counter() - start
+    return {"set-evict": set_time, "get-hit": hit_time, "get-miss": miss_time}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,10000,100000,300000")
+    parser.add_argument("--ops", type=int, default=50000, help="Operations per phase")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(
+        f"{'cache':22} {'size':>8} {'set-evict us':>13} "
+        f"{'get-hit us':>11} {'get-miss us':>12}"
+    )
+    for size in sizes:
+        keys = [f"k{i}" for i in range(size)]
+        random.shuffle(keys)
+        results = {
+            "LRUCache": run_lru(size, args.ops, keys),
+            "multi_tier.MemoryCache": asyncio.run(run_tier(size, args.ops, keys)),
+            "advanced.MemoryCache": asyncio.run(run_backend(size, args.ops, keys)),
+        }
+        for name, timings in results.items():
+            per_op = {
+                phase: seconds / args.ops * 1e6 for phase, seconds in timings.items()
+            }
+            print(
+                f"{name:22} {size:>8} {per_op['set-evict']:>13.2f} "
+                f"{per_op['get-hit']:>11.2f} {per_op['get-miss']:>12.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
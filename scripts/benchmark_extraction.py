@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass page extractor against the legacy multi-pass helpers.
+
+Usage:
+    python scripts/benchmark_extraction.py <corpus_dir> [--repeat N]
+
+Every *.html / *.htm file under the corpus directory is parsed and extracted
+with both code paths. Per-page CPU time (time.process_time) is reported for:
+
+  legacy       html.parser + one traversal per _extract_* helper
+  single-pass  html.parser + one walk (the parser _basic_scraper uses)
+
+The script also checks that the single-pass extractor produces exactly the
+legacy output.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scraping_engine import ScrapingEngine  # noqa: E402
+
+CONFIG = {
+    "include_images": True,
+    "include_all_images": True,
+    "include_forms": True,
+    "extract_videos": True,
+}
+BASE_URL = "https://example.com/page"
+
+
+def legacy_extract(engine: ScrapingEngine, soup: BeautifulSoup) -> dict:
+    """The field-by-field extraction sequence _basic_scraper used to run"""
+    page = {
+        "title": engine._extract_title(soup),
+        "meta_description": engine._extract_meta_description(soup),
+        "headings": engine._extract_headings(soup),
+        "links": engine._extract_links(soup, BASE_URL),
+        "text_content": engine._extract_text_content(soup),
+        "word_count": len(soup.get_text().split()),
+    }
+    page["images"] = engine._extract_images(soup, BASE_URL, True)
+    page["videos"] = engine._extract_videos(soup, BASE_URL)
+    page["forms"] = engine._extract_forms(soup, BASE_URL)
+    return page
+
+
+def time_page(fn, repeat: int) -> float:
+    """Median CPU seconds for one call of fn"""
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        samples.append(time.process_time() - start)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("corpus", type=Path, help="Directory of saved HTML pages")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per page")
+    args = parser.parse_args()
+
+    pages = sorted(
+        path
+        for pattern in ("*.html", "*.htm")
+        for path in args.corpus.rglob(pattern)
+    )
+    if not pages:
+        print(f"No HTML files found under {args.corpus}")
+        return 1
+
+    engine = ScrapingEngine()
+    legacy_times, single_times, mismatches = [], [], []
+
+    print(f"Corpus: {len(pages)} pages")
+    print(
+        f"{'page':40} {'bytes':>9} {'legacy ms':>10} {'single ms':>10} "
+        f"{'speedup':>8}"
+    )
+
+    for path in pages:
+        html = path.read_bytes()
+
+        # Output parity
+        expected = legacy_extract(engine, BeautifulSoup(html, "html.parser"))
+        actual = engine._extract_page_data(
+            BeautifulSoup(html, "html.parser"), BASE_URL, CONFIG
+        )
+        if expected != actual:
+            mismatches.append(path.name)
+
+        legacy = time_page(
+            lambda: legacy_extract(engine, BeautifulSoup(html, "html.parser")),
+            args.repeat,
+        )
+        single = time_page(
+            lambda: engine._extract_page_data(
+                BeautifulSoup(html, "html.parser"), BASE_URL, CONFIG
+            ),
+            args.repeat,
+        )
+        legacy_times.append(legacy)
+        single_times.append(single)
+        print(
+            f"{path.name[:40]:40} {len(html):>9} {legacy * 1000:>10.2f} "
+            f"{single * 1000:>10.2f} {legacy / single if single else 0:>7.2f}x"
+        )
+
+    total_legacy, total_single = sum(legacy_times), sum(single_times)
+    print("-" * 81)
+    print(
+        f"{'total':40} {'':>9} {total_legacy * 1000:>10.2f} "
+        f"{total_single * 1000:>10.2f} {total_legacy / total_single:>7.2f}x"
+    )
+    print(
+        f"median per page: legacy {statistics.median(legacy_times) * 1000:.2f} ms, "
+        f"single-pass {statistics.median(single_times) * 1000:.2f} ms"
+    )
+    if mismatches:
+        print(f"Output mismatches on {len(mismatches)} pages: {', '.join(mismatches)}")
+        return 1
+    print("Output parity: identical on all pages")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
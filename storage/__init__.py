@@ -6,6 +6,7 @@ Capture-First, Process-Later implementation for web scraping
 from .cas_store import CASStore
 from .capture_engine import CFPLCaptureEngine, capture_single_url
 from .config import CFPLConfig, CFPLConfigManager, get_config
+from .document import DocumentContext
 from .processors import ProcessingPipeline, HTMLProcessor, TextExtractor, MediaMetadataProcessor
 from .cfpl_integration import CFPLScrapingEngine, create_scraping_engine, get_cfpl_scraping_engine
 
@@ -18,6 +19,7 @@ __all__ = [
     "CFPLConfig",
     "CFPLConfigManager", 
     "get_config",
+    "DocumentContext",
     "ProcessingPipeline",
     "HTMLProcessor",
     "TextExtractor", 
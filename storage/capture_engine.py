@@ -9,31 +9,88 @@ import json
 import logging
 import mimetypes
 import re
-import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 import uuid
 
 import aiohttp
 import aiofiles
 from bs4 import BeautifulSoup
 
+from config.rate_limiter import HostRateLimiter
+
 from .cas_store import CASStore
 from .config import get_config, CFPLConfig
+from .document import parse_html
 
 logger = logging.getLogger(__name__)
 
 
+class ContentTooLarge(Exception):
+    """A response body exceeded a hard size limit while streaming"""
+
+
+_HLS_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def parse_hls_playlist(text: str, playlist_url: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Parse an M3U8 playlist into absolute variant stream and segment URLs
+    A master playlist yields variants (with bandwidth and resolution); a
+    media playlist yields segments, including any EXT-X-MAP init segment.
+    """
+    variants: List[Dict[str, Any]] = []
+    segments: List[Dict[str, Any]] = []
+    pending_variant: Optional[Dict[str, Any]] = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            tag, _, value = line.partition(':')
+            attributes = {k: v.strip('"') for k, v in _HLS_ATTRIBUTE.findall(value)}
+            if tag == '#EXT-X-STREAM-INF':
+                bandwidth = attributes.get('BANDWIDTH', '0')
+                pending_variant = {
+                    'bandwidth': int(bandwidth) if bandwidth.isdigit() else 0,
+                    'resolution': attributes.get('RESOLUTION', '')
+                }
+            elif tag == '#EXT-X-MAP' and attributes.get('URI'):
+                segments.append({'url': urljoin(playlist_url, attributes['URI']),
+                                 'init': True})
+            continue
+        if pending_variant is not None:
+            pending_variant['url'] = urljoin(playlist_url, line)
+            variants.append(pending_variant)
+            pending_variant = None
+        else:
+            segments.append({'url': urljoin(playlist_url, line)})
+
+    return {'variants': variants, 'segments': segments}
+
+
 class CFPLCaptureEngine:
     """Capture engine implementing CFPL single-touch fetching"""
+
+    # Read size for response bodies streamed into the CAS
+    STREAM_CHUNK_SIZE = 64 * 1024
     
     def __init__(self, config: Optional[CFPLConfig] = None):
         self.config = config or get_config()
-        self.cas_store = CASStore(self.config.storage.root)
+        self.cas_store = CASStore(
+            self.config.storage.root,
+            pack_threshold_bytes=self.config.storage.pack_threshold_bytes,
+            max_pack_bytes=self.config.storage.max_pack_bytes
+        )
         self.session: Optional[aiohttp.ClientSession] = None
         self._current_run_id: Optional[str] = None
+        self._segment_limiter = HostRateLimiter(
+            self.config.limits.segment_rate_limit_rps
+        )
+        self._hls_progress_root = self.cas_store.index_root / "hls_progress"
         
         # Content discovery patterns
         self.asset_selectors = [
@@ -83,8 +140,7 @@ class CFPLCaptureEngine:
         self.session = aiohttp.ClientSession(
             timeout=timeout,
             headers=headers,
-            connector=connector,
-            max_redirects=self.config.limits.max_redirects if self.config.capture.follow_redirects else 0
+            connector=connector
         )
 
     async def _close_session(self):
@@ -144,18 +200,16 @@ class CFPLCaptureEngine:
         try:
             # Step 1: Fetch main content
             logger.info(f"Fetching main content: {url}")
-            main_response = await self._fetch_with_metadata(url)
+            # Body is streamed into CAS; it is only kept in memory for asset discovery
+            main_response = await self._fetch_with_metadata(
+                url, keep_content=self.config.capture.assets
+            )
             
             if not main_response:
                 capture_result['errors'].append("Failed to fetch main content")
                 return capture_result
                 
-            # Store main content in CAS
-            content_bytes = main_response['content']
-            content_hash = self.cas_store.store_content(
-                content_bytes, 
-                main_response.get('content_type')
-            )
+            content_hash = main_response['sha256']
             
             # Update capture result with main content info
             capture_result.update({
@@ -166,7 +220,7 @@ class CFPLCaptureEngine:
                 'response_headers': self._redact_headers(main_response['response_headers']),
                 'content': {
                     'sha256': content_hash,
-                    'size': len(content_bytes),
+                    'size': main_response['size'],
                     'content_type': main_response.get('content_type', ''),
                     'encoding': main_response.get('encoding', '')
                 }
@@ -175,15 +229,19 @@ class CFPLCaptureEngine:
             # Step 2: Asset discovery and capture (if enabled)
             if self.config.capture.assets and self._is_html_content(main_response.get('content_type', '')):
                 logger.info(f"Discovering assets for: {url}")
+                # One parse serves both asset and media discovery
+                soup = parse_html(main_response['content'].decode(
+                    main_response.get('encoding', 'utf-8'), errors='ignore'
+                ))
                 assets = await self._discover_and_capture_assets(
-                    content_bytes.decode(main_response.get('encoding', 'utf-8'), errors='ignore'),
+                    soup,
                     main_response['final_url']
                 )
                 capture_result['assets'] = assets
                 
                 # Step 3: Media discovery and capture
                 media_items = await self._discover_and_capture_media(
-                    content_bytes.decode(main_response.get('encoding', 'utf-8'), errors='ignore'),
+                    soup,
                     main_response['final_url']
                 )
                 capture_result['media'] = media_items
@@ -207,7 +265,10 @@ class CFPLCaptureEngine:
             
             # Step 6: Create manifest (RAW write barrier)
             logger.info(f"Creating manifest for: {url}")
-            manifest_path = self.cas_store.create_manifest(run_id, url, capture_result)
+            loop = asyncio.get_running_loop()
+            manifest_path = await loop.run_in_executor(
+                None, self.cas_store.create_manifest, run_id, url, capture_result
+            )
             
             logger.info(f"Successfully captured: {url} -> {manifest_path}")
             return {
@@ -230,12 +291,25 @@ class CFPLCaptureEngine:
                 'capture_result': capture_result
             }
 
-    async def _fetch_with_metadata(self, url: str) -> Optional[Dict[str, Any]]:
-        """Fetch URL with comprehensive metadata capture"""
+    async def _fetch_with_metadata(
+        self, url: str, keep_content: bool = False,
+        max_bytes: Optional[int] = None, store_error_body: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch URL with comprehensive metadata capture
+        The body is streamed straight into CAS ('sha256', 'size'); 'content'
+        holds the bytes only when keep_content is set. Bodies over
+        max_content_bytes are truncated; bodies over max_bytes are rejected.
+        Without store_error_body, a 4xx/5xx body is not read ('sha256' None).
+        """
         redirects = []
         
         try:
-            async with self.session.get(url, allow_redirects=True) as response:
+            async with self.session.get(
+                url,
+                allow_redirects=self.config.capture.follow_redirects,
+                max_redirects=self.config.capture.max_redirects
+            ) as response:
                 # Track redirects
                 if response.history:
                     for redirect in response.history:
@@ -245,23 +319,29 @@ class CFPLCaptureEngine:
                             'status': redirect.status
                         })
                 
+                if response.status >= 400 and not store_error_body:
+                    return {
+                        'content': None,
+                        'sha256': None,
+                        'size': 0,
+                        'status': response.status,
+                        'final_url': str(response.url),
+                        'redirects': redirects,
+                        'request_headers': dict(response.request_info.headers),
+                        'response_headers': dict(response.headers),
+                        'content_type': response.headers.get('content-type', ''),
+                        'encoding': None
+                    }
+
                 # Check content size limits
                 content_length = response.headers.get('content-length')
-                if content_length and int(content_length) > self.config.limits.max_content_bytes:
+                size_limit = self.config.limits.max_content_bytes
+                if max_bytes is not None:
+                    size_limit = min(size_limit, max_bytes)
+                if content_length and int(content_length) > size_limit:
                     logger.warning(f"Content too large: {content_length} bytes for {url}")
                     return None
                 
-                # Read content with size limit
-                content_bytes = b''
-                bytes_read = 0
-                
-                async for chunk in response.content.iter_chunked(8192):
-                    bytes_read += len(chunk)
-                    if bytes_read > self.config.limits.max_content_bytes:
-                        logger.warning(f"Content size limit exceeded for {url}")
-                        break
-                    content_bytes += chunk
-                
                 # Determine encoding
                 encoding = 'utf-8'
                 content_type = response.headers.get('content-type', '')
@@ -271,8 +351,32 @@ class CFPLCaptureEngine:
                     except:
                         encoding = 'utf-8'
                 
+                # Stream content with size limit
+                kept_chunks: List[bytes] = []
+                bytes_read = 0
+
+                async def body():
+                    nonlocal bytes_read
+                    chunks = response.content.iter_chunked(self.STREAM_CHUNK_SIZE)
+                    async for chunk in chunks:
+                        bytes_read += len(chunk)
+                        if max_bytes is not None and bytes_read > max_bytes:
+                            raise ContentTooLarge(f"{bytes_read} bytes")
+                        if bytes_read > self.config.limits.max_content_bytes:
+                            logger.warning(f"Content size limit exceeded for {url}")
+                            break
+                        if keep_content:
+                            kept_chunks.append(chunk)
+                        yield chunk
+
+                content_hash, size = await self.cas_store.store_stream(
+                    body(), content_type
+                )
+
                 return {
-                    'content': content_bytes,
+                    'content': b''.join(kept_chunks) if keep_content else None,
+                    'sha256': content_hash,
+                    'size': size,
                     'status': response.status,
                     'final_url': str(response.url),
                     'redirects': redirects,
@@ -282,17 +386,19 @@ class CFPLCaptureEngine:
                     'encoding': encoding
                 }
                 
+        except ContentTooLarge as e:
+            logger.warning(f"Content too large: {e} for {url}")
+            return None
         except Exception as e:
             logger.error(f"Failed to fetch {url}: {str(e)}")
             return None
 
-    async def _discover_and_capture_assets(self, html_content: str, base_url: str) -> List[Dict[str, Any]]:
-        """Discover and capture all assets from HTML content"""
+    async def _discover_and_capture_assets(self, soup: BeautifulSoup,
+                                           base_url: str) -> List[Dict[str, Any]]:
+        """Discover and capture all assets from parsed HTML content"""
         assets = []
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
             # Extract different types of assets
             asset_urls = set()
             
@@ -333,16 +439,10 @@ class CFPLCaptureEngine:
                         if not response:
                             return None
                         
-                        # Store in CAS
-                        content_hash = self.cas_store.store_content(
-                            response['content'],
-                            response.get('content_type')
-                        )
-                        
                         return {
                             'url': asset_url,
-                            'sha256': content_hash,
-                            'size': len(response['content']),
+                            'sha256': response['sha256'],
+                            'size': response['size'],
                             'content_type': response.get('content_type', ''),
                             'discovered_via': 'html_parsing',
                             'status': response['status']
@@ -367,15 +467,15 @@ class CFPLCaptureEngine:
         logger.info(f"Captured {len(assets)} assets")
         return assets
 
-    async def _discover_and_capture_media(self, html_content: str, base_url: str) -> List[Dict[str, Any]]:
-        """Discover and capture media content"""
+    async def _discover_and_capture_media(self, soup: BeautifulSoup,
+                                          base_url: str) -> List[Dict[str, Any]]:
+        """Discover and capture media content from parsed HTML"""
         media_items = []
         
         if self.config.capture.media == "off":
             return media_items
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
             media_urls = set()
             
             # Video elements
@@ -446,25 +546,17 @@ class CFPLCaptureEngine:
     async def _capture_direct_media(self, media_url: str) -> Optional[Dict[str, Any]]:
         """Capture direct media file"""
         try:
-            response = await self._fetch_with_metadata(media_url)
+            # Oversized media is rejected mid-stream rather than after download
+            response = await self._fetch_with_metadata(
+                media_url, max_bytes=self.config.limits.max_asset_bytes
+            )
             if not response:
                 return None
             
-            # Check if content is too large
-            if len(response['content']) > self.config.limits.max_asset_bytes:
-                logger.warning(f"Media file too large: {len(response['content'])} bytes for {media_url}")
-                return None
-            
-            # Store in CAS
-            content_hash = self.cas_store.store_content(
-                response['content'],
-                response.get('content_type')
-            )
-            
             return {
                 'url': media_url,
-                'sha256': content_hash,
-                'size': len(response['content']),
+                'sha256': response['sha256'],
+                'size': response['size'],
                 'content_type': response.get('content_type', ''),
                 'capture_method': 'direct_download'
             }
@@ -474,61 +566,166 @@ class CFPLCaptureEngine:
             return None
 
     async def _capture_hls_playlist(self, playlist_url: str) -> Optional[Dict[str, Any]]:
-        """Capture HLS playlist and all segments"""
+        """
+        Capture HLS playlist and all segments
+        Master playlists are resolved to variant streams by capture.hls_variant.
+        Segments download concurrently (limits.concurrent_segments, paced per
+        host); finished ones are logged so an interrupted capture resumes
+        without refetching what is already in CAS.
+        """
         try:
             # Fetch playlist
-            response = await self._fetch_with_metadata(playlist_url)
+            response = await self._fetch_with_metadata(playlist_url, keep_content=True)
             if not response:
                 return None
             
             playlist_content = response['content'].decode('utf-8', errors='ignore')
+            playlist = parse_hls_playlist(playlist_content, response['final_url'])
+            progress = await self._load_hls_progress(playlist_url)
             
-            # Store playlist in CAS
-            playlist_hash = self.cas_store.store_content(
-                response['content'],
-                'application/vnd.apple.mpegurl'
-            )
-            
-            # Parse playlist for segment URLs
-            segments = []
-            base_url = '/'.join(playlist_url.split('/')[:-1]) + '/'
-            
-            for line in playlist_content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    segment_url = urljoin(base_url, line)
-                    
-                    # Capture segment
-                    try:
-                        segment_response = await self._fetch_with_metadata(segment_url)
-                        if segment_response:
-                            segment_hash = self.cas_store.store_content(
-                                segment_response['content'],
-                                segment_response.get('content_type', 'video/mp2t')
-                            )
-                            
-                            segments.append({
-                                'url': segment_url,
-                                'sha256': segment_hash,
-                                'size': len(segment_response['content'])
-                            })
-                    except Exception as e:
-                        logger.warning(f"Failed to capture segment {segment_url}: {str(e)}")
-            
-            return {
+            result = {
                 'url': playlist_url,
-                'sha256': playlist_hash,
-                'size': len(response['content']),
+                'sha256': response['sha256'],
+                'size': response['size'],
                 'content_type': 'application/vnd.apple.mpegurl',
-                'capture_method': 'hls_playlist',
-                'segments': segments,
-                'segment_count': len(segments)
+                'capture_method': 'hls_playlist'
             }
             
+            complete = True
+            if not playlist_content.lstrip().startswith('#EXTM3U'):
+                # Not HLS (e.g. a DASH manifest): keep the playlist itself only
+                segments = []
+            elif playlist['variants']:
+                variants = []
+                segments = []
+                for variant in self._select_hls_variants(playlist['variants']):
+                    variant_response = await self._fetch_with_metadata(
+                        variant['url'], keep_content=True
+                    )
+                    if not variant_response:
+                        logger.warning(f"Failed to fetch HLS variant {variant['url']}")
+                        complete = False
+                        continue
+                    variant_playlist = parse_hls_playlist(
+                        variant_response['content'].decode('utf-8', errors='ignore'),
+                        variant_response['final_url']
+                    )
+                    variant_segments = await self._capture_hls_segments(
+                        playlist_url, variant_playlist['segments'], progress
+                    )
+                    expected = len(variant_playlist['segments'])
+                    complete = complete and len(variant_segments) == expected
+                    for segment in variant_segments:
+                        segment['variant'] = variant['url']
+                    variants.append({
+                        **variant,
+                        'sha256': variant_response['sha256'],
+                        'size': variant_response['size'],
+                        'segment_count': len(variant_segments)
+                    })
+                    segments.extend(variant_segments)
+                result['variants'] = variants
+            else:
+                segments = await self._capture_hls_segments(
+                    playlist_url, playlist['segments'], progress
+                )
+                complete = len(segments) == len(playlist['segments'])
+
+            # Progress is only needed to resume a capture that did not finish
+            if complete:
+                self._hls_progress_path(playlist_url).unlink(missing_ok=True)
+
+            result['segments'] = segments
+            result['segment_count'] = len(segments)
+            result['resumed_segments'] = sum(1 for s in segments if s.get('resumed'))
+            return result
+
         except Exception as e:
             logger.error(f"HLS playlist capture failed for {playlist_url}: {str(e)}")
             return None
 
+    def _select_hls_variants(
+        self, variants: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Apply the configured variant policy to a master playlist's streams"""
+        policy = self.config.capture.hls_variant
+        if policy == "all":
+            return variants
+
+        candidates = variants
+        max_bandwidth = self.config.capture.hls_max_bandwidth
+        if max_bandwidth:
+            # Fall back to the lowest stream when none fits under the cap
+            candidates = [v for v in variants if v['bandwidth'] <= max_bandwidth] or [
+                min(variants, key=lambda v: v['bandwidth'])
+            ]
+        pick = max if policy == "highest" else min
+        return [pick(candidates, key=lambda v: v['bandwidth'])]
+
+    async def _capture_hls_segments(
+        self, playlist_url: str, segments: List[Dict[str, Any]],
+        progress: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Download segments concurrently, in playlist order, skipping finished ones"""
+        semaphore = asyncio.Semaphore(self.config.limits.concurrent_segments)
+
+        async def capture_segment(segment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            segment_url = segment['url']
+            done = progress.get(segment_url)
+            if done and self.cas_store.has_content(done['sha256']):
+                return {**segment, 'sha256': done['sha256'], 'size': done['size'],
+                        'resumed': True}
+
+            async with semaphore:
+                try:
+                    await self._segment_limiter.acquire(segment_url)
+                    segment_response = await self._fetch_with_metadata(
+                        segment_url, store_error_body=False
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to capture segment {segment_url}: {str(e)}")
+                    return None
+            if not segment_response or segment_response['status'] >= 400:
+                # Error bodies are not segments; leave them for a resumed capture
+                return None
+
+            captured = {**segment, 'sha256': segment_response['sha256'],
+                        'size': segment_response['size']}
+            await self._record_hls_progress(playlist_url, captured)
+            return captured
+
+        results = await asyncio.gather(
+            *(capture_segment(segment) for segment in segments)
+        )
+        return [segment for segment in results if segment]
+
+    def _hls_progress_path(self, playlist_url: str) -> Path:
+        digest = hashlib.sha256(playlist_url.encode()).hexdigest()
+        return self._hls_progress_root / f"{digest}.jsonl"
+
+    async def _load_hls_progress(self, playlist_url: str) -> Dict[str, Dict[str, Any]]:
+        """Segments finished by an earlier, interrupted capture of this playlist"""
+        path = self._hls_progress_path(playlist_url)
+        progress: Dict[str, Dict[str, Any]] = {}
+        if not path.exists():
+            return progress
+        async with aiofiles.open(path, 'r') as f:
+            async for line in f:
+                try:
+                    entry = json.loads(line)
+                    progress[entry['url']] = entry
+                except (ValueError, KeyError):
+                    continue  # torn final line from the interruption
+        return progress
+
+    async def _record_hls_progress(self, playlist_url: str, segment: Dict[str, Any]):
+        path = self._hls_progress_path(playlist_url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {'url': segment['url'], 'sha256': segment['sha256'],
+                 'size': segment['size']}
+        async with aiofiles.open(path, 'a') as f:
+            await f.write(json.dumps(entry) + '\n')
+
     async def _capture_dom_snapshot(self, url: str) -> Optional[Dict[str, Any]]:
         """Capture rendered DOM snapshot (placeholder - would integrate with Playwright)"""
         # This is a placeholder for DOM snapshot functionality
@@ -3,26 +3,224 @@ Content-Addressed Store (CAS) Implementation
 Provides immutable, hash-based storage for captured web content
 """
 
+import asyncio
+import atexit
 import hashlib
 import json
 import os
+import queue
 import shutil
 import sqlite3
+import tempfile
+import threading
 import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterable, Dict, Iterator, List, Optional, Tuple
 import logging
 
+from .packs import RECORD_HEADER, PackFiles, pack_codec
+
 logger = logging.getLogger(__name__)
 
+# content_objects.cas_path of a packed object: this prefix plus the pack name
+PACKED_PATH_PREFIX = "pack:"
+
+
+class CASWriter:
+    """
+    Streams one object into a CASStore.
+
+    Chunks are hashed as they are spooled to a temp file next to the CAS tree,
+    so commit() only has to publish the file under its digest; nothing is read
+    back. Blocking file I/O: async callers go through CASStore.store_stream().
+    """
+
+    def __init__(self, store: "CASStore", content_type: Optional[str] = None):
+        self.store = store
+        self.content_type = content_type
+        self.size = 0
+        self.sha256: Optional[str] = None
+        self._hasher = hashlib.sha256()
+        fd, temp_name = tempfile.mkstemp(dir=store.tmp_root, suffix='.tmp')
+        self.temp_path = Path(temp_name)
+        self._file = os.fdopen(fd, 'wb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.sha256 is None:
+            self.abort()
+
+    def write(self, data: bytes):
+        """Append a chunk to the object being written"""
+        if self._file is None:
+            raise ValueError("CASWriter is closed")
+        self._hasher.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> str:
+        """Publish the spooled object and return its SHA256 hash"""
+        if self._file is None:
+            raise ValueError("CASWriter is closed")
+        self._file.close()
+        self._file = None
+        self.sha256 = self._hasher.hexdigest()
+        return self.store._publish(
+            self.temp_path, self.sha256, self.size, self.content_type
+        )
+
+    def abort(self):
+        """Discard everything written so far"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.temp_path.unlink(missing_ok=True)
+
+
+def manifest_hashes(manifest: Any) -> List[str]:
+    """Every CAS hash a manifest references: content, snapshots, assets and media"""
+    hashes = set()
+    stack = [manifest]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            sha256_hash = node.get('sha256')
+            if isinstance(sha256_hash, str) and sha256_hash:
+                hashes.add(sha256_hash)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return sorted(hashes)
+
+
+class CatalogWriter:
+    """
+    Owns the catalog's only write connection, on a dedicated thread
+
+    Writes are queued and committed in groups: everything waiting when the
+    thread wakes (up to MAX_BATCH) goes into one transaction, so concurrent
+    captures share an fsync instead of paying one per row.
+    """
+
+    MAX_BATCH = 512
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.pid = os.getpid()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="cas-catalog-writer", daemon=True
+        )
+        self._thread.start()
+        # Writes nobody waits on must still be committed at interpreter exit
+        atexit.register(self.close)
+
+    def submit(self, fn, *args) -> Future:
+        """Queue fn(connection, *args); the future resolves once it is committed"""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Catalog writer is closed")
+            self._pending += 1
+            self._queue.put((fn, args, future))
+        return future
+
+    def flush(self):
+        """Block until every write queued so far is committed"""
+        with self._lock:
+            idle = self._pending == 0
+        if not idle:
+            self.submit(lambda conn: None).result()
+
+    def close(self):
+        """Commit queued writes and stop the thread"""
+        if os.getpid() != self.pid:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                while len(batch) < self.MAX_BATCH:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                self._commit(conn, batch)
+                with self._lock:
+                    self._pending -= len(batch)
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[tuple]):
+        """Run a group of writes in one transaction"""
+        try:
+            with conn:
+                results = [fn(conn, *args) for fn, args, _ in batch]
+        except Exception as e:
+            if len(batch) > 1:
+                # Replay one by one so a bad write fails alone
+                for item in batch:
+                    self._commit(conn, [item])
+                return
+            logger.error(f"Catalog write failed: {e}")
+            batch[0][2].set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
 
 class CASStore:
     """Content-Addressed Store for immutable web capture storage"""
 
-    def __init__(self, storage_root: str):
+    # Chunks are coalesced to this size before each write is handed to a thread
+    SPOOL_BATCH_BYTES = 1024 * 1024
+    # Garbage collection batch size, and how long a freshly stored object is
+    # protected while the capture that stored it has no manifest yet
+    GC_BATCH_SIZE = 1000
+    GC_GRACE_SECONDS = 3600
+
+    def __init__(self, storage_root: str, pack_threshold_bytes: int = 0,
+                 max_pack_bytes: int = 256 * 1024 * 1024):
         self.storage_root = Path(storage_root)
         self.cas_root = self.storage_root / "raw" / "cas" / "sha256"
+        # Same filesystem as cas_root so publishing a spooled object is a link,
+        # not a copy
+        self.tmp_root = self.storage_root / "raw" / "cas" / "tmp"
+        # Objects smaller than pack_threshold_bytes are appended to compressed
+        # pack files instead of getting a file each; 0 keeps every object loose.
+        # Packed objects are readable whatever the threshold.
+        self.pack_threshold_bytes = pack_threshold_bytes
+        self.packs = PackFiles(self.storage_root / "raw" / "cas" / "packs",
+                               max_pack_bytes)
         self.runs_root = self.storage_root / "raw" / "runs"
         self.derived_root = self.storage_root / "derived"
         self.index_root = self.storage_root / "index"
@@ -34,14 +232,23 @@ class CASStore:
         self.catalog_db = self.index_root / "catalog.sqlite"
         self._init_catalog()
 
+        # Catalog connections are opened on first use and reused
+        self._pid = os.getpid()
+        self._writer: Optional[CatalogWriter] = None
+        self._writer_lock = threading.Lock()
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+
     def _init_storage(self):
         """Initialize the storage directory structure"""
-        for path in [self.cas_root, self.runs_root, self.derived_root, self.index_root]:
+        for path in [self.cas_root, self.tmp_root, self.runs_root,
+                     self.derived_root, self.index_root]:
             path.mkdir(parents=True, exist_ok=True)
 
     def _init_catalog(self):
         """Initialize the catalog database for fast lookups"""
         conn = sqlite3.connect(self.catalog_db)
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS captures (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -60,6 +267,7 @@ class CASStore:
                 asset_count INTEGER DEFAULT 0,
                 media_count INTEGER DEFAULT 0,
                 created_at TEXT NOT NULL,
+                refs_indexed INTEGER NOT NULL DEFAULT 0,
                 UNIQUE(url, timestamp, run_id)
             )
         """)
@@ -85,13 +293,141 @@ class CASStore:
                 content_type TEXT,
                 first_seen TEXT NOT NULL,
                 reference_count INTEGER DEFAULT 0,
-                cas_path TEXT NOT NULL
+                cas_path TEXT NOT NULL,
+                last_stored TEXT
             )
         """)
         
+        # Every hash a manifest references, so GC never sees assets or media as orphans
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS capture_refs (
+                capture_id INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (capture_id, sha256)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_capture_refs_sha256 ON capture_refs(sha256)
+        """)
+
+        # Location of packed objects; offset and length address the compressed
+        # record body
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pack_index (
+                sha256 TEXT PRIMARY KEY,
+                pack TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pack_index_pack ON pack_index(pack)
+        """)
+
+        # Resumable garbage collection progress
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS gc_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+        self._migrate_catalog(conn)
+
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_captures_unindexed
+            ON captures(id) WHERE refs_indexed = 0
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_objects_unreferenced
+            ON content_objects(sha256) WHERE reference_count <= 0
+        """)
+
         conn.commit()
         conn.close()
 
+    def _migrate_catalog(self, conn: sqlite3.Connection):
+        """Bring catalogs created before reference tracking up to date"""
+        object_columns = {
+            row[1] for row in conn.execute("PRAGMA table_info(content_objects)")
+        }
+        if 'last_stored' not in object_columns:
+            conn.execute("ALTER TABLE content_objects ADD COLUMN last_stored TEXT")
+            conn.execute("UPDATE content_objects SET last_stored = first_seen")
+
+        capture_columns = {
+            row[1] for row in conn.execute("PRAGMA table_info(captures)")
+        }
+        if 'refs_indexed' not in capture_columns:
+            conn.execute(
+                "ALTER TABLE captures "
+                "ADD COLUMN refs_indexed INTEGER NOT NULL DEFAULT 0"
+            )
+            # Old counts tallied stores, not references; the GC mark phase
+            # recounts them from the manifests
+            conn.execute("UPDATE content_objects SET reference_count = 0")
+
+        # Packed objects used to be recorded with their pack file's path
+        conn.execute("""
+            UPDATE content_objects
+            SET cas_path = ? || (SELECT pack FROM pack_index
+                                 WHERE pack_index.sha256 = content_objects.sha256)
+            WHERE sha256 IN (SELECT sha256 FROM pack_index) AND cas_path NOT LIKE ?
+        """, (PACKED_PATH_PREFIX, PACKED_PATH_PREFIX + '%'))
+
+    def _check_fork(self):
+        """Drop connections and the writer thread inherited from a parent process"""
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._writer = None
+            self._writer_lock = threading.Lock()
+            self._read_conn = None
+            self._read_lock = threading.Lock()
+
+    def _catalog_writer(self) -> CatalogWriter:
+        """The catalog writer thread, started on first write"""
+        self._check_fork()
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = CatalogWriter(self.catalog_db)
+            return self._writer
+
+    @contextmanager
+    def _catalog_reader(self, flush: bool = True):
+        """
+        Shared read connection; sees every write queued before the call unless
+        flush is False
+        """
+        if flush:
+            self.flush()
+        with self._read_lock:
+            if self._read_conn is None:
+                conn = sqlite3.connect(
+                    self.catalog_db, timeout=30, check_same_thread=False
+                )
+                conn.row_factory = sqlite3.Row
+                self._read_conn = conn
+            yield self._read_conn
+
+    def flush(self):
+        """Wait until every queued catalog write is committed"""
+        self._check_fork()
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self):
+        """Commit queued catalog writes and release connections"""
+        self._check_fork()
+        self.packs.close()
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
     def _compute_sha256(self, data: bytes) -> str:
         """Compute SHA256 hash of data"""
         return hashlib.sha256(data).hexdigest()
@@ -106,58 +442,184 @@ class CASStore:
         Store content in CAS and return SHA256 hash
         Returns existing hash if content already exists
         """
-        sha256_hash = self._compute_sha256(data)
+        with self.open_writer(content_type) as writer:
+            writer.write(data)
+            return writer.commit()
+
+    def open_writer(self, content_type: Optional[str] = None) -> CASWriter:
+        """Start a streaming write; commit() returns the SHA256 hash"""
+        return CASWriter(self, content_type)
+
+    async def store_stream(self, chunks: AsyncIterable[bytes],
+                           content_type: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Store an async stream of chunks without buffering it in memory
+        Returns (sha256, size). File and catalog I/O run in worker threads;
+        if the stream raises, the partial object is discarded.
+        """
+        loop = asyncio.get_running_loop()
+        writer = await loop.run_in_executor(None, self.open_writer, content_type)
+        try:
+            pending: List[bytes] = []
+            pending_bytes = 0
+            async for chunk in chunks:
+                pending.append(chunk)
+                pending_bytes += len(chunk)
+                if pending_bytes >= self.SPOOL_BATCH_BYTES:
+                    await loop.run_in_executor(None, writer.write, b''.join(pending))
+                    pending, pending_bytes = [], 0
+            if pending:
+                await loop.run_in_executor(None, writer.write, b''.join(pending))
+            sha256_hash = await loop.run_in_executor(None, writer.commit)
+            return sha256_hash, writer.size
+        except BaseException:
+            writer.abort()
+            raise
+
+    def _publish(self, temp_path: Path, sha256_hash: str, size: int,
+                 content_type: Optional[str]) -> str:
+        """Move a fully written temp file to its CAS path, deduplicating"""
         cas_path = self._get_cas_path(sha256_hash)
-        
-        # Check if content already exists
-        if cas_path.exists():
-            # Update reference count
-            self._update_reference_count(sha256_hash, increment=1)
-            return sha256_hash
-            
-        # Store new content
+        # Objects stored loose before packing was enabled stay loose
+        if 0 < size < self.pack_threshold_bytes and not cas_path.exists():
+            return self._publish_packed(temp_path, sha256_hash, size, content_type)
+
         cas_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Atomic write: write to temp file then move
-        temp_path = cas_path.with_suffix('.tmp')
+
+        # Make read-only before it becomes visible under its hash
+        temp_path.chmod(0o444)
         try:
-            with open(temp_path, 'wb') as f:
-                f.write(data)
-            
-            # Verify integrity
-            with open(temp_path, 'rb') as f:
-                verify_hash = self._compute_sha256(f.read())
-            
-            if verify_hash != sha256_hash:
-                temp_path.unlink()
-                raise ValueError(f"Hash mismatch: expected {sha256_hash}, got {verify_hash}")
-            
-            # Atomic move
-            temp_path.rename(cas_path)
-            
-            # Make read-only
-            cas_path.chmod(0o444)
-            
-            # Record in catalog
-            self._record_content_object(sha256_hash, len(data), content_type, str(cas_path))
-            
-            logger.info(f"Stored content with hash {sha256_hash} ({len(data)} bytes)")
-            return sha256_hash
-            
-        except Exception as e:
-            if temp_path.exists():
-                temp_path.unlink()
-            raise e
+            created = self._link_object(temp_path, cas_path)
+            # Record in catalog without waiting; the capture's manifest commit
+            # (or any catalog read) flushes it
+            recorded = self._record_content_object(
+                sha256_hash, size, content_type, str(cas_path)
+            )
+            if not created:
+                # A sweep may be deleting the existing copy. Once the refresh
+                # commits the grace period protects it; if the sweep got there
+                # first, publish this copy again
+                recorded.result()
+                if not cas_path.exists():
+                    created = self._link_object(temp_path, cas_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        if created:
+            logger.info(f"Stored content with hash {sha256_hash} ({size} bytes)")
+        return sha256_hash
+
+    @staticmethod
+    def _link_object(temp_path: Path, cas_path: Path) -> bool:
+        """Link a spooled object into place; False if the object already exists"""
+        try:
+            # link() refuses to overwrite, so concurrent writers of the same
+            # content agree on exactly one of them creating the object
+            os.link(temp_path, cas_path)
+            return True
+        except FileExistsError:
+            return False
+
+    def _publish_packed(self, temp_path: Path, sha256_hash: str, size: int,
+                        content_type: Optional[str]) -> str:
+        """Append a small spooled object to the current pack file, deduplicating"""
+        try:
+            # Not flushed, to keep small writes group-committed; an entry still
+            # queued only costs a duplicate record that repack drops
+            created = (self._pack_location(sha256_hash, flush=False) is None
+                       or not self._refresh_packed_object(sha256_hash))
+            if created:
+                pack_name, offset, length = self.packs.append(
+                    sha256_hash, temp_path.read_bytes()
+                )
+                now = datetime.utcnow().isoformat()
+                self._catalog_writer().submit(self._insert_packed_object, (
+                    sha256_hash, pack_name, offset, length
+                ), (sha256_hash, size, content_type, now, sha256_hash, now))
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        if created:
+            logger.info(f"Packed content with hash {sha256_hash} ({size} bytes)")
+        return sha256_hash
+
+    def _refresh_packed_object(self, sha256_hash: str) -> bool:
+        """Bump last_stored of a packed object; False if GC removed it meanwhile"""
+        now = datetime.utcnow().isoformat()
+        # Waited on, and checked under the write lock, so a sweep cannot
+        # delete the object between this check and the caller returning
+        return self._catalog_writer().submit(
+            self._touch_packed_object, sha256_hash, now
+        ).result()
+
+    @staticmethod
+    def _touch_packed_object(conn: sqlite3.Connection, sha256_hash: str,
+                             now: str) -> bool:
+        packed = conn.execute(
+            "SELECT 1 FROM pack_index WHERE sha256 = ?", (sha256_hash,)
+        ).fetchone()
+        if packed is None:
+            return False
+        conn.execute(
+            "UPDATE content_objects SET last_stored = ? WHERE sha256 = ?",
+            (now, sha256_hash)
+        )
+        return True
+
+    @staticmethod
+    def _insert_packed_object(conn: sqlite3.Connection, entry: tuple, row: tuple):
+        # The first index entry for a hash wins; later copies are dead space.
+        # content_objects names the winning pack with a marker, not a file path
+        conn.execute(
+            "INSERT OR IGNORE INTO pack_index (sha256, pack, offset, length) "
+            "VALUES (?, ?, ?, ?)",
+            entry
+        )
+        conn.execute("""
+            INSERT INTO content_objects
+            (sha256, size, content_type, first_seen, reference_count, cas_path,
+             last_stored)
+            SELECT ?, ?, ?, ?, (SELECT COUNT(*) FROM capture_refs WHERE sha256 = ?),
+                   ? || pack, ?
+            FROM pack_index WHERE sha256 = ?
+            ON CONFLICT(sha256) DO UPDATE SET last_stored = excluded.last_stored
+        """, (*row[:5], PACKED_PATH_PREFIX, row[5], row[0]))
+
+    def _pack_location(self, sha256_hash: str,
+                       flush: bool = True) -> Optional[Tuple[str, int, int]]:
+        """(pack, offset, length) of a packed object, or None"""
+        with self._catalog_reader(flush) as conn:
+            row = conn.execute(
+                "SELECT pack, offset, length FROM pack_index WHERE sha256 = ?",
+                (sha256_hash,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def _read_packed(self, sha256_hash: str) -> Optional[bytes]:
+        """Read a packed object, or None if it is not in any pack"""
+        # A concurrent repack can delete the pack between lookup and read;
+        # by then the index points at the object's new pack
+        for _ in range(2):
+            location = self._pack_location(sha256_hash)
+            if location is None:
+                return None
+            try:
+                return self.packs.read(*location)
+            except FileNotFoundError:
+                continue
+        return None
 
     def retrieve_content(self, sha256_hash: str) -> bytes:
         """Retrieve content by SHA256 hash"""
         cas_path = self._get_cas_path(sha256_hash)
         
-        if not cas_path.exists():
-            raise FileNotFoundError(f"Content not found for hash {sha256_hash}")
-        
-        with open(cas_path, 'rb') as f:
-            content = f.read()
+        if cas_path.exists():
+            with open(cas_path, 'rb') as f:
+                content = f.read()
+        else:
+            content = self._read_packed(sha256_hash)
+            if content is None:
+                raise FileNotFoundError(f"Content not found for hash {sha256_hash}")
         
         # Verify integrity
         verify_hash = self._compute_sha256(content)
@@ -166,11 +628,30 @@ class CASStore:
         
         return content
 
+    def has_content(self, sha256_hash: str) -> bool:
+        """Whether an object with this hash is stored"""
+        return (self._get_cas_path(sha256_hash).exists()
+                or self._pack_location(sha256_hash) is not None)
+
     def create_manifest(self, run_id: str, url: str, capture_data: Dict[str, Any]) -> str:
         """
         Create a capture manifest and return the manifest path
         This should only be called after all referenced content is stored in CAS
         """
+        manifest, manifest_path = self.write_manifest(run_id, url, capture_data)
+
+        # Record in catalog; commits together with the capture's queued object rows
+        self.record_capture_batch([(manifest, manifest_path)])
+
+        logger.info(f"Created manifest for {url} in {manifest_path}")
+        return manifest_path
+
+    def write_manifest(self, run_id: str, url: str,
+                       capture_data: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """
+        Write a capture manifest file without cataloguing it
+        Returns (manifest, path) for a later record_capture_batch() call.
+        """
         timestamp = capture_data.get('fetch_start', datetime.utcnow().isoformat() + 'Z')
         host = self._extract_host(url)
         
@@ -212,11 +693,7 @@ class CASStore:
             temp_manifest.rename(manifest_path)
             manifest_path.chmod(0o444)  # Read-only
             
-            # Record in catalog
-            self._record_capture_manifest(manifest, str(manifest_path))
-            
-            logger.info(f"Created manifest for {url} in {manifest_path}")
-            return str(manifest_path)
+            return manifest, str(manifest_path)
             
         except Exception as e:
             if temp_manifest.exists():
@@ -228,63 +705,108 @@ class CASStore:
         from urllib.parse import urlparse
         return urlparse(url).netloc or "unknown"
 
-    def _record_content_object(self, sha256_hash: str, size: int, content_type: Optional[str], cas_path: str):
-        """Record content object in catalog"""
-        conn = sqlite3.connect(self.catalog_db)
-        try:
-            conn.execute("""
-                INSERT OR IGNORE INTO content_objects 
-                (sha256, size, content_type, first_seen, reference_count, cas_path)
-                VALUES (?, ?, ?, ?, 1, ?)
-            """, (sha256_hash, size, content_type, datetime.utcnow().isoformat(), cas_path))
-            conn.commit()
-        finally:
-            conn.close()
+    def _record_content_object(self, sha256_hash: str, size: int,
+                               content_type: Optional[str], cas_path: str) -> Future:
+        """Queue the catalog row for a stored object, or refresh an existing one"""
+        now = datetime.utcnow().isoformat()
+        return self._catalog_writer().submit(self._upsert_content_object, (
+            sha256_hash, size, content_type, now, sha256_hash, cas_path, now
+        ))
 
-    def _update_reference_count(self, sha256_hash: str, increment: int):
-        """Update reference count for content object"""
-        conn = sqlite3.connect(self.catalog_db)
-        try:
-            conn.execute("""
-                UPDATE content_objects 
-                SET reference_count = reference_count + ? 
-                WHERE sha256 = ?
-            """, (increment, sha256_hash))
-            conn.commit()
-        finally:
-            conn.close()
+    @staticmethod
+    def _upsert_content_object(conn: sqlite3.Connection, row: tuple):
+        # last_stored keeps GC away from objects a capture in progress is about
+        # to reference
+        conn.execute("""
+            INSERT INTO content_objects
+            (sha256, size, content_type, first_seen, reference_count, cas_path,
+             last_stored)
+            VALUES (?, ?, ?, ?,
+                    (SELECT COUNT(*) FROM capture_refs WHERE sha256 = ?), ?, ?)
+            ON CONFLICT(sha256) DO UPDATE SET last_stored = excluded.last_stored
+        """, row)
 
-    def _record_capture_manifest(self, manifest: Dict[str, Any], manifest_path: str):
-        """Record capture manifest in catalog"""
-        conn = sqlite3.connect(self.catalog_db)
-        try:
-            content = manifest.get('content', {})
-            conn.execute("""
+    def record_capture_batch(self, captures: List[Tuple[Dict[str, Any], str]]) -> int:
+        """
+        Record (manifest, manifest_path) pairs in the catalog in one transaction
+        Every hash each manifest references is tracked for garbage collection.
+        Blocks until committed; returns the number of captures recorded.
+        """
+        created_at = datetime.utcnow().isoformat()
+        rows = [
+            (self._capture_row(manifest, path, created_at), manifest_hashes(manifest))
+            for manifest, path in captures
+        ]
+        if not rows:
+            return 0
+        return self._catalog_writer().submit(self._insert_captures, rows).result()
+
+    def _capture_row(self, manifest: Dict[str, Any], manifest_path: str,
+                     created_at: str) -> tuple:
+        content = manifest.get('content', {})
+        return (
+            manifest['url'],
+            manifest['final_url'],
+            manifest['fetch_start'],
+            manifest['run_id'],
+            self._extract_host(manifest['url']),
+            manifest['status'],
+            content.get('sha256', ''),
+            content.get('content_type', ''),
+            content.get('size', 0),
+            manifest_path,
+            bool(manifest.get('dom_snapshot')),
+            bool(manifest.get('har_capture')),
+            len(manifest.get('assets', [])),
+            len(manifest.get('media', [])),
+            created_at
+        )
+
+    @classmethod
+    def _insert_captures(cls, conn: sqlite3.Connection,
+                         captures: List[Tuple[tuple, List[str]]]) -> int:
+        for row, hashes in captures:
+            # A re-recorded capture replaces the old row; release its references first
+            existing = conn.execute(
+                "SELECT id FROM captures "
+                "WHERE url = ? AND timestamp = ? AND run_id = ?",
+                (row[0], row[2], row[3])
+            ).fetchone()
+            if existing:
+                cls._release_captures(conn, [existing[0]])
+
+            cursor = conn.execute("""
                 INSERT OR REPLACE INTO captures
-                (url, final_url, timestamp, run_id, host, status, content_sha256, 
-                 content_type, content_size, manifest_path, has_dom_snapshot, 
-                 has_har, asset_count, media_count, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                manifest['url'],
-                manifest['final_url'], 
-                manifest['fetch_start'],
-                manifest['run_id'],
-                self._extract_host(manifest['url']),
-                manifest['status'],
-                content.get('sha256', ''),
-                content.get('content_type', ''),
-                content.get('size', 0),
-                manifest_path,
-                bool(manifest.get('dom_snapshot')),
-                bool(manifest.get('har_capture')),
-                len(manifest.get('assets', [])),
-                len(manifest.get('media', [])),
-                datetime.utcnow().isoformat()
-            ))
-            conn.commit()
-        finally:
-            conn.close()
+                (url, final_url, timestamp, run_id, host, status, content_sha256,
+                 content_type, content_size, manifest_path, has_dom_snapshot,
+                 has_har, asset_count, media_count, created_at, refs_indexed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+            """, row)
+            cls._add_capture_refs(conn, cursor.lastrowid, hashes)
+        return len(captures)
+
+    @staticmethod
+    def _add_capture_refs(conn: sqlite3.Connection, capture_id: int, hashes: List[str]):
+        conn.executemany(
+            "INSERT INTO capture_refs (capture_id, sha256) VALUES (?, ?)",
+            [(capture_id, sha256_hash) for sha256_hash in hashes]
+        )
+        conn.executemany(
+            "UPDATE content_objects SET reference_count = reference_count + 1 "
+            "WHERE sha256 = ?",
+            [(sha256_hash,) for sha256_hash in hashes]
+        )
+
+    @staticmethod
+    def _release_captures(conn: sqlite3.Connection, capture_ids: List[int]):
+        """Drop captures and their references, keeping counts in step"""
+        ids = [(capture_id,) for capture_id in capture_ids]
+        conn.executemany("""
+            UPDATE content_objects SET reference_count = reference_count - 1
+            WHERE sha256 IN (SELECT sha256 FROM capture_refs WHERE capture_id = ?)
+        """, ids)
+        conn.executemany("DELETE FROM capture_refs WHERE capture_id = ?", ids)
+        conn.executemany("DELETE FROM captures WHERE id = ?", ids)
 
     def query_captures(self, 
                       url: Optional[str] = None,
@@ -292,9 +814,6 @@ class CASStore:
                       since: Optional[datetime] = None,
                       limit: int = 100) -> List[Dict[str, Any]]:
         """Query captured URLs with optional filters"""
-        conn = sqlite3.connect(self.catalog_db)
-        conn.row_factory = sqlite3.Row
-        
         query = "SELECT * FROM captures WHERE 1=1"
         params = []
         
@@ -313,37 +832,66 @@ class CASStore:
         query += " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
         
-        try:
+        with self._catalog_reader() as conn:
             cursor = conn.execute(query, params)
             results = [dict(row) for row in cursor.fetchall()]
             return results
-        finally:
-            conn.close()
+
+    def iter_captures(self, run_id: str,
+                      batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every capture of a run in catalog order, without a row limit
+        Pages by id so the read connection is not held between batches.
+        """
+        last_id = 0
+        while True:
+            rows = self.capture_batch(run_id, last_id, batch_size)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]['id']
+
+    def capture_batch(self, run_id: str, after_id: int = 0,
+                      batch_size: int = 500) -> List[Dict[str, Any]]:
+        """Up to batch_size captures of a run with id above after_id, in id order"""
+        with self._catalog_reader() as conn:
+            rows = conn.execute(
+                "SELECT * FROM captures WHERE run_id = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (run_id, after_id, batch_size)
+            ).fetchall()
+        return [dict(row) for row in rows]
 
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics"""
-        conn = sqlite3.connect(self.catalog_db)
-        
-        # Capture statistics
-        cursor = conn.execute("SELECT COUNT(*) as total_captures FROM captures")
-        total_captures = cursor.fetchone()[0]
-        
-        cursor = conn.execute("SELECT COUNT(DISTINCT url) as unique_urls FROM captures")
-        unique_urls = cursor.fetchone()[0]
-        
-        cursor = conn.execute("SELECT COUNT(DISTINCT run_id) as total_runs FROM captures")
-        total_runs = cursor.fetchone()[0]
-        
-        # Content statistics
-        cursor = conn.execute("""
-            SELECT COUNT(*) as total_objects, 
-                   SUM(size) as total_bytes,
-                   SUM(reference_count) as total_references
-            FROM content_objects
-        """)
-        content_stats = cursor.fetchone()
-        
-        conn.close()
+        with self._catalog_reader() as conn:
+            # Capture statistics
+            cursor = conn.execute("SELECT COUNT(*) as total_captures FROM captures")
+            total_captures = cursor.fetchone()[0]
+
+            cursor = conn.execute(
+                "SELECT COUNT(DISTINCT url) as unique_urls FROM captures"
+            )
+            unique_urls = cursor.fetchone()[0]
+
+            cursor = conn.execute(
+                "SELECT COUNT(DISTINCT run_id) as total_runs FROM captures"
+            )
+            total_runs = cursor.fetchone()[0]
+
+            # Content statistics
+            cursor = conn.execute("""
+                SELECT COUNT(*) as total_objects,
+                       SUM(size) as total_bytes,
+                       SUM(reference_count) as total_references
+                FROM content_objects
+            """)
+            content_stats = cursor.fetchone()
+
+            cursor = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT pack) FROM pack_index"
+            )
+            pack_stats = cursor.fetchone()
         
         # Calculate deduplication savings
         total_logical_bytes = total_captures * (content_stats[1] / max(content_stats[0], 1))
@@ -359,29 +907,102 @@ class CASStore:
                 "total_objects": content_stats[0],
                 "total_bytes": content_stats[1], 
                 "total_references": content_stats[2],
+                "packed_objects": pack_stats[0],
+                "pack_files": pack_stats[1],
                 "deduplication_savings": f"{savings_ratio:.1%}"
             },
             "storage_root": str(self.storage_root)
         }
 
-    def cleanup_old_content(self, retention_days: int) -> Dict[str, int]:
-        """Clean up old content based on retention policy"""
+    def cleanup_old_content(self, retention_days: int,
+                            batch_size: Optional[int] = None,
+                            max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Clean up old content based on retention policy
+        Incremental mark-and-sweep: index references of captures recorded
+        before reference tracking, expire captures past retention, then delete
+        objects no manifest references. Each batch is its own short
+        transaction. With max_batches the call stops early ("complete" is
+        False) and the next call resumes where it left off.
+        """
+        batch_size = batch_size or self.GC_BATCH_SIZE
         cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
         cutoff_str = cutoff_date.isoformat()
         
-        conn = sqlite3.connect(self.catalog_db)
-        
-        # Find old captures
-        cursor = conn.execute("""
-            SELECT manifest_path FROM captures 
-            WHERE timestamp < ?
-        """, (cutoff_str,))
+        stats = {
+            "indexed_captures": 0,
+            "deleted_manifests": 0,
+            "deleted_content_objects": 0,
+            "retention_cutoff": cutoff_str,
+            "complete": False
+        }
+        phases = [
+            ("indexed_captures", lambda: self._gc_mark_batch(batch_size)),
+            ("deleted_manifests",
+             lambda: self._gc_expire_batch(cutoff_str, batch_size)),
+            ("deleted_content_objects", lambda: self._gc_sweep_batch(batch_size))
+        ]
+
+        batches = 0
+        for key, run_batch in phases:
+            finished = False
+            while not finished:
+                if max_batches is not None and batches >= max_batches:
+                    return stats
+                count, finished = run_batch()
+                stats[key] += count
+                batches += 1
+
+        stats["complete"] = True
+        return stats
+
+    def _gc_mark_batch(self, batch_size: int) -> Tuple[int, bool]:
+        """Record the references of captures catalogued before reference tracking"""
+        with self._catalog_reader() as conn:
+            rows = conn.execute(
+                "SELECT id, manifest_path FROM captures WHERE refs_indexed = 0 "
+                "ORDER BY id LIMIT ?",
+                (batch_size,)
+            ).fetchall()
         
-        old_manifests = [row[0] for row in cursor.fetchall()]
+        indexed = []
+        for capture_id, manifest_path in rows:
+            try:
+                with open(manifest_path, 'r') as f:
+                    hashes = manifest_hashes(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(
+                    f"Cannot read manifest {manifest_path} for GC marking: {e}"
+                )
+                hashes = []
+            indexed.append((capture_id, hashes))
+
+        if indexed:
+            self._catalog_writer().submit(self._mark_captures, indexed).result()
+        return len(indexed), len(rows) < batch_size
+
+    @classmethod
+    def _mark_captures(cls, conn: sqlite3.Connection,
+                       indexed: List[Tuple[int, List[str]]]):
+        for capture_id, hashes in indexed:
+            cls._add_capture_refs(conn, capture_id, hashes)
+            conn.execute(
+                "UPDATE captures SET refs_indexed = 1 WHERE id = ?", (capture_id,)
+            )
+
+    def _gc_expire_batch(self, cutoff_str: str, batch_size: int) -> Tuple[int, bool]:
+        """Delete one batch of captures older than the retention cutoff"""
+        with self._catalog_reader() as conn:
+            rows = conn.execute(
+                "SELECT id, manifest_path FROM captures WHERE timestamp < ? "
+                "ORDER BY timestamp LIMIT ?",
+                (cutoff_str, batch_size)
+            ).fetchall()
         
-        # Delete manifest files and directories
+        # Files first: a crash then leaves rows whose manifests are already gone,
+        # which the next run simply finishes deleting
         deleted_manifests = 0
-        for manifest_path in old_manifests:
+        for _, manifest_path in rows:
             try:
                 path = Path(manifest_path)
                 if path.exists():
@@ -396,43 +1017,128 @@ class CASStore:
             except Exception as e:
                 logger.warning(f"Failed to delete manifest {manifest_path}: {e}")
         
-        # Remove from catalog
-        conn.execute("DELETE FROM captures WHERE timestamp < ?", (cutoff_str,))
-        
-        # Clean up unreferenced content objects (garbage collection)
-        cursor = conn.execute("""
-            SELECT co.sha256, co.cas_path 
-            FROM content_objects co
-            LEFT JOIN captures c ON co.sha256 = c.content_sha256
-            WHERE c.content_sha256 IS NULL
-        """)
-        
-        unreferenced_objects = cursor.fetchall()
-        deleted_objects = 0
-        
-        for sha256_hash, cas_path in unreferenced_objects:
-            try:
-                path = Path(cas_path)
-                if path.exists():
-                    path.unlink()
-                deleted_objects += 1
-            except Exception as e:
-                logger.warning(f"Failed to delete content object {sha256_hash}: {e}")
-        
-        # Remove unreferenced objects from catalog
-        conn.execute("""
-            DELETE FROM content_objects 
-            WHERE sha256 NOT IN (
-                SELECT DISTINCT content_sha256 FROM captures 
-                WHERE content_sha256 != ''
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        if rows:
+            capture_ids = [row[0] for row in rows]
+            self._catalog_writer().submit(self._release_captures, capture_ids).result()
+        return deleted_manifests, len(rows) < batch_size
+
+    def _gc_sweep_batch(self, batch_size: int) -> Tuple[int, bool]:
+        """Delete one batch of unreferenced objects, resuming from the saved cursor"""
+        grace = timedelta(seconds=self.GC_GRACE_SECONDS)
+        grace_cutoff = (datetime.utcnow() - grace).isoformat()
         
-        return {
-            "deleted_manifests": deleted_manifests,
-            "deleted_content_objects": deleted_objects,
-            "retention_cutoff": cutoff_str
-        }
+        with self._catalog_reader() as conn:
+            row = conn.execute(
+                "SELECT value FROM gc_state WHERE key = 'sweep_cursor'"
+            ).fetchone()
+            cursor = row[0] if row else ''
+            candidates = conn.execute("""
+                SELECT sha256 FROM content_objects
+                WHERE reference_count <= 0 AND sha256 > ?
+                ORDER BY sha256 LIMIT ?
+            """, (cursor, batch_size)).fetchall()
+
+        finished = len(candidates) < batch_size
+        next_cursor = '' if finished else candidates[-1][0]
+        deleted_objects = self._catalog_writer().submit(
+            self._delete_unreferenced, [c[0] for c in candidates], grace_cutoff,
+            next_cursor
+        ).result()
+        return deleted_objects, finished
+
+    def _delete_unreferenced(self, conn: sqlite3.Connection, candidates: List[str],
+                             grace_cutoff: str, next_cursor: str) -> int:
+        # Re-checked under the write lock: a capture may have referenced or
+        # re-stored the object since it was selected. Files are unlinked inside
+        # the same transaction, so a re-store (which refreshes the row through
+        # this writer) either keeps the object or finds it gone and re-publishes
+        deleted = 0
+        for sha256_hash in candidates:
+            cursor = conn.execute("""
+                DELETE FROM content_objects
+                WHERE sha256 = ? AND reference_count <= 0
+                  AND COALESCE(last_stored, first_seen) < ?
+            """, (sha256_hash, grace_cutoff))
+            if not cursor.rowcount:
+                continue
+            packed = conn.execute(
+                "DELETE FROM pack_index WHERE sha256 = ?", (sha256_hash,)
+            ).rowcount > 0
+            if not packed:
+                # The path comes from the hash, never from the catalog row
+                try:
+                    self._get_cas_path(sha256_hash).unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(
+                        f"Failed to delete content object {sha256_hash}: {e}"
+                    )
+            # Packed objects' space is reclaimed by repack()
+            deleted += 1
+        conn.execute(
+            "INSERT OR REPLACE INTO gc_state (key, value) VALUES ('sweep_cursor', ?)",
+            (next_cursor,)
+        )
+        return deleted
+
+    def repack(self, min_dead_ratio: float = 0.5) -> Dict[str, Any]:
+        """
+        Compact pack files
+        Live objects are copied (still compressed) out of packs that are at
+        least min_dead_ratio garbage, or under a quarter of the pack size
+        limit, into the current pack; the old packs are then deleted. Packs
+        modified within the GC grace period are skipped since another
+        process may still be appending to them.
+        """
+        quiet_before = time.time() - self.GC_GRACE_SECONDS
+        stats = {"packs_rewritten": 0, "objects_moved": 0, "bytes_reclaimed": 0}
+
+        for pack_name, pack_size, mtime in self.packs.sealed_packs():
+            if mtime > quiet_before:
+                continue
+            with self._catalog_reader() as conn:
+                live = conn.execute(
+                    "SELECT sha256, offset, length FROM pack_index "
+                    "WHERE pack = ? ORDER BY offset",
+                    (pack_name,)
+                ).fetchall()
+            live_bytes = sum(RECORD_HEADER.size + length for _, _, length in live)
+            dead_ratio = 1 - live_bytes / pack_size if pack_size else 1
+            small = pack_size < self.packs.max_pack_bytes // 4
+            if dead_ratio < min_dead_ratio and not small:
+                continue
+
+            moved = []
+            for sha256_hash, offset, length in live:
+                compressed = self.packs.read_raw(pack_name, offset, length)
+                new_location = self.packs.append_compressed(
+                    sha256_hash, compressed, pack_codec(pack_name)
+                )
+                moved.append((*new_location, sha256_hash, pack_name))
+
+            # Copies are durable before the index points at them, and the
+            # index is committed before the old pack disappears
+            self.packs.sync()
+            if moved:
+                self._catalog_writer().submit(self._move_pack_entries, moved).result()
+            self.packs.remove(pack_name)
+
+            stats["packs_rewritten"] += 1
+            stats["objects_moved"] += len(moved)
+            stats["bytes_reclaimed"] += pack_size - live_bytes
+            logger.info(f"Repacked {pack_name}: moved {len(moved)} objects")
+
+        return stats
+
+    @staticmethod
+    def _move_pack_entries(conn: sqlite3.Connection, moved: List[tuple]):
+        # Matching on the old pack leaves entries GC deleted in the meantime deleted
+        conn.executemany(
+            "UPDATE pack_index SET pack = ?, offset = ?, length = ? "
+            "WHERE sha256 = ? AND pack = ?",
+            moved
+        )
+        conn.executemany(
+            "UPDATE content_objects SET cas_path = ? WHERE sha256 = ? AND cas_path = ?",
+            [(PACKED_PATH_PREFIX + new_pack, sha256_hash, PACKED_PATH_PREFIX + old_pack)
+             for new_pack, _, _, sha256_hash, old_pack in moved]
+        )
@@ -23,6 +23,9 @@ class CaptureConfig:
     assets: bool = True
     follow_redirects: bool = True
     max_redirects: int = 10
+    # "highest", "lowest" or "all" variant streams of a master playlist
+    hls_variant: str = "highest"
+    hls_max_bandwidth: Optional[int] = None  # bits/s cap before picking a variant
 
 
 @dataclass 
@@ -34,6 +37,8 @@ class StorageConfig:
     s3_prefix: Optional[str] = None
     compression: bool = False
     encryption: bool = False
+    pack_threshold_bytes: int = 0  # objects below this go into pack files; 0 disables
+    max_pack_bytes: int = 256 * 1024 * 1024  # 256MB
 
 
 @dataclass
@@ -45,6 +50,8 @@ class LimitsConfig:
     concurrent_per_domain: int = 2
     timeout_sec: int = 30
     rate_limit_rps: float = 2.0
+    concurrent_segments: int = 6  # HLS segment downloads in flight per playlist
+    segment_rate_limit_rps: float = 10.0  # per host
 
 
 @dataclass
@@ -77,6 +84,8 @@ class ProcessingConfig:
     ])
     async_processing: bool = True
     max_processing_workers: int = 4
+    execution_mode: str = "process"  # "process" (worker pool) or "inline" (event loop)
+    max_in_flight: int = 0  # manifests queued per run; 0 = 2x max_processing_workers
     retry_failed: bool = True
     retry_max_attempts: int = 3
 
@@ -202,6 +211,12 @@ class CFPLConfigManager:
         if config.storage.backend == "s3" and not config.storage.s3_bucket:
             raise ValueError("S3 bucket required when using S3 storage backend")
             
+        if config.storage.pack_threshold_bytes < 0:
+            raise ValueError("pack_threshold_bytes must not be negative")
+
+        if config.storage.max_pack_bytes <= 0:
+            raise ValueError("max_pack_bytes must be positive")
+
         # Validate limits
         if config.limits.concurrent_fetches <= 0:
             raise ValueError("concurrent_fetches must be positive")
@@ -212,6 +227,14 @@ class CFPLConfigManager:
         if config.limits.timeout_sec <= 0:
             raise ValueError("timeout_sec must be positive")
             
+        if config.limits.concurrent_segments <= 0:
+            raise ValueError("concurrent_segments must be positive")
+
+        if config.capture.hls_variant not in ["highest", "lowest", "all"]:
+            raise ValueError(
+                f"Invalid HLS variant policy: {config.capture.hls_variant}"
+            )
+
         # Validate retention
         if config.retention.raw_years <= 0:
             logger.warning("raw_years should be positive for data retention")
@@ -228,6 +251,15 @@ class CFPLConfigManager:
         for processor in config.processing.enabled_processors:
             if processor not in valid_processors:
                 logger.warning(f"Unknown processor: {processor}")
+
+        if config.processing.execution_mode not in ["process", "inline"]:
+            raise ValueError(
+                "Invalid processing execution mode: "
+                f"{config.processing.execution_mode}"
+            )
+
+        if config.processing.max_processing_workers <= 0:
+            raise ValueError("max_processing_workers must be positive")
                 
         # Create storage root if it doesn't exist
         if config.storage.backend == "filesystem":
@@ -0,0 +1,76 @@
+"""
+CFPL Document Context
+Loads, verifies and parses a captured page once so every consumer shares it
+"""
+
+from functools import cached_property
+from typing import Any, Dict, Optional
+
+from bs4 import BeautifulSoup, CData, NavigableString
+
+from .cas_store import CASStore
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+def parse_html(html_content: str) -> BeautifulSoup:
+    """Parse HTML with the fastest available BeautifulSoup tree builder"""
+    return BeautifulSoup(html_content, HTML_PARSER)
+
+
+def is_text_node(node: Any) -> bool:
+    """True for strings Tag.get_text() keeps (not comments or script/style bodies)"""
+    return type(node) in (NavigableString, CData)
+
+
+class DocumentContext:
+    """
+    Main content of one capture manifest, shared by all processors
+
+    The CAS read (with its integrity check), the decode and the parse each
+    happen at most once, on first access. Processors must treat the soup
+    as read-only since the same tree is handed to every one of them.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], cas_store: CASStore):
+        self.manifest = manifest
+        self.cas_store = cas_store
+        self.content_info: Dict[str, Any] = manifest.get('content') or {}
+
+    @property
+    def sha256(self) -> Optional[str]:
+        return self.content_info.get('sha256')
+
+    @property
+    def content_type(self) -> str:
+        return self.content_info.get('content_type', '') or ''
+
+    @property
+    def encoding(self) -> str:
+        return self.content_info.get('encoding', 'utf-8') or 'utf-8'
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self.manifest.get('final_url', self.manifest.get('url'))
+
+    @property
+    def is_html(self) -> bool:
+        return 'text/html' in self.content_type.lower()
+
+    @cached_property
+    def raw(self) -> bytes:
+        """Main content bytes, verified against the manifest hash"""
+        return self.cas_store.retrieve_content(self.sha256)
+
+    @cached_property
+    def html(self) -> str:
+        return self.raw.decode(self.encoding, errors='ignore')
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return parse_html(self.html)
@@ -0,0 +1,167 @@
+"""
+CAS Pack Files
+Append-only, compressed pack files holding small CAS objects
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Each record is <raw sha256 digest><compressed length><compressed bytes>; the
+# header makes a pack self-describing, the catalog's pack_index points past it
+RECORD_HEADER = struct.Struct(">32sI")
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read .zst pack files")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def pack_codec(pack_name: str) -> str:
+    """Compression codec of a pack, from its file suffix"""
+    return pack_name.rsplit(".", 1)[-1]
+
+
+class PackFiles:
+    """
+    Pack files under one directory
+
+    Each instance appends to a pack of its own (so processes never share a
+    write position) and rolls over at max_pack_bytes. Reads go through a
+    cached mmap that is re-mapped when a pack has grown past it.
+    """
+
+    def __init__(self, pack_root: Path, max_pack_bytes: int = 256 * 1024 * 1024):
+        self.pack_root = pack_root
+        self.max_pack_bytes = max_pack_bytes
+        self.codec = "zst" if ZSTD_AVAILABLE else "zz"
+        self._write_lock = threading.Lock()
+        self._current: Optional[BinaryIO] = None
+        self._current_name: Optional[str] = None
+        self._current_size = 0
+        self._map_lock = threading.Lock()
+        self._maps: Dict[str, Tuple[BinaryIO, mmap.mmap]] = {}
+
+    def append(self, sha256_hash: str, data: bytes) -> Tuple[str, int, int]:
+        """Compress an object into the current pack; returns (pack, offset, length)"""
+        return self.append_compressed(
+            sha256_hash, _compress(data, self.codec), self.codec
+        )
+
+    def append_compressed(self, sha256_hash: str, compressed: bytes,
+                          codec: str) -> Tuple[str, int, int]:
+        """Append an already compressed record, re-encoding it if the codec differs"""
+        if codec != self.codec:
+            compressed = _compress(_decompress(compressed, codec), self.codec)
+
+        header = RECORD_HEADER.pack(bytes.fromhex(sha256_hash), len(compressed))
+        with self._write_lock:
+            if self._current is None or self._current_size >= self.max_pack_bytes:
+                self._rotate()
+            offset = self._current_size + RECORD_HEADER.size
+            self._current.write(header + compressed)
+            # Flushed so mmap readers in this or other processes see the record
+            self._current.flush()
+            self._current_size += RECORD_HEADER.size + len(compressed)
+            return self._current_name, offset, len(compressed)
+
+    def _rotate(self):
+        """Seal the current pack and start a new one"""
+        self._seal()
+        self.pack_root.mkdir(parents=True, exist_ok=True)
+        self._current_name = (
+            f"pack-{time.strftime('%Y%m%d')}-{uuid.uuid4().hex[:12]}.{self.codec}"
+        )
+        self._current = open(self.pack_root / self._current_name, "ab")
+        self._current_size = 0
+
+    def _seal(self):
+        if self._current is not None:
+            os.fsync(self._current.fileno())
+            self._current.close()
+            self._current = None
+            self._current_name = None
+
+    def sync(self):
+        """Make every appended record durable"""
+        with self._write_lock:
+            if self._current is not None:
+                os.fsync(self._current.fileno())
+
+    def read(self, pack_name: str, offset: int, length: int) -> bytes:
+        """Read and decompress one object"""
+        return _decompress(
+            self.read_raw(pack_name, offset, length), pack_codec(pack_name)
+        )
+
+    def read_raw(self, pack_name: str, offset: int, length: int) -> bytes:
+        """Read one record's compressed bytes"""
+        end = offset + length
+        with self._map_lock:
+            mapped = self._maps.get(pack_name)
+            if mapped is None or len(mapped[1]) < end:
+                if mapped is not None:
+                    self._unmap(pack_name)
+                handle = open(self.pack_root / pack_name, "rb")
+                try:
+                    view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                except Exception:
+                    handle.close()
+                    raise
+                mapped = self._maps[pack_name] = (handle, view)
+            if len(mapped[1]) < end:
+                raise ValueError(f"Pack {pack_name} is truncated at offset {offset}")
+            return mapped[1][offset:end]
+
+    def _unmap(self, pack_name: str):
+        handle, view = self._maps.pop(pack_name)
+        view.close()
+        handle.close()
+
+    def sealed_packs(self) -> List[Tuple[str, int, float]]:
+        """(name, size, mtime) of every pack this instance is not appending to"""
+        if not self.pack_root.exists():
+            return []
+        packs = []
+        for path in sorted(self.pack_root.glob("pack-*")):
+            if path.name == self._current_name:
+                continue
+            stat = path.stat()
+            packs.append((path.name, stat.st_size, stat.st_mtime))
+        return packs
+
+    def remove(self, pack_name: str):
+        """Delete a pack whose objects have all been moved or collected"""
+        with self._map_lock:
+            if pack_name in self._maps:
+                self._unmap(pack_name)
+        (self.pack_root / pack_name).unlink(missing_ok=True)
+
+    def close(self):
+        with self._write_lock:
+            self._seal()
+        with self._map_lock:
+            for pack_name in list(self._maps):
+                self._unmap(pack_name)
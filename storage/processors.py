@@ -4,21 +4,26 @@ Post-capture processors that work exclusively with stored RAW data
 """
 
 import asyncio
+import functools
 import json
 import logging
 import mimetypes
 import re
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
+import aiofiles
 import pandas as pd
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
 from .cas_store import CASStore
 from .config import get_config, CFPLConfig
+from .document import DocumentContext, is_text_node
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +36,22 @@ class BaseProcessor(ABC):
         self.cas_store = CASStore(config.storage.root)
         
     @abstractmethod
-    async def process(self, manifest: Dict[str, Any], run_id: str) -> Dict[str, Any]:
-        """Process a capture manifest and return derived data"""
+    async def process(self, manifest: Dict[str, Any], run_id: str,
+                      document: Optional[DocumentContext] = None) -> Dict[str, Any]:
+        """
+        Process a capture manifest and return derived data
+        The pipeline passes one shared document per manifest; without it the
+        processor loads its own.
+        """
         pass
     
+    def _document(self, manifest: Dict[str, Any],
+                  document: Optional[DocumentContext]) -> DocumentContext:
+        """Return the shared document, or load one for a standalone call"""
+        if document is not None:
+            return document
+        return DocumentContext(manifest, self.cas_store)
+
     @property
     @abstractmethod
     def processor_name(self) -> str:
@@ -73,28 +90,24 @@ class HTMLProcessor(BaseProcessor):
             }
         }
     
-    async def process(self, manifest: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+    async def process(self, manifest: Dict[str, Any], run_id: str,
+                      document: Optional[DocumentContext] = None) -> Dict[str, Any]:
         """Extract structured data from HTML content"""
         try:
-            # Get main content from CAS
-            content_info = manifest.get('content', {})
-            content_sha256 = content_info.get('sha256')
+            document = self._document(manifest, document)
+            content_sha256 = document.sha256
             
             if not content_sha256:
                 return {"error": "No content hash in manifest"}
             
             # Check if content is HTML
-            content_type = content_info.get('content_type', '')
-            if 'text/html' not in content_type.lower():
-                return {"error": f"Not HTML content: {content_type}"}
-            
-            # Retrieve content from CAS
-            raw_content = self.cas_store.retrieve_content(content_sha256)
-            encoding = content_info.get('encoding', 'utf-8')
-            html_content = raw_content.decode(encoding, errors='ignore')
+            if not document.is_html:
+                return {"error": f"Not HTML content: {document.content_type}"}
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Shared parse tree (read-only)
+            soup = document.soup
+            page_text = soup.get_text()
+            base_url = document.base_url
             
             # Extract structured data
             result = {
@@ -111,8 +124,8 @@ class HTMLProcessor(BaseProcessor):
                 
                 # Content structure
                 "headings": self._extract_headings(soup),
-                "links": self._extract_links(soup, manifest.get('final_url', manifest.get('url'))),
-                "images": self._extract_images(soup, manifest.get('final_url', manifest.get('url'))),
+                "links": self._extract_links(soup, base_url),
+                "images": self._extract_images(soup, base_url),
                 "forms": self._extract_forms(soup),
                 "tables": self._extract_tables(soup),
                 
@@ -121,8 +134,8 @@ class HTMLProcessor(BaseProcessor):
                 
                 # Content statistics
                 "stats": {
-                    "text_length": len(soup.get_text()),
-                    "word_count": len(soup.get_text().split()),
+                    "text_length": len(page_text),
+                    "word_count": len(page_text.split()),
                     "link_count": len(soup.find_all('a')),
                     "image_count": len(soup.find_all('img')),
                     "heading_count": len(soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']))
@@ -321,32 +334,27 @@ class TextExtractor(BaseProcessor):
             }
         }
     
-    async def process(self, manifest: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+    # Boilerplate subtrees left out of the extracted text
+    SKIP_TAGS = frozenset(["script", "style", "nav", "footer", "aside"])
+    # Elements that can become text blocks, and the size that makes one substantial
+    BLOCK_TAGS = frozenset(["p", "div", "article", "section"])
+    MIN_BLOCK_CHARS = 50
+
+    async def process(self, manifest: Dict[str, Any], run_id: str,
+                      document: Optional[DocumentContext] = None) -> Dict[str, Any]:
         """Extract clean text content"""
         try:
-            content_info = manifest.get('content', {})
-            content_sha256 = content_info.get('sha256')
+            document = self._document(manifest, document)
+            content_sha256 = document.sha256
             
             if not content_sha256:
                 return {"error": "No content hash in manifest"}
             
-            content_type = content_info.get('content_type', '')
-            if 'text/html' not in content_type.lower():
-                return {"error": f"Not HTML content: {content_type}"}
-            
-            # Retrieve and parse content
-            raw_content = self.cas_store.retrieve_content(content_sha256)
-            encoding = content_info.get('encoding', 'utf-8')
-            html_content = raw_content.decode(encoding, errors='ignore')
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "aside"]):
-                script.decompose()
+            if not document.is_html:
+                return {"error": f"Not HTML content: {document.content_type}"}
             
-            # Extract main text
-            main_text = soup.get_text()
+            # The tree is shared, so boilerplate is skipped rather than decomposed
+            main_text, text_blocks = self._segment(document.soup)
             
             # Clean up whitespace
             lines = (line.strip() for line in main_text.splitlines())
@@ -358,23 +366,11 @@ class TextExtractor(BaseProcessor):
             word_count = len(words)
             reading_time = max(1, word_count // 200)  # Assume 200 WPM reading speed
             
-            # Extract text blocks (paragraphs)
-            text_blocks = []
-            for i, p in enumerate(soup.find_all(['p', 'div', 'article', 'section'])):
-                text = p.get_text().strip()
-                if len(text) > 50:  # Only substantial text blocks
-                    text_blocks.append({
-                        "order": i + 1,
-                        "text": text,
-                        "word_count": len(text.split()),
-                        "tag": p.name
-                    })
-            
             return {
                 "source_manifest": manifest.get('url'),
                 "content_sha256": content_sha256,
                 "processed_at": datetime.utcnow().isoformat() + 'Z',
-                "processor_version": "1.0.0",
+                "processor_version": "1.1.0",
                 
                 "main_text": main_text,
                 "text_blocks": text_blocks,
@@ -388,6 +384,85 @@ class TextExtractor(BaseProcessor):
             logger.error(f"Text extraction failed: {str(e)}")
             return {"error": str(e)}
 
+    def _segment(self, soup: BeautifulSoup) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Walk the tree once, returning the page text and its text blocks
+        A block's text is what its subtree holds minus any descendant block
+        already emitted, so nested containers never repeat their children.
+        Blocks too small to emit fold their text into the enclosing block.
+        """
+        strings: List[str] = []
+        blocks: List[Dict[str, Any]] = []
+        block_count = 0
+        # [tag, order, rope, length] per open block; the root frame is never emitted.
+        # Ropes nest child ropes by reference, so folding text upward is O(1).
+        open_blocks: List[list] = [[None, 0, [], 0]]
+        stack = [(iter(soup.children), False)]
+
+        while stack:
+            children, is_block = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if is_block:
+                    self._close_block(open_blocks, blocks)
+            elif isinstance(child, Tag):
+                if child.name in self.SKIP_TAGS:
+                    continue
+                is_block = child.name in self.BLOCK_TAGS
+                if is_block:
+                    block_count += 1
+                    open_blocks.append([child.name, block_count, [], 0])
+                stack.append((iter(child.children), is_block))
+            elif is_text_node(child):
+                strings.append(child)
+                frame = open_blocks[-1]
+                frame[2].append(child)
+                frame[3] += len(child)
+
+        blocks.sort(key=lambda block: block["order"])
+        return ''.join(strings), blocks
+
+    def _close_block(self, open_blocks: List[list], blocks: List[Dict[str, Any]]):
+        """Emit the innermost open block, or fold its text into its parent"""
+        tag, order, rope, length = open_blocks.pop()
+
+        if length > self.MIN_BLOCK_CHARS:
+            text = self._flatten(rope)
+            stripped = text.strip()
+            if len(stripped) > self.MIN_BLOCK_CHARS:
+                blocks.append({
+                    "order": order,
+                    "text": stripped,
+                    "word_count": len(stripped.split()),
+                    "tag": tag
+                })
+                return
+            # Mostly whitespace: keep a short copy so ancestors don't re-join it
+            rope = [(' ' if text[:1].isspace() else '') + stripped +
+                    (' ' if text[-1:].isspace() else '')]
+            length = len(rope[0])
+
+        if length:
+            parent = open_blocks[-1]
+            parent[2].append(rope)
+            parent[3] += length
+
+    @staticmethod
+    def _flatten(rope: list) -> str:
+        """Join a nested rope of strings in document order"""
+        parts: List[str] = []
+        stack = [iter(rope)]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+            elif isinstance(item, list):
+                stack.append(iter(item))
+            else:
+                parts.append(item)
+        return ''.join(parts)
+
 
 class MediaMetadataProcessor(BaseProcessor):
     """Extract metadata from media files"""
@@ -407,7 +482,8 @@ class MediaMetadataProcessor(BaseProcessor):
             }
         }
     
-    async def process(self, manifest: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+    async def process(self, manifest: Dict[str, Any], run_id: str,
+                      document: Optional[DocumentContext] = None) -> Dict[str, Any]:
         """Extract metadata from captured media"""
         try:
             media_items = manifest.get('media', [])
@@ -477,9 +553,31 @@ class MediaMetadataProcessor(BaseProcessor):
         return format_map.get(content_type.lower(), 'unknown')
 
 
+# Per-process pipeline for pool workers, built once by _init_worker
+_worker_pipeline: Optional["ProcessingPipeline"] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker(config: CFPLConfig):
+    """Process pool initializer: build processors and an event loop once per worker"""
+    global _worker_pipeline, _worker_loop
+    _worker_pipeline = ProcessingPipeline(config)
+    _worker_loop = asyncio.new_event_loop()
+
+
+def _process_in_worker(manifest_path: str, run_id: str) -> Dict[str, Any]:
+    """Run the processors for one manifest inside a pool worker"""
+    return _worker_loop.run_until_complete(
+        _worker_pipeline._run_processors(manifest_path, run_id)
+    )
+
+
 class ProcessingPipeline:
     """Orchestrates post-capture processing"""
-    
+
+    # Captures read from the catalog per off-loop query in process_run
+    CAPTURE_BATCH_SIZE = 500
+
     def __init__(self, config: Optional[CFPLConfig] = None):
         self.config = config or get_config()
         self.cas_store = CASStore(self.config.storage.root)
@@ -491,39 +589,23 @@ class ProcessingPipeline:
             'media_metadata': MediaMetadataProcessor(self.config)
         }
     
-    async def process_manifest(self, manifest_path: str, run_id: str) -> Dict[str, Any]:
-        """Process a single capture manifest"""
+    async def process_manifest(
+        self, manifest_path: str, run_id: str,
+        executor: Optional[ProcessPoolExecutor] = None
+    ) -> Dict[str, Any]:
+        """
+        Process a single capture manifest
+        With an executor the processors run in a worker process; derived
+        results are always written from this process.
+        """
         try:
-            # Load manifest
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-            
-            url = manifest.get('url', 'unknown')
-            logger.info(f"Processing manifest for: {url}")
-            
-            # Run enabled processors
-            results = {
-                "manifest_path": manifest_path,
-                "url": url,
-                "run_id": run_id,
-                "processing_start": datetime.utcnow().isoformat() + 'Z',
-                "processors": {}
-            }
-            
-            enabled_processors = self.config.processing.enabled_processors
-            
-            for processor_name in enabled_processors:
-                if processor_name in self.processors:
-                    try:
-                        processor = self.processors[processor_name]
-                        result = await processor.process(manifest, run_id)
-                        results["processors"][processor_name] = result
-                        logger.info(f"Completed {processor_name} for {url}")
-                    except Exception as e:
-                        logger.error(f"Processor {processor_name} failed for {url}: {str(e)}")
-                        results["processors"][processor_name] = {"error": str(e)}
-            
-            results["processing_end"] = datetime.utcnow().isoformat() + 'Z'
+            if executor is not None:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(
+                    executor, _process_in_worker, manifest_path, run_id
+                )
+            else:
+                results = await self._run_processors(manifest_path, run_id)
             
             # Save results to DERIVED zone
             await self._save_derived_results(results, run_id)
@@ -534,6 +616,52 @@ class ProcessingPipeline:
             logger.error(f"Processing failed for {manifest_path}: {str(e)}")
             return {"error": str(e)}
     
+    async def _run_processors(self, manifest_path: str, run_id: str) -> Dict[str, Any]:
+        """Load a manifest and run every enabled processor over it"""
+        # Load manifest
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+        url = manifest.get('url', 'unknown')
+        logger.info(f"Processing manifest for: {url}")
+
+        # Run enabled processors
+        results = {
+            "manifest_path": manifest_path,
+            "url": url,
+            "run_id": run_id,
+            "processing_start": datetime.utcnow().isoformat() + 'Z',
+            "processors": {},
+            "processor_timings_ms": {}
+        }
+
+        enabled_processors = self.config.processing.enabled_processors
+
+        # Main content is read, verified and parsed once for all processors
+        document = DocumentContext(manifest, self.cas_store)
+
+        for processor_name in enabled_processors:
+            if processor_name in self.processors:
+                started = time.perf_counter()
+                try:
+                    processor = self.processors[processor_name]
+                    result = await processor.process(manifest, run_id, document)
+                    results["processors"][processor_name] = result
+                    logger.info(f"Completed {processor_name} for {url}")
+                except Exception as e:
+                    logger.error(
+                        f"Processor {processor_name} failed for {url}: {str(e)}"
+                    )
+                    results["processors"][processor_name] = {"error": str(e)}
+                # Shared parse cost is charged to whichever processor touches the
+                # soup first
+                results["processor_timings_ms"][processor_name] = round(
+                    (time.perf_counter() - started) * 1000, 3
+                )
+
+        results["processing_end"] = datetime.utcnow().isoformat() + 'Z'
+        return results
+
     async def _save_derived_results(self, results: Dict[str, Any], run_id: str):
         """Save processing results to DERIVED zone"""
         try:
@@ -557,41 +685,104 @@ class ProcessingPipeline:
         except Exception as e:
             logger.error(f"Failed to save derived results: {str(e)}")
     
+    def _create_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Worker pool for a run, or None when processing inline"""
+        if self.config.processing.execution_mode != "process":
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.config.processing.max_processing_workers,
+            initializer=_init_worker,
+            initargs=(self.config,)
+        )
+
     async def process_run(self, run_id: str) -> Dict[str, Any]:
-        """Process all manifests in a run"""
+        """
+        Process all manifests in a run
+        Captures are streamed from the catalog and at most max_in_flight
+        manifests are queued at once, so memory stays flat on large runs.
+        """
         logger.info(f"Processing run: {run_id}")
         
-        # Find all manifests for this run
-        manifests = self.cas_store.query_captures(run_id=run_id)
+        max_in_flight = (self.config.processing.max_in_flight or
+                         2 * self.config.processing.max_processing_workers)
+        executor = self._create_executor()
         
-        if not manifests:
-            return {"error": f"No manifests found for run {run_id}"}
+        total = successful = 0
+        processor_totals_ms: Dict[str, float] = {}
+        pending: Set[asyncio.Task] = set()
         
-        # Process manifests concurrently with semaphore
-        semaphore = asyncio.Semaphore(self.config.processing.max_processing_workers)
+        def collect(done: Set[asyncio.Task]):
+            nonlocal successful
+            for task in done:
+                result = task.result()
+                if "error" not in result:
+                    successful += 1
+                for name, elapsed in result.get("processor_timings_ms", {}).items():
+                    processor_totals_ms[name] = (
+                        processor_totals_ms.get(name, 0.0) + elapsed
+                    )
         
-        async def process_single_manifest(manifest_record: Dict[str, Any]) -> Dict[str, Any]:
-            async with semaphore:
-                manifest_path = manifest_record['manifest_path']
-                return await self.process_manifest(manifest_path, run_id)
+        loop = asyncio.get_running_loop()
+        try:
+            last_id = 0
+            while True:
+                # Catalog paging (and the writer flush before it) stays off the loop
+                batch = await loop.run_in_executor(
+                    None, self.cas_store.capture_batch, run_id, last_id,
+                    self.CAPTURE_BATCH_SIZE
+                )
+                for manifest_record in batch:
+                    # Backpressure: wait for a slot before queueing the next manifest
+                    if len(pending) >= max_in_flight:
+                        done, pending = await asyncio.wait(
+                            pending, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        collect(done)
+
+                    pending.add(asyncio.create_task(
+                        self.process_manifest(
+                            manifest_record['manifest_path'], run_id, executor
+                        )
+                    ))
+                    total += 1
+                if len(batch) < self.CAPTURE_BATCH_SIZE:
+                    break
+                last_id = batch[-1]['id']
+
+            if pending:
+                done, pending = await asyncio.wait(pending)
+                collect(done)
+        finally:
+            for task in pending:
+                task.cancel()
+            if executor is not None:
+                # Waiting for worker processes to exit must not block the loop
+                await loop.run_in_executor(
+                    None, functools.partial(
+                        executor.shutdown, wait=True, cancel_futures=True
+                    )
+                )
         
-        # Execute processing
-        processing_tasks = [process_single_manifest(m) for m in manifests]
-        processing_results = await asyncio.gather(*processing_tasks, return_exceptions=True)
+        if not total:
+            return {"error": f"No manifests found for run {run_id}"}
         
-        # Summarize results
-        successful = sum(1 for r in processing_results if isinstance(r, dict) and "error" not in r)
-        failed = len(processing_results) - successful
+        failed = total - successful
         
         summary = {
             "run_id": run_id,
-            "total_manifests": len(manifests),
+            "total_manifests": total,
             "successful_processing": successful,
             "failed_processing": failed,
+            "execution_mode": self.config.processing.execution_mode,
+            "processor_time_ms": {
+                name: round(ms, 3) for name, ms in processor_totals_ms.items()
+            },
             "processing_completed": datetime.utcnow().isoformat() + 'Z'
         }
         
-        logger.info(f"Processing complete for run {run_id}: {successful}/{len(manifests)} successful")
+        logger.info(
+            f"Processing complete for run {run_id}: {successful}/{total} successful"
+        )
         return summary
 
 
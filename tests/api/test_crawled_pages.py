@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the crawled_pages URL index behind /api/cfpl/page-content
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from crawled_pages import (
+    backfill_crawled_pages,
+    ensure_crawled_pages_table,
+    find_crawled_page,
+    index_job_result,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "scraper.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, created_by INTEGER);
+        CREATE TABLE job_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            data TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO jobs (id, created_by) VALUES (1, 7), (2, 7), (3, 9);
+        """
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _crawl(*urls, tag=""):
+    return {
+        "crawled_data": [{"url": url, "headline": f"{url}{tag}"} for url in urls],
+        "summary": {"pages_processed": len(urls)},
+    }
+
+
+def _insert_result(cursor, job_id, data, index=True):
+    cursor.execute(
+        "INSERT INTO job_results (job_id, data) VALUES (?, ?)",
+        (job_id, json.dumps(data)),
+    )
+    if index:
+        index_job_result(cursor, cursor.lastrowid, job_id, data)
+    return cursor.lastrowid
+
+
+class TestCrawledPageIndex:
+    """Write-time indexing, lookup and backfill"""
+
+    def test_lookup_returns_latest_page_for_owner(self, db_path):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        ensure_crawled_pages_table(cursor)
+        _insert_result(
+            cursor, 1, _crawl("https://a.test/", "https://a.test/b", tag=" v1")
+        )
+        _insert_result(cursor, 2, _crawl("https://a.test/b", tag=" v2"))
+        _insert_result(cursor, 3, _crawl("https://a.test/b", tag=" other user"))
+        _insert_result(cursor, 1, {"url": "https://single.test/", "headline": "single"})
+
+        item, job_id = find_crawled_page(cursor, 7, "https://a.test/b")
+        assert (item["headline"], job_id) == ("https://a.test/b v2", 2)
+
+        item, job_id = find_crawled_page(cursor, 7, "https://single.test/")
+        assert (item["headline"], job_id) == ("single", 1)
+
+        assert find_crawled_page(cursor, 9, "https://a.test/") is None
+        assert find_crawled_page(cursor, 7, "https://missing.test/") is None
+
+        plan = " ".join(
+            str(row[-1])
+            for row in cursor.execute(
+                "EXPLAIN QUERY PLAN SELECT job_result_id FROM crawled_pages "
+                "WHERE user_id = ? AND url = ? ORDER BY job_result_id DESC LIMIT 1",
+                (7, "https://a.test/b"),
+            )
+        )
+        assert "idx_crawled_pages_user_url" in plan
+        conn.close()
+
+    def test_deleted_results_drop_out_of_index(self, db_path):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        ensure_crawled_pages_table(cursor)
+        _insert_result(cursor, 1, _crawl("https://a.test/", tag=" old"))
+        newest = _insert_result(cursor, 2, _crawl("https://a.test/", tag=" new"))
+
+        cursor.execute("DELETE FROM job_results WHERE id = ?", (newest,))
+
+        item, job_id = find_crawled_page(cursor, 7, "https://a.test/")
+        assert (item["headline"], job_id) == ("https://a.test/ old", 1)
+        assert cursor.execute("SELECT COUNT(*) FROM crawled_pages").fetchone()[0] == 1
+        conn.close()
+
+    def test_backfill_indexes_existing_results_once(self, db_path):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        for i in range(5):
+            _insert_result(
+                cursor, 1, _crawl(f"https://a.test/{i}", "https://a.test/"), False
+            )
+        cursor.execute("INSERT INTO job_results (job_id, data) VALUES (1, 'not json')")
+        conn.commit()
+        conn.close()
+
+        stats = backfill_crawled_pages(db_path, batch_size=2)
+        assert stats == {
+            "results_scanned": 6,
+            "pages_indexed": 10,
+            "results_unreadable": 1,
+        }
+
+        rerun = backfill_crawled_pages(db_path)
+        assert rerun["pages_indexed"] == 0
+
+        conn = sqlite3.connect(db_path)
+        item, job_id = find_crawled_page(conn.cursor(), 7, "https://a.test/3")
+        conn.close()
+        assert job_id == 1 and item["url"] == "https://a.test/3"
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for registry-backed job progress: polling endpoint and WebSocket pushes
+"""
+
+import asyncio
+import json
+
+import pytest
+
+backend_server = pytest.importorskip("backend_server")
+import jwt  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from config.database_manager import AsyncDatabasePool  # noqa: E402
+from job_progress import JobProgressRegistry  # noqa: E402
+
+USER = {"id": 1, "username": "admin", "role": "admin"}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = JobProgressRegistry()
+    manager = backend_server.ConnectionManager(registry, progress_interval=0.05)
+    monkeypatch.setattr(backend_server, "progress_registry", registry)
+    monkeypatch.setattr(backend_server, "manager", manager)
+    return registry
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, registry):
+    database_path = str(tmp_path / "scraper.db")
+    pool = AsyncDatabasePool(database_path, pool_size=2)
+    monkeypatch.setattr(backend_server, "DATABASE_PATH", database_path)
+    monkeypatch.setattr(backend_server, "db_pool", pool)
+    backend_server.init_database()
+
+    yield TestClient(backend_server.app)
+    backend_server.app.dependency_overrides.clear()
+    asyncio.run(pool.close())
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message):
+        self.sent.append(json.loads(message))
+
+
+class TestProgressEndpoint:
+    """The polling endpoint reads the registry instead of job_results"""
+
+    def test_running_job_served_without_database(self, client, registry, monkeypatch):
+        registry.start(5, owner_id=1, estimated_target=20)
+        registry.publish(
+            5, {"url": "https://a.test/", "pages_done": 5, "queue_size": 12}
+        )
+        backend_server.app.dependency_overrides[backend_server.get_current_user] = (
+            lambda: USER
+        )
+
+        async def no_database(*args, **kwargs):
+            raise AssertionError("progress endpoint touched the database")
+
+        monkeypatch.setattr(backend_server.db_pool, "fetchone", no_database)
+        progress = client.get("/api/jobs/5/progress").json()
+
+        assert progress["status"] == "running"
+        assert progress["progress_percentage"] == 25.0
+        assert progress["queue_size"] == 12
+        assert progress["recent_activity"][0]["url"] == "https://a.test/"
+
+    def test_other_users_job_is_hidden(self, client, registry):
+        registry.start(5, owner_id=2)
+        backend_server.app.dependency_overrides[backend_server.get_current_user] = (
+            lambda: USER
+        )
+
+        assert client.get("/api/jobs/5/progress").status_code == 404
+
+
+class TestProgressPush:
+    """Coalesced fan-out through ConnectionManager and the /ws endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_flush_sends_one_message_per_changed_job(self, registry):
+        manager = backend_server.ConnectionManager(registry)
+        first, second, bystander = FakeSocket(), FakeSocket(), FakeSocket()
+        manager.progress_subscriptions = {1: {first, second}, 2: {bystander}}
+
+        registry.start(1)
+        for pages in range(1, 21):
+            registry.publish(1, {"pages_done": pages})
+        await manager.flush_progress()
+
+        assert [m["data"]["pages_done"] for m in first.sent] == [20]
+        assert second.sent == first.sent
+        assert bystander.sent == []
+
+        registry.finish(1, "completed")
+        await manager.flush_progress()
+
+        assert first.sent[-1]["data"]["status"] == "completed"
+        assert 1 not in manager.progress_subscriptions
+
+    def test_websocket_subscription_receives_pushes(self, client, registry):
+        token = jwt.encode(
+            {"sub": "admin"},
+            backend_server.JWT_SECRET,
+            algorithm=backend_server.JWT_ALGORITHM,
+        )
+        registry.start(9, owner_id=1, estimated_target=10)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_text(
+                json.dumps({"action": "subscribe_progress", "job_id": 9})
+            )
+            assert websocket.receive_json()["type"] == "error"
+
+            websocket.send_text(
+                json.dumps(
+                    {"action": "subscribe_progress", "job_id": 9, "token": token}
+                )
+            )
+            assert websocket.receive_json()["data"]["pages_done"] == 0
+
+            registry.publish(9, {"pages_done": 3})
+            registry.finish(9, "completed")
+            pushed = websocket.receive_json()
+            while pushed["data"]["status"] != "completed":
+                pushed = websocket.receive_json()
+
+        assert pushed["type"] == "job_progress"
+        assert pushed["data"]["pages_done"] == 3
+        assert pushed["data"]["status"] == "completed"
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Tests for paginated, projected and NDJSON-streamed job results
+"""
+
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+backend_server = pytest.importorskip("backend_server")
+from fastapi.testclient import TestClient  # noqa: E402
+
+from config.database_manager import AsyncDatabasePool  # noqa: E402
+
+USER = {"id": 1, "username": "admin", "role": "admin"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    database_path = str(tmp_path / "scraper.db")
+    pool = AsyncDatabasePool(database_path, pool_size=2)
+    monkeypatch.setattr(backend_server, "DATABASE_PATH", database_path)
+    monkeypatch.setattr(backend_server, "db_pool", pool)
+    backend_server.init_database()
+
+    conn = sqlite3.connect(backend_server.DATABASE_PATH)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO jobs (id, name, type, created_by) VALUES (?, ?, ?, ?)",
+        [(10, "crawl", "intelligent", 1), (11, "other", "single", 2)],
+    )
+    for i in range(5):
+        page = {
+            "url": f"https://a.test/{i}",
+            "title": f"Page {i}",
+            "raw_html": "<html>" + "x" * 1000 + "</html>",
+            "links": [{"url": "https://a.test/"}],
+            "images": [{"url": f"https://a.test/img{i % 2}.png"}],
+        }
+        cursor.execute(
+            "INSERT INTO job_results (job_id, data) VALUES (10, ?)", (json.dumps(page),)
+        )
+    crawl = {
+        "crawled_data": [
+            {"url": "https://a.test/c1", "title": "C1", "raw_html": "<html></html>",
+             "images": [{"url": "https://a.test/img9.png"}]},
+        ],
+        "summary": {"pages_processed": 1},
+    }
+    cursor.execute(
+        "INSERT INTO job_results (job_id, data) VALUES (10, ?)", (json.dumps(crawl),)
+    )
+    cursor.execute("INSERT INTO job_results (job_id, data) VALUES (10, 'not json')")
+    conn.commit()
+    conn.close()
+
+    overrides = backend_server.app.dependency_overrides
+    overrides[backend_server.get_current_user] = lambda: USER
+    yield TestClient(backend_server.app)
+    backend_server.app.dependency_overrides.clear()
+    asyncio.run(pool.close())
+
+
+class TestJobResultsStreaming:
+    """Pagination, field projection and NDJSON output"""
+
+    def test_unpaginated_response_is_full_list(self, client):
+        results = client.get("/api/jobs/10/results").json()
+
+        assert len(results) == 7
+        assert results[0]["error"] == "Failed to parse result data"
+        assert results[-1]["url"] == "https://a.test/0"
+        assert "raw_html" in results[-1]
+
+    def test_cursor_pagination_walks_every_row(self, client):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3}
+            if cursor is not None:
+                params["cursor"] = cursor
+            page = client.get("/api/jobs/10/results", params=params).json()
+            seen.extend(result["result_id"] for result in page["results"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == sorted(seen, reverse=True)
+        assert len(seen) == len(set(seen)) == 7
+
+    def test_field_projection(self, client):
+        results = client.get(
+            "/api/jobs/10/results",
+            params={"fields": "url,title", "limit": 2, "cursor": 7},
+        ).json()["results"]
+
+        crawl, single = results
+        assert crawl["crawled_data"] == [{"url": "https://a.test/c1", "title": "C1"}]
+        assert crawl["summary"] == {"pages_processed": 1}
+        assert set(single) == {"url", "title", "retrieved_at", "result_id"}
+
+    def test_ndjson_stream(self, client):
+        response = client.get(
+            "/api/jobs/10/results", params={"format": "ndjson", "fields": "url"}
+        )
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 7
+        assert lines[-1] == {
+            "url": "https://a.test/0",
+            "retrieved_at": lines[-1]["retrieved_at"],
+            "result_id": 1,
+        }
+
+    def test_ndjson_stream_reads_bounded_batches(self, client, monkeypatch):
+        pool = backend_server.db_pool
+        fetchall = pool.fetchall
+        batches = []
+
+        async def recording_fetchall(query, params=()):
+            # Nothing is checked out of the pool between batches
+            assert pool.get_stats()["active_connections"] == 0
+            rows = await fetchall(query, params)
+            batches.append(len(rows))
+            return rows
+
+        def no_iterate(*args):
+            raise AssertionError("stream must not hold a cursor open")
+
+        monkeypatch.setattr(backend_server, "STREAM_BATCH_ROWS", 2)
+        monkeypatch.setattr(pool, "fetchall", recording_fetchall)
+        monkeypatch.setattr(pool, "iterate", no_iterate)
+
+        lines = client.get(
+            "/api/jobs/10/results", params={"format": "ndjson", "fields": "url"}
+        ).text.splitlines()
+        ids = [json.loads(line)["result_id"] for line in lines]
+        assert ids == list(range(7, 0, -1))
+        assert batches == [2, 2, 2, 1]
+
+        batches.clear()
+        lines = client.get(
+            "/api/jobs/10/results",
+            params={"format": "ndjson", "limit": 3, "cursor": 7},
+        ).text.splitlines()
+        assert [json.loads(line)["result_id"] for line in lines] == [6, 5, 4]
+        assert batches == [2, 1]
+
+    def test_crawl_pages_windowed_within_row(self, client):
+        crawl = {
+            "crawled_data": [
+                {"url": f"https://a.test/p{i}", "raw_html": "<html></html>"}
+                for i in range(5)
+            ],
+            "summary": {"pages_processed": 5},
+        }
+        conn = sqlite3.connect(backend_server.DATABASE_PATH)
+        conn.execute(
+            "INSERT INTO job_results (job_id, data) VALUES (10, ?)",
+            (json.dumps(crawl),),
+        )
+        conn.commit()
+        conn.close()
+
+        pages, offset = [], 0
+        while offset is not None:
+            result = client.get(
+                "/api/jobs/10/results",
+                params={
+                    "limit": 1,
+                    "page_offset": offset,
+                    "page_limit": 2,
+                    "fields": "url",
+                },
+            ).json()["results"][0]
+            assert result["crawled_data_total"] == 5
+            assert result["summary"] == {"pages_processed": 5}
+            assert len(result["crawled_data"]) <= 2
+            pages.extend(page["url"] for page in result["crawled_data"])
+            offset = result["next_page_offset"]
+
+        assert pages == [f"https://a.test/p{i}" for i in range(5)]
+
+    def test_page_window_leaves_other_rows_alone(self, client):
+        results = client.get(
+            "/api/jobs/10/results", params={"page_limit": 1, "page_offset": 5}
+        ).json()
+
+        assert len(results) == 7
+        assert results[0]["error"] == "Failed to parse result data"
+        assert results[1]["crawled_data"] == []
+        assert results[1]["next_page_offset"] is None
+        assert results[-1]["url"] == "https://a.test/0"
+        assert "crawled_data_total" not in results[-1]
+
+        lines = client.get(
+            "/api/jobs/10/results",
+            params={"format": "ndjson", "page_limit": 1, "fields": "url"},
+        ).text.splitlines()
+        crawl = json.loads(lines[1])
+        assert crawl["crawled_data"] == [{"url": "https://a.test/c1"}]
+        assert crawl["next_page_offset"] is None
+
+    def test_other_users_job_is_hidden(self, client):
+        assert client.get("/api/jobs/11/results").status_code == 404
+        response = client.get("/api/jobs/11/results", params={"format": "ndjson"})
+        assert response.status_code == 404
+
+    def test_media_covers_crawl_results(self, client):
+        media = client.get("/api/jobs/10/media").json()
+
+        assert media["pages_processed"] == 6
+        assert sorted(asset["url"] for asset in media["assets"]) == [
+            "https://a.test/img0.png",
+            "https://a.test/img1.png",
+            "https://a.test/img9.png",
+        ]
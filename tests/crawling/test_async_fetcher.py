@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled async fetch layer in ScrapingEngine
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from scraping_engine import ResponseTooLargeError, ScrapingEngine
+
+PAGE = b"<html><head><title>Local Page</title></head><body><p>hello</p></body></html>"
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    hits: Counter = Counter()
+
+    def do_GET(self):
+        self.hits[self.path] += 1
+
+        if self.path == "/flaky" and self.hits[self.path] < 2:
+            self._reply(503, b"try again")
+        elif self.path == "/missing":
+            self._reply(404, b"not found")
+        elif self.path == "/huge":
+            self._reply(200, b"x" * 4096)
+        elif self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/page")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self._reply(200, PAGE)
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    _FixtureHandler.hits = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestAsyncFetcher:
+    """Pooled client, retries and size cap"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_and_basic_scrape(self, local_server):
+        engine = ScrapingEngine()
+        try:
+            result = await engine.scrape_url(f"{local_server}/redirect", "basic")
+        finally:
+            await engine.aclose()
+
+        assert result["status"] == "success"
+        assert result["title"] == "Local Page"
+        assert result["page_metadata"]["final_url"] == f"{local_server}/page"
+        assert result["page_metadata"]["redirect_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retryable_status_is_retried(self, local_server):
+        engine = ScrapingEngine()
+        with patch.object(engine, "_backoff", return_value=None) as backoff:
+            try:
+                response = await engine._fetch_url(f"{local_server}/flaky")
+            finally:
+                await engine.aclose()
+
+        assert response.status_code == 200
+        assert backoff.call_count == 1
+        assert _FixtureHandler.hits["/flaky"] == 2
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_status_fails_fast(self, local_server):
+        engine = ScrapingEngine()
+        try:
+            with pytest.raises(Exception, match="HTTP 404"):
+                await engine._fetch_url(f"{local_server}/missing")
+        finally:
+            await engine.aclose()
+
+        assert _FixtureHandler.hits["/missing"] == 1
+
+    @pytest.mark.asyncio
+    async def test_response_size_cap(self, local_server):
+        engine = ScrapingEngine(max_response_bytes=1024)
+        try:
+            with pytest.raises(ResponseTooLargeError):
+                await engine._fetch_url(f"{local_server}/huge")
+        finally:
+            await engine.aclose()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_share_one_client(self, local_server):
+        engine = ScrapingEngine(max_connections_per_host=4)
+        try:
+            responses = await asyncio.gather(
+                *(engine._fetch_url(f"{local_server}/page?n={i}") for i in range(50))
+            )
+            client = engine._client
+        finally:
+            await engine.aclose()
+
+        assert all(response.status_code == 200 for response in responses)
+        assert client is not None
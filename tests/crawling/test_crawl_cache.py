@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched, WAL-mode crawl cache used by intelligent_crawl
+"""
+
+import json
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from scraping_engine import CrawlCache, ScrapingEngine
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "crawl_cache.db")
+
+
+class TestCrawlCache:
+    """Storage format, batching and bulk lookups"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_compresses_html_once(self, cache_path):
+        html = "<html><body>" + "<p>repeated content</p>" * 500 + "</body></html>"
+        cache = CrawlCache(cache_path)
+        await cache.open()
+        cache.put("https://a.example/", {"url": "https://a.example/", "raw_html": html})
+        cache.put("https://a.example/x", {"url": "https://a.example/x", "title": "X"})
+        await cache.close()
+
+        conn = sqlite3.connect(cache_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        content, metadata, encoding = conn.execute(
+            "SELECT content, metadata, content_encoding FROM crawl_cache WHERE url = ?",
+            ("https://a.example/",),
+        ).fetchone()
+        conn.close()
+
+        assert encoding == "zlib"
+        assert len(content) < len(html) / 10
+        assert "raw_html" not in json.loads(metadata)
+
+        cache = CrawlCache(cache_path)
+        await cache.open()
+        hits = await cache.get_many(
+            ["https://a.example/", "https://a.example/x", "https://a.example/missing"]
+        )
+        await cache.close()
+
+        assert set(hits) == {"https://a.example/", "https://a.example/x"}
+        assert hits["https://a.example/"]["data"]["raw_html"] == html
+        assert hits["https://a.example/x"]["data"] == {
+            "url": "https://a.example/x",
+            "title": "X",
+        }
+
+    @pytest.mark.asyncio
+    async def test_cached_urls_checks_keys_only(self, cache_path):
+        cache = CrawlCache(cache_path)
+        await cache.open()
+        cache.put("https://a.example/", {"url": "https://a.example/", "raw_html": "x"})
+        await cache.close()
+
+        cache = CrawlCache(cache_path)
+        await cache.open()
+        with patch.object(cache, "_get_many") as get_many:
+            cached = await cache.cached_urls(
+                ["https://a.example/", "https://a.example/missing"]
+            )
+        await cache.close()
+
+        assert cached == {"https://a.example/"}
+        get_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reads_rows_written_by_legacy_schema(self, cache_path):
+        conn = sqlite3.connect(cache_path)
+        conn.execute(
+            "CREATE TABLE crawl_cache (url TEXT PRIMARY KEY, content TEXT, "
+            "metadata TEXT, crawled_at TIMESTAMP, domain TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO crawl_cache VALUES (?, ?, ?, ?, ?)",
+            (
+                "https://old.example/",
+                "<html></html>",
+                json.dumps(
+                    {"url": "https://old.example/", "raw_html": "<html></html>"}
+                ),
+                "2025-01-01T00:00:00",
+                "old.example",
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+        cache = CrawlCache(cache_path)
+        await cache.open()
+        hits = await cache.get_many(["https://old.example/"])
+        await cache.close()
+
+        assert hits["https://old.example/"]["data"]["raw_html"] == "<html></html>"
+
+    @pytest.mark.asyncio
+    async def test_writes_are_batched(self, cache_path):
+        cache = CrawlCache(cache_path, batch_size=50, flush_interval=5.0)
+        await cache.open()
+        with patch.object(cache, "_write_batch", wraps=cache._write_batch) as writer:
+            for i in range(120):
+                cache.put(f"https://b.example/{i}", {"url": f"https://b.example/{i}"})
+            await cache.close()
+
+        assert [len(call.args[0]) for call in writer.call_args_list] == [50, 50, 20]
+
+    @pytest.mark.asyncio
+    async def test_second_crawl_served_from_cache(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        async def fake_scrape_url(url, scraper_type="basic", config=None):
+            if url.count("/") >= 4:
+                return {"url": url, "status": "success", "links": []}
+            links = [{"url": f"{url}p{i}/"} for i in range(3)]
+            return {"url": url, "status": "success", "links": links}
+
+        config = {
+            "max_pages": 4,
+            "max_depth": 2,
+            "rate_limit": {"requests_per_second": 0},
+        }
+        engine = ScrapingEngine()
+
+        loaded = []
+        get_many = CrawlCache.get_many
+
+        async def recording_get_many(cache, urls):
+            loaded.append(list(urls))
+            return await get_many(cache, urls)
+
+        with patch.object(engine, "scrape_url", side_effect=fake_scrape_url) as scrape:
+            first = await engine.intelligent_crawl("http://site.test/", "basic", config)
+            fetched_first = scrape.call_count
+            with patch.object(CrawlCache, "get_many", recording_get_many):
+                second = await engine.intelligent_crawl(
+                    "http://site.test/", "basic", config
+                )
+
+        assert first["summary"]["pages_processed"] == 4
+        assert second["summary"]["pages_processed"] == 4
+        assert fetched_first == 4
+        assert scrape.call_count == fetched_first
+        assert all(page.get("cached") for page in second["crawled_data"])
+        # Cached pages are loaded one at a time as they are crawled, not for
+        # every discovered link
+        crawled = [[page["url"]] for page in second["crawled_data"]]
+        assert sorted(loaded) == sorted(crawled)
+
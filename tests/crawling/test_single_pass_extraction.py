@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Parity tests for ScrapingEngine._extract_page_data against the per-field extractors
+"""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from bs4 import BeautifulSoup
+
+from scraping_engine import FetchResponse, ScrapingEngine
+
+BASE_URL = "https://example.com/articles/page"
+
+FIXTURE = """
+<!DOCTYPE html>
+<html>
+<head>
+  <title> Fixture Page </title>
+  <meta name="description" content="A page exercising every extractor">
+  <style>body { color: red; }</style>
+  <script>var tracking = "not text";</script>
+</head>
+<body>
+  <h1>Main heading</h1>
+  <h2>Sub <em>heading</em></h2><h2>Second h2</h2>
+  <h6>Tiny</h6>
+  <p>Intro paragraph with <a href="/about">About us</a> and
+     <a href="https://other.example/x">External</a>.</p>
+  <a href="">empty</a>
+  <a href="/media/clip.mp4" title="Clip">Download clip</a>
+  <img src="/img/a.png" alt="A" width="10">
+  <img data-src="/img/lazy.png" alt="lazy">
+  <img src="/img/b.png" data-src="/img/b-large.png"
+       style="background-image: url('/img/bg-on-img.png')">
+  <div class="hero" style="background-image: url(/img/hero.jpg)">Hero</div>
+  <picture>
+    <source srcset="/img/c.webp" src="/img/c.webp"><img src="/img/c.png">
+  </picture>
+  <video src="/v/movie.webm" controls poster="/v/poster.jpg"></video>
+  <video><source src="/v/fallback.mp4"></video>
+  <iframe src="https://www.youtube.com/embed/xyz" title="YT" allowfullscreen></iframe>
+  <iframe src="https://player.vimeo.com/video/1"></iframe>
+  <form action="/search" method="post" class="search">
+    <input type="text" name="q" placeholder="Search" required>
+    <select name="sort">
+      <option value="a" selected>A</option><option value="b">B</option>
+    </select>
+    <textarea name="notes"></textarea>
+    <button type="submit">Go</button>
+  </form>
+  <script>document.write("also not text");</script>
+  <p>Closing   text
+     over lines.</p>
+</body>
+</html>
+"""
+
+
+def _legacy_page(engine, soup, config):
+    page = {
+        "title": engine._extract_title(soup),
+        "meta_description": engine._extract_meta_description(soup),
+        "headings": engine._extract_headings(soup),
+        "links": engine._extract_links(soup, BASE_URL),
+        "text_content": engine._extract_text_content(soup),
+        "word_count": len(soup.get_text().split()),
+        "images": [],
+        "videos": [],
+        "forms": [],
+    }
+    if config.get("include_images"):
+        page["images"] = engine._extract_images(
+            soup, BASE_URL, config.get("include_all_images", False)
+        )
+    if config.get("extract_videos", True):
+        page["videos"] = engine._extract_videos(soup, BASE_URL)
+    if config.get("include_forms"):
+        page["forms"] = engine._extract_forms(soup, BASE_URL)
+    return page
+
+
+class TestSinglePassExtraction:
+    """The single traversal must reproduce the multi-pass output exactly"""
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {},
+            {"include_images": True, "include_forms": True},
+            {"include_images": True, "include_all_images": True, "include_forms": True},
+            {"extract_videos": False},
+        ],
+    )
+    def test_matches_legacy_extractors(self, config):
+        engine = ScrapingEngine()
+
+        expected = _legacy_page(engine, BeautifulSoup(FIXTURE, "html.parser"), config)
+        actual = engine._extract_page_data(
+            BeautifulSoup(FIXTURE, "html.parser"), BASE_URL, config
+        )
+
+        assert actual == expected
+
+    def test_scripts_removed_after_extraction(self):
+        engine = ScrapingEngine()
+        soup = BeautifulSoup(FIXTURE, "html.parser")
+
+        page = engine._extract_page_data(soup, BASE_URL, {})
+
+        assert "not text" not in page["text_content"]
+        assert soup.find("script") is None
+        assert soup.find("style") is None
+
+    @pytest.mark.asyncio
+    async def test_basic_scraper_keeps_html_parser_tree(self):
+        # Unclosed tags and a missing <html>/<body>, which lxml would repair
+        html = '<title>T</title><p>One<p>Two <b>bold<i>both</b> tail<table><td>x'
+        response = FetchResponse(
+            BASE_URL, 200, "OK", httpx.Headers(), html.encode(), "utf-8",
+            timedelta(0), [],
+        )
+        engine = ScrapingEngine()
+
+        with patch.object(engine, "_fetch_url", AsyncMock(return_value=response)):
+            data = await engine._basic_scraper(
+                BASE_URL,
+                {"extract_full_html": True, "custom_selectors": {"cells": "td"}},
+            )
+
+        assert data["raw_html"] == str(BeautifulSoup(html, "html.parser"))
+        assert data["custom_data"] == engine._extract_custom_data(
+            BeautifulSoup(html, "html.parser"), {"cells": "td"}
+        )
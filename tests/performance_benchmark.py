@@ -65,6 +65,8 @@ class PerformanceBenchmark:
             ("Logging Performance", self.benchmark_logging),
             ("API Response Times", self.benchmark_api_endpoints),
             ("Queue Operations", self.benchmark_queue_system),
+            ("Headless Rendering", self.benchmark_headless_rendering),
+            ("Link Extraction", self.benchmark_link_extraction),
             ("Concurrent Operations", self.benchmark_concurrency),
         ]
 
@@ -361,6 +363,225 @@ class PerformanceBenchmark:
                 metadata={"simulated": True, "queue_not_available": True},
             )
 
+    def benchmark_headless_rendering(self) -> BenchmarkResult:
+        """Benchmark pooled headless rendering against a local fixture site"""
+        from aiohttp import web
+
+        from business_intel_scraper.backend.queue.distributed_crawler import (
+            PUPPETEER_AVAILABLE,
+            HeadlessBrowser,
+        )
+
+        if not PUPPETEER_AVAILABLE:
+            raise ImportError("pyppeteer is required for the rendering benchmark")
+
+        num_pages = 100
+
+        # Each page pulls an image, a web font and a video, and adds half its
+        # content from script after load
+        async def fixture_page(request):
+            n = int(request.match_info["n"])
+            links = "".join(
+                f'<a href="/page/{(n + i) % num_pages}">p{i}</a>' for i in range(1, 20)
+            )
+            html = f"""<html><head><title>Fixture {n}</title>
+                <style>@font-face {{
+                    font-family: F; src: url(/asset/font.woff2);
+                }}</style>
+                </head><body style="font-family: F">
+                <img src="/asset/{n}.png"><video src="/asset/{n}.mp4"></video>
+                <ul id="items">{"<li>static</li>" * 20}</ul>{links}
+                <script>setTimeout(() => {{
+                    const ul = document.getElementById('items');
+                    for (let i = 0; i < 20; i++)
+                        ul.appendChild(document.createElement('li'));
+                }}, 150);</script></body></html>"""
+            return web.Response(text=html, content_type="text/html")
+
+        async def fixture_asset(request):
+            await asyncio.sleep(0.2)  # slow CDN
+            return web.Response(
+                body=b"\0" * 50_000, content_type="application/octet-stream"
+            )
+
+        async def run() -> tuple:
+            app = web.Application()
+            app.router.add_get("/page/{n}", fixture_page)
+            app.router.add_get("/asset/{name}", fixture_asset)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            browser = HeadlessBrowser(max_browsers=1, pages_per_browser=4)
+            operations = []
+
+            async def render(n: int):
+                op_start = time.time()
+                await browser.render_page(f"http://127.0.0.1:{port}/page/{n}")
+                operations.append(time.time() - op_start)
+
+            try:
+                await browser.initialize()
+                start_time = time.time()
+                await asyncio.gather(
+                    *(render(n) for n in range(num_pages)), return_exceptions=True
+                )
+                return operations, time.time() - start_time, browser.get_stats()
+            finally:
+                await browser.close()
+                await runner.cleanup()
+
+        operations, total_duration, stats = asyncio.run(run())
+
+        return BenchmarkResult(
+            name="Headless Rendering",
+            duration_seconds=total_duration,
+            operations_per_second=len(operations) / total_duration,
+            total_operations=len(operations),
+            success_rate=len(operations) / num_pages * 100,
+            min_time=min(operations) if operations else 0,
+            max_time=max(operations) if operations else 0,
+            avg_time=statistics.mean(operations) if operations else 0,
+            std_dev=statistics.stdev(operations) if len(operations) > 1 else 0.0,
+            metadata={
+                "pool_size": stats["pool_size"],
+                "pages_per_second": len(operations) / total_duration,
+                "js_heap_bytes_per_page": stats["avg_js_heap_bytes"],
+                "requests_blocked": stats["requests_blocked"],
+                "pages_recycled": stats["pages_recycled"],
+            },
+        )
+
+    def benchmark_link_extraction(self) -> BenchmarkResult:
+        """Benchmark parse-worker link extraction: inline on the loop vs the pool"""
+        import os
+        import tempfile
+        from pathlib import Path
+        from urllib.parse import urljoin
+
+        from bs4 import BeautifulSoup
+
+        from business_intel_scraper.backend.queue.distributed_crawler import (
+            LinkExtractionPool,
+            extract_links,
+            is_crawlable_url,
+        )
+
+        # Saved HTML pages; BENCHMARK_HTML_CORPUS points at a directory of
+        # real captures, otherwise a mixed-size corpus is generated
+        corpus_dir = os.environ.get("BENCHMARK_HTML_CORPUS")
+        temp_dir = None
+        if not corpus_dir:
+            temp_dir = tempfile.TemporaryDirectory()
+            corpus_dir = temp_dir.name
+            for n in range(60):
+                blocks = 50 if n % 10 else 5000  # every tenth page is a large listing
+                body = "".join(
+                    f'<div class="item"><h3>Item {i}</h3><p>{"lorem ipsum " * 20}</p>'
+                    f'<a href="/item/{n}/{i}">Item {i}</a>'
+                    f'<a href="/item/{n}/{i}">'
+                    f'<img src="/img/{i}.jpg" alt="item {i}"></a></div>'
+                    for i in range(blocks)
+                )
+                nav = "".join(
+                    f'<a href="/section/{s}">Section {s}</a>' for s in range(40)
+                )
+                Path(corpus_dir, f"page-{n}.html").write_text(
+                    f"<html><body><nav>{nav}</nav>{body}"
+                    f'<form action="/search"><input name="q"></form></body></html>'
+                )
+        pages = [
+            path.read_text(errors="ignore")
+            for path in sorted(Path(corpus_dir).glob("*.html"))
+        ]
+        if temp_dir:
+            temp_dir.cleanup()
+
+        concurrency = 8
+
+        def inline_soup(content: str, base_url: str):
+            # Link extraction as ParseWorker did it before the pool: html.parser
+            # on the loop
+            soup = BeautifulSoup(content, "html.parser")
+            links = [
+                urljoin(base_url, link["href"])
+                for link in soup.find_all("a", href=True)
+            ]
+            return [url for url in dict.fromkeys(links) if is_crawlable_url(url)]
+
+        async def run(extract) -> tuple:
+            operations = []
+            lags = []
+            queue = list(enumerate(pages))
+
+            async def ticker():
+                # Lateness of a 10ms timer is the time the loop spent blocked
+                while True:
+                    tick_start = time.perf_counter()
+                    await asyncio.sleep(0.01)
+                    lags.append(time.perf_counter() - tick_start - 0.01)
+
+            async def worker():
+                while queue:
+                    n, content = queue.pop()
+                    op_start = time.perf_counter()
+                    result = extract(content, f"https://bench.example/page/{n}")
+                    if asyncio.iscoroutine(result):
+                        await result
+                    operations.append(time.perf_counter() - op_start)
+                    await asyncio.sleep(0)
+
+            tick_task = asyncio.create_task(ticker())
+            await asyncio.sleep(0.02)
+            start_time = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            total_duration = time.perf_counter() - start_time
+            tick_task.cancel()
+            return operations, total_duration, sorted(lags) or [0.0]
+
+        def summarize(operations, total_duration, lags) -> Dict[str, float]:
+            return {
+                "pages_per_second": len(operations) / total_duration,
+                "loop_lag_p50_ms": lags[len(lags) // 2] * 1000,
+                "loop_lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000,
+                "loop_lag_max_ms": lags[-1] * 1000,
+            }
+
+        inline_soup_stats = summarize(*asyncio.run(run(inline_soup)))
+        inline_fast_stats = summarize(*asyncio.run(run(extract_links)))
+
+        pool = LinkExtractionPool()
+        try:
+            operations, total_duration, lags = asyncio.run(run(pool.extract))
+            pool_stats = pool.get_stats()
+        finally:
+            pool.close()
+
+        return BenchmarkResult(
+            name="Link Extraction",
+            duration_seconds=total_duration,
+            operations_per_second=len(operations) / total_duration,
+            total_operations=len(operations),
+            success_rate=len(operations) / len(pages) * 100,
+            min_time=min(operations),
+            max_time=max(operations),
+            avg_time=statistics.mean(operations),
+            std_dev=statistics.stdev(operations) if len(operations) > 1 else 0.0,
+            metadata={
+                "corpus_pages": len(pages),
+                "corpus_bytes": sum(len(page) for page in pages),
+                "concurrency": concurrency,
+                "parser": pool_stats["parser"],
+                "pool_workers": pool_stats["max_workers"],
+                "saturated_waits": pool_stats["saturated_waits"],
+                "process_pool": summarize(operations, total_duration, lags),
+                "inline_fast_parser": inline_fast_stats,
+                "inline_html_parser": inline_soup_stats,
+            },
+        )
+
     def benchmark_concurrency(self) -> BenchmarkResult:
         """Benchmark concurrent operations performance"""
         operations = []
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the aiosqlite-backed AsyncDatabasePool used by backend_server
+"""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from config.database_manager import AsyncDatabasePool
+
+pytest.importorskip("aiosqlite")
+
+SLOW_QUERY = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3000000)
+    SELECT SUM(i) FROM n
+"""
+
+
+@pytest.fixture
+def pool(tmp_path):
+    database_path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(database_path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.close()
+
+    pool = AsyncDatabasePool(database_path, pool_size=2)
+    yield pool
+    asyncio.run(pool.close())
+
+
+class TestAsyncDatabasePool:
+    """Pragmas, bounded borrowing, transactions and loop responsiveness"""
+
+    @pytest.mark.asyncio
+    async def test_connections_use_wal_and_normal_sync(self, pool):
+        async with pool.connection() as conn:
+            async with conn.execute("PRAGMA journal_mode") as cursor:
+                assert (await cursor.fetchone())[0] == "wal"
+            async with conn.execute("PRAGMA synchronous") as cursor:
+                assert (await cursor.fetchone())[0] == 1  # NORMAL
+
+    @pytest.mark.asyncio
+    async def test_execute_and_fetch_helpers(self, pool):
+        row_id, rowcount = await pool.execute(
+            "INSERT INTO items (name) VALUES (?)", ("first",)
+        )
+        await pool.execute("INSERT INTO items (name) VALUES (?)", ("second",))
+
+        assert (row_id, rowcount) == (1, 1)
+        assert await pool.fetchone("SELECT name FROM items WHERE id = ?", (1,)) == (
+            "first",
+        )
+        assert await pool.fetchall("SELECT id FROM items ORDER BY id") == [(1,), (2,)]
+        assert [row async for row in pool.iterate("SELECT name FROM items")] == [
+            ("first",),
+            ("second",),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_borrowing_is_bounded_by_pool_size(self, pool):
+        active = peak = 0
+
+        async def borrow():
+            nonlocal active, peak
+            async with pool.connection():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(borrow() for _ in range(10)))
+
+        assert peak == 2
+        assert pool.get_stats()["available_connections"] == 2
+
+    @pytest.mark.asyncio
+    async def test_transaction_rolls_back_on_error(self, pool):
+        with pytest.raises(RuntimeError):
+            async with pool.transaction() as conn:
+                await conn.execute("INSERT INTO items (name) VALUES ('lost')")
+                raise RuntimeError("abort")
+
+        assert await pool.fetchall("SELECT * FROM items") == []
+
+    @pytest.mark.asyncio
+    async def test_slow_query_does_not_block_event_loop(self, pool):
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await pool.fetchone(SLOW_QUERY)
+        elapsed = time.perf_counter() - start
+        done.set()
+        await ticker_task
+
+        # The ticker keeps running while the query executes on the pool thread
+        assert ticks >= max(2, int(elapsed / 0.005 * 0.3))
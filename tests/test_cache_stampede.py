@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Tests for single-flight loading, stale-while-revalidate and negative caching
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import caching.multi_tier_cache as multi_tier_cache
+from caching.multi_tier_cache import MultiTierCacheManager
+from caching.stampede import CacheRecord, SingleFlight
+from performance.advanced_caching import create_cache_system
+
+
+@pytest.fixture
+def manager(tmp_path):
+    # Redis is never connected, so the memory and database tiers serve everything
+    manager = MultiTierCacheManager(db_path=str(tmp_path / "cache.db"))
+    yield manager
+    asyncio.run(manager.database_cache.close())
+
+
+class CountingLoader:
+    def __init__(self, value="fresh", delay=0.02):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+class TestSingleFlight:
+    """Concurrent misses share one loader call"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_result(self):
+        flight, loader = SingleFlight(), CountingLoader()
+
+        results = await asyncio.gather(*(flight.do("k", loader) for _ in range(20)))
+
+        assert results == ["fresh"] * 20
+        assert loader.calls == 1
+        assert not flight.in_flight("k")
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("backend down")
+
+        results = await asyncio.gather(
+            *(flight.do("k", failing) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_leaves_waiters_the_value(self):
+        flight, loader = SingleFlight(), CountingLoader(delay=0.05)
+
+        leader = asyncio.ensure_future(flight.do("k", loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do("k", loader))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await waiter == "fresh"
+        assert leader.cancelled()
+        assert loader.calls == 1
+        assert not flight.in_flight("k")
+
+    def test_early_refresh_probability_rises_near_deadline(self):
+        now = time.time()
+        far = CacheRecord(
+            value=1, fresh_until=now + 100, stale_until=now + 100, delta=0.5
+        )
+        near = CacheRecord(
+            value=1, fresh_until=now + 0.01, stale_until=now + 1, delta=0.5
+        )
+
+        assert sum(far.refresh_due(now=now) for _ in range(1000)) == 0
+        assert sum(near.refresh_due(now=now) for _ in range(1000)) > 900
+
+
+class TestMultiTierCacheManager:
+    """get_or_set on MultiTierCacheManager and the cached decorator"""
+
+    @pytest.mark.asyncio
+    async def test_stampede_on_cold_key_runs_loader_once(self, manager):
+        loader = CountingLoader()
+
+        results = await asyncio.gather(
+            *(manager.get_or_set("hot", loader, ttl=60) for _ in range(50))
+        )
+
+        assert results == ["fresh"] * 50
+        assert loader.calls == 1
+        assert await manager.get("hot") == "fresh"
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_one_refresh_runs(self, manager):
+        await manager.get_or_set(
+            "k", CountingLoader("old"), ttl=0.05, stale_ttl=60, beta=0
+        )
+        await asyncio.sleep(0.1)
+
+        refresher = CountingLoader("new", delay=0.05)
+        served = await asyncio.gather(
+            *(
+                manager.get_or_set("k", refresher, ttl=60, stale_ttl=60, beta=0)
+                for _ in range(10)
+            )
+        )
+        assert served == ["old"] * 10
+
+        await asyncio.sleep(0.1)
+        assert refresher.calls == 1
+        assert await manager.get_or_set("k", refresher, ttl=60, beta=0) == "new"
+
+    @pytest.mark.asyncio
+    async def test_negative_results_are_cached(self, manager):
+        empty = CountingLoader(None)
+
+        for _ in range(3):
+            value = await manager.get_or_set("missing", empty, ttl=60, negative_ttl=30)
+            assert value is None
+        assert empty.calls == 1
+        assert await manager.get("missing") is None
+
+        uncached = CountingLoader(None)
+        for _ in range(2):
+            await manager.get_or_set("other", uncached, ttl=60)
+        assert uncached.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_database_queried_only_after_redis_miss(self, manager, monkeypatch):
+        queried = []
+
+        async def redis_get(key):
+            queried.append(("redis", key))
+            return "from redis" if key == "shared" else None
+
+        async def database_get(key):
+            queried.append(("database", key))
+            return None
+
+        monkeypatch.setattr(manager.redis_cache, "get", redis_get)
+        monkeypatch.setattr(manager.database_cache, "get", database_get)
+
+        assert await manager.get("shared") == "from redis"
+        assert await manager.get("absent") is None
+        assert queried == [
+            ("redis", "shared"),
+            ("redis", "absent"),
+            ("database", "absent"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cached_decorator_uses_single_flight(self, manager, monkeypatch):
+        monkeypatch.setattr(multi_tier_cache, "cache_manager", manager)
+        calls = 0
+
+        @multi_tier_cache.cached(ttl=60, key_prefix="dashboard")
+        async def analytics(user_id):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return {"user": user_id}
+
+        results = await asyncio.gather(*(analytics(7) for _ in range(10)))
+
+        assert results == [{"user": 7}] * 10
+        assert calls == 1
+
+
+class TestAdvancedMultiTierCache:
+    """get_or_set on performance.advanced_caching.MultiTierCache"""
+
+    @pytest.mark.asyncio
+    async def test_get_or_set_coalesces_and_keeps_tags(self):
+        cache = create_cache_system({})
+        loader = CountingLoader({"rows": 3})
+
+        results = await asyncio.gather(
+            *(cache.get_or_set("q", loader, ttl=60, tags=["job:1"]) for _ in range(10))
+        )
+
+        assert results == [{"rows": 3}] * 10
+        assert loader.calls == 1
+        assert await cache.invalidate_by_tags(["job:1"]) == 1
+        assert await cache.get("q") is None
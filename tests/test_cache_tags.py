@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for tag-indexed invalidation in performance.advanced_caching
+"""
+
+import fnmatch
+from datetime import datetime
+
+import pytest
+
+from performance.advanced_caching import (
+    CacheEntry,
+    MemoryCache,
+    MultiTierCache,
+    RedisCache,
+)
+
+
+class FakeRedis:
+    """The handful of redis.asyncio commands RedisCache uses, over plain dicts"""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.commands = []
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value):
+        self.commands.append("SET")
+        self.values[key] = value
+
+    async def setex(self, key, ttl, value):
+        self.commands.append("SETEX")
+        self.values[key] = value
+
+    async def sadd(self, key, *members):
+        self.commands.append("SADD")
+        self.sets.setdefault(key, set()).update(m.encode() for m in members)
+
+    async def smembers(self, key):
+        self.commands.append("SMEMBERS")
+        return set(self.sets.get(key, ()))
+
+    async def delete(self, *keys):
+        self.commands.append("DEL")
+        deleted = 0
+        for key in keys:
+            deleted += self.values.pop(key, None) is not None
+            deleted += self.sets.pop(key, None) is not None
+        return deleted
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def scan_iter(self, match, count=None):
+        for key in list(self.values) + list(self.sets):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.queued.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        self.client.commands.append("EXEC")
+        results = []
+        for name, args, kwargs in self.queued:
+            results.append(await getattr(self.client, name)(*args, **kwargs))
+        return results
+
+
+def entry(key, tags):
+    return CacheEntry(key=key, value={"key": key}, created_at=datetime.now(),
+                      expires_at=None, tags=tags)
+
+
+class TestMemoryTagIndex:
+    """The memory tier's tag -> keys index follows sets, evictions and deletes"""
+
+    @pytest.mark.asyncio
+    async def test_index_tracks_entry_lifecycle(self):
+        cache = MemoryCache(max_size=3)
+        await cache.set(entry("a", ["job:1", "user:7"]))
+        await cache.set(entry("b", ["job:1"]))
+        await cache.set(entry("c", ["job:2"]))
+        assert cache.keys_for_tags(["job:1"]) == {"a", "b"}
+
+        await cache.set(entry("d", ["job:2"]))  # evicts "a"
+        await cache.set(entry("b", ["job:3"]))  # re-tagged
+        await cache.delete("c")
+
+        assert cache.tag_index == {"job:2": {"d"}, "job:3": {"b"}}
+
+    @pytest.mark.asyncio
+    async def test_invalidation_only_touches_tagged_keys(self):
+        cache = MemoryCache(max_size=10000)
+        for i in range(5000):
+            await cache.set(entry(f"k{i}", [f"job:{i % 100}"]))
+
+        removed = await cache.invalidate_tags(["job:3", "job:4"])
+
+        assert len(removed) == 100
+        assert len(cache.cache) == 4900
+        assert "job:3" not in cache.tag_index
+        assert not await cache.exists("k3")
+
+
+class TestRedisTagSets:
+    """Redis tier keeps SADD tag sets and invalidates with pipelined DEL"""
+
+    @pytest.mark.asyncio
+    async def test_tag_sets_drive_invalidation(self):
+        redis_cache = RedisCache("redis://unused", key_prefix="t:")
+        fake = redis_cache.redis_client = FakeRedis()
+
+        await redis_cache.set(entry("a", ["job:1"]), ttl=60)
+        await redis_cache.set(entry("b", ["job:1", "user:7"]))
+        await redis_cache.set(entry("c", ["user:7"]))
+        assert fake.sets["t:tag:job:1"] == {b"a", b"b"}
+
+        fake.commands.clear()
+        removed = await redis_cache.invalidate_tags(["job:1"])
+
+        assert removed == {"a", "b"}
+        assert set(fake.values) == {"t:c"}
+        assert "t:tag:job:1" not in fake.sets
+        assert fake.commands.count("EXEC") == 2
+
+    @pytest.mark.asyncio
+    async def test_pattern_clear_uses_scan(self):
+        redis_cache = RedisCache("redis://unused", key_prefix="t:")
+        redis_cache.redis_client = FakeRedis()
+        redis_cache.DELETE_BATCH_SIZE = 2
+        for key in ("user:1", "user:2", "user:3", "page:1"):
+            await redis_cache.set(entry(key, []))
+
+        assert await redis_cache.clear("user:*") == 3
+        assert await redis_cache.exists("page:1")
+
+    @pytest.mark.asyncio
+    async def test_multi_tier_invalidation_covers_both_tiers(self):
+        redis_cache = RedisCache("redis://unused", key_prefix="t:")
+        redis_cache.redis_client = FakeRedis()
+        cache = MultiTierCache(MemoryCache(), redis_cache)
+
+        await cache.set("a", 1, tags=["job:1"])
+        await cache.set("b", 2, tags=["job:2"])
+        await cache.memory_cache.delete("a")  # now only in Redis
+
+        assert await cache.invalidate_by_tags(["job:1"]) == 1
+        assert await cache.get("a") is None
+        assert await cache.get("b") == 2
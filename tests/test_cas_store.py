@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming writes into the CFPL content-addressed store
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from storage.capture_engine import CFPLCaptureEngine
+from storage.cas_store import CASStore
+from storage.config import CFPLConfig, LimitsConfig, StorageConfig
+
+
+async def chunked(data, size=10_000):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def reference_count(store, sha256_hash):
+    store.flush()
+    conn = sqlite3.connect(store.catalog_db)
+    row = conn.execute(
+        "SELECT reference_count FROM content_objects WHERE sha256 = ?", (sha256_hash,)
+    ).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def object_count(store):
+    store.flush()
+    conn = sqlite3.connect(store.catalog_db)
+    count = conn.execute("SELECT COUNT(*) FROM content_objects").fetchone()[0]
+    conn.close()
+    return count
+
+
+class TestStreamingWrites:
+    """Hash-while-spooling writes, dedup and abort"""
+
+    @pytest.mark.asyncio
+    async def test_stream_matches_digest_and_leaves_no_temp(self, tmp_path):
+        store = CASStore(str(tmp_path))
+        store.SPOOL_BATCH_BYTES = 64 * 1024
+        data = bytes(range(256)) * 4096  # 1 MiB
+
+        sha256_hash, size = await store.store_stream(
+            chunked(data), "application/octet-stream"
+        )
+
+        assert sha256_hash == hashlib.sha256(data).hexdigest()
+        assert size == len(data)
+        assert store.retrieve_content(sha256_hash) == data
+        assert store._get_cas_path(sha256_hash).stat().st_mode & 0o777 == 0o444
+        assert list(store.tmp_root.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_duplicate_content_is_referenced_not_rewritten(self, tmp_path):
+        store = CASStore(str(tmp_path))
+
+        first = store.store_content(b"same body", "text/plain")
+        second, _ = await store.store_stream(chunked(b"same body", 3))
+
+        assert first == second
+        # One object; references come from manifests, not stores
+        assert object_count(store) == 1
+        assert reference_count(store, first) == 0
+        assert list(store.tmp_root.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_discards_partial_object(self, tmp_path):
+        store = CASStore(str(tmp_path))
+
+        async def broken():
+            yield b"partial"
+            raise ConnectionError("peer reset")
+
+        with pytest.raises(ConnectionError):
+            await store.store_stream(broken())
+
+        assert list(store.tmp_root.iterdir()) == []
+        assert list(store.cas_root.iterdir()) == []
+
+
+class TestCaptureStreaming:
+    """CFPLCaptureEngine streams response bodies into the store"""
+
+    @pytest.fixture
+    def body(self):
+        return b"x" * (3 * 1024 * 1024)
+
+    @pytest.mark.asyncio
+    async def test_fetch_streams_body_into_cas(self, tmp_path, body):
+        async def handler(request):
+            response = web.StreamResponse(headers={"Content-Type": "video/mp4"})
+            await response.prepare(request)
+            for i in range(0, len(body), 100_000):
+                await response.write(body[i:i + 100_000])
+            return response
+
+        app = web.Application()
+        app.router.add_get("/video.mp4", handler)
+        config = CFPLConfig(
+            storage=StorageConfig(root=str(tmp_path)),
+            limits=LimitsConfig(max_asset_bytes=1024 * 1024),
+        )
+
+        async with TestServer(app) as server:
+            async with CFPLCaptureEngine(config) as engine:
+                url = str(server.make_url("/video.mp4"))
+                fetched = await engine._fetch_with_metadata(url)
+                rejected = await engine._capture_direct_media(url)
+
+        assert fetched["content"] is None
+        assert fetched["size"] == len(body)
+        assert fetched["sha256"] == hashlib.sha256(body).hexdigest()
+        assert engine.cas_store.retrieve_content(fetched["sha256"]) == body
+        # Over max_asset_bytes: rejected mid-stream, nothing stored twice or left behind
+        assert rejected is None
+        assert object_count(engine.cas_store) == 1
+        assert list(engine.cas_store.tmp_root.iterdir()) == []
+
+
+class TestCatalogWriter:
+    """Catalog writes share one connection and commit in groups"""
+
+    def test_queued_writes_commit_as_one_group(self, tmp_path):
+        store = CASStore(str(tmp_path))
+        writer = store._catalog_writer()
+        batches = []
+        commit = writer._commit
+
+        def counting_commit(conn, batch):
+            batches.append(len(batch))
+            return commit(conn, batch)
+
+        writer._commit = counting_commit
+
+        # Hold the writer so every store below queues behind it
+        release = threading.Event()
+        writer.submit(lambda conn: release.wait())
+        hashes = [store.store_content(f"asset {i}".encode()) for i in range(40)]
+        release.set()
+        store.flush()
+
+        # Blocker, 40 object rows and the flush marker in a handful of transactions
+        assert sum(batches) == 42 and len(batches) <= 3
+        assert all(reference_count(store, h) == 0 for h in hashes)
+        store.close()
+
+    def test_record_capture_batch_and_read_back(self, tmp_path):
+        store = CASStore(str(tmp_path))
+        sha256_hash = store.store_content(b"page")
+        captures = [
+            store.write_manifest("crawl", f"https://site{i}.example/", {
+                "fetch_start": "2026-01-01T00:00:00Z",
+                "status": 200,
+                "content": {"sha256": sha256_hash, "content_type": "text/html"},
+            })
+            for i in range(25)
+        ]
+
+        assert store.record_capture_batch(captures) == 25
+        assert reference_count(store, sha256_hash) == 25
+        assert len(store.query_captures(run_id="crawl")) == 25
+        assert store.get_storage_stats()["captures"]["total"] == 25
+        store.close()
+
+    def test_failed_write_does_not_fail_its_group(self, tmp_path):
+        store = CASStore(str(tmp_path))
+        writer = store._catalog_writer()
+        release = threading.Event()
+        writer.submit(lambda conn: release.wait())
+
+        bad = writer.submit(lambda conn: conn.execute("INSERT INTO missing VALUES (1)"))
+        good = store.store_content(b"fine")
+        release.set()
+
+        with pytest.raises(sqlite3.OperationalError):
+            bad.result()
+        assert reference_count(store, good) == 0
+        store.close()
+
+
+def record_capture(store, run_id, url, fetch_start, content, assets=(), media=()):
+    manifest_path = store.create_manifest(run_id, url, {
+        "fetch_start": fetch_start,
+        "status": 200,
+        "content": {"sha256": content, "content_type": "text/html"},
+        "assets": [{"url": f"{url}asset", "sha256": h} for h in assets],
+        "media": [{"url": f"{url}media", "sha256": h,
+                   "segments": [{"sha256": s} for s in seg]}
+                  for h, seg in media],
+    })
+    return manifest_path
+
+
+class TestGarbageCollection:
+    """Reference tracking covers every manifest hash; GC runs in resumable batches"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = CASStore(str(tmp_path))
+        store.GC_GRACE_SECONDS = 0
+        yield store
+        store.close()
+
+    def test_assets_and_media_keep_objects_alive(self, store):
+        page, asset, playlist, segment, orphan = (
+            store.store_content(f"object {i}".encode()) for i in range(5)
+        )
+        record_capture(store, "run", "https://a.example/", "2026-01-01T00:00:00Z",
+                       page, assets=[asset], media=[(playlist, [segment])])
+
+        stats = store.cleanup_old_content(retention_days=36500)
+
+        assert stats["complete"] and stats["deleted_content_objects"] == 1
+        assert reference_count(store, segment) == 1
+        assert reference_count(store, orphan) is None
+        assert not store._get_cas_path(orphan).exists()
+        assert store.retrieve_content(segment) == b"object 3"
+
+    def test_expired_captures_release_their_objects(self, store):
+        old, shared = store.store_content(b"old page"), store.store_content(b"shared")
+        new = store.store_content(b"new page")
+        old_manifest = record_capture(store, "run", "https://old.example/",
+                                      "2000-01-01T00:00:00Z", old, assets=[shared])
+        record_capture(store, "run", "https://new.example/", "2999-01-01T00:00:00Z",
+                       new, assets=[shared])
+
+        stats = store.cleanup_old_content(retention_days=1)
+
+        assert stats["deleted_manifests"] == 1
+        assert not os.path.exists(old_manifest)
+        assert reference_count(store, old) is None
+        assert reference_count(store, shared) == 1
+        assert reference_count(store, new) == 1
+
+    def test_grace_period_protects_unrecorded_objects(self, store):
+        store.GC_GRACE_SECONDS = 3600
+        in_flight = store.store_content(b"manifest not written yet")
+
+        store.cleanup_old_content(retention_days=1)
+
+        assert reference_count(store, in_flight) == 0
+        assert store._get_cas_path(in_flight).exists()
+
+    def test_restore_during_sweep_keeps_object(self, store):
+        sha256_hash = store.store_content(b"swept then stored again")
+        writer = store._catalog_writer()
+        release = threading.Event()
+        writer.submit(lambda conn: release.wait())
+        # The sweep is queued ahead of the re-store's catalog refresh
+        cutoff = "9999-01-01T00:00:00"
+        swept = writer.submit(store._delete_unreferenced, [sha256_hash], cutoff, "")
+        restore = threading.Thread(
+            target=store.store_content, args=(b"swept then stored again",)
+        )
+        restore.start()
+        while writer._pending < 3:
+            time.sleep(0.01)
+        release.set()
+        restore.join()
+
+        assert swept.result() == 1
+        assert reference_count(store, sha256_hash) == 0
+        assert store.retrieve_content(sha256_hash) == b"swept then stored again"
+
+    def test_bounded_batches_resume(self, store):
+        orphans = [store.store_content(f"orphan {i}".encode()) for i in range(5)]
+
+        first = store.cleanup_old_content(retention_days=1, batch_size=2, max_batches=3)
+        assert not first["complete"]
+        assert first["deleted_content_objects"] == 2
+
+        rest = store.cleanup_old_content(retention_days=1, batch_size=2)
+        assert rest["complete"]
+        assert rest["deleted_content_objects"] == 3
+        assert all(reference_count(store, h) is None for h in orphans)
+
+    def test_mark_phase_indexes_legacy_captures(self, store):
+        page = store.store_content(b"legacy page")
+        asset = store.store_content(b"legacy asset")
+        record_capture(store, "run", "https://legacy.example/", "2026-01-01T00:00:00Z",
+                       page, assets=[asset])
+        # Catalog as it looked before reference tracking
+        store.flush()
+        conn = sqlite3.connect(store.catalog_db)
+        with conn:
+            conn.execute("DELETE FROM capture_refs")
+            conn.execute("UPDATE captures SET refs_indexed = 0")
+            conn.execute("UPDATE content_objects SET reference_count = 0")
+        conn.close()
+
+        stats = store.cleanup_old_content(retention_days=36500)
+
+        assert stats["indexed_captures"] == 1
+        assert stats["deleted_content_objects"] == 0
+        assert reference_count(store, asset) == 1
+
+
+class TestPackFiles:
+    """Small objects go to compressed pack files; repack reclaims their dead space"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = CASStore(str(tmp_path), pack_threshold_bytes=1024)
+        store.GC_GRACE_SECONDS = 0
+        yield store
+        store.close()
+
+    def test_small_objects_packed_large_objects_loose(self, store):
+        small = store.store_content(b"body { color: red }" * 10, "text/css")
+        again = store.store_content(b"body { color: red }" * 10, "text/css")
+        large = store.store_content(b"x" * 4096)
+
+        assert small == again
+        assert not store._get_cas_path(small).exists()
+        assert store._get_cas_path(large).exists()
+        assert store.has_content(small)
+        assert store.retrieve_content(small) == b"body { color: red }" * 10
+        assert store.retrieve_content(large) == b"x" * 4096
+        stats = store.get_storage_stats()["storage"]
+        assert stats["packed_objects"] == 1 and stats["pack_files"] == 1
+
+    def test_packed_objects_readable_without_threshold(self, store, tmp_path):
+        sha256_hash = store.store_content(b"packed once")
+        store.close()
+
+        reader = CASStore(str(tmp_path))
+        assert reader.retrieve_content(sha256_hash) == b"packed once"
+        reader.close()
+
+    def test_gc_then_repack_reclaims_space(self, store):
+        keep = store.store_content(b"referenced")
+        orphans = [store.store_content(f"orphan {i}".encode()) for i in range(20)]
+        record_capture(store, "run", "https://a.example/", "2026-01-01T00:00:00Z", keep)
+        store.packs.close()  # seal the pack so repack may rewrite it
+        old_packs = [name for name, _, _ in store.packs.sealed_packs()]
+
+        stats = store.cleanup_old_content(retention_days=36500)
+        result = store.repack()
+
+        assert stats["deleted_content_objects"] == 20
+        assert result["packs_rewritten"] == 1 and result["objects_moved"] == 1
+        assert result["bytes_reclaimed"] > 0
+        assert not any((store.packs.pack_root / name).exists() for name in old_packs)
+        assert store.retrieve_content(keep) == b"referenced"
+        assert not store.has_content(orphans[0])
+
+    def test_catalog_path_marks_pack_and_follows_repack(self, store):
+        keep = store.store_content(b"referenced")
+        store.store_content(b"orphan")
+        record_capture(store, "run", "https://a.example/", "2026-01-01T00:00:00Z", keep)
+        store.packs.close()
+        store.cleanup_old_content(retention_days=36500)
+
+        store.repack()
+
+        store.flush()
+        conn = sqlite3.connect(store.catalog_db)
+        cas_path, pack = conn.execute(
+            "SELECT cas_path, pack FROM content_objects JOIN pack_index USING (sha256)"
+        ).fetchone()
+        conn.close()
+        assert cas_path == f"pack:{pack}"
+        assert (store.packs.pack_root / pack).exists()
+
+    def test_restore_during_sweep_never_unlinks_pack(self, store):
+        sha256_hash = store.store_content(b"swept then stored again")
+        other = store.store_content(b"neighbour")
+        record_capture(store, "run", "https://a.example/",
+                       "2026-01-01T00:00:00Z", other)
+        writer = store._catalog_writer()
+        release = threading.Event()
+        writer.submit(lambda conn: release.wait())
+        cutoff = "9999-01-01T00:00:00"
+        writer.submit(store._delete_unreferenced, [sha256_hash], cutoff, "")
+        restore = threading.Thread(
+            target=store.store_content, args=(b"swept then stored again",)
+        )
+        restore.start()
+        while writer._pending < 3:
+            time.sleep(0.01)
+        release.set()
+        restore.join()
+
+        assert store.retrieve_content(sha256_hash) == b"swept then stored again"
+        # A later sweep of the re-stored copy leaves the shared pack alone
+        store.cleanup_old_content(retention_days=36500)
+        assert not store.has_content(sha256_hash)
+        assert store.retrieve_content(other) == b"neighbour"
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent-connection SQLite tier of the multi-tier cache
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from caching.multi_tier_cache import DatabaseCache
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+@pytest.fixture
+def cache(db_path):
+    cache = DatabaseCache(db_path, stats_flush_interval=3600)
+    yield cache
+    asyncio.run(cache.close())
+
+
+class TestDatabaseCache:
+    """WAL connection, read-only hits, buffered stats and batch APIs"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_and_batch_apis(self, cache, db_path):
+        assert await cache.set_many(
+            {"a": {"x": 1}, "b": [1, 2], "c": 3.5, "d": "text"}, ttl=60
+        )
+        assert await cache.set("e", {"nested": True})
+
+        assert await cache.get_many(["a", "b", "c", "d", "missing"]) == {
+            "a": {"x": 1},
+            "b": [1, 2],
+            "c": 3.5,
+            "d": "text",
+        }
+        assert await cache.get("e") == {"nested": True}
+        assert await cache.delete("e") and await cache.get("e") is None
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_write_until_stats_flush(self, cache, db_path):
+        await cache.set_many({"hot": "value", "cold": "value"})
+
+        observer = sqlite3.connect(db_path)
+        version = observer.execute("PRAGMA data_version").fetchone()[0]
+        for _ in range(25):
+            assert await cache.get("hot") == "value"
+        await cache.get("cold")
+        assert observer.execute("PRAGMA data_version").fetchone()[0] == version
+
+        await cache.flush_access_stats()
+        assert observer.execute("PRAGMA data_version").fetchone()[0] != version
+        counts = dict(observer.execute("SELECT key, access_count FROM advanced_cache"))
+        observer.close()
+        assert counts == {"hot": 25, "cold": 1}
+
+    @pytest.mark.asyncio
+    async def test_expired_rows_are_misses_until_cleanup(self, cache, db_path):
+        await cache.set("old", "value", ttl=1)
+        await cache.set("live", "value", ttl=60)
+        await asyncio.sleep(1.1)
+
+        assert await cache.get_many(["old", "live"]) == {"live": "value"}
+        assert (await cache.get_stats())["expired_entries"] == 1
+
+        await cache.cleanup_expired()
+        stats = await cache.get_stats()
+        assert (stats["total_entries"], stats["expired_entries"]) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_stats_flush_is_scheduled_after_interval(self, db_path):
+        cache = DatabaseCache(db_path, stats_flush_interval=0)
+        await cache.set("k", "v")
+        await cache.get("k")
+        await cache._stats_flush_task
+        await cache.close()
+
+        conn = sqlite3.connect(db_path)
+        assert (
+            conn.execute("SELECT access_count FROM advanced_cache").fetchone()[0] == 1
+        )
+        conn.close()
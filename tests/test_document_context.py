@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared parse-once document context in the CFPL pipeline
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from storage.cas_store import CASStore
+from storage.config import CFPLConfig, StorageConfig
+from storage.document import DocumentContext
+from storage.processors import HTMLProcessor, ProcessingPipeline, TextExtractor
+
+PAGE = b"""<html lang="en"><head><title>Shared</title>
+<script>var hidden = 1;</script></head>
+<body><nav><p>Navigation links that never show up in extracted text</p></nav>
+<article><p>This paragraph has enough words to count as a substantial block.</p>
+</article>
+<footer>Footer boilerplate</footer></body></html>"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CASStore(str(tmp_path))
+
+
+@pytest.fixture
+def manifest(store):
+    sha256_hash = store.store_content(PAGE, "text/html")
+    return {
+        "url": "https://example.com/",
+        "content": {
+            "sha256": sha256_hash,
+            "content_type": "text/html",
+            "encoding": "utf-8",
+        },
+    }
+
+
+class TestDocumentContext:
+    """Content is loaded and parsed at most once"""
+
+    def test_loads_and_parses_once(self, store, manifest):
+        document = DocumentContext(manifest, store)
+
+        with patch.object(
+            store, "retrieve_content", wraps=store.retrieve_content
+        ) as retrieve:
+            first = document.soup
+            second = document.soup
+
+        assert first is second
+        assert retrieve.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_processors_share_tree_without_mutating_it(
+        self, store, manifest, tmp_path
+    ):
+        config = CFPLConfig(storage=StorageConfig(root=str(tmp_path)))
+        document = DocumentContext(manifest, store)
+
+        text = await TextExtractor(config).process(manifest, "run", document)
+        html = await HTMLProcessor(config).process(manifest, "run", document)
+
+        assert "Navigation" not in text["main_text"]
+        assert "hidden" not in text["main_text"]
+        assert [b["tag"] for b in text["text_blocks"]] == ["p"]
+        # Skipped subtrees are still in the shared tree for later processors
+        assert document.soup.find("nav") is not None
+        assert html["title"] == "Shared"
+
+    @pytest.mark.asyncio
+    async def test_pipeline_reads_content_once(self, store, manifest, tmp_path):
+        config = CFPLConfig(storage=StorageConfig(root=str(tmp_path)))
+        pipeline = ProcessingPipeline(config)
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(json.dumps(manifest))
+
+        with patch.object(
+            pipeline.cas_store,
+            "retrieve_content",
+            wraps=pipeline.cas_store.retrieve_content,
+        ) as retrieve:
+            results = await pipeline.process_manifest(str(manifest_path), "run")
+
+        assert "error" not in results["processors"]["html_parser"]
+        assert "error" not in results["processors"]["text_extractor"]
+        assert retrieve.call_count == 1
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for HeadlessBrowser page pooling, recycling and resource blocking
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from business_intel_scraper.backend.queue import distributed_crawler
+from business_intel_scraper.backend.queue.distributed_crawler import HeadlessBrowser
+
+
+class FakePage:
+    def __init__(self, fail_urls=()):
+        self.fail_urls = fail_urls
+        self.url = None
+
+    async def setUserAgent(self, user_agent):
+        pass
+
+    async def setViewport(self, viewport):
+        pass
+
+    async def setRequestInterception(self, enabled):
+        self.intercepting = enabled
+
+    def on(self, event, handler):
+        pass
+
+    async def goto(self, url, **options):
+        if url in self.fail_urls:
+            raise TimeoutError(f"Navigation timeout: {url}")
+        self.url = url
+
+    async def evaluate(self, script):
+        return 10 if "getElementsByTagName" in script else []
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def title(self):
+        return "Fixture"
+
+    async def metrics(self):
+        return {"JSHeapUsedSize": 1000}
+
+
+class FakeBrowser:
+    def __init__(self, fail_urls=()):
+        self.fail_urls = fail_urls
+        self.contexts_opened = 0
+        self.contexts_closed = 0
+
+    async def createIncognitoBrowserContext(self):
+        self.contexts_opened += 1
+        browser = self
+
+        class Context:
+            async def newPage(self):
+                return FakePage(browser.fail_urls)
+
+            async def close(self):
+                browser.contexts_closed += 1
+
+        return Context()
+
+    async def close(self):
+        pass
+
+
+def launching(browser):
+    async def launch(**options):
+        return browser
+
+    return patch.multiple(distributed_crawler, launch=launch, PUPPETEER_AVAILABLE=True)
+
+
+class TestPagePool:
+    """Pages are leased from a fixed pool and recycled on a schedule"""
+
+    @pytest.mark.asyncio
+    async def test_pages_reused_then_recycled(self):
+        browser = FakeBrowser()
+        pool = HeadlessBrowser(max_browsers=1, pages_per_browser=2,
+                               max_renders_per_page=3, settle_interval=0)
+
+        with launching(browser):
+            results = await asyncio.gather(
+                *(pool.render_page(f"https://a.example/{i}") for i in range(6))
+            )
+            stats = pool.get_stats()
+            await pool.close()
+
+        expected = [f"https://a.example/{i}" for i in range(6)]
+        assert [r["final_url"] for r in results] == expected
+        # Two pages, each recycled after its third render
+        assert stats["pages_recycled"] == 2
+        assert browser.contexts_opened == 2
+        assert stats["pages_rendered"] == 6 and stats["avg_js_heap_bytes"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_failed_render_recycles_page(self):
+        browser = FakeBrowser(fail_urls={"https://a.example/broken"})
+        pool = HeadlessBrowser(max_browsers=1, pages_per_browser=1, settle_interval=0)
+
+        with launching(browser):
+            with pytest.raises(TimeoutError):
+                await pool.render_page("https://a.example/broken")
+            result = await pool.render_page("https://a.example/ok")
+            await pool.close()
+
+        assert result["final_url"] == "https://a.example/ok"
+        assert pool.metrics["pages_recycled"] == 1
+        assert browser.contexts_opened == 2
+
+    @pytest.mark.asyncio
+    async def test_lease_waits_for_a_free_page(self):
+        pool = HeadlessBrowser(max_browsers=1, pages_per_browser=1)
+
+        with launching(FakeBrowser()):
+            async with pool.lease_page():
+                with pytest.raises(asyncio.TimeoutError):
+                    async with pool.lease_page(timeout=0.05):
+                        pass
+            async with pool.lease_page(timeout=0.05) as page:
+                assert page.intercepting
+            await pool.close()
+
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.resourceType = resource_type
+        self.url = f"https://a.example/{resource_type}"
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class TestResourceBlocking:
+    """Blocked resource types are aborted, everything else goes through"""
+
+    @pytest.mark.asyncio
+    async def test_default_blocklist(self):
+        pool = HeadlessBrowser()
+        kinds = ("image", "font", "media", "script", "document")
+        requests = [FakeRequest(kind) for kind in kinds]
+
+        for request in requests:
+            await pool._route_request(request)
+
+        assert [r.outcome for r in requests] == ["aborted"] * 3 + ["continued"] * 2
+        assert pool.metrics["requests_blocked"] == 3
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent, resumable HLS capture in the CFPL capture engine
+"""
+
+import asyncio
+import hashlib
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from storage.capture_engine import CFPLCaptureEngine, parse_hls_playlist
+from storage.config import CaptureConfig, CFPLConfig, LimitsConfig, StorageConfig
+
+ERROR_BODY = b"<html>upstream unavailable</html>" * 50
+
+MASTER = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360
+low/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=5000000,RESOLUTION=1920x1080,CODECS="avc1.640028,mp4a.40.2"
+high/index.m3u8
+"""
+
+
+def media_playlist(count):
+    lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:4", '#EXT-X-MAP:URI="init.mp4"']
+    for i in range(count):
+        lines += ["#EXTINF:4.0,", f"seg{i}.ts"]
+    return "\n".join(lines + ["#EXT-X-ENDLIST"])
+
+
+class HLSSite:
+    """Test origin that counts requests and tracks download concurrency"""
+
+    def __init__(self, segments=12, fail_once=()):
+        self.segments = segments
+        self.fail_once = set(fail_once)
+        self.requests = Counter()
+        self.in_flight = self.peak = 0
+
+    async def handle(self, request):
+        path = request.path
+        self.requests[path] += 1
+        if path == "/master.m3u8":
+            return web.Response(text=MASTER)
+        if path.endswith("index.m3u8"):
+            return web.Response(text=media_playlist(self.segments))
+        if path in self.fail_once:
+            self.fail_once.discard(path)
+            return web.Response(status=503, body=ERROR_BODY, content_type="text/html")
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return web.Response(body=path.encode() * 100, content_type="video/mp2t")
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.handle)
+        return app
+
+
+def make_config(tmp_path, **capture):
+    return CFPLConfig(
+        storage=StorageConfig(root=str(tmp_path)),
+        capture=CaptureConfig(**capture),
+        limits=LimitsConfig(concurrent_segments=3, segment_rate_limit_rps=0),
+    )
+
+
+class TestPlaylistParsing:
+
+    def test_master_and_media_playlists(self):
+        master = parse_hls_playlist(MASTER, "https://cdn.example/v/master.m3u8")
+        media = parse_hls_playlist(media_playlist(2), "https://cdn.example/v/high/index.m3u8")
+
+        assert [v["bandwidth"] for v in master["variants"]] == [800000, 5000000]
+        assert master["variants"][1]["url"] == "https://cdn.example/v/high/index.m3u8"
+        assert master["variants"][1]["resolution"] == "1920x1080"
+        names = [s["url"].rsplit("/", 1)[1] for s in media["segments"]]
+        assert names == ["init.mp4", "seg0.ts", "seg1.ts"]
+        assert media["segments"][0]["init"] is True
+
+
+def test_capture_engine_does_not_import_the_crawler():
+    # storage ships as a package; scraping_engine.py is a top-level script
+    check = (
+        "import sys, storage.capture_engine; "
+        "sys.exit('scraping_engine' in sys.modules)"
+    )
+    assert subprocess.run([sys.executable, "-c", check]).returncode == 0
+
+
+class TestHLSCapture:
+
+    @pytest.mark.asyncio
+    async def test_master_playlist_highest_variant_concurrently(self, tmp_path):
+        site = HLSSite()
+        async with TestServer(site.app()) as server:
+            async with CFPLCaptureEngine(make_config(tmp_path)) as engine:
+                url = str(server.make_url("/master.m3u8"))
+                result = await engine._capture_hls_playlist(url)
+
+        assert [v["bandwidth"] for v in result["variants"]] == [5000000]
+        assert result["segment_count"] == 13  # init + 12 segments
+        assert not any(path.startswith("/low/") for path in site.requests)
+        assert 1 < site.peak <= 3
+
+    @pytest.mark.asyncio
+    async def test_bandwidth_cap_and_lowest_policy(self, tmp_path):
+        site = HLSSite(segments=1)
+        async with TestServer(site.app()) as server:
+            url = str(server.make_url("/master.m3u8"))
+            capped_config = make_config(tmp_path, hls_max_bandwidth=1000000)
+            async with CFPLCaptureEngine(capped_config) as engine:
+                capped = await engine._capture_hls_playlist(url)
+            every_config = make_config(tmp_path, hls_variant="all")
+            async with CFPLCaptureEngine(every_config) as engine:
+                every = await engine._capture_hls_playlist(url)
+
+        assert [v["bandwidth"] for v in capped["variants"]] == [800000]
+        assert len(every["variants"]) == 2 and every["segment_count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_interrupted_capture_resumes_from_progress(self, tmp_path):
+        site = HLSSite(segments=6, fail_once={"/high/seg4.ts"})
+        async with TestServer(site.app()) as server:
+            url = str(server.make_url("/master.m3u8"))
+            async with CFPLCaptureEngine(make_config(tmp_path)) as engine:
+                first = await engine._capture_hls_playlist(url)
+                assert engine._hls_progress_path(url).exists()
+
+                second = await engine._capture_hls_playlist(url)
+
+        assert first["segment_count"] == 6
+        assert second["segment_count"] == 7
+        assert second["resumed_segments"] == 6
+        assert site.requests["/high/seg0.ts"] == 1
+        assert site.requests["/high/seg4.ts"] == 2
+        assert not engine._hls_progress_path(url).exists()
+        # The 503 body was never streamed into CAS
+        assert not engine.cas_store.has_content(hashlib.sha256(ERROR_BODY).hexdigest())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process job progress registry and crawl progress events
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from job_progress import JobProgressRegistry
+from scraping_engine import ScrapingEngine
+
+
+class TestJobProgressRegistry:
+    """Event application, coalescing and retention"""
+
+    def test_events_between_drains_coalesce(self):
+        registry = JobProgressRegistry()
+        registry.start(1, owner_id=7, estimated_target=10)
+        registry.drain_changes()
+
+        for pages in range(1, 6):
+            registry.publish(1, {"url": f"https://a.test/{pages}", "pages_done": pages,
+                                 "queue_size": 10 - pages, "bytes": pages * 100})
+        registry.publish(2, {"pages_done": 1})
+
+        changes = {
+            snapshot["job_id"]: snapshot for snapshot in registry.drain_changes()
+        }
+        assert set(changes) == {1, 2}
+        assert changes[1]["pages_done"] == 5
+        assert changes[1]["queue_size"] == 5
+        assert changes[1]["bytes_downloaded"] == 500
+        assert changes[1]["progress_percentage"] == 50.0
+        assert [a["url"] for a in changes[1]["recent_activity"]] == [
+            "https://a.test/5",
+            "https://a.test/4",
+            "https://a.test/3",
+        ]
+        assert registry.drain_changes() == []
+
+    def test_finish_reports_final_state(self):
+        registry = JobProgressRegistry()
+        registry.start(1, estimated_target=50)
+        registry.publish(1, {"pages_done": 60, "queue_size": 4, "max_pages": 80})
+        assert registry.get(1).to_dict()["progress_percentage"] == 75.0
+
+        registry.finish(1, "completed")
+        snapshot = registry.get(1).to_dict()
+
+        assert snapshot["status"] == "completed"
+        assert snapshot["progress_percentage"] == 100.0
+        assert snapshot["queue_size"] == 0
+        assert registry.running() == []
+
+    def test_finished_jobs_expire_after_retention(self):
+        registry = JobProgressRegistry(retention_seconds=0)
+        registry.start(1)
+        registry.finish(1, "failed")
+        registry.start(2)
+
+        assert registry.get(1) is None
+        assert [p.job_id for p in registry.running()] == [2]
+
+
+class TestCrawlProgressEvents:
+    """intelligent_crawl reports running totals after every page"""
+
+    @pytest.mark.asyncio
+    async def test_crawl_publishes_per_page_events(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        async def fake_scrape_url(url, scraper_type="basic", config=None):
+            if url.endswith("broken/"):
+                raise RuntimeError("boom")
+            links = [{"url": f"{url}p{i}/"} for i in range(2)]
+            links.append({"url": f"{url}broken/"})
+            return {"url": url, "status": "success", "html_size_bytes": 1000,
+                    "links": links if url.count("/") < 4 else []}
+
+        events = []
+        config = {"max_pages": 4, "max_depth": 1, "save_to_database": False,
+                  "rate_limit": {"requests_per_second": 0}, "max_concurrent_workers": 1}
+        engine = ScrapingEngine()
+
+        with patch.object(engine, "scrape_url", side_effect=fake_scrape_url):
+            result = await engine.intelligent_crawl(
+                "http://site.test/", "basic", config, progress_callback=events.append
+            )
+
+        assert len(events) == 4
+        assert [e["pages_done"] for e in events] == [1, 2, 3, 3]
+        assert events[0]["queue_size"] == 3
+        assert events[-1]["errors"] == 1
+        assert events[-1]["bytes"] == 3000 == result["summary"]["bytes_downloaded"]
+        assert events[-1]["max_pages"] == 4
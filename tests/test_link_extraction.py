@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for link extraction: lxml/BeautifulSoup parity and pool backpressure
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from unittest.mock import patch
+from urllib.parse import urljoin
+
+import pytest
+from bs4 import BeautifulSoup
+
+from business_intel_scraper.backend.queue import distributed_crawler
+from business_intel_scraper.backend.queue.distributed_crawler import (
+    LinkExtractionPool,
+    extract_links,
+    is_crawlable_url,
+)
+
+BASE_URL = "https://a.example/dir/page.html"
+
+PAGES = [
+    """<html><body>
+    <nav><a href="/">Home</a> <a href="/about">About <b>us</b></a></nav>
+    <a href="next.html">Next</a> <a href="../up">Up</a> <a href="?page=2">2</a>
+    <a href="#top">Top</a> <a href="">Self</a> <a>No href</a>
+    <a href="/about">About again</a>
+    <a href="mailto:x@a.example">Mail</a> <a href="javascript:void(0)">JS</a>
+    <a href="/report.PDF">Report</a> <a href="/style.css">CSS</a>
+    <a href="https://b.example/x?q=a%20b&amp;r=1">External</a>
+    <a href="  /padded  ">Padded</a> <a href="//c.example/proto">Proto</a>
+    <a href="/caf&eacute;">Caf&eacute;</a>
+    </body></html>""",
+    """<html><body>
+    <form action="/search"><input name="q"></form> <form>No action</form>
+    <a href="/gallery"><img src="/thumb.jpg" alt="Gallery"></a>
+    <a href="/photo"><span><img src="/p.png" alt="Nested"></span></a>
+    <a href="/search">Search link</a> <img src="/loose.png" alt="Loose">
+    <a href="/broken"><img alt="No src"></a>
+    </body></html>""",
+    "",
+    "<p>No links at all</p>",
+]
+PAGE_IDS = ["links", "forms-and-images", "empty", "no-links"]
+
+
+def soup_extract_links(content, base_url):
+    """The ParseWorker extractor that extract_links replaced"""
+    soup = BeautifulSoup(content, 'html.parser')
+    urls = []
+    for link in soup.find_all('a', href=True):
+        urls.append({"url": urljoin(base_url, link['href']),
+                     "text": link.get_text(strip=True), "type": "link"})
+    for form in soup.find_all('form', action=True):
+        urls.append({"url": urljoin(base_url, form['action']),
+                     "text": "", "type": "form"})
+    for img in soup.find_all('img', src=True):
+        parent_link = img.find_parent('a')
+        if parent_link and parent_link.get('href'):
+            urls.append({"url": urljoin(base_url, parent_link['href']),
+                         "text": img.get('alt', ''), "type": "image_link"})
+
+    valid_urls = []
+    seen_urls = set()
+    for url_info in urls:
+        url = url_info["url"]
+        if url and url not in seen_urls and is_crawlable_url(url):
+            seen_urls.add(url)
+            valid_urls.append(url_info)
+    return valid_urls
+
+
+class TestExtractLinks:
+    """extract_links returns what the BeautifulSoup extractor did"""
+
+    @pytest.mark.parametrize("page", PAGES, ids=PAGE_IDS)
+    def test_matches_soup_extractor(self, page):
+        assert extract_links(page, BASE_URL) == soup_extract_links(page, BASE_URL)
+
+    @pytest.mark.parametrize("page", PAGES, ids=PAGE_IDS)
+    def test_soup_fallback_matches(self, page):
+        with patch.object(distributed_crawler, "LXML_AVAILABLE", False):
+            assert extract_links(page, BASE_URL) == soup_extract_links(page, BASE_URL)
+
+    def test_bytes_content(self):
+        page = PAGES[0]
+        assert extract_links(page.encode(), BASE_URL) == extract_links(page, BASE_URL)
+
+    @pytest.mark.asyncio
+    async def test_pool_runs_extract_links(self):
+        pool = LinkExtractionPool(max_workers=1)
+        try:
+            urls = await pool.extract(PAGES[1], BASE_URL)
+            assert urls == extract_links(PAGES[1], BASE_URL)
+        finally:
+            pool.close()
+        assert pool.get_stats()["pages_extracted"] == 1
+
+
+class TestLinkExtractionPoolBackpressure:
+    """At most max_pending pages are handed to the pool at once"""
+
+    @pytest.mark.asyncio
+    async def test_callers_wait_while_saturated(self):
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def blocking_extract(content, base_url):
+            started.release()
+            release.wait(5)
+            return [{"url": base_url, "text": content, "type": "link"}]
+
+        pool = LinkExtractionPool(max_workers=2, max_pending=2)
+        # Threads instead of processes so the patched extractor is picked up
+        pool._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        try:
+            with patch.object(distributed_crawler, "extract_links", blocking_extract):
+                tasks = [asyncio.create_task(pool.extract(str(i), BASE_URL))
+                         for i in range(4)]
+                for _ in range(2):
+                    await asyncio.to_thread(started.acquire, True, 5)
+                await asyncio.sleep(0.05)
+
+                assert pool.saturated
+                assert pool.get_stats()["in_flight"] == 2
+                assert pool.metrics["saturated_waits"] == 2
+                # The waiting pages were never submitted to the executor
+                assert not started.acquire(blocking=False)
+
+                release.set()
+                results = await asyncio.gather(*tasks)
+        finally:
+            release.set()
+            pool.close()
+
+        assert [result[0]["text"] for result in results] == ["0", "1", "2", "3"]
+        stats = pool.get_stats()
+        assert stats["in_flight"] == 0
+        assert stats["pages_extracted"] == 4
+        assert not pool.saturated
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_replaced(self):
+        pool = LinkExtractionPool(max_workers=1)
+        broken = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        pool._executor = broken
+
+        def crash(content, base_url):
+            raise concurrent.futures.process.BrokenProcessPool("worker died")
+
+        try:
+            with patch.object(distributed_crawler, "extract_links", crash):
+                with pytest.raises(concurrent.futures.process.BrokenProcessPool):
+                    await pool.extract(PAGES[0], BASE_URL)
+            assert pool._executor is None
+            assert not pool.saturated
+            urls = await pool.extract(PAGES[1], BASE_URL)
+            assert urls == extract_links(PAGES[1], BASE_URL)
+        finally:
+            broken.shutdown()
+            pool.close()
+
+
+class TestLinkExtractionPoolClose:
+    """Async stop paths shut the pool down without blocking the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_aclose_shuts_down_on_a_thread(self):
+        shutdown_threads = []
+
+        class RecordingExecutor(concurrent.futures.ThreadPoolExecutor):
+            def shutdown(self, wait=True, *, cancel_futures=False):
+                shutdown_threads.append(threading.get_ident())
+                super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+        pool = LinkExtractionPool(max_workers=1)
+        pool._executor = RecordingExecutor(max_workers=1)
+        await pool.extract(PAGES[0], BASE_URL)
+
+        await pool.aclose()
+        await pool.aclose()
+
+        assert pool._executor is None
+        assert len(shutdown_threads) == 1
+        assert shutdown_threads[0] != threading.get_ident()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the O(1) LRU/TTL map behind the in-memory cache tiers
+"""
+
+from datetime import datetime
+
+import pytest
+
+from caching.lru_cache import LRUCache, estimate_size
+from caching.multi_tier_cache import MemoryCache as TierMemoryCache
+from performance.advanced_caching import CacheEntry
+from performance.advanced_caching import MemoryCache as BackendMemoryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache:
+    """Recency order, lazy expiry, size accounting and counters"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=3)
+        for key in "abc":
+            cache.set(key, key.upper())
+        cache.get("a")
+        cache.set("d", "D")
+
+        assert list(cache.keys()) == ["c", "a", "d"]
+        assert cache.get("b") is None
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+    def test_ttl_expires_lazily(self):
+        clock = FakeClock()
+        cache = LRUCache(max_entries=10, clock=clock)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=50)
+        cache.set("forever", 3)
+
+        clock.now = 10
+        assert len(cache) == 3
+        assert "short" not in cache
+        assert cache.get("short") is None
+        assert cache.expirations == 1
+
+        clock.now = 100
+        assert cache.purge_expired() == 1
+        assert list(cache.keys()) == ["forever"]
+
+    def test_byte_budget_tracked_incrementally(self):
+        cache = LRUCache(max_entries=100, max_bytes=10)
+        cache.set("a", "xxxx")
+        cache.set("b", "yyyy")
+        cache.set("a", "zz")
+        assert cache.current_bytes == 6
+
+        cache.set("c", "wwwwww")
+        assert list(cache.keys()) == ["a", "c"]
+        assert cache.current_bytes == 8
+
+        cache.delete("a")
+        assert cache.current_bytes == 6
+        assert cache.clear() == 1 and cache.current_bytes == 0
+
+    def test_size_estimate_is_shallow(self):
+        nested = {"rows": [{"id": i} for i in range(1000)]}
+
+        assert estimate_size("abc") == 3
+        assert estimate_size(42) == 8
+        assert estimate_size(nested) < estimate_size([{"id": i} for i in range(1000)])
+
+
+class TestMemoryCacheTiers:
+    """Both MemoryCache wrappers run on LRUCache"""
+
+    @pytest.mark.asyncio
+    async def test_multi_tier_memory_cache(self):
+        cache = TierMemoryCache(max_size=2)
+        await cache.set("a", {"v": 1}, ttl=60)
+        await cache.set("b", [1, 2])
+        await cache.get("a")
+        await cache.set("c", "three")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == {"v": 1}
+        stats = await cache.get_stats()
+        assert (stats["total_entries"], stats["evictions"], stats["hits"]) == (2, 1, 2)
+
+    @pytest.mark.asyncio
+    async def test_advanced_memory_cache(self):
+        cache = BackendMemoryCache(max_size=2)
+
+        def entry(key):
+            return CacheEntry(
+                key=key, value=key * 3, created_at=datetime.now(), expires_at=None
+            )
+
+        for key in ("user:1", "user:2", "page:1"):
+            await cache.set(entry(key), ttl=60)
+
+        assert await cache.get("user:1") is None
+        assert (await cache.get("user:2")).hit_count == 1
+        assert await cache.clear("user:*") == 1
+        assert await cache.exists("page:1")
+        assert cache.stats["evictions"] == 1
+        assert cache.stats["memory_usage"] == len("page:1" * 3)
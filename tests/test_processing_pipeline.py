@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for CFPL run processing: worker pool, backpressure and full-run coverage
+"""
+
+import threading
+
+import pytest
+
+from storage.cas_store import CASStore
+from storage.config import CFPLConfig, ProcessingConfig, StorageConfig
+from storage.processors import ProcessingPipeline
+
+PAGE = b"<html><head><title>Page</title></head><body><p>Hello</p></body></html>"
+
+
+def make_run(root, run_id, pages):
+    store = CASStore(str(root))
+    sha256_hash = store.store_content(PAGE, "text/html")
+    for i in range(pages):
+        store.create_manifest(run_id, f"https://site{i}.example/", {
+            "fetch_start": "2026-01-01T00:00:00Z",
+            "status": 200,
+            "content": {
+                "sha256": sha256_hash,
+                "content_type": "text/html",
+                "encoding": "utf-8",
+            },
+        })
+    return store
+
+
+def make_config(root, **processing):
+    return CFPLConfig(
+        storage=StorageConfig(root=str(root)),
+        processing=ProcessingConfig(
+            enabled_processors=["html_parser", "text_extractor"], **processing
+        ),
+    )
+
+
+class TestProcessRun:
+    """process_run covers every capture with bounded in-flight work"""
+
+    def test_iter_captures_has_no_row_limit(self, tmp_path):
+        store = make_run(tmp_path, "big", 130)
+
+        assert len(store.query_captures(run_id="big")) == 100
+        assert len(list(store.iter_captures("big", batch_size=50))) == 130
+
+    @pytest.mark.asyncio
+    async def test_inline_run_processes_past_query_limit(self, tmp_path):
+        make_run(tmp_path, "big", 130)
+        pipeline = ProcessingPipeline(
+            make_config(tmp_path, execution_mode="inline", max_in_flight=3)
+        )
+
+        in_flight = peak = 0
+        run_processors = pipeline._run_processors
+
+        async def counting(manifest_path, run_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await run_processors(manifest_path, run_id)
+            finally:
+                in_flight -= 1
+
+        pipeline._run_processors = counting
+        summary = await pipeline.process_run("big")
+
+        assert summary["total_manifests"] == 130
+        assert summary["successful_processing"] == 130
+        assert peak <= 3
+        assert set(summary["processor_time_ms"]) == {"html_parser", "text_extractor"}
+
+    @pytest.mark.asyncio
+    async def test_catalog_pages_off_the_loop(self, tmp_path):
+        make_run(tmp_path, "big", 130)
+        pipeline = ProcessingPipeline(make_config(tmp_path, execution_mode="inline"))
+        pipeline.CAPTURE_BATCH_SIZE = 50
+        loop_thread = threading.get_ident()
+        capture_batch = pipeline.cas_store.capture_batch
+        batches = []
+
+        def recording(*args):
+            rows = capture_batch(*args)
+            batches.append((len(rows), threading.get_ident() != loop_thread))
+            return rows
+
+        pipeline.cas_store.capture_batch = recording
+        summary = await pipeline.process_run("big")
+
+        assert summary["total_manifests"] == 130
+        assert batches == [(50, True), (50, True), (30, True)]
+
+    @pytest.mark.asyncio
+    async def test_process_pool_run(self, tmp_path):
+        make_run(tmp_path, "pooled", 6)
+        pipeline = ProcessingPipeline(make_config(tmp_path, max_processing_workers=2))
+        loop_thread = threading.get_ident()
+        shutdown_threads = []
+        create_executor = pipeline._create_executor
+
+        def tracking_executor():
+            executor = create_executor()
+            shutdown = executor.shutdown
+
+            def recording_shutdown(*args, **kwargs):
+                shutdown_threads.append(threading.get_ident())
+                shutdown(*args, **kwargs)
+
+            executor.shutdown = recording_shutdown
+            return executor
+
+        pipeline._create_executor = tracking_executor
+        summary = await pipeline.process_run("pooled")
+
+        assert shutdown_threads and loop_thread not in shutdown_threads
+        assert summary["execution_mode"] == "process"
+        assert summary["successful_processing"] == 6
+        derived = tmp_path / "derived" / "pooled" / "html_parser.jsonl"
+        assert len(derived.read_text().splitlines()) == 6
+
+    @pytest.mark.asyncio
+    async def test_empty_run_reports_error(self, tmp_path):
+        pipeline = ProcessingPipeline(make_config(tmp_path, execution_mode="inline"))
+
+        assert "error" in await pipeline.process_run("missing")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory recrawl index and its batched crawl-record writes
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from business_intel_scraper.backend.queue.distributed_crawler import (
+    Base,
+    CrawlRecord,
+    RecrawlIndex,
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'crawl.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def url_hash(url):
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def crawl_update(url, crawled_at, etag=None, status_code=200, interval_hours=24):
+    return {
+        "url": url,
+        "domain": "a.example",
+        "link_depth": 1,
+        "first_crawled_at": crawled_at,
+        "crawled_at": crawled_at,
+        "status_code": status_code,
+        "requires_js": False,
+        "is_dynamic": False,
+        "content_size": 1000,
+        "etag": etag,
+        "last_modified": None,
+        "recrawl_interval_hours": interval_hours,
+        "next_crawl_at": crawled_at + timedelta(hours=interval_hours),
+        "metadata": {"worker_id": "crawl-test"},
+    }
+
+
+def stored_records(session_factory):
+    session = session_factory()
+    try:
+        return {record.url: record for record in session.query(CrawlRecord)}
+    finally:
+        session.close()
+
+
+class TestRecrawlIndex:
+    """Recrawl checks come from memory; crawl results reach the database in batches"""
+
+    @pytest.mark.asyncio
+    async def test_updates_coalesce_per_url(self, session_factory):
+        index = RecrawlIndex(session_factory, flush_interval=60)
+        await index.start()
+        url = "https://a.example/page"
+        first, second = datetime(2026, 1, 1), datetime(2026, 1, 2)
+
+        index.record_crawl(url_hash(url), crawl_update(url, first, etag='"v1"'))
+        index.record_crawl(url_hash(url), crawl_update(url, second, status_code=304))
+        await index.close()
+
+        record = stored_records(session_factory)[url]
+        assert index.metrics["flush_batches"] == 1
+        assert index.metrics["flushed_records"] == 1
+        assert record.crawl_count == 2
+        assert record.first_crawled_at == first and record.last_crawled_at == second
+        assert record.last_status_code == 304
+        # A later crawl without validators keeps the earlier ETag
+        assert record.etag == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_recrawl_checks_answered_from_warm_index(self, session_factory):
+        now = datetime.utcnow()
+        writer = RecrawlIndex(session_factory)
+        await writer.start()
+        for url, crawled_at in (
+            ("https://a.example/fresh", now),
+            ("https://a.example/stale", now - timedelta(days=2)),
+        ):
+            writer.record_crawl(url_hash(url), crawl_update(url, crawled_at))
+        await writer.close()
+
+        index = RecrawlIndex(session_factory)
+        await index.start()
+
+        assert index.metrics["warmed_records"] == 2
+        assert not index.should_crawl(url_hash("https://a.example/fresh"))
+        assert index.should_crawl(url_hash("https://a.example/stale"))
+        assert index.should_crawl(url_hash("https://a.example/new"))
+        await index.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_updates(self, session_factory):
+        index = RecrawlIndex(session_factory, flush_interval=60)
+        await index.start()
+        url = "https://a.example/page"
+        write_batch = index._write_batch
+
+        def failing_write(batch):
+            raise OSError("database is locked")
+
+        index._write_batch = failing_write
+        index.record_crawl(url_hash(url), crawl_update(url, datetime(2026, 1, 1)))
+        await index.flush()
+        # Crawled again while the failed batch waits for the next flush
+        index.record_crawl(url_hash(url), crawl_update(url, datetime(2026, 1, 2)))
+        index._write_batch = write_batch
+        await index.close()
+
+        record = stored_records(session_factory)[url]
+        assert index.metrics["flush_failures"] == 1
+        assert record.crawl_count == 2
+        assert record.first_crawled_at == datetime(2026, 1, 1)
+        assert record.last_crawled_at == datetime(2026, 1, 2)
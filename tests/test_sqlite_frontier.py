@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the leased, batched SQLite frontier and how crawl workers claim from it
+"""
+
+import asyncio
+
+import pytest
+
+from business_intel_scraper.backend.queue.distributed_crawler import (
+    CrawlURL,
+    CrawlWorker,
+    QueueManager,
+    SQLiteQueueManager,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def urls(count, priority=5):
+    return [CrawlURL(url=f"https://site.example/{priority}/{i}", priority=priority)
+            for i in range(count)]
+
+
+class TestFrontierBatches:
+    """put_frontier_urls/get_frontier_urls move many URLs per transaction"""
+
+    @pytest.mark.asyncio
+    async def test_batch_put_then_claim_by_priority(self, db_path):
+        queue = SQLiteQueueManager(db_path)
+        added = await queue.put_frontier_urls(urls(3, priority=1) + urls(2, priority=9))
+
+        claimed = await queue.get_frontier_urls(3)
+
+        assert added == 5
+        assert [u.priority for u in claimed] == [9, 9, 1]
+        assert claimed[0].url == "https://site.example/9/0"
+        assert all(u.queue_receipt for u in claimed)
+        await queue.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_managers_never_share_a_claim(self, db_path):
+        first, second = SQLiteQueueManager(db_path), SQLiteQueueManager(db_path)
+        await first.put_frontier_urls(urls(50))
+
+        batches = await asyncio.gather(*(
+            manager.get_frontier_urls(10) for manager in (first, second) * 3
+        ))
+
+        claimed = [u.url for batch in batches for u in batch]
+        assert len(claimed) == len(set(claimed)) == 50
+        await first.disconnect()
+        await second.disconnect()
+
+
+class TestFrontierLeases:
+    """Claimed URLs stay queued until acked, and return when their lease runs out"""
+
+    @pytest.mark.asyncio
+    async def test_ack_removes_claimed_url(self, db_path):
+        queue = SQLiteQueueManager(db_path)
+        await queue.put_frontier_urls(urls(2))
+
+        crawl_url = await queue.get_frontier_url()
+        leased = await queue.get_queue_stats()
+        acked = await queue.ack_frontier_url(crawl_url)
+        after = await queue.get_queue_stats()
+
+        assert leased["frontier_queue_size"] == 2 and leased["frontier_leased"] == 1
+        assert acked
+        assert after["frontier_queue_size"] == 1 and after["frontier_leased"] == 0
+        await queue.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_claimed_again(self, db_path):
+        first = SQLiteQueueManager(db_path, visibility_timeout=0.1)
+        second = SQLiteQueueManager(db_path, visibility_timeout=60)
+        await first.put_frontier_urls(urls(1))
+
+        stale = await first.get_frontier_url()
+        assert await second.get_frontier_url() is None
+        await asyncio.sleep(0.2)
+        # Expired but not yet reclaimed: not counted as leased
+        assert (await first.get_queue_stats())["frontier_leased"] == 0
+        reclaimed = await second.get_frontier_url()
+
+        assert reclaimed.url == stale.url
+        # The old holder can neither renew nor ack the new holder's lease
+        assert not await first.renew_frontier_lease(stale)
+        assert not await first.ack_frontier_url(stale)
+        assert await second.renew_frontier_lease(reclaimed)
+        assert await second.ack_frontier_url(reclaimed)
+        assert (await second.get_queue_stats())["frontier_queue_size"] == 0
+        await first.disconnect()
+        await second.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_renewal_keeps_url_from_other_workers(self, db_path):
+        first = SQLiteQueueManager(db_path, visibility_timeout=0.3)
+        second = SQLiteQueueManager(db_path)
+        await first.put_frontier_urls(urls(1))
+
+        crawl_url = await first.get_frontier_url()
+        await asyncio.sleep(0.2)
+        assert await first.renew_frontier_lease(crawl_url)
+        await asyncio.sleep(0.2)
+
+        assert await second.get_frontier_url() is None
+        await first.disconnect()
+        await second.disconnect()
+
+
+class CountingQueue(QueueManager):
+    """Endless frontier that records how many URLs were claimed"""
+
+    def __init__(self):
+        self.claimed = 0
+
+    async def get_frontier_url(self):
+        self.claimed += 1
+        return CrawlURL(url=f"https://site.example/{self.claimed}")
+
+
+class TestCrawlWorkerClaims:
+    """A crawl worker holds at most max_concurrent URLs"""
+
+    @pytest.mark.asyncio
+    async def test_claims_wait_for_a_free_slot(self):
+        queue = CountingQueue()
+        worker = CrawlWorker(
+            "crawl-test", queue, storage_manager=None, max_concurrent=3
+        )
+        release = asyncio.Event()
+
+        async def slow_crawl(crawl_url):
+            await release.wait()
+
+        worker._crawl_url = slow_crawl
+        worker.is_running = True
+        loop_task = asyncio.create_task(worker._crawl_loop())
+        await asyncio.sleep(0.1)
+        held = queue.claimed
+
+        release.set()
+        await asyncio.sleep(0.1)
+        worker.is_running = False
+        loop_task.cancel()
+        await asyncio.gather(loop_task, return_exceptions=True)
+
+        assert held == 3
+        assert queue.claimed > 3
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for single-pass text block segmentation in the CFPL TextExtractor
+"""
+
+import pytest
+
+from storage.config import CFPLConfig, StorageConfig
+from storage.document import parse_html
+from storage.processors import TextExtractor
+
+SENTENCE = "This sentence is long enough on its own to count as a substantial block."
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    return TextExtractor(CFPLConfig(storage=StorageConfig(root=str(tmp_path))))
+
+
+class TestSegmentation:
+    """Blocks are leaf-most and never repeat descendant text"""
+
+    def test_nested_containers_do_not_duplicate_text(self, extractor):
+        soup = parse_html(
+            f"<div><div><div><p>{SENTENCE}</p></div></div>"
+            f"<section><p>{SENTENCE}</p><p>{SENTENCE}</p></section></div>"
+        )
+
+        _, blocks = extractor._segment(soup)
+
+        assert [b["tag"] for b in blocks] == ["p", "p", "p"]
+        assert all(b["text"] == SENTENCE for b in blocks)
+        assert [b["order"] for b in blocks] == [4, 6, 7]
+
+    def test_small_children_fold_into_parent(self, extractor):
+        soup = parse_html(
+            "<article><p>Short lead.</p><p>Another short line.</p>"
+            "<div>A third small piece of text.</div></article>"
+        )
+
+        _, blocks = extractor._segment(soup)
+
+        assert len(blocks) == 1
+        assert blocks[0]["tag"] == "article"
+        assert blocks[0]["text"].startswith("Short lead.Another short line.")
+
+    def test_parent_keeps_only_uncovered_text(self, extractor):
+        soup = parse_html(f"<div>{SENTENCE} Intro<p>{SENTENCE}</p></div>")
+
+        _, blocks = extractor._segment(soup)
+
+        assert [b["tag"] for b in blocks] == ["div", "p"]
+        assert blocks[0]["text"] == f"{SENTENCE} Intro"
+
+    def test_skipped_subtrees_and_page_text(self, extractor):
+        soup = parse_html(
+            f"<body><nav><p>{SENTENCE}</p></nav><script>var x = 1;</script>"
+            f"<!-- note --><p>{SENTENCE}</p><footer>Footer</footer></body>"
+        )
+
+        text, blocks = extractor._segment(soup)
+
+        assert text == SENTENCE
+        assert len(blocks) == 1
+
+    def test_deep_nesting_does_not_recurse(self, extractor):
+        depth = 5000
+        soup = parse_html("<div>" * depth + SENTENCE + "</div>" * depth)
+
+        text, blocks = extractor._segment(soup)
+
+        assert text == SENTENCE
+        assert len(blocks) == 1
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Tests for frontier URL de-duplication: canonical keys and the persistent seen-set
+"""
+
+import types
+
+import pytest
+
+from business_intel_scraper.backend.queue.distributed_crawler import (
+    DistributedCrawlSystem,
+    MemoryURLSeenSet,
+    ParseTask,
+    ParseWorker,
+    QueueBackend,
+    QueueManager,
+    RedisURLSeenSet,
+    SQLiteURLSeenSet,
+    canonicalize_url,
+)
+
+
+class TestCanonicalizeUrl:
+    """Equivalent spellings share a key; the key is still a valid URL"""
+
+    @pytest.mark.parametrize("url, canonical", [
+        ("HTTP://Example.COM:80", "http://example.com/"),
+        ("https://example.com:443/a#section", "https://example.com/a"),
+        ("https://example.com:8443/a", "https://example.com:8443/a"),
+        ("https://example.com/?b=2&a=1", "https://example.com/?a=1&b=2"),
+        ("https://example.com/?utm_source=x&id=7&gclid=y", "https://example.com/?id=7"),
+        ("http://[::1]:8080/x", "http://[::1]:8080/x"),
+        ("http://[2001:DB8::1]/", "http://[2001:db8::1]/"),
+        ("https://example.com/?flag&q=a%20b", "https://example.com/?flag&q=a%20b"),
+        ("https://user:pw@example.com./", "https://user:pw@example.com/"),
+    ])
+    def test_canonical_form(self, url, canonical):
+        assert canonicalize_url(url) == canonical
+
+    def test_tracking_keys_matched_decoded(self):
+        assert canonicalize_url("https://example.com/?UTM%5FCampaign=x") == "https://example.com/"
+
+
+class TestSQLiteURLSeenSet:
+    """Bloom filter in front of a SQLite table, scoped per job"""
+
+    @pytest.mark.asyncio
+    async def test_add_new_returns_unseen_urls_as_given(self, tmp_path):
+        seen = SQLiteURLSeenSet(str(tmp_path / "seen.db"), expected_urls=1000)
+
+        first = await seen.add_new(
+            ["https://a.example/x?utm_source=feed", "https://A.example/x", "https://a.example/y"],
+            "job"
+        )
+        second = await seen.add_new(
+            ["https://a.example/y", "https://a.example/z"], "job"
+        )
+
+        # Canonical duplicates collapse onto the first spelling, which is kept as linked
+        assert first == ["https://a.example/x?utm_source=feed", "https://a.example/y"]
+        assert second == ["https://a.example/z"]
+        await seen.close()
+
+    @pytest.mark.asyncio
+    async def test_scoped_per_job(self, tmp_path):
+        seen = SQLiteURLSeenSet(str(tmp_path / "seen.db"), expected_urls=1000)
+
+        assert await seen.add_new(["https://a.example/"], "job-1") == ["https://a.example/"]
+        assert await seen.add_new(["https://a.example/"], "job-2") == ["https://a.example/"]
+        assert await seen.add_new(["https://a.example/"], "job-1") == []
+        await seen.close()
+
+    @pytest.mark.asyncio
+    async def test_bloom_positives_checked_against_table(self, tmp_path):
+        # A saturated filter reports every key as present
+        seen = SQLiteURLSeenSet(
+            str(tmp_path / "seen.db"), expected_urls=1, error_rate=0.5
+        )
+        await seen.add_new([f"https://a.example/{i}" for i in range(50)], "job")
+
+        fresh = await seen.add_new(
+            ["https://a.example/1", "https://a.example/new"], "job"
+        )
+
+        assert fresh == ["https://a.example/new"]
+        await seen.close()
+
+    @pytest.mark.asyncio
+    async def test_persists_and_forget(self, tmp_path):
+        db_path = str(tmp_path / "seen.db")
+        seen = SQLiteURLSeenSet(db_path, expected_urls=1000)
+        await seen.add_new(["https://a.example/1", "https://a.example/2"], "job")
+        await seen.close()
+
+        reopened = SQLiteURLSeenSet(db_path, expected_urls=1000)
+        await reopened.forget(["https://a.example/2"], "job")
+        fresh = await reopened.add_new(
+            ["https://a.example/1", "https://a.example/2"], "job"
+        )
+
+        assert fresh == ["https://a.example/2"]
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_forget_job_keeps_other_jobs(self, tmp_path):
+        db_path = str(tmp_path / "seen.db")
+        seen = SQLiteURLSeenSet(db_path, expected_urls=1000)
+        await seen.add_new(["https://a.example/"], "job-1")
+        await seen.add_new(["https://a.example/"], "job-2")
+        await seen.forget_job("job-1")
+        await seen.close()
+
+        reopened = SQLiteURLSeenSet(db_path, expected_urls=1000)
+        assert await reopened.add_new(["https://a.example/"], "job-1") == [
+            "https://a.example/"
+        ]
+        assert await reopened.add_new(["https://a.example/"], "job-2") == []
+        await reopened.close()
+
+
+class TestMemoryURLSeenSet:
+    """Process-lifetime seen-set paired with the in-memory frontier"""
+
+    @pytest.mark.asyncio
+    async def test_scoped_per_job_and_forget(self):
+        seen = MemoryURLSeenSet()
+
+        assert await seen.add_new(
+            ["https://a.example/x", "https://A.example/x#top"], "job-1"
+        ) == ["https://a.example/x"]
+        assert await seen.add_new(["https://a.example/x"], "job-2") == ["https://a.example/x"]
+        assert await seen.add_new(["https://a.example/x"], "job-1") == []
+
+        await seen.forget(["https://a.example/x"], "job-1")
+        assert await seen.add_new(["https://a.example/x"], "job-1") == ["https://a.example/x"]
+
+        await seen.forget_job("job-1")
+        assert await seen.add_new(["https://a.example/x"], "job-1") == ["https://a.example/x"]
+        assert await seen.add_new(["https://a.example/x"], "job-2") == []
+
+
+class RecordingRedis:
+    """Just enough of a Redis client to see which keys a seen-set touches"""
+
+    def __init__(self):
+        self.sets = {}
+        self.expiries = {}
+
+    def pipeline(self, transaction=True):
+        client, calls = self, []
+
+        class Pipeline:
+            def sadd(self, name, value):
+                calls.append(("sadd", name, value))
+
+            def expire(self, name, ttl):
+                calls.append(("expire", name, ttl))
+
+            async def execute(self):
+                results = []
+                for op, name, arg in calls:
+                    if op == "sadd":
+                        members = client.sets.setdefault(name, set())
+                        results.append(int(arg not in members))
+                        members.add(arg)
+                    else:
+                        client.expiries[name] = arg
+                        results.append(True)
+                return results
+
+        return Pipeline()
+
+    async def delete(self, name):
+        self.sets.pop(name, None)
+        self.expiries.pop(name, None)
+
+
+class TestRedisURLSeenSet:
+    """One expiring Redis set per job"""
+
+    @pytest.mark.asyncio
+    async def test_per_job_key_with_ttl(self):
+        seen = RedisURLSeenSet(ttl=60)
+        seen.redis_client = client = RecordingRedis()
+
+        assert await seen.add_new(["https://a.example/"], "job-1") == ["https://a.example/"]
+        assert await seen.add_new(["https://a.example/"], "job-2") == ["https://a.example/"]
+        assert await seen.add_new(["https://a.example/"], "job-1") == []
+        assert client.expiries == {"crawler:seen:job-1": 60, "crawler:seen:job-2": 60}
+
+        await seen.forget_job("job-1")
+        assert set(client.sets) == {"crawler:seen:job-2"}
+        assert await seen.add_new(["https://a.example/"], "job-1") == ["https://a.example/"]
+
+
+def memory_crawl_system(tmp_path):
+    return DistributedCrawlSystem(
+        queue_backend=QueueBackend.MEMORY,
+        storage_config={
+            "database_url": f"sqlite:///{tmp_path / 'crawl.db'}",
+            "local_storage_path": str(tmp_path / "storage"),
+        },
+    )
+
+
+class TestCrawlSystemSeeding:
+    """The seen-set lives exactly as long as the frontier it guards"""
+
+    @pytest.mark.asyncio
+    async def test_memory_frontier_reseeds_after_restart(self, tmp_path):
+        urls = ["https://a.example/", "https://b.example/"]
+
+        first = memory_crawl_system(tmp_path)
+        assert isinstance(first.seen_urls, MemoryURLSeenSet)
+        assert await first.add_seed_urls(urls, "job") == 2
+        assert await first.add_seed_urls(urls, "job") == 0
+        await first.seen_urls.close()
+        await first.link_extractor.aclose()
+
+        restarted = memory_crawl_system(tmp_path)
+        assert await restarted.add_seed_urls(urls, "job") == 2
+        await restarted.link_extractor.aclose()
+
+    @pytest.mark.asyncio
+    async def test_reseed_and_finish_forget_the_job(self, tmp_path):
+        system = memory_crawl_system(tmp_path)
+        urls = ["https://a.example/"]
+
+        await system.add_seed_urls(urls, "job")
+        assert await system.add_seed_urls(urls, "job", reseed=True) == 1
+
+        await system.finish_job("job")
+        assert await system.add_seed_urls(urls, "job") == 1
+        await system.link_extractor.aclose()
+
+
+class FailingQueue(QueueManager):
+    """Frontier that rejects every enqueue"""
+
+    async def put_frontier_urls(self, crawl_urls):
+        return 0
+
+
+class OnePageStorage:
+    async def retrieve_raw_data(self, raw_id):
+        return types.SimpleNamespace(content="<html></html>", content_type="text/html")
+
+
+class TestParseWorkerEnqueue:
+    """URLs that fail to reach the frontier are not left marked as seen"""
+
+    @pytest.mark.asyncio
+    async def test_failed_enqueue_forgets_urls(self, tmp_path):
+        seen = SQLiteURLSeenSet(str(tmp_path / "seen.db"), expected_urls=1000)
+        worker = ParseWorker(
+            "parse-test", FailingQueue(), OnePageStorage(), seen_urls=seen
+        )
+
+        async def extract_inline(content, base_url):
+            return [{"url": f"https://a.example{path}", "text": "", "type": "link"}
+                    for path in ("/a", "/b")]
+
+        worker._extract_urls_from_html = extract_inline
+        task = ParseTask(task_id="t", url="https://a.example/", raw_id="r",
+                         storage_location="s", metadata={"job_id": "job"})
+
+        await worker._process_parse_task(task)
+
+        assert worker.metrics["tasks_failed"] == 1
+        urls = ["https://a.example/a", "https://a.example/b"]
+        assert await seen.add_new(urls, "job") == urls
+        await seen.close()
+        worker.link_extractor.close()